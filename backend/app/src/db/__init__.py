@@ -9,10 +9,20 @@ from sqlalchemy.orm import sessionmaker
 load_dotenv()
 
 DATABASE_URL = os.environ.get("DATABASE_URL", "postgresql://postgres:postgres@db:5432/petverse")
+# "memory": tablas de los repositorios en memoria (src/db/memory.py), sin Postgres
+DB_BACKEND = os.environ.get("DB_BACKEND", "sql")
+# replicas de solo lectura separadas por coma (ver src/db/replicas.py)
+DATABASE_REPLICA_URLS = [u.strip() for u in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
 
-# Normalizar para usar psycopg2 (driver ya instalado en tu venv)
-if DATABASE_URL.startswith("postgresql://"):
-	DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://", 1)
+
+def normalize_url(url: str) -> str:
+	# Normalizar para usar psycopg2 (driver ya instalado en tu venv)
+	if url.startswith("postgresql://"):
+		return url.replace("postgresql://", "postgresql+psycopg2://", 1)
+	return url
+
+
+DATABASE_URL = normalize_url(DATABASE_URL)
 
 engine: Engine = create_engine(DATABASE_URL, future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
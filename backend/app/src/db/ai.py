@@ -0,0 +1,56 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, select, text
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+# Mascota + ultimas vacunas, medicaciones vigentes y ultimos pesos en un solo viaje.
+_PET_CONTEXT = text("""
+SELECT p.id, p.owner_id, p.name, p.species, p.breed, p.sex, p.birthdate,
+  (SELECT coalesce(json_agg(v), '[]') FROM (
+     SELECT vaccine_name, date, next_due FROM pet_vaccines
+     WHERE pet_id = p.id ORDER BY date DESC NULLS LAST, id DESC LIMIT :n) v) AS vaccines,
+  (SELECT coalesce(json_agg(m), '[]') FROM (
+     SELECT medication, dose, frequency, start_date, end_date FROM pet_medications
+     WHERE pet_id = p.id AND (end_date IS NULL OR end_date >= current_date)
+     ORDER BY start_date DESC NULLS LAST, id DESC LIMIT :n) m) AS medications,
+  (SELECT coalesce(json_agg(w), '[]') FROM (
+     SELECT date, weight FROM pet_weight_history
+     WHERE pet_id = p.id ORDER BY date DESC NULLS LAST, id DESC LIMIT :n) w) AS weights
+FROM pets p
+WHERE p.id = :pet_id
+""")
+
+
+def pet_context(pet_id: int, limit: int = 5) -> Optional[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        row = session.execute(_PET_CONTEXT, {"pet_id": pet_id, "n": limit}).mappings().first()
+        return dict(row) if row else None
+    finally:
+        session.close()
+
+
+def insert_chat_history(rows: List[Dict[str, Any]]):
+    """Un INSERT con executemany para todo el lote."""
+    if not rows:
+        return
+    session = SessionLocal()
+    try:
+        session.execute(insert(t.ai_chat_history), rows)
+        session.commit()
+    finally:
+        session.close()
+
+
+def list_chat_history(user_id: int, pet_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+    h = t.ai_chat_history.c
+    stmt = select(t.ai_chat_history).where(h.user_id == user_id).order_by(h.created_at.desc(), h.id.desc()).limit(limit)
+    if pet_id is not None:
+        stmt = stmt.where(h.pet_id == pet_id)
+    session = SessionLocal()
+    try:
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
@@ -0,0 +1,102 @@
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+
+class SlotTakenError(ValueError):
+    pass
+
+
+def get_clinic(clinic_id: int) -> Optional[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        row = session.execute(select(t.vet_clinics).where(t.vet_clinics.c.id == clinic_id)).mappings().first()
+        return dict(row) if row else None
+    finally:
+        session.close()
+
+
+def get_rules(clinic_id: int) -> List[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        stmt = select(t.vet_availability).where(t.vet_availability.c.clinic_id == clinic_id)
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+
+
+def replace_rules(clinic_id: int, rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        session.execute(delete(t.vet_availability).where(t.vet_availability.c.clinic_id == clinic_id))
+        if rules:
+            session.execute(insert(t.vet_availability), [{"clinic_id": clinic_id, **r} for r in rules])
+        session.commit()
+    finally:
+        session.close()
+    return get_rules(clinic_id)
+
+
+def booked_in_range(clinic_id: int, start: date, end: date) -> List[Dict[str, Any]]:
+    """Turnos activos de la clinica en [start, end): una sola consulta por el indice (clinic_id, date)."""
+    a = t.appointments.c
+    stmt = select(a.date, a.vet_id, a.time).where(
+        a.clinic_id == clinic_id,
+        a.date >= start,
+        a.date < end,
+        a.status.is_distinct_from("cancelled"),
+    )
+    session = SessionLocal()
+    try:
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+
+
+def create_appointment(data: Dict[str, Any]) -> Dict[str, Any]:
+    """El indice unico ux_appointments_slot decide las carreras: gana un solo INSERT."""
+    session = SessionLocal()
+    try:
+        row = session.execute(
+            insert(t.appointments).values(status="booked", **data).returning(*t.appointments.c)
+        ).mappings().first()
+        session.commit()
+        return dict(row)
+    except IntegrityError:
+        session.rollback()
+        raise SlotTakenError("El horario ya está reservado")
+    finally:
+        session.close()
+
+
+def cancel_appointment(user_id: int, appointment_id: int) -> Optional[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        row = session.execute(
+            update(t.appointments)
+            .where(t.appointments.c.id == appointment_id, t.appointments.c.user_id == user_id)
+            .values(status="cancelled")
+            .returning(*t.appointments.c)
+        ).mappings().first()
+        session.commit()
+        return dict(row) if row else None
+    finally:
+        session.close()
+
+
+def list_user_appointments(user_id: int) -> List[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        stmt = (
+            select(t.appointments)
+            .where(t.appointments.c.user_id == user_id)
+            .order_by(t.appointments.c.date, t.appointments.c.time)
+        )
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
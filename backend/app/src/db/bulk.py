@@ -0,0 +1,86 @@
+"""
+COPY en streaming para volcados y cargas masivas (scripts/bulk_data.py).
+
+- Salida: CSV con encabezado (el de Postgres) o NDJSON. El JSON lo arma
+  Postgres con row_to_json y se copia como texto crudo (RAW_TEXT: delimitador
+  y comilla que JSON siempre escapa), asi el cliente solo pasa bytes.
+- Entrada: CSV directo con COPY; NDJSON a una tabla temporal (doc json) y un
+  INSERT ... SELECT con json_populate_record.
+
+psycopg2 copia de y hacia objetos archivo en bloques: nada se arma entero en
+memoria. Las columnas son las de models/tables.py, sin las calculadas por la
+base (Computed), que no se pueden insertar.
+"""
+from typing import IO, List, Optional, Set
+
+from sqlalchemy import Table
+
+FORMATS = ("csv", "ndjson")
+RAW_TEXT = "FORMAT csv, DELIMITER E'\\x02', QUOTE E'\\x01'"
+
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def existing_columns(cursor, table_name: str) -> Set[str]:
+    """Columnas de la tabla en la base (vacio si la tabla no existe)."""
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_schema = current_schema() AND table_name = %s",
+        (table_name,),
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def columns_of(table: Table, existing: Optional[Set[str]] = None) -> List[str]:
+    return [
+        c.name for c in table.columns
+        if c.computed is None and (existing is None or c.name in existing)
+    ]
+
+
+def select_sql(table_name: str, columns: List[str], where: str = "", order_by: Optional[str] = "id") -> str:
+    sql = f"SELECT {', '.join(map(quote, columns))} FROM {quote(table_name)}"
+    if where:
+        sql += f" WHERE {where}"
+    if order_by and order_by in columns:
+        sql += f" ORDER BY {quote(order_by)}"
+    return sql
+
+
+def copy_out(cursor, query: str, fmt: str, out: IO) -> int:
+    """Vuelca el resultado de `query` en `out`; devuelve las filas copiadas."""
+    if fmt == "csv":
+        sql = f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)"
+    elif fmt == "ndjson":
+        sql = f"COPY (SELECT row_to_json(q) FROM ({query}) q) TO STDOUT WITH ({RAW_TEXT})"
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    cursor.copy_expert(sql, out)
+    return cursor.rowcount
+
+
+def copy_in(cursor, table_name: str, columns: List[str], fmt: str, data: IO) -> None:
+    """Carga `data` (CSV sin encabezado o NDJSON) en la transaccion en curso."""
+    cols = ", ".join(map(quote, columns))
+    if fmt == "csv":
+        cursor.copy_expert(f"COPY {quote(table_name)} ({cols}) FROM STDIN WITH (FORMAT csv)", data)
+    elif fmt == "ndjson":
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS bulk_ndjson (doc json) ON COMMIT DELETE ROWS")
+        cursor.copy_expert(f"COPY bulk_ndjson (doc) FROM STDIN WITH ({RAW_TEXT})", data)
+        picked = ", ".join(f"r.{quote(c)}" for c in columns)
+        cursor.execute(
+            f"INSERT INTO {quote(table_name)} ({cols}) "
+            f"SELECT {picked} FROM bulk_ndjson, json_populate_record(NULL::{quote(table_name)}, doc) r"
+        )
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+
+def reset_identity(cursor, table_name: str, column: str = "id") -> None:
+    """Deja la secuencia de la columna identidad despues del maximo cargado."""
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, %s), GREATEST(COALESCE(MAX({quote(column)}), 0), 1), "
+        f"MAX({quote(column)}) IS NOT NULL) FROM {quote(table_name)}",
+        (quote(table_name), column),
+    )
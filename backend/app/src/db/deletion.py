@@ -0,0 +1,299 @@
+"""
+Borrado en cascada por lotes (ver src/services/deletion.py).
+
+Un plan es la lista de pasos para borrar una mascota o una cuenta, de las
+tablas hijas a la fila padre. Cada paso borra (o desvincula, con SET NULL)
+hasta `batch` filas por transaccion:
+
+    DELETE FROM t WHERE id IN (SELECT id FROM t WHERE <filtro> LIMIT :batch) RETURNING ...
+
+y en la misma transaccion suma el avance en deletion_jobs, asi un job cortado
+retoma sin contar dos veces. Los filtros se vuelven a evaluar en cada lote:
+repetir un paso ya hecho no borra nada.
+
+Lo que es de la cuenta se borra; lo compartido con otros usuarios (turnos
+como veterinario, lugares creados, clinicas, productos y ventas de su
+tienda, pedidos) se conserva sin la referencia. Los turnos pendientes del
+veterinario ademas se cancelan.
+"""
+import json
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.db import SessionLocal
+from src.db.places import discount_reviews
+from src.models import tables as t
+
+class Step(NamedTuple):
+    table: str
+    where: str
+    set_null: Optional[str] = None
+    # con set_null, otra asignacion en el mismo UPDATE (p. ej. cancelar el turno)
+    also_set: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.table}.{self.set_null}" if self.set_null else self.table
+
+    @property
+    def assignments(self) -> str:
+        return f"{self.set_null} = NULL" + (f", {self.also_set}" if self.also_set else "")
+
+
+# URL del archivo subido de cada fila (posts.media_urls: varias separadas por coma)
+MEDIA_COLUMNS = {
+    "pets": "avatar_url",
+    "pet_media": "url",
+    "pet_vaccine_card_scans": "file_url",
+    "posts": "media_urls",
+    "messages": "media_url",
+    "users": "profile_photo_url",
+}
+
+# columnas que devuelve el borrado ademas del id: archivos a limpiar y datos para ajustar agregados y caches
+RETURNING = {
+    **{table: (column,) for table, column in MEDIA_COLUMNS.items()},
+    "pets": ("avatar_url", "breed"),
+    "place_reviews": ("place_id", "rating"),
+    "friendships": ("user_1", "user_2"),
+    "group_members": ("group_id", "user_id"),
+    "vet_availability": ("clinic_id",),
+}
+
+
+def _pet_steps(pets: str) -> List[Step]:
+    """Pasos para las mascotas del subquery `pets` (una o todas las de una cuenta)."""
+    in_pets = f"pet_id IN ({pets})"
+    return [
+        Step("pet_vaccines", in_pets),
+        Step("pet_medications", in_pets),
+        Step("pet_weight_history", in_pets),
+        Step("pet_media", in_pets),
+        Step("pet_medical_visits", in_pets),
+        Step("pet_vaccine_card_scans", in_pets),
+        Step("health_records", in_pets),
+        Step("appointments", in_pets),
+        Step("ai_recommendations", in_pets),
+        Step("ai_chat_history", in_pets, set_null="pet_id"),
+        Step("posts", in_pets, set_null="pet_id"),
+        Step("embeddings", f"entity_type = 'pet' AND entity_id IN ({pets})"),
+        Step("pets", f"id IN ({pets})"),
+    ]
+
+
+_USER_POSTS = "SELECT id FROM posts WHERE user_id = :target"
+
+# un turno del veterinario que pasa a vet_id NULL toma la clave del turno general de la
+# clinica en ux_appointments_slot: si ese horario ya esta tomado, o el turno es futuro, se cancela
+_VET_SLOT_TAKEN = (
+    "EXISTS (SELECT 1 FROM appointments o WHERE o.clinic_id = appointments.clinic_id AND o.vet_id IS NULL"
+    " AND o.date = appointments.date AND o.time = appointments.time AND o.status IS DISTINCT FROM 'cancelled')"
+)
+_VET_CANCEL = f"coalesce(date >= current_date, false) OR {_VET_SLOT_TAKEN}"
+
+PLANS: Dict[str, List[Step]] = {
+    "pet": _pet_steps("SELECT :target"),
+    "user": [
+        # primero el contenido propio: los posts se llevan likes y comentarios de otros
+        Step("post_likes", f"post_id IN ({_USER_POSTS})"),
+        Step("post_comments", f"post_id IN ({_USER_POSTS})"),
+        Step("embeddings", f"entity_type = 'post' AND entity_id IN ({_USER_POSTS})"),
+        Step("posts", "user_id = :target"),
+        Step("post_likes", "user_id = :target"),
+        Step("post_comments", "user_id = :target"),
+        Step("ai_chat_history", "user_id = :target"),
+        Step("appointments", "user_id = :target"),
+        *_pet_steps("SELECT id FROM pets WHERE owner_id = :target"),
+        Step("messages", "sender_id = :target"),
+        Step("chat_members", "user_id = :target"),
+        Step("group_members", "user_id = :target"),
+        Step("friendships", "user_1 = :target OR user_2 = :target OR requested_by = :target"),
+        Step("place_reviews", "user_id = :target"),
+        Step("place_reports", "user_id = :target"),
+        Step("vet_availability", "vet_id = :target"),
+        # compartido con otros usuarios: queda sin la referencia
+        Step("pet_medical_visits", "vet_id = :target", set_null="vet_id"),
+        Step("health_records", "vet_id = :target", set_null="vet_id"),
+        Step("appointments", f"vet_id = :target AND ({_VET_CANCEL})", set_null="vet_id", also_set="status = 'cancelled'"),
+        Step("appointments", f"vet_id = :target AND NOT ({_VET_CANCEL})", set_null="vet_id"),
+        Step("places", "created_by_user = :target", set_null="created_by_user"),
+        Step("vet_clinics", "owner_id = :target", set_null="owner_id"),
+        Step("shop_products", "shop_id = :target", set_null="shop_id"),
+        Step("orders", "shop_id = :target", set_null="shop_id"),
+        Step("orders", "user_id = :target", set_null="user_id"),
+        Step("user_settings", "user_id = :target"),
+        Step("user_address", "user_id = :target"),
+        Step("users", "id = :target"),
+    ],
+}
+
+
+def existing_columns(tables: Set[str]) -> Dict[str, Set[str]]:
+    """Columnas de cada tabla presente en la base; los pasos de tablas o columnas ausentes se saltean."""
+    session = SessionLocal()
+    try:
+        rows = session.execute(
+            text(
+                "SELECT table_name, column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = ANY(:names)"
+            ),
+            {"names": sorted(tables)},
+        ).all()
+    finally:
+        session.close()
+    found: Dict[str, Set[str]] = {}
+    for table_name, column in rows:
+        found.setdefault(table_name, set()).add(column)
+    return found
+
+
+def plan_for(kind: str) -> List[Step]:
+    existing = existing_columns({step.table for step in PLANS[kind]})
+    return [
+        step for step in PLANS[kind]
+        if step.table in existing and (step.set_null is None or step.set_null in existing[step.table])
+    ]
+
+
+def count_rows(plan: List[Step], target_id: int) -> int:
+    """Filas que tocaria el plan hoy (para el porcentaje; los filtros usan los indices de FK)."""
+    session = SessionLocal()
+    try:
+        return sum(
+            session.execute(text(f"SELECT count(*) FROM {step.table} WHERE {step.where}"), {"target": target_id}).scalar_one()
+            for step in plan
+        )
+    finally:
+        session.close()
+
+
+def run_batch(job_id: int, step: Step, target_id: int, batch: int, lock_timeout_ms: int, progress: Dict[str, int]) -> Tuple[int, List[tuple]]:
+    """
+    Un lote del paso en su propia transaccion, con lock_timeout para no
+    quedar esperando detras de otra escritura. Devuelve las filas tocadas y
+    lo que devolvio el RETURNING del borrado.
+    """
+    returning = ", ".join(("id",) + RETURNING.get(step.table, ())) if not step.set_null else "id"
+    pick = f"SELECT id FROM {step.table} WHERE {step.where} LIMIT :batch"
+    if step.set_null:
+        sql = f"UPDATE {step.table} SET {step.assignments} WHERE id IN ({pick}) RETURNING id"
+    else:
+        sql = f"DELETE FROM {step.table} WHERE id IN ({pick}) RETURNING {returning}"
+    session = SessionLocal()
+    try:
+        session.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+        rows = [tuple(r) for r in session.execute(text(sql), {"target": target_id, "batch": batch}).all()]
+        if step.table == "place_reviews" and not step.set_null:
+            discount_reviews(session, [(place_id, rating) for _, place_id, rating in rows])
+        done = dict(progress)
+        if rows:
+            done[step.name] = done.get(step.name, 0) + len(rows)
+        session.execute(
+            text(
+                "UPDATE deletion_jobs SET step = :step, deleted = deleted + :n, progress = :progress, updated_at = now() "
+                "WHERE id = :id"
+            ),
+            {"step": step.name, "n": len(rows), "progress": json.dumps(done), "id": job_id},
+        )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    progress.update(done)
+    return len(rows), rows
+
+
+# ----- Jobs -----
+def _job(row) -> Dict[str, Any]:
+    job = dict(row)
+    job["progress"] = json.loads(job["progress"]) if job.get("progress") else {}
+    return job
+
+
+def create_job(kind: str, target_id: int, requested_by: Optional[int]) -> Dict[str, Any]:
+    """Encola el borrado; si ya hay uno pendiente para la misma mascota o cuenta, devuelve ese."""
+    j = t.deletion_jobs.c
+    stmt = (
+        pg_insert(t.deletion_jobs)
+        .values(kind=kind, target_id=target_id, requested_by=requested_by)
+        .on_conflict_do_nothing(index_elements=[j.kind, j.target_id], index_where=j.status.in_(("queued", "running")))
+        .returning(*t.deletion_jobs.c)
+    )
+    session = SessionLocal()
+    try:
+        row = session.execute(stmt).mappings().first()
+        if row is None:
+            row = session.execute(
+                select(t.deletion_jobs).where(j.kind == kind, j.target_id == target_id, j.status.in_(("queued", "running")))
+            ).mappings().first()
+        session.commit()
+        return _job(row)
+    finally:
+        session.close()
+
+
+def get_job(job_id: int) -> Optional[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        row = session.execute(select(t.deletion_jobs).where(t.deletion_jobs.c.id == job_id)).mappings().first()
+        return _job(row) if row else None
+    finally:
+        session.close()
+
+
+def active_targets(kind: str) -> List[int]:
+    """Mascotas o cuentas con un borrado en cola o en curso (por el indice parcial ux_deletion_jobs_active)."""
+    j = t.deletion_jobs.c
+    session = SessionLocal()
+    try:
+        return list(session.execute(
+            select(j.target_id).where(j.kind == kind, j.status.in_(("queued", "running")))
+        ).scalars().all())
+    finally:
+        session.close()
+
+
+_CLAIM = text("""
+UPDATE deletion_jobs SET status = 'running', attempts = attempts + 1,
+  started_at = coalesce(started_at, now()), updated_at = now()
+WHERE id = (
+  SELECT id FROM deletion_jobs
+  WHERE status = 'queued' OR (status = 'running' AND updated_at < now() - make_interval(secs => :stale))
+  ORDER BY id LIMIT 1 FOR UPDATE SKIP LOCKED
+)
+RETURNING *
+""")
+
+
+def claim_job(stale_seconds: float) -> Optional[Dict[str, Any]]:
+    """
+    Toma el job pendiente mas viejo (o uno 'running' sin avance en
+    stale_seconds: su proceso murio). SKIP LOCKED deja que varios procesos
+    de la app compartan la cola.
+    """
+    session = SessionLocal()
+    try:
+        row = session.execute(_CLAIM, {"stale": stale_seconds}).mappings().first()
+        session.commit()
+        return _job(row) if row else None
+    finally:
+        session.close()
+
+
+def update_job(job_id: int, **values: Any):
+    session = SessionLocal()
+    try:
+        session.execute(
+            t.deletion_jobs.update().where(t.deletion_jobs.c.id == job_id).values(updated_at=func.now(), **values)
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
+def finish_job(job_id: int, status: str, error: Optional[str] = None):
+    update_job(job_id, status=status, step=None if status == "done" else t.deletion_jobs.c.step, error=error, finished_at=func.now())
@@ -0,0 +1,76 @@
+from typing import Any, Dict, Iterator, List, Sequence
+
+from sqlalchemy import delete, select, text
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+_UPSERT = text("""
+INSERT INTO embeddings (entity_type, entity_id, vector, metadata, content_hash, updated_at)
+VALUES (:entity_type, :entity_id, :vector, :metadata, :content_hash, :updated_at)
+ON CONFLICT (entity_type, entity_id) DO UPDATE
+SET vector = excluded.vector, metadata = excluded.metadata,
+    content_hash = excluded.content_hash, updated_at = excluded.updated_at
+""")
+
+# Texto de origen de cada tipo de entidad, para el backfill.
+_SOURCES = {
+    "post": text("SELECT id, content FROM posts WHERE id > :after ORDER BY id LIMIT :limit"),
+    "pet": text("SELECT id, name, species, breed, sex FROM pets WHERE id > :after ORDER BY id LIMIT :limit"),
+}
+
+
+def existing_hashes(entity_type: str, entity_ids: Sequence[int]) -> Dict[int, str]:
+    """content_hash guardado por entidad; las que no tienen embedding no aparecen."""
+    if not entity_ids:
+        return {}
+    e = t.embeddings.c
+    session = SessionLocal()
+    try:
+        stmt = select(e.entity_id, e.content_hash).where(e.entity_type == entity_type, e.entity_id.in_(list(entity_ids)))
+        return {row.entity_id: row.content_hash for row in session.execute(stmt)}
+    finally:
+        session.close()
+
+
+def upsert_embeddings(rows: List[Dict[str, Any]]) -> int:
+    """Upsert en bloque (executemany) por (entity_type, entity_id)."""
+    if not rows:
+        return 0
+    session = SessionLocal()
+    try:
+        session.execute(_UPSERT, rows)
+        session.commit()
+        return len(rows)
+    finally:
+        session.close()
+
+
+def delete_embeddings(entity_type: str, entity_ids: Sequence[int]) -> int:
+    if not entity_ids:
+        return 0
+    e = t.embeddings.c
+    session = SessionLocal()
+    try:
+        result = session.execute(
+            delete(t.embeddings).where(e.entity_type == entity_type, e.entity_id.in_(list(entity_ids)))
+        )
+        session.commit()
+        return result.rowcount
+    finally:
+        session.close()
+
+
+def iter_sources(entity_type: str, chunk: int) -> Iterator[List[Dict[str, Any]]]:
+    """Recorre la tabla de origen por id en paginas de `chunk` filas."""
+    after = 0
+    while True:
+        session = SessionLocal()
+        try:
+            rows = [dict(r) for r in session.execute(_SOURCES[entity_type], {"after": after, "limit": chunk}).mappings()]
+        finally:
+            session.close()
+        if not rows:
+            return
+        yield rows
+        after = rows[-1]["id"]
@@ -0,0 +1,137 @@
+"""
+Amistades guardadas como par canonico (user_1 < user_2): cada pareja tiene una
+sola fila y las consultas por usuario son dos busquedas por indice unidas con
+UNION ALL en lugar de un OR sobre ambas columnas.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, union_all, update
+from sqlalchemy.exc import IntegrityError
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+ACCEPTED = "accepted"
+PENDING = "pending"
+
+
+class FriendshipExistsError(ValueError):
+    pass
+
+
+def canonical(a: int, b: int) -> Tuple[int, int]:
+    return (a, b) if a < b else (b, a)
+
+
+def _pair_where(a: int, b: int):
+    low, high = canonical(a, b)
+    return (t.friendships.c.user_1 == low, t.friendships.c.user_2 == high)
+
+
+def get_friendship(a: int, b: int) -> Optional[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        row = session.execute(select(t.friendships).where(*_pair_where(a, b))).mappings().first()
+        return dict(row) if row else None
+    finally:
+        session.close()
+
+
+def create_request(requester: int, target: int) -> Dict[str, Any]:
+    low, high = canonical(requester, target)
+    session = SessionLocal()
+    try:
+        row = session.execute(
+            insert(t.friendships)
+            .values(user_1=low, user_2=high, status=PENDING, requested_by=requester)
+            .returning(*t.friendships.c)
+        ).mappings().first()
+        session.commit()
+        return dict(row)
+    except IntegrityError:
+        session.rollback()
+        raise FriendshipExistsError("Ya existe una solicitud o amistad con ese usuario")
+    finally:
+        session.close()
+
+
+def accept_request(user_id: int, requester: int) -> Optional[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        row = session.execute(
+            update(t.friendships)
+            .where(*_pair_where(user_id, requester), t.friendships.c.status == PENDING,
+                   t.friendships.c.requested_by == requester)
+            .values(status=ACCEPTED)
+            .returning(*t.friendships.c)
+        ).mappings().first()
+        session.commit()
+        return dict(row) if row else None
+    finally:
+        session.close()
+
+
+def remove_friendship(a: int, b: int) -> bool:
+    session = SessionLocal()
+    try:
+        result = session.execute(delete(t.friendships).where(*_pair_where(a, b)))
+        session.commit()
+        return result.rowcount > 0
+    finally:
+        session.close()
+
+
+def _neighbours_stmt(user_ids: Iterable[int], status: str):
+    f = t.friendships.c
+    ids = list(user_ids)
+    forward = select(f.user_1.label("user_id"), f.user_2.label("friend_id"), f.requested_by).where(
+        f.user_1.in_(ids), f.status == status
+    )
+    backward = select(f.user_2.label("user_id"), f.user_1.label("friend_id"), f.requested_by).where(
+        f.user_2.in_(ids), f.status == status
+    )
+    return union_all(forward, backward)
+
+
+def friend_ids_for(user_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """Amigos aceptados de varios usuarios en una sola consulta."""
+    ids = list(user_ids)
+    result: Dict[int, List[int]] = {uid: [] for uid in ids}
+    if not ids:
+        return result
+    session = SessionLocal()
+    try:
+        for user_id, friend_id, _ in session.execute(_neighbours_stmt(ids, ACCEPTED)):
+            result[user_id].append(friend_id)
+        return result
+    finally:
+        session.close()
+
+
+def pending_incoming(user_id: int) -> List[Dict[str, Any]]:
+    """Solicitudes pendientes que recibio el usuario."""
+    incoming = _neighbours_stmt([user_id], PENDING).subquery("n")
+    stmt = (
+        select(t.users.c.id, t.users.c.full_name, t.users.c.profile_photo_url)
+        .join(incoming, incoming.c.friend_id == t.users.c.id)
+        .where(incoming.c.requested_by != user_id)
+        .order_by(t.users.c.id)
+    )
+    session = SessionLocal()
+    try:
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+
+
+def users_brief(user_ids: Iterable[int]) -> List[Dict[str, Any]]:
+    ids = list(user_ids)
+    if not ids:
+        return []
+    session = SessionLocal()
+    try:
+        stmt = select(t.users.c.id, t.users.c.full_name, t.users.c.profile_photo_url).where(t.users.c.id.in_(ids))
+        by_id = {r["id"]: dict(r) for r in session.execute(stmt).mappings().all()}
+        return [by_id[i] for i in ids if i in by_id]
+    finally:
+        session.close()
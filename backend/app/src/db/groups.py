@@ -0,0 +1,172 @@
+import io
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, insert, or_, select, text, tuple_, update
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+ADMIN = "admin"
+MEMBER = "member"
+
+
+def get_group(group_id: int) -> Optional[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        row = session.execute(select(t.groups).where(t.groups.c.id == group_id)).mappings().first()
+        return dict(row) if row else None
+    finally:
+        session.close()
+
+
+def list_groups(kind: Optional[str], after_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+    stmt = select(t.groups).order_by(t.groups.c.id).limit(limit)
+    if kind:
+        stmt = stmt.where(t.groups.c.type == kind)
+    if after_id:
+        stmt = stmt.where(t.groups.c.id > after_id)
+    session = SessionLocal()
+    try:
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+
+
+def create_group(user_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Crea el grupo y deja a su creador como admin en la misma transaccion."""
+    session = SessionLocal()
+    try:
+        row = session.execute(insert(t.groups).values(**data).returning(*t.groups.c)).mappings().first()
+        session.execute(insert(t.group_members).values(group_id=row["id"], user_id=user_id, role=ADMIN))
+        session.commit()
+        return dict(row)
+    finally:
+        session.close()
+
+
+def update_group(group_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not data:
+        return get_group(group_id)
+    session = SessionLocal()
+    try:
+        row = session.execute(
+            update(t.groups).where(t.groups.c.id == group_id).values(**data).returning(*t.groups.c)
+        ).mappings().first()
+        session.commit()
+        return dict(row) if row else None
+    finally:
+        session.close()
+
+
+def delete_group(group_id: int) -> bool:
+    """
+    Borra en una transaccion los posts del grupo (con likes, comentarios y
+    embeddings), las membresias y el grupo. Los posts no pueden quedar con
+    group_id NULL (ON DELETE SET NULL): los de un grupo privado pasarian al
+    feed publico.
+    """
+    posts = select(t.posts.c.id).where(t.posts.c.group_id == group_id).scalar_subquery()
+    session = SessionLocal()
+    try:
+        session.execute(delete(t.post_likes).where(t.post_likes.c.post_id.in_(posts)))
+        session.execute(delete(t.post_comments).where(t.post_comments.c.post_id.in_(posts)))
+        session.execute(
+            delete(t.embeddings).where(t.embeddings.c.entity_type == "post", t.embeddings.c.entity_id.in_(posts))
+        )
+        session.execute(delete(t.posts).where(t.posts.c.group_id == group_id))
+        session.execute(delete(t.group_members).where(t.group_members.c.group_id == group_id))
+        result = session.execute(delete(t.groups).where(t.groups.c.id == group_id))
+        session.commit()
+        return result.rowcount > 0
+    finally:
+        session.close()
+
+
+def member_rows(group_id: int) -> List[Tuple[int, Optional[str]]]:
+    session = SessionLocal()
+    try:
+        stmt = select(t.group_members.c.user_id, t.group_members.c.role).where(t.group_members.c.group_id == group_id)
+        return [tuple(r) for r in session.execute(stmt).all()]
+    finally:
+        session.close()
+
+
+def add_member(group_id: int, user_id: int, role: str = MEMBER) -> bool:
+    """False si ya era miembro (el indice unico resuelve carreras sin leer antes)."""
+    session = SessionLocal()
+    try:
+        row = session.execute(
+            text(
+                "INSERT INTO group_members (group_id, user_id, role) VALUES (:g, :u, :r) "
+                "ON CONFLICT (group_id, user_id) DO NOTHING RETURNING id"
+            ),
+            {"g": group_id, "u": user_id, "r": role},
+        ).first()
+        session.commit()
+        return row is not None
+    finally:
+        session.close()
+
+
+def remove_member(group_id: int, user_id: int) -> bool:
+    session = SessionLocal()
+    try:
+        result = session.execute(
+            delete(t.group_members).where(t.group_members.c.group_id == group_id, t.group_members.c.user_id == user_id)
+        )
+        session.commit()
+        return result.rowcount > 0
+    finally:
+        session.close()
+
+
+def import_members(group_id: int, user_ids: Iterable[int]) -> List[int]:
+    """
+    Alta masiva: un COPY a una tabla temporal y un INSERT ... SELECT que descarta
+    usuarios inexistentes y miembros repetidos. Devuelve los ids agregados.
+    """
+    buf = io.StringIO("".join(f"{int(uid)}\n" for uid in user_ids))
+    session = SessionLocal()
+    try:
+        cursor = session.connection().connection.cursor()
+        try:
+            cursor.execute("CREATE TEMP TABLE group_import (user_id int) ON COMMIT DROP")
+            cursor.copy_expert("COPY group_import (user_id) FROM STDIN", buf)
+        finally:
+            cursor.close()
+        added = session.execute(
+            text(
+                "INSERT INTO group_members (group_id, user_id, role) "
+                "SELECT DISTINCT :g, i.user_id, :r FROM group_import i JOIN users u ON u.id = i.user_id "
+                "ON CONFLICT (group_id, user_id) DO NOTHING RETURNING user_id"
+            ),
+            {"g": group_id, "r": MEMBER},
+        ).scalars().all()
+        session.commit()
+        return list(added)
+    finally:
+        session.close()
+
+
+def group_posts(group_id: int, before: Optional[Tuple[Optional[datetime], int]], limit: int) -> List[Dict[str, Any]]:
+    """Feed del grupo por el indice (group_id, created_at DESC, id DESC); pide limit + 1 para saber si hay mas."""
+    p = t.posts.c
+    stmt = (
+        select(t.posts)
+        .where(p.group_id == group_id)
+        .order_by(p.created_at.desc(), p.id.desc())
+        .limit(limit + 1)
+    )
+    if before:
+        created_at, post_id = before
+        if created_at is None:
+            # en orden DESC los posts sin fecha van primero: sigue por id y despues todos los fechados
+            stmt = stmt.where(or_(and_(p.created_at.is_(None), p.id < post_id), p.created_at.isnot(None)))
+        else:
+            stmt = stmt.where(tuple_(p.created_at, p.id) < tuple_(created_at, post_id))
+    session = SessionLocal()
+    try:
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
@@ -0,0 +1,52 @@
+"""Soporte para jobs por lotes: puntos de avance reanudables y carga actual de la base."""
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+
+def get_checkpoint(job: str) -> Dict[str, Any]:
+    session = SessionLocal()
+    try:
+        row = session.execute(select(t.job_checkpoints).where(t.job_checkpoints.c.job == job)).mappings().first()
+        return dict(row) if row else {"job": job, "last_id": 0, "processed": 0, "updated_at": None}
+    finally:
+        session.close()
+
+
+def save_checkpoint(job: str, last_id: int, processed: int):
+    stmt = pg_insert(t.job_checkpoints).values(job=job, last_id=last_id, processed=processed, updated_at=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[t.job_checkpoints.c.job],
+        set_={"last_id": stmt.excluded.last_id, "processed": stmt.excluded.processed, "updated_at": stmt.excluded.updated_at},
+    )
+    session = SessionLocal()
+    try:
+        session.execute(stmt)
+        session.commit()
+    finally:
+        session.close()
+
+
+def reset_checkpoint(job: str):
+    session = SessionLocal()
+    try:
+        session.execute(delete(t.job_checkpoints).where(t.job_checkpoints.c.job == job))
+        session.commit()
+    finally:
+        session.close()
+
+
+def active_queries() -> int:
+    """Consultas en curso de otras conexiones: los jobs esperan si la base esta ocupada."""
+    session = SessionLocal()
+    try:
+        return session.execute(
+            text("SELECT count(*) FROM pg_stat_activity WHERE state = 'active' AND pid <> pg_backend_pid()")
+        ).scalar_one()
+    finally:
+        session.close()
@@ -0,0 +1,174 @@
+"""
+Almacenamiento en memoria con la misma forma de filas que las tablas SQL.
+
+Se usa con DB_BACKEND=memory (pruebas rapidas y demos de un solo nodo), a
+traves de MemoryRepository (src/repositories). Cada MemoryTable tiene:
+- indices secundarios por columna (p. ej. owner_id) y unicos (p. ej. email),
+  asi las busquedas no recorren toda la tabla;
+- un lock reentrante: los endpoints sincronos corren en el threadpool;
+- snapshot/restore opcional a disco (MEMORY_SNAPSHOT_DIR), escrito a un
+  archivo temporal y renombrado para no dejar snapshots a medias.
+Las filas se devuelven como copias: modificarlas no altera la tabla ni sus indices.
+"""
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+MEMORY_SNAPSHOT_DIR = os.getenv("MEMORY_SNAPSHOT_DIR", "")
+
+_tables: Dict[str, "MemoryTable"] = {}
+
+
+class UniqueViolation(ValueError):
+    pass
+
+
+class MemoryTable:
+    def __init__(self, name: str, columns: Sequence[str], indexes: Iterable[str] = (), unique: Iterable[str] = ()):
+        self.name = name
+        self.columns = tuple(columns)
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 1
+        self._indexes: Dict[str, Dict[Any, set]] = {col: {} for col in indexes}
+        self._unique: Dict[str, Dict[Any, int]] = {col: {} for col in unique}
+        self._lock = threading.RLock()
+        _tables[name] = self
+
+    # ----- indices -----
+    def _index(self, row: Dict[str, Any]):
+        for col, index in self._indexes.items():
+            index.setdefault(row.get(col), set()).add(row["id"])
+        for col, index in self._unique.items():
+            if row.get(col) is not None:
+                index[row[col]] = row["id"]
+
+    def _unindex(self, row: Dict[str, Any]):
+        for col, index in self._indexes.items():
+            ids = index.get(row.get(col))
+            if ids is not None:
+                ids.discard(row["id"])
+                if not ids:
+                    del index[row.get(col)]
+        for col, index in self._unique.items():
+            if index.get(row.get(col)) == row["id"]:
+                del index[row[col]]
+
+    def _check_unique(self, row: Dict[str, Any]):
+        for col, index in self._unique.items():
+            owner = index.get(row.get(col))
+            if owner is not None and owner != row.get("id"):
+                raise UniqueViolation(f"{self.name}.{col} duplicado: {row[col]}")
+
+    @property
+    def indexed(self) -> set:
+        return {*self._indexes, *self._unique}
+
+    # ----- lectura -----
+    def get(self, row_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._rows.get(row_id)
+            return dict(row) if row else None
+
+    def find(self, column: str, value: Any) -> List[Dict[str, Any]]:
+        """Filas con column == value, ordenadas por id. Usa el indice si existe."""
+        with self._lock:
+            if column in self._unique:
+                row_id = self._unique[column].get(value)
+                ids = [row_id] if row_id is not None else []
+            elif column in self._indexes:
+                ids = sorted(self._indexes[column].get(value, ()))
+            else:
+                ids = [rid for rid, row in self._rows.items() if row.get(column) == value]
+            return [dict(self._rows[rid]) for rid in ids]
+
+    def find_one(self, column: str, value: Any) -> Optional[Dict[str, Any]]:
+        rows = self.find(column, value)
+        return rows[0] if rows else None
+
+    def all(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._rows.values()]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ----- escritura -----
+    def insert(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            row = {col: values.get(col) for col in self.columns}
+            row["id"] = self._next_id
+            self._check_unique(row)
+            self._rows[row["id"]] = row
+            self._index(row)
+            self._next_id += 1
+            return dict(row)
+
+    def update(self, row_id: int, values: Dict[str, Any], **where: Any) -> Optional[Dict[str, Any]]:
+        """Actualiza la fila si existe y cumple `where` (columna=valor); None si no."""
+        with self._lock:
+            row = self._rows.get(row_id)
+            if row is None or any(row.get(col) != val for col, val in where.items()):
+                return None
+            new = {**row, **{k: v for k, v in values.items() if k in self.columns and k != "id"}}
+            self._check_unique(new)
+            self._unindex(row)
+            self._rows[row_id] = new
+            self._index(new)
+            return dict(new)
+
+    def delete(self, row_id: int, **where: Any) -> bool:
+        with self._lock:
+            row = self._rows.get(row_id)
+            if row is None or any(row.get(col) != val for col, val in where.items()):
+                return False
+            self._unindex(row)
+            del self._rows[row_id]
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self._next_id = 1
+            for index in (*self._indexes.values(), *self._unique.values()):
+                index.clear()
+
+    # ----- snapshot -----
+    def snapshot(self, path: Path):
+        with self._lock:
+            data = pickle.dumps({"next_id": self._next_id, "rows": self._rows}, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def restore(self, path: Path) -> int:
+        data = pickle.loads(path.read_bytes())
+        with self._lock:
+            self.clear()
+            for row in data["rows"].values():
+                self._rows[row["id"]] = row
+                self._index(row)
+            self._next_id = data["next_id"]
+            return len(self._rows)
+
+
+def snapshot_all(directory: str = MEMORY_SNAPSHOT_DIR) -> Dict[str, int]:
+    if not directory:
+        return {}
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    for name, table in _tables.items():
+        table.snapshot(root / f"{name}.pickle")
+    return {name: len(table) for name, table in _tables.items()}
+
+
+def restore_all(directory: str = MEMORY_SNAPSHOT_DIR) -> Dict[str, int]:
+    if not directory:
+        return {}
+    root = Path(directory)
+    return {
+        name: table.restore(root / f"{name}.pickle")
+        for name, table in _tables.items()
+        if (root / f"{name}.pickle").exists()
+    }
@@ -0,0 +1,251 @@
+"""
+Lugares, reseñas y reportes.
+
+places guarda rating_count, rating_sum y rating_hist (y rating_avg generado)
+de sus reseñas; cada alta, edicion o baja de reseña los ajusta en la misma
+transaccion con un UPDATE por delta, asi que listar y ordenar por calificacion
+no necesita JOIN ni GROUP BY. recompute_ratings rehace los agregados desde
+place_reviews por si alguna vez se desalinean (scripts/recompute_place_ratings.py).
+"""
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, text, tuple_, update
+from sqlalchemy.exc import IntegrityError
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+class ReviewConflictError(ValueError):
+    pass
+
+
+def _apply_delta(session, place_id: int, old: Optional[int], new: Optional[int]):
+    """Ajusta los agregados del lugar al pasar una reseña de `old` a `new` estrellas (None = no existe)."""
+    if old == new:
+        return
+    sets = [
+        "rating_count = rating_count + :dc",
+        "rating_sum = rating_sum + :ds",
+    ]
+    if old:
+        sets.append(f"rating_hist[{int(old)}] = rating_hist[{int(old)}] - 1")
+    if new:
+        sets.append(f"rating_hist[{int(new)}] = rating_hist[{int(new)}] + 1")
+    session.execute(
+        text(f"UPDATE places SET {', '.join(sets)} WHERE id = :place_id"),
+        {"dc": (new is not None) - (old is not None), "ds": (new or 0) - (old or 0), "place_id": place_id},
+    )
+
+
+def get_place(place_id: int) -> Optional[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        row = session.execute(select(t.places).where(t.places.c.id == place_id)).mappings().first()
+        return dict(row) if row else None
+    finally:
+        session.close()
+
+
+def create_place(user_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+    session = SessionLocal()
+    try:
+        row = session.execute(
+            insert(t.places).values(created_by_user=user_id, **data).returning(*t.places.c)
+        ).mappings().first()
+        session.commit()
+        return dict(row)
+    finally:
+        session.close()
+
+
+def list_places(
+    kind: Optional[str],
+    by_rating: bool,
+    after: Optional[Tuple[float, int]],
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """Keyset por (rating_avg, id) o por id, sobre ix_places_rating; pide limit + 1."""
+    p = t.places.c
+    stmt = select(t.places).limit(limit + 1)
+    if kind:
+        stmt = stmt.where(p.type == kind)
+    if by_rating:
+        stmt = stmt.order_by(p.rating_avg.desc(), p.id.desc())
+        if after:
+            stmt = stmt.where(tuple_(p.rating_avg, p.id) < tuple_(*after))
+    else:
+        stmt = stmt.order_by(p.id.desc())
+        if after:
+            stmt = stmt.where(p.id < after[1])
+    session = SessionLocal()
+    try:
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+
+
+def nearby_places(
+    lat: float,
+    lng: float,
+    radius_km: float,
+    kind: Optional[str],
+    by_rating: bool,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """Caja lat/lng por el indice ix_places_lat_lng y luego distancia haversine exacta."""
+    p = t.places.c
+    dlat = radius_km / KM_PER_DEGREE
+    dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    distance = (
+        2 * EARTH_RADIUS_KM * func.asin(func.sqrt(
+            func.power(func.sin(func.radians(p.lat - lat) / 2), 2)
+            + math.cos(math.radians(lat)) * func.cos(func.radians(p.lat))
+            * func.power(func.sin(func.radians(p.lng - lng) / 2), 2)
+        ))
+    ).label("distance_km")
+    inner = select(t.places, distance).where(
+        p.lat.between(lat - dlat, lat + dlat),
+        p.lng.between(lng - dlng, lng + dlng),
+    )
+    if kind:
+        inner = inner.where(p.type == kind)
+    box = inner.subquery("box")
+    order = [box.c.rating_avg.desc(), box.c.distance_km] if by_rating else [box.c.distance_km]
+    stmt = select(box).where(box.c.distance_km <= radius_km).order_by(*order).limit(limit)
+    session = SessionLocal()
+    try:
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+
+
+def upsert_review(place_id: int, user_id: int, rating: int, comment: Optional[str]) -> Tuple[Dict[str, Any], bool]:
+    """Crea o reemplaza la reseña del usuario y ajusta los agregados; devuelve (reseña, creada)."""
+    r = t.place_reviews.c
+    session = SessionLocal()
+    try:
+        old = session.execute(
+            select(r.id, r.rating).where(r.place_id == place_id, r.user_id == user_id).with_for_update()
+        ).mappings().first()
+        values = {"rating": rating, "comment": comment, "created_at": datetime.utcnow()}
+        if old:
+            stmt = update(t.place_reviews).where(r.id == old["id"]).values(**values)
+        else:
+            stmt = insert(t.place_reviews).values(place_id=place_id, user_id=user_id, **values)
+        review = session.execute(stmt.returning(*t.place_reviews.c)).mappings().first()
+        _apply_delta(session, place_id, old["rating"] if old else None, rating)
+        session.commit()
+        return dict(review), old is None
+    except IntegrityError:
+        session.rollback()
+        raise ReviewConflictError("La reseña se modificó al mismo tiempo, intenta de nuevo")
+    finally:
+        session.close()
+
+
+def delete_review(place_id: int, user_id: int) -> bool:
+    r = t.place_reviews.c
+    session = SessionLocal()
+    try:
+        old = session.execute(
+            delete(t.place_reviews).where(r.place_id == place_id, r.user_id == user_id).returning(r.rating)
+        ).first()
+        if old:
+            _apply_delta(session, place_id, old.rating, None)
+        session.commit()
+        return old is not None
+    finally:
+        session.close()
+
+
+def discount_reviews(session, reviews: List[Tuple[int, int]]):
+    """Descuenta de los agregados reseñas ya borradas (place_id, rating), en la transaccion de `session`."""
+    for place_id, rating in reviews:
+        _apply_delta(session, place_id, rating, None)
+
+
+def list_reviews(place_id: int, limit: int, offset: int) -> List[Dict[str, Any]]:
+    r = t.place_reviews.c
+    stmt = (
+        select(t.place_reviews, t.users.c.full_name)
+        .join(t.users, t.users.c.id == r.user_id, isouter=True)
+        .where(r.place_id == place_id)
+        .order_by(r.created_at.desc(), r.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    session = SessionLocal()
+    try:
+        return [dict(row) for row in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+
+
+def create_report(place_id: int, user_id: int, report_type: str, comment: Optional[str]) -> Dict[str, Any]:
+    session = SessionLocal()
+    try:
+        row = session.execute(
+            insert(t.place_reports)
+            .values(place_id=place_id, user_id=user_id, report_type=report_type, comment=comment, created_at=datetime.utcnow())
+            .returning(*t.place_reports.c)
+        ).mappings().first()
+        session.commit()
+        return dict(row)
+    finally:
+        session.close()
+
+
+def list_reports(place_id: int) -> List[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        stmt = (
+            select(t.place_reports)
+            .where(t.place_reports.c.place_id == place_id)
+            .order_by(t.place_reports.c.created_at.desc())
+        )
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+
+
+_RECOMPUTE = """
+UPDATE places p SET
+  rating_count = coalesce(a.n, 0),
+  rating_sum = coalesce(a.s, 0),
+  rating_hist = coalesce(a.h, '{0,0,0,0,0}')
+FROM places q
+LEFT JOIN (
+  SELECT place_id, count(*) AS n, sum(rating) AS s,
+    ARRAY[count(*) FILTER (WHERE rating = 1), count(*) FILTER (WHERE rating = 2), count(*) FILTER (WHERE rating = 3),
+          count(*) FILTER (WHERE rating = 4), count(*) FILTER (WHERE rating = 5)]::int[] AS h
+  FROM place_reviews WHERE rating BETWEEN 1 AND 5 AND place_id BETWEEN :lo AND :hi GROUP BY place_id
+) a ON a.place_id = q.id
+WHERE p.id = q.id AND q.id BETWEEN :lo AND :hi
+  AND (p.rating_count, p.rating_sum, p.rating_hist) IS DISTINCT FROM (coalesce(a.n, 0), coalesce(a.s, 0), coalesce(a.h, '{0,0,0,0,0}'))
+"""
+
+
+def place_id_range() -> Tuple[int, int]:
+    session = SessionLocal()
+    try:
+        lo, hi = session.execute(select(func.min(t.places.c.id), func.max(t.places.c.id))).one()
+        return lo or 0, hi or 0
+    finally:
+        session.close()
+
+
+def recompute_ratings(lo: int, hi: int) -> int:
+    """Rehace los agregados de los lugares con id en [lo, hi]; solo escribe las filas que cambian."""
+    session = SessionLocal()
+    try:
+        result = session.execute(text(_RECOMPUTE), {"lo": lo, "hi": hi})
+        session.commit()
+        return result.rowcount
+    finally:
+        session.close()
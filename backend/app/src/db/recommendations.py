@@ -0,0 +1,99 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import select, text
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+# Datos de cada mascota que usan las reglas; los registros van agregados como JSON
+# para que una fila del cursor traiga todo lo necesario.
+_PET_FEATURES = text("""
+SELECT p.id, p.species, p.breed, p.birthdate, p.weight,
+  (SELECT coalesce(json_agg(v), '[]') FROM (
+     SELECT vaccine_name, date, next_due FROM pet_vaccines
+     WHERE pet_id = p.id ORDER BY date DESC NULLS LAST LIMIT 20) v) AS vaccines,
+  (SELECT coalesce(json_agg(m), '[]') FROM (
+     SELECT medication, end_date FROM pet_medications
+     WHERE pet_id = p.id AND (end_date IS NULL OR end_date >= current_date)) m) AS medications,
+  (SELECT coalesce(json_agg(w ORDER BY w.date), '[]') FROM (
+     SELECT date, weight FROM pet_weight_history
+     WHERE pet_id = p.id AND date >= current_date - 180 ORDER BY date DESC LIMIT 60) w) AS weights
+FROM pets p
+WHERE p.id > :after
+ORDER BY p.id
+LIMIT :window
+""")
+
+_UPSERT = text("""
+INSERT INTO ai_recommendations (pet_id, recommendation_type, content, metadata, created_at)
+VALUES (:pet_id, :recommendation_type, :content, :metadata, :created_at)
+ON CONFLICT (pet_id, recommendation_type) DO UPDATE
+SET content = excluded.content, metadata = excluded.metadata, created_at = excluded.created_at
+WHERE (ai_recommendations.content, ai_recommendations.metadata) IS DISTINCT FROM (excluded.content, excluded.metadata)
+""")
+
+# Tipos que ya no aplican a una mascota del lote (p. ej. vacuna puesta al dia).
+_DELETE_STALE = text("""
+DELETE FROM ai_recommendations r
+WHERE r.pet_id = ANY(:pet_ids)
+  AND (r.pet_id, r.recommendation_type) NOT IN (
+    SELECT * FROM unnest(CAST(:keep_pets AS int[]), CAST(:keep_types AS varchar[])))
+""")
+
+
+def stream_pet_features(after_id: int, window: int, chunk: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Recorre hasta `window` mascotas con id > after_id con un cursor del lado del
+    servidor, entregando listas de `chunk` filas. La ventana acota cuanto dura
+    la transaccion de lectura.
+    """
+    session = SessionLocal()
+    try:
+        result = session.execute(
+            _PET_FEATURES.execution_options(stream_results=True, yield_per=chunk),
+            {"after": after_id, "window": window},
+        ).mappings()
+        for part in result.partitions(chunk):
+            yield [dict(r) for r in part]
+    finally:
+        session.close()
+
+
+def upsert_recommendations(pet_ids: List[int], rows: List[Dict[str, Any]]) -> int:
+    """Upsert en bloque (executemany) y borrado de tipos obsoletos, en una transaccion."""
+    now = datetime.utcnow()
+    params = [
+        {**row, "metadata": json.dumps(row.get("metadata") or {}, ensure_ascii=False, sort_keys=True), "created_at": now}
+        for row in rows
+    ]
+    session = SessionLocal()
+    try:
+        if params:
+            session.execute(_UPSERT, params)
+        session.execute(_DELETE_STALE, {
+            "pet_ids": pet_ids,
+            "keep_pets": [r["pet_id"] for r in rows],
+            "keep_types": [r["recommendation_type"] for r in rows],
+        })
+        session.commit()
+        return len(params)
+    finally:
+        session.close()
+
+
+def list_for_pet(pet_id: int) -> List[Dict[str, Any]]:
+    r = t.ai_recommendations.c
+    session = SessionLocal()
+    try:
+        stmt = select(t.ai_recommendations).where(r.pet_id == pet_id).order_by(r.recommendation_type)
+        rows = [dict(row) for row in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+    for row in rows:
+        try:
+            row["metadata"] = json.loads(row["metadata"]) if row["metadata"] else {}
+        except ValueError:
+            pass
+    return rows
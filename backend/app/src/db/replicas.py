@@ -0,0 +1,193 @@
+"""
+Ruteo de lecturas a replicas.
+
+Con DATABASE_REPLICA_URLS (separadas por coma) las lecturas de los
+repositorios van a una replica sana; las escrituras y las consultas de los
+modulos de dominio siguen en el primario. Reglas:
+- un hilo revisa cada REPLICA_CHECK_SECONDS que cada replica responda y mide
+  su retraso; si supera REPLICA_MAX_LAG_SECONDS deja de recibir lecturas
+  hasta el proximo chequeo que la vea al dia;
+- leer-lo-que-escribiste: despues de confirmar una escritura en el primario
+  (repositorios o modulos de dominio: se detecta en el commit de SessionLocal),
+  las lecturas de ese usuario van al primario durante REPLICA_STICKY_SECONDS;
+- si una lectura falla por conexion en la replica, se marca caida y se
+  reintenta en el primario.
+Sin replicas configuradas (o antes de arrancar el chequeo) todo va al primario.
+"""
+import contextvars
+import itertools
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from cachetools import TTLCache
+from loguru import logger
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import ORMExecuteState, sessionmaker
+from sqlalchemy.sql.elements import TextClause
+
+from src.db import DATABASE_REPLICA_URLS, SessionLocal, normalize_url
+
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+REPLICA_CHECK_SECONDS = float(os.getenv("REPLICA_CHECK_SECONDS", "5"))
+
+# usuario del request en curso; lo fija la dependencia de autenticacion
+current_user: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("current_user", default=None)
+
+# retraso de replay; 0 si ya aplico todo lo recibido (un primario ocioso no cuenta como retraso)
+_LAG_SQL = text("""
+SELECT CASE
+  WHEN NOT pg_is_in_recovery() THEN 0
+  WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+  ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+""")
+
+
+class Replica:
+    def __init__(self, url: str, name: str):
+        self.name = name
+        self.engine = create_engine(normalize_url(url), future=True, pool_pre_ping=True)
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.reads = 0
+
+    def check(self):
+        try:
+            with self.engine.connect() as conn:
+                sql = _LAG_SQL if self.engine.dialect.name == "postgresql" else text("SELECT 0")
+                self.lag = float(conn.execute(sql).scalar() or 0)
+            self.error = None
+            healthy = self.lag <= REPLICA_MAX_LAG_SECONDS
+        except Exception as exc:
+            self.lag, self.error, healthy = None, str(exc).splitlines()[0], False
+        if healthy != self.healthy:
+            logger.info("Replica {}: {} (lag {}, {})", self.name, "sana" if healthy else "fuera", self.lag, self.error or "ok")
+        self.healthy = healthy
+        self.checked_at = time.time()
+
+    def mark_down(self, exc: Exception):
+        self.healthy = False
+        self.error = str(exc).splitlines()[0]
+        logger.warning("Replica {} fuera hasta el proximo chequeo: {}", self.name, self.error)
+
+
+class ReplicaRouter:
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(url, f"replica-{i}") for i, url in enumerate(urls)]
+        self._sticky: TTLCache = TTLCache(maxsize=100_000, ttl=REPLICA_STICKY_SECONDS)
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.fallbacks = 0
+
+    # ----- escrituras -----
+    def note_write(self):
+        user_id = current_user.get()
+        if user_id is not None and self.replicas:
+            with self._lock:
+                self._sticky[user_id] = True
+
+    # ----- lecturas -----
+    def pick(self) -> Optional[Replica]:
+        """Replica para una lectura, o None para usar el primario."""
+        if not self.replicas:
+            return None
+        user_id = current_user.get()
+        if user_id is not None:
+            with self._lock:
+                sticky = user_id in self._sticky
+            if sticky:
+                self.sticky_reads += 1
+                return None
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            self.primary_reads += 1
+            return None
+        replica = healthy[next(self._turn) % len(healthy)]
+        replica.reads += 1
+        return replica
+
+    def fallback(self, replica: Replica, exc: Exception):
+        self.fallbacks += 1
+        replica.mark_down(exc)
+
+    # ----- chequeo -----
+    def check_all(self):
+        for replica in self.replicas:
+            replica.check()
+
+    def _run(self):
+        while not self._stop.wait(REPLICA_CHECK_SECONDS):
+            self.check_all()
+
+    def start(self):
+        if not self.replicas or self._thread is not None:
+            return
+        self.check_all()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=REPLICA_CHECK_SECONDS + 1)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": [
+                {"name": r.name, "healthy": r.healthy, "lag": r.lag, "reads": r.reads, "error": r.error}
+                for r in self.replicas
+            ],
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "fallbacks": self.fallbacks,
+        }
+
+
+# ----- escrituras en el primario -----
+_READ_ONLY_SQL = ("SELECT", "SET", "SHOW")
+
+
+def _writes(state: ORMExecuteState) -> bool:
+    statement = state.statement
+    if isinstance(statement, TextClause):
+        words = statement.text.split(None, 1)
+        return bool(words) and words[0].upper() not in _READ_ONLY_SQL
+    return state.is_insert or state.is_update or state.is_delete
+
+
+def watch_writes(factory: sessionmaker, replica_router: ReplicaRouter):
+    """
+    Cada sesion de `factory` anota si ejecuto un INSERT, UPDATE o DELETE y,
+    al confirmar, se lo avisa al router (note_write); un rollback lo descarta.
+    """
+    @event.listens_for(factory, "do_orm_execute")
+    def _mark(state: ORMExecuteState):
+        if _writes(state):
+            state.session.info["wrote"] = True
+
+    @event.listens_for(factory, "after_commit")
+    def _committed(session):
+        if session.info.pop("wrote", False):
+            replica_router.note_write()
+
+    @event.listens_for(factory, "after_rollback")
+    def _rolled_back(session):
+        session.info.pop("wrote", None)
+
+
+router = ReplicaRouter(DATABASE_REPLICA_URLS)
+if router.replicas:
+    watch_writes(SessionLocal, router)
@@ -0,0 +1,86 @@
+"""
+Busqueda unificada sobre posts, lugares, veterinarias y productos.
+
+Usa las columnas `search_vector` (GIN) para texto completo en español e ingles
+y los indices de trigramas sobre el titulo para tolerar errores de tipeo.
+Requiere databases/01-search.sql aplicado.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import cast, func, literal, literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+# tipo -> (tabla, columna de titulo/trigramas, columna de subtitulo)
+SEARCH_SOURCES = {
+    "post": (t.posts, t.posts.c.content, None),
+    "place": (t.places, t.places.c.name, t.places.c.description),
+    "clinic": (t.vet_clinics, t.vet_clinics.c.name, t.vet_clinics.c.description),
+    "product": (t.shop_products, t.shop_products.c.name, t.shop_products.c.description),
+}
+
+TITLE_LENGTH = 140
+
+
+def _ts_query(q: str):
+    spanish = func.websearch_to_tsquery(cast(literal("spanish"), REGCONFIG), q)
+    english = func.websearch_to_tsquery(cast(literal("english"), REGCONFIG), q)
+    return spanish.op("||")(english)
+
+
+def _kind_select(kind: str, q: str):
+    table, text_col, subtitle_col = SEARCH_SOURCES[kind]
+    vector = literal_column(f"{table.name}.search_vector", TSVECTOR)
+    tsq = _ts_query(q)
+    if kind == "post":
+        # contenido largo: similitud por palabra (q <% content) en vez de global
+        fuzzy = text_col.op("%>")(q)
+        similarity = func.word_similarity(q, text_col)
+        title = func.left(text_col, TITLE_LENGTH)
+    else:
+        fuzzy = text_col.op("%")(q)
+        similarity = func.similarity(text_col, q)
+        title = text_col
+    subtitle = subtitle_col if subtitle_col is not None else literal(None)
+    stmt = select(
+        literal(kind).label("kind"),
+        table.c.id.label("id"),
+        title.label("title"),
+        subtitle.label("subtitle"),
+        (func.ts_rank_cd(vector, tsq) + similarity).label("rank"),
+    ).where(vector.op("@@")(tsq) | fuzzy)
+    if kind == "post":
+        # como GET /posts: los posts de grupos (privados incluidos) se leen por el feed del grupo
+        stmt = stmt.where(table.c.group_id.is_(None))
+    return stmt
+
+
+def search(q: str, kinds: Optional[Sequence[str]] = None, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    """
+    Devuelve una pagina de resultados ordenados por relevancia. Se pide un
+    elemento extra para saber si hay mas paginas sin hacer COUNT(*).
+    """
+    kinds = list(kinds or SEARCH_SOURCES.keys())
+    results = union_all(*[_kind_select(kind, q) for kind in kinds]).subquery("results")
+    stmt = (
+        select(results)
+        .order_by(results.c.rank.desc(), results.c.kind, results.c.id)
+        .limit(page_size + 1)
+        .offset((page - 1) * page_size)
+    )
+    session = SessionLocal()
+    try:
+        rows: List[Dict[str, Any]] = [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+    for row in rows:
+        row["rank"] = round(float(row["rank"]), 4)
+    return {
+        "query": q,
+        "page": page,
+        "page_size": page_size,
+        "has_more": len(rows) > page_size,
+        "results": rows[:page_size],
+    }
@@ -0,0 +1,235 @@
+"""
+Catalogo y checkout de la tienda.
+
+La reserva de stock es un UPDATE condicional (stock >= cantidad) por producto,
+en orden de id para que dos carritos con los mismos productos no se bloqueen
+mutuamente. Pedido, lineas y descuento de stock van en una sola transaccion.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, func, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+
+class CheckoutError(ValueError):
+    pass
+
+
+class OutOfStockError(CheckoutError):
+    def __init__(self, product_id: int):
+        super().__init__(f"Stock insuficiente para el producto {product_id}")
+        self.product_id = product_id
+
+
+class ProductNotFoundError(CheckoutError):
+    def __init__(self, product_ids: List[int]):
+        super().__init__(f"Productos inexistentes: {', '.join(map(str, product_ids))}")
+        self.product_ids = product_ids
+
+
+class ProductInUseError(ValueError):
+    """El producto figura en pedidos: borrarlo romperia su historial (FK de order_items)."""
+
+
+def _missing_products(session, product_ids) -> List[int]:
+    found = set(session.execute(select(t.shop_products.c.id).where(t.shop_products.c.id.in_(product_ids))).scalars())
+    return sorted(set(product_ids) - found)
+
+
+def _load_order(session, order_id: int) -> Optional[Dict[str, Any]]:
+    order = session.execute(select(t.orders).where(t.orders.c.id == order_id)).mappings().first()
+    if not order:
+        return None
+    items = session.execute(select(t.order_items).where(t.order_items.c.order_id == order_id)).mappings().all()
+    return {**dict(order), "items": [dict(i) for i in items]}
+
+
+def _find_by_key(session, user_id: int, idempotency_key: str) -> Optional[Dict[str, Any]]:
+    stmt = select(t.orders.c.id).where(
+        t.orders.c.user_id == user_id, t.orders.c.idempotency_key == idempotency_key
+    )
+    order_id = session.execute(stmt).scalar()
+    return _load_order(session, order_id) if order_id else None
+
+
+_PRODUCT_FIELDS = {"name", "description", "price", "stock", "image_url"}
+
+
+def create_product(shop_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    data = {k: v for k, v in payload.items() if k in _PRODUCT_FIELDS}
+    session = SessionLocal()
+    try:
+        row = session.execute(
+            insert(t.shop_products).values(shop_id=shop_id, **data).returning(*t.shop_products.c)
+        ).mappings().first()
+        session.commit()
+        return dict(row)
+    finally:
+        session.close()
+
+
+def update_product(shop_id: int, product_id: int, payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Devuelve (antes, despues) para que la cache de facetas se ajuste sin releer."""
+    data = {k: v for k, v in payload.items() if k in _PRODUCT_FIELDS}
+    session = SessionLocal()
+    try:
+        where = (t.shop_products.c.id == product_id, t.shop_products.c.shop_id == shop_id)
+        before = session.execute(select(t.shop_products).where(*where).with_for_update()).mappings().first()
+        if not before:
+            return None, None
+        if not data:
+            return dict(before), dict(before)
+        after = session.execute(
+            update(t.shop_products).where(*where).values(**data).returning(*t.shop_products.c)
+        ).mappings().first()
+        session.commit()
+        return dict(before), dict(after)
+    finally:
+        session.close()
+
+
+def delete_product(shop_id: int, product_id: int) -> Optional[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        row = session.execute(
+            delete(t.shop_products)
+            .where(t.shop_products.c.id == product_id, t.shop_products.c.shop_id == shop_id)
+            .returning(*t.shop_products.c)
+        ).mappings().first()
+        session.commit()
+        return dict(row) if row else None
+    except IntegrityError:
+        session.rollback()
+        raise ProductInUseError(f"El producto {product_id} tiene pedidos; para retirarlo deja su stock en 0")
+    finally:
+        session.close()
+
+
+def list_products(shop_id: int, min_price: Optional[float] = None, max_price: Optional[float] = None,
+                  in_stock: bool = False, descending: bool = False,
+                  after: Optional[Tuple[float, int]] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Pagina por cursor (price, id) sobre el indice (shop_id, price, id): cada
+    pagina cuesta lo mismo sin importar la profundidad y no hace COUNT(*).
+    Devuelve hasta limit + 1 filas para saber si hay siguiente pagina.
+    """
+    p = t.shop_products.c
+    stmt = select(t.shop_products).where(p.shop_id == shop_id, p.price.isnot(None))
+    if min_price is not None:
+        stmt = stmt.where(p.price >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(p.price <= max_price)
+    if in_stock:
+        stmt = stmt.where(p.stock > 0)
+    if after is not None:
+        key = tuple_(p.price, p.id)
+        stmt = stmt.where(key < tuple_(*after) if descending else key > tuple_(*after))
+    order = (p.price.desc(), p.id.desc()) if descending else (p.price, p.id)
+    stmt = stmt.order_by(*order).limit(limit + 1)
+    session = SessionLocal()
+    try:
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+
+
+def product_facet_rows(shop_id: int, edges: Sequence[float]) -> List[Dict[str, Any]]:
+    """Una fila por tramo de precio: (bucket, total, en stock)."""
+    p = t.shop_products.c
+    bucket = case(*[(p.price < edge, i) for i, edge in enumerate(edges[1:])], else_=len(edges) - 1)
+    stmt = (
+        select(
+            bucket.label("bucket"),
+            func.count().label("total"),
+            func.count().filter(p.stock > 0).label("in_stock"),
+        )
+        .where(p.shop_id == shop_id, p.price.isnot(None))
+        .group_by(bucket)
+    )
+    session = SessionLocal()
+    try:
+        return [dict(r) for r in session.execute(stmt).mappings().all()]
+    finally:
+        session.close()
+
+
+def get_order(user_id: int, order_id: int) -> Optional[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        order = _load_order(session, order_id)
+        return order if order and order["user_id"] == user_id else None
+    finally:
+        session.close()
+
+
+def checkout(user_id: int, items: List[Dict[str, int]], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Crea el pedido y descuenta el stock. Devuelve el pedido con sus lineas,
+    `replayed=True` si la clave de idempotencia ya se habia usado y `sold_out`
+    con los productos que quedaron sin stock.
+    """
+    quantities: Dict[int, int] = {}
+    for item in items:
+        quantities[item["product_id"]] = quantities.get(item["product_id"], 0) + item["quantity"]
+
+    session = SessionLocal()
+    try:
+        if idempotency_key:
+            existing = _find_by_key(session, user_id, idempotency_key)
+            if existing:
+                return {**existing, "replayed": True, "sold_out": []}
+
+        lines, shops, sold_out = [], set(), []
+        for product_id in sorted(quantities):
+            qty = quantities[product_id]
+            stmt = (
+                update(t.shop_products)
+                .where(t.shop_products.c.id == product_id, t.shop_products.c.stock >= qty)
+                .values(stock=t.shop_products.c.stock - qty)
+                .returning(t.shop_products.c.price, t.shop_products.c.shop_id, t.shop_products.c.stock)
+            )
+            row = session.execute(stmt).first()
+            if row is None:
+                # sin fila: falta stock o el producto no existe (se informan todos los inexistentes)
+                missing = _missing_products(session, quantities)
+                session.rollback()
+                if missing:
+                    raise ProductNotFoundError(missing)
+                raise OutOfStockError(product_id)
+            shops.add(row.shop_id)
+            if row.stock == 0:
+                sold_out.append({"id": product_id, "price": row.price})
+            lines.append({"product_id": product_id, "quantity": qty, "price": row.price or 0.0})
+        if len(shops) > 1:
+            session.rollback()
+            raise CheckoutError("Todos los productos deben ser de la misma tienda")
+
+        total = round(sum(line["quantity"] * line["price"] for line in lines), 2)
+        order_id = session.execute(
+            insert(t.orders)
+            .values(
+                shop_id=shops.pop(),
+                user_id=user_id,
+                total=total,
+                status="pending",
+                created_at=datetime.utcnow(),
+                idempotency_key=idempotency_key,
+            )
+            .returning(t.orders.c.id)
+        ).scalar_one()
+        session.execute(insert(t.order_items), [{"order_id": order_id, **line} for line in lines])
+        session.commit()
+        return {**_load_order(session, order_id), "replayed": False, "sold_out": sold_out}
+    except IntegrityError:
+        # otra peticion con la misma clave gano la carrera: devolver su pedido
+        session.rollback()
+        existing = _find_by_key(session, user_id, idempotency_key) if idempotency_key else None
+        if existing is None:
+            raise
+        return {**existing, "replayed": True, "sold_out": []}
+    finally:
+        session.close()
@@ -1,23 +1,14 @@
 """
-CRUD simple para usuarios. Intenta usar SessionLocal desde src.db si existe,
-si no, usa almacenamiento en memoria (útil para desarrollo rápido).
-Adapta a tu configuración real de DB si tu módulo src.db expone nombres distintos.
+CRUD simple para usuarios sobre el repositorio `users` (Postgres, o en memoria
+con DB_BACKEND=memory, útil para pruebas rápidas y demos).
 """
 from datetime import datetime
 import hashlib
 
-try:
-    from src.db import SessionLocal
-    from src.models.tables import users as users_table
-    from src.models.tables import metadata
-    from sqlalchemy import select
-    DB_AVAILABLE = True
-except Exception:
-    DB_AVAILABLE = False
+from src import repositories
+from src.repositories import DuplicateError
 
-# caída a memoria si no hay DB configurada
-_in_memory_store = {}
-_in_memory_id = 1
+_users = repositories.users
 
 
 def _now():
@@ -30,105 +21,35 @@ def _hash_password(password: str) -> str:
     return hashlib.sha256(password.encode("utf-8")).hexdigest()
 
 
-def _row_to_dict(row):
-    try:
-        return {c.name: getattr(row, c.name) for c in row.__table__.columns}
-    except Exception:
-        # si es resultado de select() -> Row
-        try:
-            return dict(row._mapping)
-        except Exception:
-            return row
-
-
 def get_or_create_user(email: str, name: str, role: str = "tutor"):
-    global _in_memory_id
-    if DB_AVAILABLE:
-        session = SessionLocal()
-        try:
-            q = select(users_table).where(users_table.c.email == email)
-            r = session.execute(q).mappings().first()
-            if r:
-                return dict(r)
-            ins = users_table.insert().values(full_name=name, email=email, user_type=role)
-            result = session.execute(ins)
-            session.commit()
-            q2 = select(users_table).where(users_table.c.email == email)
-            r2 = session.execute(q2).mappings().first()
-            return dict(r2) if r2 else None
-        finally:
-            session.close()
-    else:
-        u = _in_memory_store.get(email)
-        if u:
-            return u
-        u = {
-            "id": _in_memory_id,
-            "email": email,
-            "name": name,
-            "full_name": name,
-            "role": role,
-            "password_hash": None,
-            "created_at": _now(),
-            "updated_at": _now(),
-        }
-        _in_memory_store[email] = u
-        _in_memory_id += 1
-        return u
+    user = _users.find_one(email=email)
+    if user:
+        return user
+    try:
+        return _users.create({"full_name": name, "email": email, "user_type": role})
+    except DuplicateError:
+        # otro request lo creó entre la búsqueda y el insert
+        return _users.find_one(email=email)
 
 
 def get_user_by_email(email: str):
-    if DB_AVAILABLE:
-        session = SessionLocal()
-        try:
-            q = select(users_table).where(users_table.c.email == email)
-            r = session.execute(q).mappings().first()
-            return dict(r) if r else None
-        finally:
-            session.close()
-    else:
-        return _in_memory_store.get(email)
+    return _users.find_one(email=email)
 
 
 def create_user_with_password(full_name: str, email: str, password: str, role: str = "tutor"):
-    hashed = _hash_password(password)
-    if DB_AVAILABLE:
-        session = SessionLocal()
-        try:
-            q = select(users_table).where(users_table.c.email == email)
-            existing = session.execute(q).mappings().first()
-            if existing:
-                raise ValueError("El email ya está registrado")
-            ins = users_table.insert().values(
-                full_name=full_name,
-                email=email,
-                password_hash=hashed,
-                user_type=role,
-                created_at=_now(),
-                updated_at=_now(),
-            )
-            session.execute(ins)
-            session.commit()
-            return get_user_by_email(email)
-        finally:
-            session.close()
-    else:
-        if email in _in_memory_store:
-            raise ValueError("El email ya está registrado")
-        global _in_memory_id
-        user = {
-            "id": _in_memory_id,
-            "email": email,
-            "name": full_name,
+    if _users.exists(email=email):
+        raise ValueError("El email ya está registrado")
+    try:
+        return _users.create({
             "full_name": full_name,
-            "password_hash": hashed,
-            "role": role,
+            "email": email,
+            "password_hash": _hash_password(password),
+            "user_type": role,
             "created_at": _now(),
             "updated_at": _now(),
-        }
-        _in_memory_store[email] = user
-        _in_memory_id += 1
-        return user
+        })
+    except DuplicateError:
+        raise ValueError("El email ya está registrado")
 
 
 def verify_user_credentials(email: str, password: str):
@@ -0,0 +1,53 @@
+import json
+from typing import Any, Dict, List
+
+from sqlalchemy import insert, select
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+
+def save_scan_with_vaccines(pet_id: int, file_url: str, text: str, metadata: Dict[str, Any],
+                            entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Guarda el escaneo y las vacunas extraidas en una sola transaccion.
+    Las vacunas que ya existen para la mascota (mismo nombre y fecha) se omiten
+    y el resto se inserta en bloque con un unico executemany.
+    """
+    session = SessionLocal()
+    try:
+        existing_stmt = select(t.pet_vaccines.c.vaccine_name, t.pet_vaccines.c.date).where(
+            t.pet_vaccines.c.pet_id == pet_id
+        )
+        existing = {(r.vaccine_name, r.date) for r in session.execute(existing_stmt)}
+        rows = []
+        for entry in entries:
+            key = (entry["vaccine_name"], entry["date"])
+            if key in existing:
+                continue
+            existing.add(key)
+            rows.append({
+                "pet_id": pet_id,
+                "vaccine_name": entry["vaccine_name"],
+                "date": entry["date"],
+                "next_due": entry.get("next_due"),
+                "notes": "Extraida por OCR",
+            })
+        scan_result = session.execute(
+            insert(t.pet_vaccine_card_scans).values(
+                pet_id=pet_id,
+                file_url=file_url,
+                extracted_text=text,
+                ocr_metadata=json.dumps(metadata, default=str),
+            )
+        )
+        if rows:
+            session.execute(insert(t.pet_vaccines), rows)
+        session.commit()
+        scan_id = scan_result.inserted_primary_key[0]
+        scan = session.execute(
+            select(t.pet_vaccine_card_scans).where(t.pet_vaccine_card_scans.c.id == scan_id)
+        ).mappings().first()
+        return {**dict(scan), "vaccines": rows}
+    finally:
+        session.close()
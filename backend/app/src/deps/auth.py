@@ -1,14 +1,16 @@
 import os
 import time
 import jwt
-from typing import Callable, List
+from typing import Callable, List, Optional
 from functools import wraps
 
 from fastapi import Depends, Request, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
+from src.db import replicas
 from src.db.users import get_or_create_user, get_user_by_email
+from src.services import deletion
 
 JWT_SECRET = os.getenv("JWT_SECRET", "change-me")
 JWT_ALGORITHM = "HS256"
@@ -40,6 +42,7 @@ async def verify_google_token_and_get_user(token: str):
         name = idinfo.get("name", "")
         # role por defecto: tutor
         user = get_or_create_user(email=email, name=name, role="tutor")
+        _reject_deleted(user)
         return _normalize_user(user)
     except ValueError:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid Google token")
@@ -66,7 +69,12 @@ def _normalize_user(user):
         setattr(user, "role", role)
     return user
 
-def _get_user_from_token(token: str):
+def _reject_deleted(user):
+    # desde DELETE /users/me la cuenta no opera: lo que creara despues haria fallar el borrado
+    if deletion.is_hidden("user", user_id_of(user)):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Cuenta en proceso de borrado")
+
+def _get_user_from_token(token: str, allow_deleting: bool = False):
     payload = decode_token(token)
     subject = payload.get("sub")
     if not subject:
@@ -74,6 +82,10 @@ def _get_user_from_token(token: str):
     user = get_user_by_email(subject)
     if not user:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "User not found")
+    if not allow_deleting:
+        _reject_deleted(user)
+    # para leer-lo-que-escribiste en las replicas
+    replicas.current_user.set(user_id_of(user))
     return _normalize_user(user)
 
 async def get_current_user(request: Request):
@@ -85,6 +97,24 @@ async def get_current_user_from_bearer(credentials: HTTPAuthorizationCredentials
     return _get_user_from_token(credentials.credentials)
 
 
+async def get_deleting_user_from_bearer(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Como get_current_user_from_bearer pero acepta una cuenta en borrado (solo para consultar el avance)."""
+    return _get_user_from_token(credentials.credentials, allow_deleting=True)
+
+
+def user_id_of(user) -> Optional[int]:
+    if isinstance(user, dict):
+        return user.get("id")
+    return getattr(user, "id", None)
+
+
+def require_user_id(user) -> int:
+    user_id = user_id_of(user)
+    if not user_id:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Usuario no autenticado")
+    return user_id
+
+
 def auth_required(func: Callable):
     """
     Decorador para proteger rutas. Añade current_user al kwargs.
@@ -0,0 +1,33 @@
+"""
+Parametro `fields=` de los listados: que columnas devolver.
+
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(PostResponse))
+    rows = await repo.posts.aio.find(columns=fields, ...)
+    return rows_response(PostResponse, rows, fields)
+
+Las columnas se validan contra el modelo de respuesta (400 si alguna no
+existe), siempre incluyen `id` y se pasan al repositorio, que las pone en el
+SELECT: lo que no se pide no se lee de la base ni viaja al cliente.
+"""
+from typing import Callable, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+
+
+def fields_query(model: Type[BaseModel]) -> Callable[..., Optional[Tuple[str, ...]]]:
+    allowed = list(model.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description="Columnas separadas por coma: " + ", ".join(allowed)),
+    ) -> Optional[Tuple[str, ...]]:
+        if not fields:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(allowed)
+        if unknown:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, f"Campos desconocidos: {', '.join(sorted(unknown))}")
+        requested.add("id")
+        return tuple(name for name in allowed if name in requested)
+
+    return dependency
@@ -4,19 +4,33 @@ from loguru import logger
 import asyncio
 
 from src.routers.health import router as health_router
-from src.db import test_connection, wait_for_db
+from src.db import DB_BACKEND, engine, memory, replicas, test_connection, wait_for_db
+from src.middleware.access_log import AccessLogMiddleware
+from src.middleware.compression import CompressionMiddleware
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.sql_profiler import SqlProfilerMiddleware
 from src.routers.auth import router as auth_router
 from src.routers.users import router as users_router
 from src.routers.pets import router as pets_router
 from src.routers.pet_records import router as pet_records_router
 from src.routers.user_profile import router as user_profile_router
 from src.routers.posts import router as posts_router
+from src.routers.search import router as search_router
+from src.routers.autocomplete import router as autocomplete_router
+from src.routers.shop import router as shop_router
+from src.routers.appointments import router as appointments_router
+from src.routers.friends import router as friends_router
+from src.routers.groups import router as groups_router
+from src.routers.places import router as places_router
+from src.routers.ai import router as ai_router
+from src.services import ai_chat, autocomplete, deletion, embeddings, logs, metrics, sql_profiler
+from src.services.vaccine_ocr import shutdown_pool as shutdown_ocr_pool
 
 def create_app() -> FastAPI:
     app = FastAPI(title="PetVerse API")
 
-    # Logging setup
-    logger.add(lambda msg: print(msg, end=""))
+    # Logs JSON (LOG_FORMAT=text para desarrollo) escritos por un hilo aparte
+    logs.setup()
 
     # CORS
     app.add_middleware(
@@ -26,6 +40,22 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # gzip/brotli segun Accept-Encoding, desde COMPRESSION_MIN_SIZE bytes
+    app.add_middleware(CompressionMiddleware)
+    # metricas en /metrics; METRICS_ENABLED=0 apaga la medicion por request
+    if metrics.METRICS_ENABLED:
+        metrics.instrument_engine(engine, "primary")
+        for replica in replicas.router.replicas:
+            metrics.instrument_engine(replica.engine, replica.name)
+        app.add_middleware(MetricsMiddleware)
+    # perfil SQL por request (SQL_PROFILE=1|strict); apagado por defecto
+    if sql_profiler.ENABLED:
+        sql_profiler.instrument_engine(engine, "primary")
+        for replica in replicas.router.replicas:
+            sql_profiler.instrument_engine(replica.engine, replica.name)
+        app.add_middleware(SqlProfilerMiddleware)
+    # el ultimo agregado queda afuera: todo lo de adentro loguea con el request id
+    app.add_middleware(AccessLogMiddleware)
 
     # Routers
     app.include_router(health_router)
@@ -36,20 +66,50 @@ def create_app() -> FastAPI:
     app.include_router(pet_records_router)
     app.include_router(user_profile_router)
     app.include_router(posts_router)
+    app.include_router(search_router)
+    app.include_router(autocomplete_router)
+    app.include_router(shop_router)
+    app.include_router(appointments_router)
+    app.include_router(friends_router)
+    app.include_router(groups_router)
+    app.include_router(places_router)
+    app.include_router(ai_router)
 
     @app.on_event("startup")
     async def startup_event():
         logger.info("Starting PetVerse API")
+        if DB_BACKEND == "memory":
+            logger.warning("DB_BACKEND=memory: repositorios en memoria, sin Postgres")
+            restored = memory.restore_all()
+            if restored:
+                logger.info("Memory snapshot restored: {}", restored)
+            return
         loop = asyncio.get_running_loop()
         db_ok = await loop.run_in_executor(None, wait_for_db)  # bloqueo en hilo
         if db_ok:
             logger.info("Database connection OK")
+            await loop.run_in_executor(None, replicas.router.start)
+            stats = await loop.run_in_executor(None, autocomplete.build_all)
+            for kind, info in stats.items():
+                logger.info(
+                    "Autocomplete index {}: {} entries, {:.1f} KiB, built in {} ms",
+                    kind, info["entries"], info["bytes"] / 1024, info["build_ms"],
+                )
+            deletion.worker.start()
         else:
             logger.warning("Database connection FAILED")
 
     @app.on_event("shutdown")
     async def shutdown_event():
         logger.info("Shutting down PetVerse API")
+        shutdown_ocr_pool()
+        ai_chat.history.stop()
+        embeddings.worker.stop()
+        deletion.worker.stop()
+        replicas.router.stop()
+        if DB_BACKEND == "memory" and memory.MEMORY_SNAPSHOT_DIR:
+            logger.info("Memory snapshot saved: {}", memory.snapshot_all())
+        logs.writer.stop()
 
     return app
 
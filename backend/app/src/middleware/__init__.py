@@ -0,0 +1 @@
+"""Middlewares ASGI propios de PetVerse."""
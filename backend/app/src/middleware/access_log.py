@@ -0,0 +1,65 @@
+"""
+Request id y access log (ver src/services/logs.py).
+
+ASGI puro. Toma el X-Request-ID del cliente (si es razonable) o genera uno,
+lo deja en el ContextVar que leen todos los logs del request y lo devuelve en
+la respuesta. Al terminar loguea metodo, ruta, estado y duracion como campos
+estructurados; las respuestas 2xx/3xx se muestrean por ruta (LOG_SAMPLE).
+"""
+import re
+import time
+import uuid
+
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.services import logs
+
+_VALID_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+
+def _incoming_id(scope: Scope) -> str:
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            rid = value.decode("latin-1")
+            if _VALID_ID.match(rid):
+                return rid
+            break
+    return uuid.uuid4().hex
+
+
+class AccessLogMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = _incoming_id(scope)
+        header = (b"x-request-id", rid.encode())
+        status_code = 500
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        token = logs.request_id.set(rid)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            if status_code >= 400 or logs.sampled(route):
+                elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+                # los kwargs quedan en record["extra"]: salen como campos del JSON
+                logger.log(
+                    "WARNING" if status_code >= 500 else "INFO",
+                    "{method} {path} -> {status} ({ms} ms)",
+                    method=scope["method"], route=route, path=scope["path"], status=status_code, ms=elapsed_ms,
+                )
+            logs.request_id.reset(token)
@@ -0,0 +1,115 @@
+"""
+Compresion negociada de respuestas (brotli o gzip).
+
+Se elige por Accept-Encoding respetando los q=: brotli si el cliente lo acepta
+y el paquete `brotli` esta instalado, si no gzip. Solo se comprimen cuerpos de
+al menos COMPRESSION_MIN_SIZE bytes; los streams SSE y las respuestas que ya
+traen Content-Encoding pasan tal cual (misma logica que GZipMiddleware de
+Starlette, de la que se reutilizan los responders). Tampoco se tocan los
+formatos que ya vienen comprimidos (PRECOMPRESSED_TYPES: el zip de
+/users/me/export, imagenes).
+
+Niveles pensados para JSON de API: gzip 6 y brotli 4 comprimen casi lo mismo
+que el maximo por una fraccion del CPU.
+"""
+import os
+from typing import Dict
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except Exception:
+    BROTLI_AVAILABLE = False
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+PRECOMPRESSED_TYPES = ("application/zip", "application/gzip", "image/", "video/")
+
+
+class SkipPrecompressed:
+    """Mixin de responders: deja pasar tal cual los Content-Type de PRECOMPRESSED_TYPES."""
+
+    async def send_with_compression(self, message: Message) -> None:
+        await super().send_with_compression(message)
+        if message["type"] == "http.response.start":
+            if Headers(raw=message["headers"]).get("content-type", "").startswith(PRECOMPRESSED_TYPES):
+                self.content_type_is_excluded = True
+
+
+class SelectiveGZipResponder(SkipPrecompressed, GZipResponder):
+    pass
+
+
+class BrotliResponder(SkipPrecompressed, IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        body = self.compressor.process(body)
+        return body + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Accept-Encoding -> {codificacion: q}; las de q=0 quedan afuera."""
+    accepted = {}
+    for part in header.lower().split(","):
+        name, _, params = part.partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted[name] = q
+    return accepted
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose(self, accept_encoding: str) -> str:
+        accepted = accepted_encodings(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        candidates = {"gzip": accepted.get("gzip", wildcard)}
+        if BROTLI_AVAILABLE:
+            candidates["br"] = accepted.get("br", wildcard)
+        # ante el mismo q gana brotli (comprime mejor el JSON)
+        best = max(candidates, key=lambda name: (candidates[name], name == "br"))
+        return best if candidates[best] > 0 else "identity"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose(Headers(scope=scope).get("accept-encoding", ""))
+        responder: ASGIApp
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif encoding == "gzip":
+            responder = SelectiveGZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = self.app
+        await responder(scope, receive, send)
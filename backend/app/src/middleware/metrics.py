@@ -0,0 +1,44 @@
+"""
+Middleware de metricas HTTP (ver src/services/metrics.py).
+
+ASGI puro: no envuelve el request en tareas nuevas como BaseHTTPMiddleware. La
+ruta se etiqueta con la plantilla que matcheo FastAPI (`/pets/{pet_id}`); lo
+que no matchea ninguna ruta va como "unmatched".
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.services import metrics
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        log = metrics.requests
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        log.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            log.in_flight -= 1
+            metrics.current_request.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            log.add((scope["method"], route, status_code, elapsed, stats.queries, stats.db_seconds))
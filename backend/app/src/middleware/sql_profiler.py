@@ -0,0 +1,100 @@
+"""
+Middleware del perfilador SQL (ver src/services/sql_profiler.py).
+
+ASGI puro, como el de metricas. Agrega a cada respuesta:
+- Server-Timing: db;dur=<ms>;desc="<n> consultas"
+- X-SQL-Queries: <consultas>/<presupuesto> y X-SQL-Sessions: <sesiones>
+- X-SQL-Repeated: <veces>, solo si alguna sentencia se repite (la que mas)
+y loguea un resumen por request (warning si hay sentencias repetidas o se
+pasa del presupuesto). En modo estricto, una respuesta que se pasa del
+presupuesto se reemplaza por un 500 con el detalle.
+"""
+import json
+import time
+
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.services import sql_profiler
+
+
+class SqlProfilerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = sql_profiler.Profile()
+        token = sql_profiler.current.set(profile)
+        status_code = 500
+        budget = sql_profiler.SQL_QUERY_BUDGET
+        replaced = False
+
+        async def send_with_profile(message: Message) -> None:
+            nonlocal status_code, budget, replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # la ruta ya se resolvio; el cuerpo todavia no salio
+                budget = sql_profiler.budget_for(scope.get("route"))
+                if sql_profiler.STRICT and profile.queries > budget:
+                    replaced = True
+                    status_code = 500
+                    await self._over_budget(scope, send, profile, budget)
+                    return
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", f'db;dur={profile.seconds * 1000:.2f};desc="{profile.queries} consultas"'
+                )
+                headers["X-SQL-Queries"] = f"{profile.queries}/{budget}"
+                headers["X-SQL-Sessions"] = str(profile.sessions)
+                repeated = profile.repeated()
+                if repeated:
+                    headers["X-SQL-Repeated"] = str(repeated[0][1])
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            sql_profiler.current.reset(token)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            route = getattr(scope.get("route"), "path", scope["path"])
+            summary = profile.summary()
+            line = (
+                f"SQL {scope['method']} {route} -> {status_code}: {summary['queries']}/{budget} consultas, "
+                f"{summary['sessions']} sesiones, {summary['db_ms']} ms en base de {elapsed_ms:.1f} ms"
+            )
+            if summary["repeated"] or summary["duplicates"] or profile.queries > budget:
+                details = "; ".join(f"{r['count']}x {r['sql']}" for r in summary["repeated"])
+                logger.warning(
+                    "{} | {} duplicadas{}{}", line, summary["duplicates"],
+                    " | SUPERA EL PRESUPUESTO" if profile.queries > budget else "",
+                    f" | repetidas: {details}" if details else "",
+                )
+            else:
+                logger.info(line)
+
+    @staticmethod
+    async def _over_budget(scope: Scope, send: Send, profile: "sql_profiler.Profile", budget: int) -> None:
+        route = getattr(scope.get("route"), "path", scope["path"])
+        body = json.dumps({
+            "detail": f"{scope['method']} {route} supera el presupuesto de consultas SQL",
+            "budget": budget,
+            **profile.summary(),
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 500,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-sql-queries", f"{profile.queries}/{budget}".encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body, "more_body": False})
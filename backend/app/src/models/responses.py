@@ -0,0 +1,134 @@
+"""
+Modelos de respuesta tipados (pydantic v2) y camino rapido de serializacion.
+
+Los listados devuelven `rows_response(Modelo, filas)`: la lista entera se valida
+y se serializa a JSON con el serializador compilado de pydantic-core, sin pasar
+cada fila por jsonable_encoder. Los endpoints igual declaran
+`response_model=List[Modelo]` para que OpenAPI documente la forma.
+Con `fields` (ver src/deps/projection.py) se usa un submodelo con esas columnas.
+"""
+import datetime as dt
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+
+class RowModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+
+
+class PetResponse(RowModel):
+    owner_id: int
+    name: Optional[str] = None
+    species: Optional[str] = None
+    breed: Optional[str] = None
+    sex: Optional[str] = None
+    birthdate: Optional[dt.date] = None
+    weight: Optional[float] = None
+    avatar_url: Optional[str] = None
+
+
+class PostResponse(RowModel):
+    user_id: Optional[int] = None
+    pet_id: Optional[int] = None
+    content: Optional[str] = None
+    media_urls: Optional[str] = None
+    visibility: Optional[str] = None
+    created_at: Optional[dt.datetime] = None
+    group_id: Optional[int] = None
+
+
+class LikeResponse(RowModel):
+    post_id: Optional[int] = None
+    user_id: Optional[int] = None
+
+
+class CommentResponse(RowModel):
+    post_id: Optional[int] = None
+    user_id: Optional[int] = None
+    comment: Optional[str] = None
+    created_at: Optional[dt.datetime] = None
+
+
+class HealthRecordResponse(RowModel):
+    pet_id: Optional[int] = None
+    record_date: Optional[dt.date] = None
+    description: Optional[str] = None
+    vet_id: Optional[int] = None
+
+
+class VaccineResponse(RowModel):
+    pet_id: Optional[int] = None
+    vaccine_name: Optional[str] = None
+    date: Optional[dt.date] = None
+    next_due: Optional[dt.date] = None
+    vet_clinic: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class MedicationResponse(RowModel):
+    pet_id: Optional[int] = None
+    medication: Optional[str] = None
+    dose: Optional[str] = None
+    frequency: Optional[str] = None
+    start_date: Optional[dt.date] = None
+    end_date: Optional[dt.date] = None
+    notes: Optional[str] = None
+
+
+class WeightResponse(RowModel):
+    pet_id: Optional[int] = None
+    date: Optional[dt.date] = None
+    weight: Optional[float] = None
+
+
+class MediaResponse(RowModel):
+    pet_id: Optional[int] = None
+    url: Optional[str] = None
+    media_type: Optional[str] = None
+
+
+class MedicalVisitResponse(RowModel):
+    pet_id: Optional[int] = None
+    vet_id: Optional[int] = None
+    visit_date: Optional[dt.date] = None
+    diagnosis: Optional[str] = None
+    treatment: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class VaccineCardScanResponse(RowModel):
+    pet_id: Optional[int] = None
+    file_url: Optional[str] = None
+    extracted_text: Optional[str] = None
+    ocr_metadata: Optional[str] = None
+
+
+@lru_cache(maxsize=256)
+def partial_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Submodelo con solo `fields`, con el mismo tipo y default de cada campo."""
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=model.model_config,
+        **{name: (info.annotation, info) for name, info in model.model_fields.items() if name in fields},
+    )
+
+
+@lru_cache(maxsize=512)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def dump_rows(model: Type[BaseModel], rows: Iterable[Any], fields: Optional[Sequence[str]] = None) -> bytes:
+    if fields:
+        model = partial_model(model, tuple(fields))
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(rows))
+
+
+def rows_response(model: Type[BaseModel], rows: Iterable[Any], fields: Optional[Sequence[str]] = None) -> Response:
+    return Response(dump_rows(model, rows, fields), media_type="application/json")
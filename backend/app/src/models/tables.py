@@ -1,15 +1,23 @@
 from sqlalchemy import (
+    ARRAY,
+    BigInteger,
     Boolean,
+    CheckConstraint,
     Column,
+    Computed,
     Date,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     MetaData,
     String,
     Table,
     Text,
+    Time,
+    func,
+    text,
 )
 
 metadata = MetaData()
@@ -38,6 +46,7 @@ user_settings = Table(
     Column("privacy_level", String(50)),
     Column("language", String(50)),
     Column("timezone", String(100)),
+    Index("ix_user_settings_user_id", "user_id"),
 )
 
 user_address = Table(
@@ -50,6 +59,7 @@ user_address = Table(
     Column("address", String(255)),
     Column("lat", Float),
     Column("lng", Float),
+    Index("ix_user_address_user_id", "user_id"),
 )
 
 # --- Mascotas y salud ---
@@ -66,6 +76,7 @@ pets = Table(
     Column("weight", Float),
     Column("avatar_url", String(512)),
     Column("created_at", DateTime),
+    Index("ix_pets_owner_id", "owner_id"),
 )
 
 pet_vaccines = Table(
@@ -78,6 +89,7 @@ pet_vaccines = Table(
     Column("next_due", Date),
     Column("vet_clinic", String(255)),
     Column("notes", String(500)),
+    Index("ix_pet_vaccines_pet_id", "pet_id"),
 )
 
 pet_medications = Table(
@@ -91,6 +103,7 @@ pet_medications = Table(
     Column("start_date", Date),
     Column("end_date", Date),
     Column("notes", String(500)),
+    Index("ix_pet_medications_pet_id", "pet_id"),
 )
 
 pet_weight_history = Table(
@@ -100,6 +113,7 @@ pet_weight_history = Table(
     Column("pet_id", Integer, ForeignKey("pets.id")),
     Column("date", Date),
     Column("weight", Float),
+    Index("ix_pet_weight_history_pet_id", "pet_id"),
 )
 
 pet_media = Table(
@@ -109,6 +123,7 @@ pet_media = Table(
     Column("pet_id", Integer, ForeignKey("pets.id")),
     Column("url", String(512)),
     Column("media_type", String(50)),
+    Index("ix_pet_media_pet_id", "pet_id"),
 )
 
 pet_medical_visits = Table(
@@ -121,6 +136,8 @@ pet_medical_visits = Table(
     Column("diagnosis", String(500)),
     Column("treatment", String(500)),
     Column("notes", String(500)),
+    Index("ix_pet_medical_visits_pet_id", "pet_id"),
+    Index("ix_pet_medical_visits_vet_id", "vet_id"),
 )
 
 pet_vaccine_card_scans = Table(
@@ -131,6 +148,7 @@ pet_vaccine_card_scans = Table(
     Column("file_url", String(512)),
     Column("extracted_text", Text),
     Column("ocr_metadata", Text),
+    Index("ix_pet_vaccine_card_scans_pet_id", "pet_id"),
 )
 
 # Mantener health_records para compatibilidad aunque no esta en el esquema SQL actual
@@ -142,9 +160,14 @@ health_records = Table(
     Column("record_date", Date),
     Column("description", Text),
     Column("vet_id", Integer, ForeignKey("users.id")),
+    Index("ix_health_records_pet_id", "pet_id"),
+    Index("ix_health_records_vet_id", "vet_id"),
 )
 
 # --- Social / comunidad ---
+# posts, places, vet_clinics y shop_products tienen ademas una columna generada
+# `search_vector` (tsvector) creada en databases/01-search.sql. No se declara
+# aqui para que los select(tabla) existentes no la devuelvan; ver src/db/search.py.
 posts = Table(
     "posts",
     metadata,
@@ -155,6 +178,16 @@ posts = Table(
     Column("media_urls", Text),
     Column("visibility", String(50)),
     Column("created_at", DateTime),
+    Column("group_id", Integer, ForeignKey("groups.id", ondelete="SET NULL")),
+    Index(
+        "ix_posts_group_created",
+        "group_id",
+        text("created_at DESC"),
+        text("id DESC"),
+        postgresql_where=text("group_id IS NOT NULL"),
+    ),
+    Index("ix_posts_user_id", "user_id"),
+    Index("ix_posts_pet_id", "pet_id"),
 )
 
 post_likes = Table(
@@ -163,6 +196,8 @@ post_likes = Table(
     Column("id", Integer, primary_key=True, autoincrement=True),
     Column("post_id", Integer, ForeignKey("posts.id")),
     Column("user_id", Integer, ForeignKey("users.id")),
+    Index("ix_post_likes_post_id", "post_id"),
+    Index("ix_post_likes_user_id", "user_id"),
 )
 
 post_comments = Table(
@@ -173,6 +208,8 @@ post_comments = Table(
     Column("user_id", Integer, ForeignKey("users.id")),
     Column("comment", Text),
     Column("created_at", DateTime),
+    Index("ix_post_comments_post_id", "post_id"),
+    Index("ix_post_comments_user_id", "user_id"),
 )
 
 groups = Table(
@@ -192,6 +229,8 @@ group_members = Table(
     Column("group_id", Integer, ForeignKey("groups.id")),
     Column("user_id", Integer, ForeignKey("users.id")),
     Column("role", String(50)),
+    Index("ux_group_members_group_user", "group_id", "user_id", unique=True),
+    Index("ix_group_members_user", "user_id"),
 )
 
 friendships = Table(
@@ -201,6 +240,12 @@ friendships = Table(
     Column("user_1", Integer, ForeignKey("users.id")),
     Column("user_2", Integer, ForeignKey("users.id")),
     Column("status", String(50)),
+    Column("requested_by", Integer, ForeignKey("users.id")),
+    # par canonico: user_1 < user_2, una sola fila por pareja
+    CheckConstraint("user_1 < user_2", name="ck_friendships_canonical"),
+    Index("ux_friendships_pair", "user_1", "user_2", unique=True),
+    Index("ix_friendships_user_2", "user_2", "user_1"),
+    Index("ix_friendships_requested_by", "requested_by"),
 )
 
 chats = Table(
@@ -216,6 +261,7 @@ chat_members = Table(
     Column("id", Integer, primary_key=True, autoincrement=True),
     Column("chat_id", Integer, ForeignKey("chats.id")),
     Column("user_id", Integer, ForeignKey("users.id")),
+    Index("ix_chat_members_user_id", "user_id"),
 )
 
 messages = Table(
@@ -227,6 +273,7 @@ messages = Table(
     Column("text", Text),
     Column("media_url", String(512)),
     Column("created_at", DateTime),
+    Index("ix_messages_sender_id", "sender_id"),
 )
 
 # --- Lugares ---
@@ -243,6 +290,18 @@ places = Table(
     Column("website", String(255)),
     Column("services", Text),
     Column("created_by_user", Integer, ForeignKey("users.id")),
+    # agregados de place_reviews mantenidos en cada escritura (src/db/places.py)
+    Column("rating_count", Integer, nullable=False, server_default="0"),
+    Column("rating_sum", Integer, nullable=False, server_default="0"),
+    Column("rating_hist", ARRAY(Integer), nullable=False, server_default="{0,0,0,0,0}"),
+    Column(
+        "rating_avg",
+        Float(53),
+        Computed("CASE WHEN rating_count > 0 THEN rating_sum::double precision / rating_count ELSE 0 END", persisted=True),
+    ),
+    Index("ix_places_rating", text("rating_avg DESC"), text("id DESC")),
+    Index("ix_places_lat_lng", "lat", "lng"),
+    Index("ix_places_created_by_user", "created_by_user"),
 )
 
 place_reviews = Table(
@@ -254,6 +313,10 @@ place_reviews = Table(
     Column("rating", Integer),
     Column("comment", Text),
     Column("created_at", DateTime),
+    CheckConstraint("rating BETWEEN 1 AND 5", name="ck_place_reviews_rating"),
+    Index("ux_place_reviews_place_user", "place_id", "user_id", unique=True),
+    Index("ix_place_reviews_place_created", "place_id", text("created_at DESC")),
+    Index("ix_place_reviews_user_id", "user_id"),
 )
 
 place_reports = Table(
@@ -265,6 +328,8 @@ place_reports = Table(
     Column("report_type", String(100)),
     Column("comment", Text),
     Column("created_at", DateTime),
+    Index("ix_place_reports_place", "place_id"),
+    Index("ix_place_reports_user_id", "user_id"),
 )
 
 # --- Veterinaria ---
@@ -281,6 +346,7 @@ vet_clinics = Table(
     Column("phone", String(50)),
     Column("email", String(255)),
     Column("logo_url", String(512)),
+    Index("ix_vet_clinics_owner_id", "owner_id"),
 )
 
 vet_services = Table(
@@ -304,6 +370,34 @@ appointments = Table(
     Column("date", Date),
     Column("time", String(50)),
     Column("status", String(50)),
+    Index("ix_appointments_clinic_date", "clinic_id", "date"),
+    Index(
+        "ux_appointments_slot",
+        "clinic_id",
+        func.coalesce(text("vet_id"), 0),
+        "date",
+        "time",
+        unique=True,
+        postgresql_where=text("status IS DISTINCT FROM 'cancelled'"),
+    ),
+    Index("ix_appointments_pet_id", "pet_id"),
+    Index("ix_appointments_user_id", "user_id"),
+    Index("ix_appointments_vet_id", "vet_id"),
+)
+
+# franjas de atencion por dia de semana (0 = lunes); vet_id nulo = toda la clinica
+vet_availability = Table(
+    "vet_availability",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("clinic_id", Integer, ForeignKey("vet_clinics.id")),
+    Column("vet_id", Integer, ForeignKey("users.id")),
+    Column("weekday", Integer),
+    Column("start_time", Time),
+    Column("end_time", Time),
+    Column("slot_minutes", Integer),
+    Index("ix_vet_availability_clinic", "clinic_id"),
+    Index("ix_vet_availability_vet_id", "vet_id"),
 )
 
 # --- Tienda ---
@@ -317,6 +411,8 @@ shop_products = Table(
     Column("price", Float),
     Column("stock", Integer),
     Column("image_url", String(512)),
+    CheckConstraint("stock >= 0", name="ck_shop_products_stock_non_negative"),
+    Index("ix_shop_products_shop_price", "shop_id", "price", "id"),
 )
 
 orders = Table(
@@ -328,6 +424,16 @@ orders = Table(
     Column("total", Float),
     Column("status", String(50)),
     Column("created_at", DateTime),
+    Column("idempotency_key", String(100)),
+    Index(
+        "ux_orders_user_idempotency",
+        "user_id",
+        "idempotency_key",
+        unique=True,
+        postgresql_where=text("idempotency_key IS NOT NULL"),
+    ),
+    Index("ix_orders_user_id", "user_id"),
+    Index("ix_orders_shop_id", "shop_id"),
 )
 
 order_items = Table(
@@ -338,6 +444,7 @@ order_items = Table(
     Column("product_id", Integer, ForeignKey("shop_products.id")),
     Column("quantity", Integer),
     Column("price", Float),
+    Index("ix_order_items_order_id", "order_id"),
 )
 
 # --- IA ---
@@ -350,6 +457,46 @@ ai_recommendations = Table(
     Column("content", Text),
     Column("metadata", Text),
     Column("created_at", DateTime),
+    Index("ux_ai_recommendations_pet_type", "pet_id", "recommendation_type", unique=True),
+)
+
+# Avance de los jobs por lotes (databases/06-ai.sql)
+job_checkpoints = Table(
+    "job_checkpoints",
+    metadata,
+    Column("job", String, primary_key=True),
+    Column("last_id", Integer, nullable=False, server_default="0"),
+    Column("processed", BigInteger, nullable=False, server_default="0"),
+    Column("updated_at", DateTime, nullable=False, server_default=func.now()),
+)
+
+# Borrado en cascada por lotes de mascotas y cuentas (databases/07-deletion.sql)
+deletion_jobs = Table(
+    "deletion_jobs",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("kind", String(20), nullable=False),
+    Column("target_id", Integer, nullable=False),
+    Column("requested_by", Integer),
+    Column("status", String(20), nullable=False, server_default="queued"),
+    Column("step", String(100)),
+    Column("total", BigInteger),
+    Column("deleted", BigInteger, nullable=False, server_default="0"),
+    Column("files_deleted", Integer, nullable=False, server_default="0"),
+    Column("progress", Text),
+    Column("attempts", Integer, nullable=False, server_default="0"),
+    Column("error", Text),
+    Column("created_at", DateTime, nullable=False, server_default=func.now()),
+    Column("started_at", DateTime),
+    Column("updated_at", DateTime, nullable=False, server_default=func.now()),
+    Column("finished_at", DateTime),
+    Index(
+        "ux_deletion_jobs_active",
+        "kind",
+        "target_id",
+        unique=True,
+        postgresql_where=text("status IN ('queued', 'running')"),
+    ),
 )
 
 ai_chat_history = Table(
@@ -361,6 +508,8 @@ ai_chat_history = Table(
     Column("prompt", Text),
     Column("response", Text),
     Column("created_at", DateTime),
+    Index("ix_ai_chat_history_user_created", "user_id", text("created_at DESC")),
+    Index("ix_ai_chat_history_pet_id", "pet_id"),
 )
 
 embeddings = Table(
@@ -371,4 +520,7 @@ embeddings = Table(
     Column("entity_id", Integer),
     Column("vector", Text),
     Column("metadata", Text),
+    Column("content_hash", String(64)),
+    Column("updated_at", DateTime),
+    Index("ux_embeddings_entity", "entity_type", "entity_id", unique=True),
 )
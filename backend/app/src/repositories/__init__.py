@@ -0,0 +1,61 @@
+"""
+Repositorios por tabla, segun DB_BACKEND ("sql" por defecto o "memory").
+
+Los routers importan de aca en lugar de abrir sesiones propias:
+    from src import repositories as repo
+    post = await repo.posts.aio.get(post_id)
+"""
+from sqlalchemy import Table
+
+from src.db import DB_BACKEND
+from src.models import tables as t
+from src.repositories.base import AsyncRepository, DuplicateError, Repository
+from src.repositories.memory import MemoryRepository
+from src.repositories.sql import SqlRepository
+
+
+def for_table(table: Table, replica_reads: bool = True) -> Repository:
+    if DB_BACKEND == "memory":
+        return MemoryRepository.for_table(table)
+    return SqlRepository(table, replica_reads=replica_reads)
+
+
+# la autenticacion busca el usuario en cada request: siempre en el primario,
+# asi un usuario recien registrado no recibe 401 por el retraso de una replica
+users = for_table(t.users, replica_reads=False)
+user_settings = for_table(t.user_settings)
+user_address = for_table(t.user_address)
+pets = for_table(t.pets)
+health_records = for_table(t.health_records)
+pet_vaccines = for_table(t.pet_vaccines)
+pet_medications = for_table(t.pet_medications)
+pet_weight_history = for_table(t.pet_weight_history)
+pet_media = for_table(t.pet_media)
+pet_medical_visits = for_table(t.pet_medical_visits)
+pet_vaccine_card_scans = for_table(t.pet_vaccine_card_scans)
+posts = for_table(t.posts)
+post_likes = for_table(t.post_likes)
+post_comments = for_table(t.post_comments)
+
+__all__ = [
+    "AsyncRepository",
+    "DuplicateError",
+    "MemoryRepository",
+    "Repository",
+    "SqlRepository",
+    "for_table",
+    "users",
+    "user_settings",
+    "user_address",
+    "pets",
+    "health_records",
+    "pet_vaccines",
+    "pet_medications",
+    "pet_weight_history",
+    "pet_media",
+    "pet_medical_visits",
+    "pet_vaccine_card_scans",
+    "posts",
+    "post_likes",
+    "post_comments",
+]
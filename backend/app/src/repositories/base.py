@@ -0,0 +1,92 @@
+"""
+Interfaz comun de los repositorios.
+
+Un repositorio da CRUD sobre una tabla; los filtros son igualdades
+columna=valor (None se traduce a IS NULL) y `find` acepta una lista de
+columnas para no traer las que el cliente no pidio. Las implementaciones son
+SqlRepository (Postgres) y MemoryRepository (DB_BACKEND=memory). Las
+consultas especificas de cada dominio (keyset, COPY, agregados) siguen en
+src/db/<dominio>.py.
+
+`repo.aio` expone los mismos metodos como corrutinas: corren en el threadpool
+para no bloquear el event loop desde los endpoints `async def`.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence
+
+from starlette.concurrency import run_in_threadpool
+
+Row = Dict[str, Any]
+
+
+class DuplicateError(ValueError):
+    """La fila viola una restriccion unica (p. ej. email ya registrado)."""
+
+
+class Repository(ABC):
+    name: str = ""
+
+    def get(self, row_id: int, **where: Any) -> Optional[Row]:
+        return self.find_one(id=row_id, **where)
+
+    @abstractmethod
+    def find(self, order_by: str = "id", columns: Optional[Sequence[str]] = None, **where: Any) -> List[Row]:
+        """Filas que cumplen `where`; con `columns` solo esas columnas (proyeccion en el SELECT)."""
+
+    @abstractmethod
+    def find_one(self, **where: Any) -> Optional[Row]:
+        ...
+
+    def exists(self, **where: Any) -> bool:
+        return self.find_one(**where) is not None
+
+    @abstractmethod
+    def create(self, values: Row) -> Row:
+        ...
+
+    @abstractmethod
+    def update(self, row_id: int, values: Row, **where: Any) -> Optional[Row]:
+        """Actualiza la fila si existe y cumple `where`; None si no. Sin valores, la devuelve tal cual."""
+
+    @abstractmethod
+    def delete(self, row_id: int, **where: Any) -> bool:
+        ...
+
+    @abstractmethod
+    def delete_where(self, **where: Any) -> int:
+        ...
+
+    @property
+    def aio(self) -> "AsyncRepository":
+        return AsyncRepository(self)
+
+
+class AsyncRepository:
+    __slots__ = ("_repo",)
+
+    def __init__(self, repo: Repository):
+        self._repo = repo
+
+    async def get(self, row_id: int, **where: Any) -> Optional[Row]:
+        return await run_in_threadpool(self._repo.get, row_id, **where)
+
+    async def find(self, order_by: str = "id", columns: Optional[Sequence[str]] = None, **where: Any) -> List[Row]:
+        return await run_in_threadpool(self._repo.find, order_by, columns, **where)
+
+    async def find_one(self, **where: Any) -> Optional[Row]:
+        return await run_in_threadpool(self._repo.find_one, **where)
+
+    async def exists(self, **where: Any) -> bool:
+        return await run_in_threadpool(self._repo.exists, **where)
+
+    async def create(self, values: Row) -> Row:
+        return await run_in_threadpool(self._repo.create, values)
+
+    async def update(self, row_id: int, values: Row, **where: Any) -> Optional[Row]:
+        return await run_in_threadpool(self._repo.update, row_id, values, **where)
+
+    async def delete(self, row_id: int, **where: Any) -> bool:
+        return await run_in_threadpool(self._repo.delete, row_id, **where)
+
+    async def delete_where(self, **where: Any) -> int:
+        return await run_in_threadpool(self._repo.delete_where, **where)
@@ -0,0 +1,69 @@
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import Table
+
+from src.db.memory import MemoryTable, UniqueViolation
+from src.repositories.base import DuplicateError, Repository, Row
+
+
+class MemoryRepository(Repository):
+    """Repositorio sobre una MemoryTable; busca por el primer filtro con indice y filtra el resto."""
+
+    def __init__(self, store: MemoryTable):
+        self.store = store
+        self.name = store.name
+        self._indexed = {"id", *store.indexed}
+
+    @classmethod
+    def for_table(cls, table: Table) -> "MemoryRepository":
+        """Mismas columnas que la tabla SQL; indice por cada *_id y unico donde la columna lo es."""
+        columns = [c.name for c in table.c]
+        unique = [c.name for c in table.c if c.unique]
+        indexes = [c for c in columns if c.endswith("_id") and c not in unique]
+        return cls(MemoryTable(table.name, columns, indexes=indexes, unique=unique))
+
+    def _candidates(self, where: dict) -> List[Row]:
+        key = next((col for col in where if col in self._indexed), None)
+        if key == "id":
+            row = self.store.get(where["id"])
+            return [row] if row else []
+        if key is not None:
+            return self.store.find(key, where[key])
+        if where:
+            col = next(iter(where))
+            return self.store.find(col, where[col])
+        return self.store.all()
+
+    def find(self, order_by: str = "id", columns: Optional[Sequence[str]] = None, **where: Any) -> List[Row]:
+        rows = [r for r in self._candidates(where) if all(r.get(c) == v for c, v in where.items())]
+        if order_by != "id":
+            rows.sort(key=lambda r: (r.get(order_by) is None, r[order_by] if r.get(order_by) is not None else 0, r["id"]))
+        if columns:
+            rows = [{col: r.get(col) for col in columns} for r in rows]
+        return rows
+
+    def find_one(self, **where: Any) -> Optional[Row]:
+        rows = self.find(**where)
+        return rows[0] if rows else None
+
+    def create(self, values: Row) -> Row:
+        try:
+            return self.store.insert(values)
+        except UniqueViolation as exc:
+            raise DuplicateError(str(exc)) from exc
+
+    def update(self, row_id: int, values: Row, **where: Any) -> Optional[Row]:
+        if not values:
+            return self.get(row_id, **where)
+        try:
+            return self.store.update(row_id, values, **where)
+        except UniqueViolation as exc:
+            raise DuplicateError(str(exc)) from exc
+
+    def delete(self, row_id: int, **where: Any) -> bool:
+        return self.store.delete(row_id, **where)
+
+    def delete_where(self, **where: Any) -> int:
+        if not where:
+            raise ValueError(f"{self.name}: delete_where sin filtros")
+        return sum(self.store.delete(row["id"]) for row in self.find(**where))
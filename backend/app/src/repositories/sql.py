@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Sequence, TypeVar
+
+from sqlalchemy import Table, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from src.db import SessionLocal, replicas
+from src.repositories.base import DuplicateError, Repository, Row
+
+T = TypeVar("T")
+
+_UNIQUE_VIOLATION = "23505"
+
+
+class SqlRepository(Repository):
+    """
+    Repositorio sobre una tabla de Postgres; escrituras con RETURNING (un solo viaje).
+    Con replica_reads las lecturas pueden ir a una replica (src/db/replicas.py).
+    """
+
+    def __init__(self, table: Table, replica_reads: bool = True):
+        self.table = table
+        self.name = table.name
+        self.replica_reads = replica_reads
+
+    @contextmanager
+    def session(self, factory=None) -> Iterator[Session]:
+        # unico punto donde se abre la sesion: aca se enchufan replicas o instrumentacion;
+        # el commit en SessionLocal avisa las escrituras al router de replicas
+        session = (factory or SessionLocal)()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def _read(self, fn: Callable[[Session], T]) -> T:
+        replica = replicas.router.pick() if self.replica_reads else None
+        if replica is not None:
+            try:
+                with self.session(replica.SessionLocal) as session:
+                    return fn(session)
+            except OperationalError as exc:
+                replicas.router.fallback(replica, exc)
+        with self.session() as session:
+            return fn(session)
+
+    def _conditions(self, where: dict) -> list:
+        return [self.table.c[col] == value for col, value in where.items()]
+
+    def find(self, order_by: str = "id", columns: Optional[Sequence[str]] = None, **where: Any) -> List[Row]:
+        selected = [self.table.c[col] for col in columns] if columns else [self.table]
+        stmt = select(*selected).where(*self._conditions(where)).order_by(self.table.c[order_by])
+        return self._read(lambda session: [dict(r) for r in session.execute(stmt).mappings().all()])
+
+    def find_one(self, **where: Any) -> Optional[Row]:
+        stmt = select(self.table).where(*self._conditions(where)).limit(1)
+        row = self._read(lambda session: session.execute(stmt).mappings().first())
+        return dict(row) if row else None
+
+    def create(self, values: Row) -> Row:
+        stmt = insert(self.table).values(**values).returning(*self.table.c)
+        with self.session() as session:
+            try:
+                row = dict(session.execute(stmt).mappings().one())
+                session.commit()
+            except IntegrityError as exc:
+                session.rollback()
+                if getattr(exc.orig, "pgcode", None) == _UNIQUE_VIOLATION:
+                    raise DuplicateError(str(exc.orig)) from exc
+                raise
+            return row
+
+    def update(self, row_id: int, values: Row, **where: Any) -> Optional[Row]:
+        if not values:
+            return self.get(row_id, **where)
+        stmt = (
+            update(self.table)
+            .where(self.table.c.id == row_id, *self._conditions(where))
+            .values(**values)
+            .returning(*self.table.c)
+        )
+        with self.session() as session:
+            row = session.execute(stmt).mappings().first()
+            session.commit()
+            return dict(row) if row else None
+
+    def delete(self, row_id: int, **where: Any) -> bool:
+        return self.delete_where(id=row_id, **where) > 0
+
+    def delete_where(self, **where: Any) -> int:
+        if not where:
+            raise ValueError(f"{self.name}: delete_where sin filtros")
+        stmt = delete(self.table).where(*self._conditions(where))
+        with self.session() as session:
+            result = session.execute(stmt)
+            session.commit()
+            return result.rowcount
@@ -0,0 +1,48 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.db.ai import list_chat_history
+from src.deps.auth import get_current_user_from_bearer, require_user_id
+from src.services import ai_chat, deletion, embeddings
+
+router = APIRouter(prefix="/ai", tags=["ai"])
+
+
+class ChatSchema(BaseModel):
+    message: str = Field(..., min_length=1, max_length=4000)
+    pet_id: Optional[int] = None
+
+
+@router.post("/chat", summary="Respuesta del asistente en streaming (text/event-stream)")
+async def chat(body: ChatSchema, current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    context = None
+    if body.pet_id is not None:
+        context = ai_chat.get_context(body.pet_id)
+        if not context or context["owner_id"] != user_id or deletion.is_hidden("pet", body.pet_id):
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "Mascota no encontrada")
+    return StreamingResponse(
+        ai_chat.stream_chat(user_id, body.message, body.pet_id, context),
+        media_type="text/event-stream",
+        # sin buffer en proxies (nginx) para que cada fragmento salga al instante
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/chat/history")
+async def chat_history(
+    pet_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id = require_user_id(current_user)
+    return list_chat_history(user_id, pet_id, limit)
+
+
+@router.get("/embeddings/status", summary="Estado del pipeline de embeddings (cola, items/s, salteados)")
+async def embeddings_status(current_user=Depends(get_current_user_from_bearer)):
+    require_user_id(current_user)
+    return embeddings.stats()
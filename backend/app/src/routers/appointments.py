@@ -0,0 +1,106 @@
+import datetime as dt
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, Field
+
+from src.db.appointments import (
+    SlotTakenError,
+    cancel_appointment,
+    create_appointment,
+    get_clinic,
+    list_user_appointments,
+    replace_rules,
+)
+from src.db.pets import get_pet_by_id
+from src.deps.auth import get_current_user_from_bearer, require_user_id, user_id_of
+from src.services import booking, deletion
+
+router = APIRouter(tags=["appointments"])
+
+
+class AvailabilityRule(BaseModel):
+    vet_id: Optional[int] = None
+    weekday: int = Field(..., ge=0, le=6)
+    start_time: dt.time
+    end_time: dt.time
+    slot_minutes: int = Field(booking.DEFAULT_SLOT_MINUTES, ge=booking.GRID_MINUTES, le=240)
+
+
+class AvailabilityRulesSchema(BaseModel):
+    rules: List[AvailabilityRule]
+
+
+class AppointmentCreate(BaseModel):
+    pet_id: int
+    vet_id: Optional[int] = None
+    date: dt.date
+    time: str
+
+
+@router.get("/vet-clinics/{clinic_id}/availability", summary="Horarios libres de la clinica para una semana")
+async def clinic_availability(
+    clinic_id: int,
+    start: Optional[dt.date] = None,
+    days: int = Query(7, ge=1, le=31),
+    vet_id: Optional[int] = None,
+):
+    start = start or dt.date.today()
+    return {"clinic_id": clinic_id, "start": start, "days": booking.availability(clinic_id, start, days, vet_id)}
+
+
+@router.put("/vet-clinics/{clinic_id}/availability-rules", summary="Reemplaza los horarios de atencion")
+async def set_availability_rules(clinic_id: int, body: AvailabilityRulesSchema, current_user=Depends(get_current_user_from_bearer)):
+    clinic = get_clinic(clinic_id)
+    if not clinic or clinic.get("owner_id") != user_id_of(current_user):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Clínica no encontrada o sin permiso")
+    for rule in body.rules:
+        if rule.end_time <= rule.start_time:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "La hora de fin debe ser posterior a la de inicio")
+    if booking.find_overlap([r.dict() for r in body.rules]):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Hay horarios superpuestos para el mismo día y veterinario")
+    rules = replace_rules(clinic_id, [r.dict() for r in body.rules])
+    booking.invalidate(clinic_id)
+    return rules
+
+
+@router.post("/vet-clinics/{clinic_id}/appointments", status_code=status.HTTP_201_CREATED)
+async def book_appointment(clinic_id: int, body: AppointmentCreate, current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    pet = get_pet_by_id(body.pet_id)
+    if not pet or pet.get("owner_id") != user_id or deletion.is_hidden("pet", body.pet_id):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Mascota no encontrada o sin permisos")
+    if body.date < dt.date.today():
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "No se pueden reservar turnos en fechas pasadas")
+    try:
+        slot = booking.normalize_time(body.time)
+    except (ValueError, IndexError):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Hora inválida")
+    if not booking.is_offered(clinic_id, body.date, body.vet_id, slot):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "La clínica no atiende en ese horario o se superpone con otro turno")
+    try:
+        return create_appointment({
+            "clinic_id": clinic_id,
+            "pet_id": body.pet_id,
+            "user_id": user_id,
+            "vet_id": body.vet_id,
+            "date": body.date,
+            "time": slot,
+        })
+    except SlotTakenError as exc:
+        raise HTTPException(status.HTTP_409_CONFLICT, str(exc))
+
+
+@router.get("/appointments/me")
+async def my_appointments(current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    return list_user_appointments(user_id)
+
+
+@router.post("/appointments/{appointment_id}/cancel")
+async def cancel_my_appointment(appointment_id: int, current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    cancelled = cancel_appointment(user_id, appointment_id)
+    if not cancelled:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Turno no encontrado")
+    return cancelled
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, EmailStr, Field
 
-from src.deps.auth import verify_google_token_and_get_user, create_access_token
+from src.deps.auth import verify_google_token_and_get_user, create_access_token, user_id_of
 from src.db.users import create_user_with_password, verify_user_credentials
 from src.models.auth import GoogleTokenSchema, RegisterSchema, EmailLoginSchema
+from src.services import autocomplete, deletion
 router = APIRouter()
 
 
@@ -32,8 +33,10 @@ async def google_callback(body: GoogleTokenSchema):
     Verifica el id_token de Google, crea/obtiene usuario y devuelve JWT.
     """
     user = await verify_google_token_and_get_user(body.id_token)
+    public = _public_user(user)
+    autocomplete.users.add(public["id"], public["name"])
     token = create_access_token({"sub": user.get("email") if isinstance(user, dict) else getattr(user, "email"), "role": user.get("role") if isinstance(user, dict) else getattr(user, "role")})
-    return {"access_token": token, "token_type": "bearer", "user": _public_user(user)}
+    return {"access_token": token, "token_type": "bearer", "user": public}
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
@@ -42,6 +45,7 @@ async def register_user(body: RegisterSchema):
         user = create_user_with_password(body.name, body.email, body.password)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    autocomplete.users.add(user.get("id"), user.get("full_name") or body.name)
     token = create_access_token({"sub": body.email, "role": user.get("role") if isinstance(user, dict) else getattr(user, "role", None)})
     return {"access_token": token, "token_type": "bearer", "user": _public_user(user)}
 
@@ -51,5 +55,7 @@ async def login_with_email(body: EmailLoginSchema):
     user = verify_user_credentials(body.email, body.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales inválidas")
+    if deletion.is_hidden("user", user_id_of(user)):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Cuenta en proceso de borrado")
     token = create_access_token({"sub": body.email, "role": user.get("role") if isinstance(user, dict) else getattr(user, "role", None)})
     return {"access_token": token, "token_type": "bearer", "user": _public_user(user)}
@@ -0,0 +1,18 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from src.deps.auth import get_current_user_from_bearer
+from src.services.autocomplete import INDEXES
+
+router = APIRouter(tags=["autocomplete"])
+
+
+@router.get("/autocomplete", summary="Sugerencias por prefijo de razas, lugares o usuarios")
+async def autocomplete(
+    kind: Literal["breed", "place", "user"],
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    return INDEXES[kind].lookup(q, limit)
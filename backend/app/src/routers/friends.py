@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+
+from src.db.friendships import (
+    FriendshipExistsError,
+    accept_request,
+    create_request,
+    pending_incoming,
+    remove_friendship,
+    users_brief,
+)
+from src.deps.auth import get_current_user_from_bearer, require_user_id
+from src.services import social_graph
+
+router = APIRouter(prefix="/friends", tags=["friends"])
+
+
+class FriendRequestSchema(BaseModel):
+    user_id: int
+
+
+@router.get("", summary="Amigos del usuario autenticado")
+async def list_friends(current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    return users_brief(social_graph.friends(user_id).tolist())
+
+
+@router.get("/requests", summary="Solicitudes de amistad recibidas")
+async def list_requests(current_user=Depends(get_current_user_from_bearer)):
+    return pending_incoming(require_user_id(current_user))
+
+
+@router.post("/requests", status_code=status.HTTP_201_CREATED)
+async def send_request(body: FriendRequestSchema, current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    if body.user_id == user_id:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "No puedes enviarte una solicitud a ti mismo")
+    if not users_brief([body.user_id]):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Usuario no encontrado")
+    try:
+        return create_request(user_id, body.user_id)
+    except FriendshipExistsError as exc:
+        raise HTTPException(status.HTTP_409_CONFLICT, str(exc))
+
+
+@router.post("/requests/{requester_id}/accept")
+async def accept(requester_id: int, current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    friendship = accept_request(user_id, requester_id)
+    if not friendship:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Solicitud no encontrada")
+    social_graph.invalidate(user_id, requester_id)
+    return friendship
+
+
+@router.delete("/{friend_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Elimina una amistad o solicitud")
+async def remove(friend_id: int, current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    if not remove_friendship(user_id, friend_id):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Amistad no encontrada")
+    social_graph.invalidate(user_id, friend_id)
+
+
+@router.get("/suggestions", summary="Amigos de amigos ordenados por amigos en comun")
+async def suggestions(limit: int = Query(20, ge=1, le=100), current_user=Depends(get_current_user_from_bearer)):
+    ranked = social_graph.suggestions(require_user_id(current_user), limit)
+    users = {u["id"]: u for u in users_brief([s["user_id"] for s in ranked])}
+    return [{**users[s["user_id"]], "mutual_count": s["mutual_count"]} for s in ranked if s["user_id"] in users]
+
+
+@router.get("/{other_id}/mutual", summary="Amigos en comun con otro usuario")
+async def mutual_friends(other_id: int, current_user=Depends(get_current_user_from_bearer)):
+    return users_brief(social_graph.mutual(require_user_id(current_user), other_id))
@@ -0,0 +1,152 @@
+import base64
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, Field
+
+from src.db.groups import (
+    add_member,
+    create_group,
+    delete_group,
+    group_posts,
+    import_members,
+    list_groups,
+    remove_member,
+    update_group,
+)
+from src.deps.auth import get_current_user_from_bearer, require_user_id
+from src.services import group_membership
+
+router = APIRouter(prefix="/groups", tags=["groups"])
+
+GroupType = Literal["public", "private"]
+
+
+def _require_group(group_id: int) -> dict:
+    cached = group_membership.entry(group_id)
+    if not cached:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Grupo no encontrado")
+    return cached["group"]
+
+
+def _require_admin(group_id: int, user_id: int):
+    _require_group(group_id)
+    if not group_membership.is_admin(group_id, user_id):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Solo un admin del grupo puede hacer esto")
+
+
+def _encode_cursor(post: dict) -> str:
+    # created_at admite NULL: va vacio en el cursor
+    created_at = post["created_at"].isoformat() if post.get("created_at") else ""
+    return base64.urlsafe_b64encode(f"{created_at}|{post['id']}".encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, post_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return (datetime.fromisoformat(created_at) if created_at else None), int(post_id)
+    except Exception:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cursor inválido")
+
+
+class GroupCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = Field(None, max_length=500)
+    photo_url: Optional[str] = None
+    type: GroupType = "public"
+
+
+class GroupUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=255)
+    description: Optional[str] = Field(None, max_length=500)
+    photo_url: Optional[str] = None
+    type: Optional[GroupType] = None
+
+
+class MemberImportSchema(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1, max_length=500_000)
+
+
+@router.get("")
+async def list_all_groups(
+    type: Optional[GroupType] = None,
+    after_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    return list_groups(type, after_id, limit)
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def create_new_group(body: GroupCreate, current_user=Depends(get_current_user_from_bearer)):
+    return create_group(require_user_id(current_user), body.dict(exclude_none=True))
+
+
+@router.get("/{group_id}")
+async def get_one_group(group_id: int):
+    group = _require_group(group_id)
+    return {**group, "member_count": group_membership.member_count(group_id)}
+
+
+@router.put("/{group_id}")
+async def update_one_group(group_id: int, body: GroupUpdate, current_user=Depends(get_current_user_from_bearer)):
+    _require_admin(group_id, require_user_id(current_user))
+    group = update_group(group_id, body.dict(exclude_none=True))
+    if not group:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Grupo no encontrado")
+    group_membership.group_changed(group_id, group)
+    return group
+
+
+@router.delete("/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_one_group(group_id: int, current_user=Depends(get_current_user_from_bearer)):
+    _require_admin(group_id, require_user_id(current_user))
+    delete_group(group_id)
+    group_membership.group_changed(group_id, None)
+
+
+@router.post("/{group_id}/join")
+async def join_group(group_id: int, current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    group = _require_group(group_id)
+    if group.get("type") == "private":
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "El grupo es privado")
+    if add_member(group_id, user_id):
+        group_membership.added(group_id, [user_id])
+    return {"group_id": group_id, "user_id": user_id, "member": True}
+
+
+@router.post("/{group_id}/leave")
+async def leave_group(group_id: int, current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    _require_group(group_id)
+    if remove_member(group_id, user_id):
+        group_membership.removed(group_id, user_id)
+    return {"group_id": group_id, "user_id": user_id, "member": False}
+
+
+@router.post("/{group_id}/members/import", summary="Alta masiva de miembros (un solo COPY)")
+async def import_group_members(group_id: int, body: MemberImportSchema, current_user=Depends(get_current_user_from_bearer)):
+    _require_admin(group_id, require_user_id(current_user))
+    added = import_members(group_id, body.user_ids)
+    group_membership.added(group_id, added)
+    return {"group_id": group_id, "added": len(added)}
+
+
+@router.get("/{group_id}/posts", summary="Feed del grupo, del mas reciente al mas antiguo")
+async def list_group_posts(
+    group_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id = require_user_id(current_user)
+    group = _require_group(group_id)
+    if group.get("type") == "private" and not group_membership.is_member(group_id, user_id):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Solo los miembros pueden ver este grupo")
+    rows = group_posts(group_id, _decode_cursor(cursor) if cursor else None, limit)
+    items = rows[:limit]
+    return {
+        "items": items,
+        "next_cursor": _encode_cursor(items[-1]) if len(rows) > limit else None,
+    }
@@ -1,4 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+
+from src.db import replicas
+from src.services import metrics
 
 router = APIRouter()
 
@@ -6,3 +9,13 @@ router = APIRouter()
 @router.get("/health", tags=["health"])
 async def health_check():
     return {"status": "ok"}
+
+
+@router.get("/health/db", tags=["health"], summary="Estado de las replicas de lectura")
+async def db_health():
+    return replicas.router.stats()
+
+
+@router.get("/metrics", tags=["health"], summary="Metricas en formato de texto de Prometheus")
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,97 +1,57 @@
-from datetime import date
-from typing import List, Optional
+import datetime as dt
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, status, UploadFile
 from pydantic import BaseModel
-from sqlalchemy import delete, insert, select, update
 
-from src.db import SessionLocal
-from src.deps.auth import get_current_user_from_bearer
-from src.models import tables as t
+from src import repositories as repo
+from src.db.vaccine_scans import save_scan_with_vaccines
+from src.deps.auth import get_current_user_from_bearer, user_id_of
+from src.deps.projection import fields_query
+from src.models.responses import (
+    HealthRecordResponse,
+    MedicalVisitResponse,
+    MediaResponse,
+    MedicationResponse,
+    VaccineCardScanResponse,
+    VaccineResponse,
+    WeightResponse,
+    rows_response,
+)
+from src.services import ai_chat, deletion, recommendations, vaccine_ocr, weight_analytics
+from src.services.sql_profiler import query_budget
 
-router = APIRouter(prefix="/pets", tags=["pet-records"])
+SCANS_ROOT = Path("media/vaccine_scans")
+SCANS_ROOT.mkdir(parents=True, exist_ok=True)
 
+def _not_deleted(pet_id: int):
+    # una mascota con el borrado pedido ya no tiene registros que leer ni donde escribir
+    if deletion.is_hidden("pet", pet_id):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Mascota no encontrada")
 
-def _user_id(user) -> Optional[int]:
-    if isinstance(user, dict):
-        return user.get("id")
-    return getattr(user, "id", None)
 
+router = APIRouter(prefix="/pets", tags=["pet-records"], dependencies=[Depends(_not_deleted)])
 
-def _row_to_dict(row):
-    try:
-        return dict(row._mapping)
-    except Exception:
-        return dict(row)
-
-
-def _list_by_pet(table, pet_id: int) -> List[dict]:
-    session = SessionLocal()
-    try:
-        stmt = select(table).where(table.c.pet_id == pet_id)
-        return [dict(r) for r in session.execute(stmt).mappings().all()]
-    finally:
-        session.close()
-
-
-def _get_by_id(table, pet_id: int, item_id: int) -> Optional[dict]:
-    session = SessionLocal()
-    try:
-        stmt = select(table).where(table.c.id == item_id, table.c.pet_id == pet_id)
-        row = session.execute(stmt).mappings().first()
-        return dict(row) if row else None
-    finally:
-        session.close()
 
-
-def _create_for_pet(table, pet_id: int, data: dict) -> dict:
-    session = SessionLocal()
-    try:
-        result = session.execute(insert(table).values(pet_id=pet_id, **data))
-        session.commit()
-        new_id = result.inserted_primary_key[0]
-        return _get_by_id(table, pet_id, new_id)
-    finally:
-        session.close()
-
-
-def _update_for_pet(table, pet_id: int, item_id: int, data: dict) -> Optional[dict]:
-    if not data:
-        return _get_by_id(table, pet_id, item_id)
-    session = SessionLocal()
-    try:
-        stmt = update(table).where(table.c.id == item_id, table.c.pet_id == pet_id).values(**data)
-        result = session.execute(stmt)
-        session.commit()
-        if result.rowcount == 0:
-            return None
-        return _get_by_id(table, pet_id, item_id)
-    finally:
-        session.close()
-
-
-def _delete_for_pet(table, pet_id: int, item_id: int) -> bool:
-    session = SessionLocal()
-    try:
-        stmt = delete(table).where(table.c.id == item_id, table.c.pet_id == pet_id)
-        result = session.execute(stmt)
-        session.commit()
-        return result.rowcount > 0
-    finally:
-        session.close()
+async def _weight_series(pet_id: int):
+    rows = await repo.pet_weight_history.aio.find("date", pet_id=pet_id)
+    return [(r["date"], r["weight"]) for r in rows]
 
 
 # ----- Schemas -----
 class HealthRecordBase(BaseModel):
-    record_date: Optional[date] = None
+    record_date: Optional[dt.date] = None
     description: Optional[str] = None
     vet_id: Optional[int] = None
 
 
 class VaccineBase(BaseModel):
+    # los campos `date` tapan el tipo dentro de la clase: las anotaciones usan dt.date
     vaccine_name: Optional[str] = None
-    date: Optional[date] = None
-    next_due: Optional[date] = None
+    date: Optional[dt.date] = None
+    next_due: Optional[dt.date] = None
     vet_clinic: Optional[str] = None
     notes: Optional[str] = None
 
@@ -100,13 +60,13 @@ class MedicationBase(BaseModel):
     medication: Optional[str] = None
     dose: Optional[str] = None
     frequency: Optional[str] = None
-    start_date: Optional[date] = None
-    end_date: Optional[date] = None
+    start_date: Optional[dt.date] = None
+    end_date: Optional[dt.date] = None
     notes: Optional[str] = None
 
 
 class WeightBase(BaseModel):
-    date: Optional[date] = None
+    date: Optional[dt.date] = None
     weight: Optional[float] = None
 
 
@@ -117,7 +77,7 @@ class MediaBase(BaseModel):
 
 class MedicalVisitBase(BaseModel):
     vet_id: Optional[int] = None
-    visit_date: Optional[date] = None
+    visit_date: Optional[dt.date] = None
     diagnosis: Optional[str] = None
     treatment: Optional[str] = None
     notes: Optional[str] = None
@@ -130,22 +90,27 @@ class VaccineCardScanBase(BaseModel):
 
 
 # ----- Routes: health_records -----
-@router.get("/{pet_id}/health-records")
-async def list_health_records(pet_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)  # asegura autenticacion
-    return _list_by_pet(t.health_records, pet_id)
-
-
-@router.post("/{pet_id}/health-records", status_code=status.HTTP_201_CREATED)
+@router.get("/{pet_id}/health-records", response_model=List[HealthRecordResponse])
+@query_budget(2)
+async def list_health_records(
+    pet_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(HealthRecordResponse)),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id_of(current_user)  # asegura autenticacion
+    return rows_response(HealthRecordResponse, await repo.health_records.aio.find(columns=fields, pet_id=pet_id), fields)
+
+
+@router.post("/{pet_id}/health-records", status_code=status.HTTP_201_CREATED, response_model=HealthRecordResponse)
 async def create_health_record(pet_id: int, body: HealthRecordBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _create_for_pet(t.health_records, pet_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    return await repo.health_records.aio.create({**body.dict(exclude_none=True), "pet_id": pet_id})
 
 
-@router.put("/{pet_id}/health-records/{record_id}")
+@router.put("/{pet_id}/health-records/{record_id}", response_model=HealthRecordResponse)
 async def update_health_record(pet_id: int, record_id: int, body: HealthRecordBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    updated = _update_for_pet(t.health_records, pet_id, record_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    updated = await repo.health_records.aio.update(record_id, body.dict(exclude_none=True), pet_id=pet_id)
     if not updated:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Registro no encontrado")
     return updated
@@ -153,115 +118,176 @@ async def update_health_record(pet_id: int, record_id: int, body: HealthRecordBa
 
 @router.delete("/{pet_id}/health-records/{record_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_health_record(pet_id: int, record_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    if not _delete_for_pet(t.health_records, pet_id, record_id):
+    user_id_of(current_user)
+    if not await repo.health_records.aio.delete(record_id, pet_id=pet_id):
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Registro no encontrado")
 
 
 # ----- Routes: pet_vaccines -----
-@router.get("/{pet_id}/vaccines")
-async def list_vaccines(pet_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _list_by_pet(t.pet_vaccines, pet_id)
-
-
-@router.post("/{pet_id}/vaccines", status_code=status.HTTP_201_CREATED)
+@router.get("/{pet_id}/vaccines", response_model=List[VaccineResponse])
+@query_budget(2)
+async def list_vaccines(
+    pet_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(VaccineResponse)),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id_of(current_user)
+    return rows_response(VaccineResponse, await repo.pet_vaccines.aio.find(columns=fields, pet_id=pet_id), fields)
+
+
+@router.post("/{pet_id}/vaccines", status_code=status.HTTP_201_CREATED, response_model=VaccineResponse)
 async def create_vaccine(pet_id: int, body: VaccineBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _create_for_pet(t.pet_vaccines, pet_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    created = await repo.pet_vaccines.aio.create({**body.dict(exclude_none=True), "pet_id": pet_id})
+    ai_chat.invalidate_context(pet_id)
+    return created
 
 
-@router.put("/{pet_id}/vaccines/{vaccine_id}")
+@router.put("/{pet_id}/vaccines/{vaccine_id}", response_model=VaccineResponse)
 async def update_vaccine(pet_id: int, vaccine_id: int, body: VaccineBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    updated = _update_for_pet(t.pet_vaccines, pet_id, vaccine_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    updated = await repo.pet_vaccines.aio.update(vaccine_id, body.dict(exclude_none=True), pet_id=pet_id)
     if not updated:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Vacuna no encontrada")
+    ai_chat.invalidate_context(pet_id)
     return updated
 
 
 @router.delete("/{pet_id}/vaccines/{vaccine_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_vaccine(pet_id: int, vaccine_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    if not _delete_for_pet(t.pet_vaccines, pet_id, vaccine_id):
+    user_id_of(current_user)
+    if not await repo.pet_vaccines.aio.delete(vaccine_id, pet_id=pet_id):
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Vacuna no encontrada")
+    ai_chat.invalidate_context(pet_id)
 
 
 # ----- Routes: pet_medications -----
-@router.get("/{pet_id}/medications")
-async def list_medications(pet_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _list_by_pet(t.pet_medications, pet_id)
-
-
-@router.post("/{pet_id}/medications", status_code=status.HTTP_201_CREATED)
+@router.get("/{pet_id}/medications", response_model=List[MedicationResponse])
+@query_budget(2)
+async def list_medications(
+    pet_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(MedicationResponse)),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id_of(current_user)
+    return rows_response(MedicationResponse, await repo.pet_medications.aio.find(columns=fields, pet_id=pet_id), fields)
+
+
+@router.post("/{pet_id}/medications", status_code=status.HTTP_201_CREATED, response_model=MedicationResponse)
 async def create_medication(pet_id: int, body: MedicationBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _create_for_pet(t.pet_medications, pet_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    created = await repo.pet_medications.aio.create({**body.dict(exclude_none=True), "pet_id": pet_id})
+    ai_chat.invalidate_context(pet_id)
+    return created
 
 
-@router.put("/{pet_id}/medications/{med_id}")
+@router.put("/{pet_id}/medications/{med_id}", response_model=MedicationResponse)
 async def update_medication(pet_id: int, med_id: int, body: MedicationBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    updated = _update_for_pet(t.pet_medications, pet_id, med_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    updated = await repo.pet_medications.aio.update(med_id, body.dict(exclude_none=True), pet_id=pet_id)
     if not updated:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Medicacion no encontrada")
+    ai_chat.invalidate_context(pet_id)
     return updated
 
 
 @router.delete("/{pet_id}/medications/{med_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_medication(pet_id: int, med_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    if not _delete_for_pet(t.pet_medications, pet_id, med_id):
+    user_id_of(current_user)
+    if not await repo.pet_medications.aio.delete(med_id, pet_id=pet_id):
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Medicacion no encontrada")
+    ai_chat.invalidate_context(pet_id)
 
 
 # ----- Routes: pet_weight_history -----
-@router.get("/{pet_id}/weights")
-async def list_weights(pet_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _list_by_pet(t.pet_weight_history, pet_id)
-
-
-@router.post("/{pet_id}/weights", status_code=status.HTTP_201_CREATED)
+@router.get("/{pet_id}/weights", response_model=List[WeightResponse])
+@query_budget(2)
+async def list_weights(
+    pet_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(WeightResponse)),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id_of(current_user)
+    return rows_response(WeightResponse, await repo.pet_weight_history.aio.find(columns=fields, pet_id=pet_id), fields)
+
+
+@router.get("/{pet_id}/weights/analytics", summary="Serie de peso reducida, media movil, crecimiento y outliers")
+async def weight_analytics_view(
+    pet_id: int,
+    points: int = Query(300, ge=10, le=2000),
+    window: int = Query(7, ge=1, le=90),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id_of(current_user)
+    key = (points, window)
+    seen_version = weight_analytics.version(pet_id)
+    cached = weight_analytics.get_cached(pet_id, key)
+    if cached is not None:
+        return cached
+    result = {"pet_id": pet_id, **weight_analytics.compute(await _weight_series(pet_id), points, window)}
+    weight_analytics.set_cached(pet_id, key, result, seen_version)
+    return result
+
+
+@router.post("/{pet_id}/weights", status_code=status.HTTP_201_CREATED, response_model=WeightResponse)
 async def create_weight(pet_id: int, body: WeightBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _create_for_pet(t.pet_weight_history, pet_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    created = await repo.pet_weight_history.aio.create({**body.dict(exclude_none=True), "pet_id": pet_id})
+    weight_analytics.invalidate(pet_id)
+    ai_chat.invalidate_context(pet_id)
+    return created
 
 
-@router.put("/{pet_id}/weights/{weight_id}")
+@router.put("/{pet_id}/weights/{weight_id}", response_model=WeightResponse)
 async def update_weight(pet_id: int, weight_id: int, body: WeightBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    updated = _update_for_pet(t.pet_weight_history, pet_id, weight_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    updated = await repo.pet_weight_history.aio.update(weight_id, body.dict(exclude_none=True), pet_id=pet_id)
     if not updated:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Registro de peso no encontrado")
+    weight_analytics.invalidate(pet_id)
+    ai_chat.invalidate_context(pet_id)
     return updated
 
 
 @router.delete("/{pet_id}/weights/{weight_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_weight(pet_id: int, weight_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    if not _delete_for_pet(t.pet_weight_history, pet_id, weight_id):
+    user_id_of(current_user)
+    if not await repo.pet_weight_history.aio.delete(weight_id, pet_id=pet_id):
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Registro de peso no encontrado")
+    weight_analytics.invalidate(pet_id)
+    ai_chat.invalidate_context(pet_id)
 
 
-# ----- Routes: pet_media -----
-@router.get("/{pet_id}/media")
-async def list_media(pet_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _list_by_pet(t.pet_media, pet_id)
+# ----- Routes: ai_recommendations -----
+@router.get("/{pet_id}/recommendations", summary="Recomendaciones precalculadas por el job por lotes")
+@query_budget(2)
+async def list_recommendations(pet_id: int, current_user=Depends(get_current_user_from_bearer)):
+    user_id_of(current_user)
+    return recommendations.get_for_pet(pet_id)
 
 
-@router.post("/{pet_id}/media", status_code=status.HTTP_201_CREATED)
+# ----- Routes: pet_media -----
+@router.get("/{pet_id}/media", response_model=List[MediaResponse])
+@query_budget(2)
+async def list_media(
+    pet_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(MediaResponse)),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id_of(current_user)
+    return rows_response(MediaResponse, await repo.pet_media.aio.find(columns=fields, pet_id=pet_id), fields)
+
+
+@router.post("/{pet_id}/media", status_code=status.HTTP_201_CREATED, response_model=MediaResponse)
 async def create_media(pet_id: int, body: MediaBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _create_for_pet(t.pet_media, pet_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    return await repo.pet_media.aio.create({**body.dict(exclude_none=True), "pet_id": pet_id})
 
 
-@router.put("/{pet_id}/media/{media_id}")
+@router.put("/{pet_id}/media/{media_id}", response_model=MediaResponse)
 async def update_media(pet_id: int, media_id: int, body: MediaBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    updated = _update_for_pet(t.pet_media, pet_id, media_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    updated = await repo.pet_media.aio.update(media_id, body.dict(exclude_none=True), pet_id=pet_id)
     if not updated:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Media no encontrada")
     return updated
@@ -269,28 +295,33 @@ async def update_media(pet_id: int, media_id: int, body: MediaBase, current_user
 
 @router.delete("/{pet_id}/media/{media_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_media(pet_id: int, media_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    if not _delete_for_pet(t.pet_media, pet_id, media_id):
+    user_id_of(current_user)
+    if not await repo.pet_media.aio.delete(media_id, pet_id=pet_id):
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Media no encontrada")
 
 
 # ----- Routes: pet_medical_visits -----
-@router.get("/{pet_id}/medical-visits")
-async def list_medical_visits(pet_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _list_by_pet(t.pet_medical_visits, pet_id)
-
-
-@router.post("/{pet_id}/medical-visits", status_code=status.HTTP_201_CREATED)
+@router.get("/{pet_id}/medical-visits", response_model=List[MedicalVisitResponse])
+@query_budget(2)
+async def list_medical_visits(
+    pet_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(MedicalVisitResponse)),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id_of(current_user)
+    return rows_response(MedicalVisitResponse, await repo.pet_medical_visits.aio.find(columns=fields, pet_id=pet_id), fields)
+
+
+@router.post("/{pet_id}/medical-visits", status_code=status.HTTP_201_CREATED, response_model=MedicalVisitResponse)
 async def create_medical_visit(pet_id: int, body: MedicalVisitBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _create_for_pet(t.pet_medical_visits, pet_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    return await repo.pet_medical_visits.aio.create({**body.dict(exclude_none=True), "pet_id": pet_id})
 
 
-@router.put("/{pet_id}/medical-visits/{visit_id}")
+@router.put("/{pet_id}/medical-visits/{visit_id}", response_model=MedicalVisitResponse)
 async def update_medical_visit(pet_id: int, visit_id: int, body: MedicalVisitBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    updated = _update_for_pet(t.pet_medical_visits, pet_id, visit_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    updated = await repo.pet_medical_visits.aio.update(visit_id, body.dict(exclude_none=True), pet_id=pet_id)
     if not updated:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Visita no encontrada")
     return updated
@@ -298,28 +329,63 @@ async def update_medical_visit(pet_id: int, visit_id: int, body: MedicalVisitBas
 
 @router.delete("/{pet_id}/medical-visits/{visit_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_medical_visit(pet_id: int, visit_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    if not _delete_for_pet(t.pet_medical_visits, pet_id, visit_id):
+    user_id_of(current_user)
+    if not await repo.pet_medical_visits.aio.delete(visit_id, pet_id=pet_id):
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Visita no encontrada")
 
 
 # ----- Routes: pet_vaccine_card_scans -----
-@router.get("/{pet_id}/vaccine-scans")
-async def list_vaccine_scans(pet_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _list_by_pet(t.pet_vaccine_card_scans, pet_id)
-
-
-@router.post("/{pet_id}/vaccine-scans", status_code=status.HTTP_201_CREATED)
+@router.get("/{pet_id}/vaccine-scans", response_model=List[VaccineCardScanResponse])
+@query_budget(2)
+async def list_vaccine_scans(
+    pet_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(VaccineCardScanResponse)),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id_of(current_user)
+    return rows_response(VaccineCardScanResponse, await repo.pet_vaccine_card_scans.aio.find(columns=fields, pet_id=pet_id), fields)
+
+
+@router.post("/{pet_id}/vaccine-scans", status_code=status.HTTP_201_CREATED, response_model=VaccineCardScanResponse)
 async def create_vaccine_scan(pet_id: int, body: VaccineCardScanBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    return _create_for_pet(t.pet_vaccine_card_scans, pet_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    return await repo.pet_vaccine_card_scans.aio.create({**body.dict(exclude_none=True), "pet_id": pet_id})
 
 
-@router.put("/{pet_id}/vaccine-scans/{scan_id}")
+@router.post("/{pet_id}/vaccine-scans/upload", status_code=status.HTTP_201_CREATED,
+             summary="Sube un carnet de vacunación y extrae las vacunas con OCR local")
+async def upload_vaccine_scan(pet_id: int, file: UploadFile = File(...), current_user=Depends(get_current_user_from_bearer)):
+    user_id_of(current_user)
+    if not vaccine_ocr.OCR_AVAILABLE:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "OCR no disponible en el servidor")
+    data = await file.read()
+    if not data:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Archivo vacío")
+    try:
+        result = await vaccine_ocr.scan_card(data)
+    except Exception:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "No se pudo procesar la imagen")
+    filename = f"{pet_id}_{int(time.time())}_{result['hash'][:16]}{Path(file.filename or '').suffix}"
+    (SCANS_ROOT / filename).write_bytes(data)
+    metadata = {
+        "source": "server",
+        "engine": "tesseract",
+        "lang": vaccine_ocr.OCR_LANG,
+        "image_sha256": result["hash"],
+        "cached": result["cached"],
+        "entries": len(result["entries"]),
+    }
+    saved = save_scan_with_vaccines(
+        pet_id, f"/media/vaccine_scans/{filename}", result["text"], metadata, result["entries"]
+    )
+    ai_chat.invalidate_context(pet_id)
+    return saved
+
+
+@router.put("/{pet_id}/vaccine-scans/{scan_id}", response_model=VaccineCardScanResponse)
 async def update_vaccine_scan(pet_id: int, scan_id: int, body: VaccineCardScanBase, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    updated = _update_for_pet(t.pet_vaccine_card_scans, pet_id, scan_id, body.dict(exclude_none=True))
+    user_id_of(current_user)
+    updated = await repo.pet_vaccine_card_scans.aio.update(scan_id, body.dict(exclude_none=True), pet_id=pet_id)
     if not updated:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Escaneo no encontrado")
     return updated
@@ -327,6 +393,6 @@ async def update_vaccine_scan(pet_id: int, scan_id: int, body: VaccineCardScanBa
 
 @router.delete("/{pet_id}/vaccine-scans/{scan_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_vaccine_scan(pet_id: int, scan_id: int, current_user=Depends(get_current_user_from_bearer)):
-    _user_id(current_user)
-    if not _delete_for_pet(t.pet_vaccine_card_scans, pet_id, scan_id):
+    user_id_of(current_user)
+    if not await repo.pet_vaccine_card_scans.aio.delete(scan_id, pet_id=pet_id):
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Escaneo no encontrado")
@@ -1,15 +1,20 @@
 import shutil
 import time
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, File, HTTPException, status, UploadFile
 from pydantic import BaseModel, Field
-
-from src.deps.auth import get_current_user_from_bearer
+from starlette.concurrency import run_in_threadpool
+
+from src.deps.auth import get_current_user_from_bearer, user_id_of
+from src.deps.projection import fields_query
+from src.models.responses import PetResponse, rows_response
+from src.services import ai_chat, deletion, embeddings
+from src.services.autocomplete import add_breed, discount_breed, fold
+from src.services.sql_profiler import query_budget
 from src.db.pets import (
     create_pet as db_create_pet,
-    delete_pet as db_delete_pet,
     get_pet_by_id,
     get_pets_by_owner,
     update_pet as db_update_pet,
@@ -45,68 +50,73 @@ class PetUpdate(BaseModel):
     avatar_url: Optional[str] = None
 
 
-class PetResponse(PetBase):
-    id: int
-    owner_id: int
-
-    class Config:
-        orm_mode = True
-
-
-def _owner_id(user) -> Optional[int]:
-    if isinstance(user, dict):
-        return user.get("id")
-    return getattr(user, "id", None)
-
-
 @router.get("/pets", response_model=List[PetResponse])
-async def list_pets(current_user=Depends(get_current_user_from_bearer)):
-    owner_id = _owner_id(current_user)
+@query_budget(2)
+async def list_pets(
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(PetResponse)),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    owner_id = user_id_of(current_user)
     if not owner_id:
-        return []
-    pets = get_pets_by_owner(owner_id)
-    return [PetResponse(**pet) for pet in pets]
+        return rows_response(PetResponse, [])
+    pets = [pet for pet in get_pets_by_owner(owner_id, fields) if not deletion.is_hidden("pet", pet["id"])]
+    return rows_response(PetResponse, pets, fields)
 
 
 @router.post("/pets", status_code=status.HTTP_201_CREATED, response_model=PetResponse)
+@query_budget(2)
 async def create_new_pet(pet: PetCreate, current_user=Depends(get_current_user_from_bearer)):
-    owner_id = _owner_id(current_user)
+    owner_id = user_id_of(current_user)
     if not owner_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario inválido")
     new_pet = db_create_pet(owner_id, pet.dict(exclude_none=True))
     if not new_pet:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No se pudo crear la mascota")
-    return PetResponse(**new_pet)
+    add_breed(new_pet.get("breed"))
+    embeddings.enqueue_pet(new_pet)
+    return new_pet
 
 
 @router.put("/pets/{pet_id}", response_model=PetResponse)
+@query_budget(3)
 async def update_existing_pet(pet_id: int, pet: PetUpdate, current_user=Depends(get_current_user_from_bearer)):
-    owner_id = _owner_id(current_user)
+    owner_id = user_id_of(current_user)
     if not owner_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario inválido")
+    if deletion.is_hidden("pet", pet_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mascota no encontrada o sin permisos")
+    # la raza anterior se lee solo si cambia, para descontarla del ranking del autocompletado
+    previous = get_pet_by_id(pet_id) if pet.breed is not None else None
     updated = db_update_pet(owner_id, pet_id, pet.dict(exclude_none=True))
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mascota no encontrada o sin permisos")
-    return PetResponse(**updated)
+    if previous and fold(previous.get("breed") or "").strip() != fold(updated.get("breed") or "").strip():
+        discount_breed(previous.get("breed"))
+        add_breed(updated.get("breed"))
+    ai_chat.invalidate_context(pet_id)
+    embeddings.enqueue_pet(updated)
+    return updated
 
 
-@router.delete("/pets/{pet_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/pets/{pet_id}", status_code=status.HTTP_202_ACCEPTED)
 async def delete_existing_pet(pet_id: int, current_user=Depends(get_current_user_from_bearer)):
-    owner_id = _owner_id(current_user)
+    """Encola el borrado de la mascota con sus registros; el avance se consulta en /users/me/deletions/{id}."""
+    owner_id = user_id_of(current_user)
     if not owner_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario inválido")
-    success = db_delete_pet(owner_id, pet_id)
-    if not success:
+    pet = get_pet_by_id(pet_id)
+    if not pet or pet.get("owner_id") != owner_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mascota no encontrada o sin permisos")
+    return await run_in_threadpool(deletion.request_pet, pet, owner_id)
 
 
 @router.post("/pets/upload-image", summary="Sube la imagen del perfil de una mascota")
 async def upload_pet_image(pet_id: int, file: UploadFile = File(...), current_user=Depends(get_current_user_from_bearer)):
-    owner_id = _owner_id(current_user)
+    owner_id = user_id_of(current_user)
     if not owner_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario inválido")
     pet = get_pet_by_id(pet_id)
-    if not pet or pet.get("owner_id") != owner_id:
+    if not pet or pet.get("owner_id") != owner_id or deletion.is_hidden("pet", pet_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mascota no encontrada o sin permisos")
     safe_name = Path(file.filename).name
     timestamp = int(time.time())
@@ -0,0 +1,148 @@
+import base64
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import BaseModel, Field
+
+from src.db.places import (
+    ReviewConflictError,
+    create_place,
+    create_report,
+    delete_review,
+    get_place,
+    list_places,
+    list_reports,
+    list_reviews,
+    nearby_places,
+    upsert_review,
+)
+from src.deps.auth import get_current_user_from_bearer, require_user_id
+from src.services import autocomplete
+
+router = APIRouter(prefix="/places", tags=["places"])
+
+
+def _require_place(place_id: int) -> dict:
+    place = get_place(place_id)
+    if not place:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Lugar no encontrado")
+    return place
+
+
+def _encode_cursor(place: dict) -> str:
+    return base64.urlsafe_b64encode(f"{place['rating_avg']!r}:{place['id']}".encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        rating, place_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return float(rating), int(place_id)
+    except Exception:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cursor inválido")
+
+
+class PlaceCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    type: Optional[str] = Field(None, max_length=100)
+    description: Optional[str] = Field(None, max_length=500)
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    phone: Optional[str] = None
+    website: Optional[str] = None
+    services: Optional[str] = None
+
+
+class ReviewSchema(BaseModel):
+    rating: int = Field(..., ge=1, le=5)
+    comment: Optional[str] = None
+
+
+class ReportSchema(BaseModel):
+    report_type: str = Field(..., min_length=1, max_length=100)
+    comment: Optional[str] = None
+
+
+@router.get("", summary="Lugares ordenados por calificacion o por mas recientes")
+async def list_all_places(
+    type: Optional[str] = None,
+    sort: Literal["rating", "recent"] = "rating",
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    after = _decode_cursor(cursor) if cursor else None
+    rows = list_places(type, sort == "rating", after, limit)
+    items = rows[:limit]
+    return {
+        "items": items,
+        "next_cursor": _encode_cursor(items[-1]) if len(rows) > limit else None,
+    }
+
+
+@router.get("/nearby", summary="Lugares en un radio, por distancia o calificacion")
+async def list_nearby_places(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5, gt=0, le=100),
+    type: Optional[str] = None,
+    sort: Literal["distance", "rating"] = "distance",
+    limit: int = Query(20, ge=1, le=100),
+):
+    return nearby_places(lat, lng, radius_km, type, sort == "rating", limit)
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def create_new_place(body: PlaceCreate, current_user=Depends(get_current_user_from_bearer)):
+    place = create_place(require_user_id(current_user), body.dict(exclude_none=True))
+    autocomplete.places.add(place["id"], place["name"])
+    return place
+
+
+@router.get("/{place_id}")
+async def get_one_place(place_id: int):
+    return _require_place(place_id)
+
+
+# ----- Reseñas -----
+@router.get("/{place_id}/reviews")
+async def list_place_reviews(place_id: int, limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0)):
+    return list_reviews(place_id, limit, offset)
+
+
+@router.put("/{place_id}/reviews/me", summary="Crea o reemplaza la reseña del usuario")
+async def put_my_review(
+    place_id: int,
+    body: ReviewSchema,
+    response: Response,
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id = require_user_id(current_user)
+    _require_place(place_id)
+    try:
+        review, created = upsert_review(place_id, user_id, body.rating, body.comment)
+    except ReviewConflictError as exc:
+        raise HTTPException(status.HTTP_409_CONFLICT, str(exc))
+    if created:
+        response.status_code = status.HTTP_201_CREATED
+    return review
+
+
+@router.delete("/{place_id}/reviews/me", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_my_review(place_id: int, current_user=Depends(get_current_user_from_bearer)):
+    if not delete_review(place_id, require_user_id(current_user)):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Reseña no encontrada")
+
+
+# ----- Reportes -----
+@router.post("/{place_id}/reports", status_code=status.HTTP_201_CREATED)
+async def report_place(place_id: int, body: ReportSchema, current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    _require_place(place_id)
+    return create_report(place_id, user_id, body.report_type, body.comment)
+
+
+@router.get("/{place_id}/reports", summary="Reportes del lugar (solo quien lo creo)")
+async def list_place_reports(place_id: int, current_user=Depends(get_current_user_from_bearer)):
+    place = _require_place(place_id)
+    if place.get("created_by_user") != require_user_id(current_user):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Sin permiso para ver los reportes")
+    return list_reports(place_id)
@@ -1,221 +1,152 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
-from sqlalchemy import delete, insert, select, update
+from starlette.concurrency import run_in_threadpool
 
-from src.db import SessionLocal
-from src.deps.auth import get_current_user_from_bearer
-from src.models import tables as t
+from src import repositories as repo
+from src.deps.auth import get_current_user, get_current_user_from_bearer, require_user_id
+from src.deps.projection import fields_query
+from src.models.responses import CommentResponse, LikeResponse, PostResponse, rows_response
+from src.services import deletion, embeddings, group_membership
+from src.services.sql_profiler import query_budget
 
 router = APIRouter(tags=["posts"])
 
 
-def _user_id(user) -> Optional[int]:
-    if isinstance(user, dict):
-        return user.get("id")
-    return getattr(user, "id", None)
-
-
-def _row_to_dict(row):
-    try:
-        return dict(row._mapping)
-    except Exception:
-        return dict(row)
-
-
-def _get_post(post_id: int):
-    session = SessionLocal()
-    try:
-        stmt = select(t.posts).where(t.posts.c.id == post_id)
-        row = session.execute(stmt).mappings().first()
-        return dict(row) if row else None
-    finally:
-        session.close()
-
-
-def _list_posts(pet_id: Optional[int] = None) -> List[dict]:
-    session = SessionLocal()
-    try:
-        stmt = select(t.posts)
-        if pet_id is not None:
-            stmt = stmt.where(t.posts.c.pet_id == pet_id)
-        return [dict(r) for r in session.execute(stmt).mappings().all()]
-    finally:
-        session.close()
-
-
 class PostSchema(BaseModel):
     pet_id: Optional[int] = None
     content: Optional[str] = None
     media_urls: Optional[str] = None
     visibility: Optional[str] = None
+    group_id: Optional[int] = None
 
 
 class CommentSchema(BaseModel):
     comment: str
 
 
-@router.get("/posts")
-async def list_posts(pet_id: Optional[int] = None):
-    return _list_posts(pet_id)
+@router.get("/posts", response_model=List[PostResponse])
+@query_budget(1)
+async def list_posts(
+    pet_id: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(fields_query(PostResponse)),
+):
+    # los posts de grupos se leen por GET /groups/{id}/posts
+    if pet_id is not None:
+        return rows_response(PostResponse, await repo.posts.aio.find(columns=fields, group_id=None, pet_id=pet_id), fields)
+    return rows_response(PostResponse, await repo.posts.aio.find(columns=fields, group_id=None), fields)
 
 
-@router.post("/posts", status_code=status.HTTP_201_CREATED)
+@router.post("/posts", status_code=status.HTTP_201_CREATED, response_model=PostResponse)
 async def create_post(body: PostSchema, current_user=Depends(get_current_user_from_bearer)):
-    user_id = _user_id(current_user)
-    if not user_id:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Usuario no autenticado")
+    user_id = require_user_id(current_user)
+    if body.group_id is not None and not group_membership.is_member(body.group_id, user_id):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Solo los miembros pueden publicar en el grupo")
     data = body.dict(exclude_none=True)
     data.update({"user_id": user_id, "created_at": datetime.utcnow()})
-    session = SessionLocal()
-    try:
-        result = session.execute(insert(t.posts).values(**data))
-        session.commit()
-        return _get_post(result.inserted_primary_key[0])
-    finally:
-        session.close()
-
-
-@router.get("/posts/{post_id}")
-async def get_post(post_id: int):
-    post = _get_post(post_id)
+    post = await repo.posts.aio.create(data)
+    embeddings.enqueue_post(post)
+    return post
+
+
+async def readable_post(post_id: int, request: Request) -> dict:
+    """
+    Dependencia de las rutas de un post (el post, sus likes y comentarios):
+    como el feed del grupo, los posts de un grupo privado solo los ven sus miembros.
+    """
+    post = await repo.posts.aio.get(post_id)
     if not post:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Post no encontrado")
+    group = group_membership.entry(post["group_id"]) if post.get("group_id") is not None else None
+    if group and group["group"].get("type") == "private":
+        user_id = require_user_id(await get_current_user(request))
+        if not group_membership.is_member(post["group_id"], user_id):
+            raise HTTPException(status.HTTP_403_FORBIDDEN, "Solo los miembros pueden ver este grupo")
+    return post
+
+
+@router.get("/posts/{post_id}", response_model=PostResponse)
+@query_budget(3)
+async def get_post(post=Depends(readable_post)):
     return post
 
 
-@router.put("/posts/{post_id}")
+@router.put("/posts/{post_id}", response_model=PostResponse)
+@query_budget(3)
 async def update_post(post_id: int, body: PostSchema, current_user=Depends(get_current_user_from_bearer)):
-    user_id = _user_id(current_user)
-    if not user_id:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Usuario no autenticado")
-    post = _get_post(post_id)
+    user_id = require_user_id(current_user)
+    post = await repo.posts.aio.get(post_id)
     if not post or post.get("user_id") != user_id:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Post no encontrado o sin permiso")
+    if body.group_id is not None and not group_membership.is_member(body.group_id, user_id):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Solo los miembros pueden publicar en el grupo")
     data = body.dict(exclude_none=True)
     if not data:
         return post
-    session = SessionLocal()
-    try:
-        session.execute(update(t.posts).where(t.posts.c.id == post_id).values(**data))
-        session.commit()
-        return _get_post(post_id)
-    finally:
-        session.close()
+    post = await repo.posts.aio.update(post_id, data)
+    embeddings.enqueue_post(post)
+    return post
 
 
 @router.delete("/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_post(post_id: int, current_user=Depends(get_current_user_from_bearer)):
-    user_id = _user_id(current_user)
-    if not user_id:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Usuario no autenticado")
-    post = _get_post(post_id)
+    user_id = require_user_id(current_user)
+    post = await repo.posts.aio.get(post_id)
     if not post or post.get("user_id") != user_id:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Post no encontrado o sin permiso")
-    session = SessionLocal()
-    try:
-        session.execute(delete(t.posts).where(t.posts.c.id == post_id))
-        session.commit()
-    finally:
-        session.close()
+    await repo.posts.aio.delete(post_id)
+    await run_in_threadpool(deletion.forget_post, post_id)
 
 
 # ----- Likes -----
-@router.get("/posts/{post_id}/likes")
-async def list_likes(post_id: int):
-    session = SessionLocal()
-    try:
-        stmt = select(t.post_likes).where(t.post_likes.c.post_id == post_id)
-        return [dict(r) for r in session.execute(stmt).mappings().all()]
-    finally:
-        session.close()
+@router.get("/posts/{post_id}/likes", response_model=List[LikeResponse])
+@query_budget(3)
+async def list_likes(post_id: int, post=Depends(readable_post)):
+    return rows_response(LikeResponse, await repo.post_likes.aio.find(post_id=post_id))
 
 
 @router.post("/posts/{post_id}/likes", status_code=status.HTTP_201_CREATED)
-async def like_post(post_id: int, current_user=Depends(get_current_user_from_bearer)):
-    user_id = _user_id(current_user)
-    if not user_id:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Usuario no autenticado")
+async def like_post(post_id: int, post=Depends(readable_post), current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
     # evita duplicados sencillos
-    session = SessionLocal()
-    try:
-        exists_stmt = select(t.post_likes).where(
-            t.post_likes.c.post_id == post_id, t.post_likes.c.user_id == user_id
-        )
-        if session.execute(exists_stmt).first():
-            return {"detail": "Like ya existe"}
-        result = session.execute(insert(t.post_likes).values(post_id=post_id, user_id=user_id))
-        session.commit()
-        return {"id": result.inserted_primary_key[0], "post_id": post_id, "user_id": user_id}
-    finally:
-        session.close()
+    if await repo.post_likes.aio.exists(post_id=post_id, user_id=user_id):
+        return {"detail": "Like ya existe"}
+    like = await repo.post_likes.aio.create({"post_id": post_id, "user_id": user_id})
+    return {"id": like["id"], "post_id": post_id, "user_id": user_id}
 
 
 @router.delete("/posts/{post_id}/likes", status_code=status.HTTP_204_NO_CONTENT)
 async def unlike_post(post_id: int, current_user=Depends(get_current_user_from_bearer)):
-    user_id = _user_id(current_user)
-    if not user_id:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Usuario no autenticado")
-    session = SessionLocal()
-    try:
-        stmt = delete(t.post_likes).where(
-            t.post_likes.c.post_id == post_id, t.post_likes.c.user_id == user_id
-        )
-        session.execute(stmt)
-        session.commit()
-    finally:
-        session.close()
+    user_id = require_user_id(current_user)
+    await repo.post_likes.aio.delete_where(post_id=post_id, user_id=user_id)
 
 
 # ----- Comments -----
-@router.get("/posts/{post_id}/comments")
-async def list_comments(post_id: int):
-    session = SessionLocal()
-    try:
-        stmt = select(t.post_comments).where(t.post_comments.c.post_id == post_id)
-        return [dict(r) for r in session.execute(stmt).mappings().all()]
-    finally:
-        session.close()
-
-
-@router.post("/posts/{post_id}/comments", status_code=status.HTTP_201_CREATED)
-async def create_comment(post_id: int, body: CommentSchema, current_user=Depends(get_current_user_from_bearer)):
-    user_id = _user_id(current_user)
-    if not user_id:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Usuario no autenticado")
-    session = SessionLocal()
-    try:
-        result = session.execute(
-            insert(t.post_comments).values(
-                post_id=post_id,
-                user_id=user_id,
-                comment=body.comment,
-                created_at=datetime.utcnow(),
-            )
-        )
-        session.commit()
-        comment_id = result.inserted_primary_key[0]
-        stmt = select(t.post_comments).where(t.post_comments.c.id == comment_id)
-        row = session.execute(stmt).mappings().first()
-        return dict(row) if row else {"id": comment_id}
-    finally:
-        session.close()
+@router.get("/posts/{post_id}/comments", response_model=List[CommentResponse])
+@query_budget(3)
+async def list_comments(post_id: int, post=Depends(readable_post), fields: Optional[Tuple[str, ...]] = Depends(fields_query(CommentResponse))):
+    return rows_response(CommentResponse, await repo.post_comments.aio.find(columns=fields, post_id=post_id), fields)
+
+
+@router.post("/posts/{post_id}/comments", status_code=status.HTTP_201_CREATED, response_model=CommentResponse)
+async def create_comment(
+    post_id: int, body: CommentSchema, post=Depends(readable_post), current_user=Depends(get_current_user_from_bearer)
+):
+    user_id = require_user_id(current_user)
+    return await repo.post_comments.aio.create({
+        "post_id": post_id,
+        "user_id": user_id,
+        "comment": body.comment,
+        "created_at": datetime.utcnow(),
+    })
 
 
 @router.delete("/posts/{post_id}/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_comment(post_id: int, comment_id: int, current_user=Depends(get_current_user_from_bearer)):
-    user_id = _user_id(current_user)
-    if not user_id:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Usuario no autenticado")
-    session = SessionLocal()
-    try:
-        stmt = select(t.post_comments).where(t.post_comments.c.id == comment_id)
-        row = session.execute(stmt).mappings().first()
-        if not row or row.get("user_id") != user_id:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, "Comentario no encontrado o sin permiso")
-        session.execute(delete(t.post_comments).where(t.post_comments.c.id == comment_id))
-        session.commit()
-    finally:
-        session.close()
+    user_id = require_user_id(current_user)
+    comment = await repo.post_comments.aio.get(comment_id)
+    if not comment or comment.get("user_id") != user_id:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Comentario no encontrado o sin permiso")
+    await repo.post_comments.aio.delete(comment_id)
@@ -0,0 +1,21 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from src.db.search import SEARCH_SOURCES, search
+
+router = APIRouter(tags=["search"])
+
+
+@router.get("/search", summary="Busqueda en posts, lugares, veterinarias y productos")
+async def search_all(
+    q: str = Query(..., min_length=2, max_length=200),
+    types: Optional[List[str]] = Query(None, description="post, place, clinic, product"),
+    page: int = Query(1, ge=1, le=100),
+    page_size: int = Query(20, ge=1, le=50),
+):
+    if types:
+        invalid = [kind for kind in types if kind not in SEARCH_SOURCES]
+        if invalid:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, f"Tipo de búsqueda inválido: {', '.join(invalid)}")
+    return search(q.strip(), types, page, page_size)
@@ -0,0 +1,147 @@
+import base64
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from pydantic import BaseModel, Field
+
+from src.db.shop import (
+    CheckoutError,
+    OutOfStockError,
+    ProductInUseError,
+    ProductNotFoundError,
+    checkout,
+    create_product,
+    delete_product,
+    get_order,
+    list_products,
+    update_product,
+)
+from src.deps.auth import get_current_user_from_bearer, require_user_id
+from src.services import catalog_facets
+
+router = APIRouter(tags=["shop"])
+
+
+def _encode_cursor(product: dict) -> str:
+    return base64.urlsafe_b64encode(f"{product['price']!r}:{product['id']}".encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        price, product_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return float(price), int(product_id)
+    except Exception:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cursor inválido")
+
+
+class ProductCreate(BaseModel):
+    name: str = Field(..., min_length=1)
+    description: Optional[str] = None
+    price: float = Field(..., ge=0)
+    stock: int = Field(0, ge=0)
+    image_url: Optional[str] = None
+
+
+class ProductUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1)
+    description: Optional[str] = None
+    price: Optional[float] = Field(None, ge=0)
+    stock: Optional[int] = Field(None, ge=0)
+    image_url: Optional[str] = None
+
+
+class CheckoutItem(BaseModel):
+    product_id: int
+    quantity: int = Field(..., ge=1, le=1000)
+
+
+class CheckoutSchema(BaseModel):
+    items: List[CheckoutItem] = Field(..., min_length=1, max_length=100)
+
+
+@router.post("/shop/checkout", status_code=status.HTTP_201_CREATED)
+async def create_checkout(
+    body: CheckoutSchema,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=100),
+    current_user=Depends(get_current_user_from_bearer),
+):
+    user_id = require_user_id(current_user)
+    try:
+        order = checkout(user_id, [item.dict() for item in body.items], idempotency_key)
+    except OutOfStockError as exc:
+        raise HTTPException(status.HTTP_409_CONFLICT, str(exc))
+    except ProductNotFoundError as exc:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, str(exc))
+    except CheckoutError as exc:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(exc))
+    sold_out = order.pop("sold_out")
+    if sold_out:
+        catalog_facets.sold_out(order["shop_id"], sold_out)
+    if order.pop("replayed"):
+        response.status_code = status.HTTP_200_OK
+    return order
+
+
+@router.get("/shop/orders/{order_id}")
+async def get_my_order(order_id: int, current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    order = get_order(user_id, order_id)
+    if not order:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Pedido no encontrado")
+    return order
+
+
+# ----- Catalogo -----
+@router.get("/shops/{shop_id}/products", summary="Catalogo de una tienda ordenado por precio")
+async def list_shop_products(
+    shop_id: int,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: bool = False,
+    order: Literal["asc", "desc"] = "asc",
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    after = _decode_cursor(cursor) if cursor else None
+    rows = list_products(shop_id, min_price, max_price, in_stock, order == "desc", after, limit)
+    items = rows[:limit]
+    return {
+        "items": items,
+        "next_cursor": _encode_cursor(items[-1]) if len(rows) > limit else None,
+    }
+
+
+@router.get("/shops/{shop_id}/products/facets", summary="Tramos de precio y productos en stock")
+async def shop_product_facets(shop_id: int):
+    return catalog_facets.get(shop_id)
+
+
+@router.post("/shop/products", status_code=status.HTTP_201_CREATED)
+async def create_shop_product(body: ProductCreate, current_user=Depends(get_current_user_from_bearer)):
+    shop_id = require_user_id(current_user)
+    product = create_product(shop_id, body.dict(exclude_none=True))
+    catalog_facets.product_changed(shop_id, None, product)
+    return product
+
+
+@router.put("/shop/products/{product_id}")
+async def update_shop_product(product_id: int, body: ProductUpdate, current_user=Depends(get_current_user_from_bearer)):
+    shop_id = require_user_id(current_user)
+    before, after = update_product(shop_id, product_id, body.dict(exclude_none=True))
+    if not after:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Producto no encontrado o sin permiso")
+    catalog_facets.product_changed(shop_id, before, after)
+    return after
+
+
+@router.delete("/shop/products/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_shop_product(product_id: int, current_user=Depends(get_current_user_from_bearer)):
+    shop_id = require_user_id(current_user)
+    try:
+        deleted = delete_product(shop_id, product_id)
+    except ProductInUseError as exc:
+        raise HTTPException(status.HTTP_409_CONFLICT, str(exc))
+    if not deleted:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Producto no encontrado o sin permiso")
+    catalog_facets.product_changed(shop_id, deleted, None)
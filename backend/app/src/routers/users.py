@@ -1,10 +1,21 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import Literal
 
-from src.deps.auth import get_current_user_from_bearer
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from src.deps.auth import get_current_user_from_bearer, get_deleting_user_from_bearer, require_user_id
+from src.db import DB_BACKEND
 from src.db.pets import get_pets_by_owner
+from src.services import account_export, deletion
+from src.services.sql_profiler import query_budget
 
 router = APIRouter(tags=["users"])
 
+# el perfil solo muestra la tarjeta de cada mascota: no se leen las demas columnas
+_PROFILE_PET_FIELDS = ("id", "name", "species", "breed", "avatar_url")
+
 
 def _user_field(user, field):
     if isinstance(user, dict):
@@ -13,24 +24,63 @@ def _user_field(user, field):
 
 
 @router.get("/users/me", summary="Perfil del usuario autenticado")
+@query_budget(2)
 async def get_my_profile(current_user=Depends(get_current_user_from_bearer)):
     owner_id = _user_field(current_user, "id")
     if not owner_id:
         return {"name": _user_field(current_user, "full_name"), "email": _user_field(current_user, "email"), "role": _user_field(current_user, "role"), "pets": []}
-    pets = get_pets_by_owner(owner_id)
-    pet_list = [
-        {
-            "id": pet.get("id"),
-            "name": pet.get("name"),
-            "species": pet.get("species"),
-            "breed": pet.get("breed"),
-            "avatar_url": pet.get("avatar_url"),
-        }
-        for pet in pets
-    ]
+    pet_list = get_pets_by_owner(owner_id, _PROFILE_PET_FIELDS)
     return {
         "name": _user_field(current_user, "full_name") or _user_field(current_user, "name"),
         "email": _user_field(current_user, "email"),
         "role": _user_field(current_user, "role"),
         "pets": pet_list,
     }
+
+
+class _ExportResponse(StreamingResponse):
+    """Starlette no cierra el generador si el cliente corta: se cierra aca, con la conexion."""
+
+    def __init__(self, export: account_export.AccountExport, fmt: str, filename: str):
+        super().__init__(
+            export.stream(fmt),
+            media_type=account_export.FORMATS[fmt],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+        )
+        self.export = export
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await run_in_threadpool(self.export.close)
+
+
+@router.get("/users/me/export", summary="Descarga de todos los datos de la cuenta (zip o NDJSON en streaming)")
+async def export_my_data(format: Literal["zip", "ndjson"] = "zip", current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    if DB_BACKEND == "memory":
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "La exportacion necesita Postgres")
+    export = account_export.AccountExport(user_id)
+    # la conexion se abre antes de responder: si la base falla, el cliente recibe un error y no un 200 vacio
+    await run_in_threadpool(export.open)
+    return _ExportResponse(export, format, f"petverse-{user_id}-{date.today().isoformat()}.{format}")
+
+
+@router.delete("/users/me", status_code=status.HTTP_202_ACCEPTED, summary="Borra la cuenta y todos sus datos (en segundo plano)")
+async def delete_my_account(current_user=Depends(get_current_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    if DB_BACKEND == "memory":
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "El borrado de cuentas necesita Postgres")
+    return await run_in_threadpool(deletion.request_user, user_id)
+
+
+@router.get("/users/me/deletions/{job_id}", summary="Avance de un borrado de mascota o de cuenta")
+async def get_deletion(job_id: int, current_user=Depends(get_deleting_user_from_bearer)):
+    user_id = require_user_id(current_user)
+    if DB_BACKEND == "memory":
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Borrado no encontrado")
+    job = await run_in_threadpool(deletion.get, job_id, user_id)
+    if job is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Borrado no encontrado")
+    return job
@@ -0,0 +1,3 @@
+"""Servicios de dominio de PetVerse (pipelines, caches e indices en memoria)"""
+
+__all__ = []
@@ -0,0 +1,280 @@
+"""
+Exportacion de los datos de una cuenta (GET /users/me/export).
+
+Se arma en streaming, tabla por tabla, con un cursor del lado del servidor:
+Postgres convierte cada fila a JSON (row_to_json) y se leen EXPORT_FETCH_ROWS
+filas por viaje, asi la memoria no depende del tamano de la cuenta. Todas las
+tablas se leen en una misma transaccion REPEATABLE READ de solo lectura, con
+una foto consistente aunque la cuenta cambie durante la descarga.
+
+Los generadores son sincronicos: Starlette pide el siguiente bloque (de
+EXPORT_CHUNK_BYTES) recien cuando el anterior salio por el socket, y ese es
+el control de flujo; un cliente lento frena la lectura en lugar de acumular.
+
+Formatos:
+- ndjson: una linea {"table": ..., "row": {...}} por fila; los archivos de
+  media van por referencia ({"table": "media", "row": {"url": ...}}) y la
+  ultima linea es {"table": "manifest", ...} con las filas por tabla (si falta,
+  la descarga se corto).
+- zip: <tabla>.ndjson con una fila por linea, los archivos locales de media
+  (URLs /media/...) copiados en media/ sin recomprimir, media.ndjson con todas
+  las URLs y manifest.json al final.
+"""
+import json
+import os
+import time
+import zipfile
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy import Table
+
+from src.db import bulk, engine
+from src.models import tables as t
+from src.services.media import MEDIA_URL, local_path
+
+EXPORT_FETCH_ROWS = int(os.getenv("EXPORT_FETCH_ROWS", "1000"))
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", str(64 * 1024)))
+FORMATS = {"zip": "application/zip", "ndjson": "application/x-ndjson"}
+
+_OWN_PETS = "pet_id IN (SELECT id FROM pets WHERE owner_id = %(user_id)s)"
+
+# (tabla, filtro); el orden es el de los archivos en la exportacion
+SECTIONS: List[Tuple[Table, str]] = [
+    (t.users, "id = %(user_id)s"),
+    (t.user_settings, "user_id = %(user_id)s"),
+    (t.user_address, "user_id = %(user_id)s"),
+    (t.pets, "owner_id = %(user_id)s"),
+    (t.health_records, _OWN_PETS),
+    (t.pet_vaccines, _OWN_PETS),
+    (t.pet_medications, _OWN_PETS),
+    (t.pet_weight_history, _OWN_PETS),
+    (t.pet_media, _OWN_PETS),
+    (t.pet_medical_visits, _OWN_PETS),
+    (t.pet_vaccine_card_scans, _OWN_PETS),
+    (t.appointments, "user_id = %(user_id)s"),
+    (t.posts, "user_id = %(user_id)s"),
+    (t.post_comments, "user_id = %(user_id)s"),
+    (t.post_likes, "user_id = %(user_id)s"),
+    (t.friendships, "user_1 = %(user_id)s OR user_2 = %(user_id)s"),
+    (t.group_members, "user_id = %(user_id)s"),
+    (t.chat_members, "user_id = %(user_id)s"),
+    (t.messages, "sender_id = %(user_id)s"),
+    (t.orders, "user_id = %(user_id)s"),
+    (t.order_items, "order_id IN (SELECT id FROM orders WHERE user_id = %(user_id)s)"),
+    (t.place_reviews, "user_id = %(user_id)s"),
+    (t.ai_chat_history, "user_id = %(user_id)s"),
+]
+
+# columnas internas que no son datos del usuario
+HIDDEN_COLUMNS = {"users": {"password_hash"}, "orders": {"idempotency_key"}}
+
+# URLs de archivos subidos por el usuario (posts.media_urls separadas por coma)
+_MEDIA_SQL = """
+SELECT DISTINCT btrim(url) FROM (
+  SELECT profile_photo_url AS url FROM users WHERE id = %(user_id)s
+  UNION ALL SELECT avatar_url FROM pets WHERE owner_id = %(user_id)s
+  UNION ALL SELECT url FROM pet_media WHERE {own_pets}
+  UNION ALL SELECT file_url FROM pet_vaccine_card_scans WHERE {own_pets}
+  UNION ALL SELECT media_url FROM messages WHERE sender_id = %(user_id)s
+  UNION ALL SELECT unnest(string_to_array(media_urls, ',')) FROM posts WHERE user_id = %(user_id)s
+) m WHERE btrim(url) <> ''
+ORDER BY 1
+""".format(own_pets=_OWN_PETS)
+
+
+class AccountExport:
+    """Una exportacion en curso: conexion propia, una transaccion de solo lectura."""
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.params = {"user_id": user_id}
+        self.counts: Dict[str, int] = {}
+        self.started = time.perf_counter()
+        self.existing: Dict[str, Set[str]] = {}
+        self.conn = None
+        self.body: Optional[Iterator[bytes]] = None
+
+    def open(self):
+        """Toma una conexion y abre la transaccion; se llama antes de empezar la respuesta."""
+        self.conn = engine.raw_connection()
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            cursor.execute(
+                "SELECT table_name, column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = ANY(%s)",
+                ([table.name for table, _ in SECTIONS],),
+            )
+            for table_name, column in cursor.fetchall():
+                self.existing.setdefault(table_name, set()).add(column)
+            cursor.close()
+        except Exception:
+            # la respuesta no llega a empezar y nadie va a llamar a close(): se devuelve al pool aca
+            conn, self.conn = self.conn, None
+            conn.close()
+            raise
+
+    def stream(self, fmt: str) -> Iterator[bytes]:
+        """Cuerpo de la respuesta en `fmt` (ver FORMATS); la exportacion ya debe estar abierta."""
+        body = _zip_body(self) if fmt == "zip" else _ndjson_body(self)
+        self.body = _logged(self, fmt, body)
+        return self.body
+
+    def close(self):
+        """Cierra el cuerpo (si el cliente corto a mitad) y devuelve la conexion al pool."""
+        if self.body is not None:
+            self.body.close()
+            self.body = None
+        if self.conn is not None:
+            self.conn.rollback()
+            self.conn.close()
+            self.conn = None
+
+    def _stream(self, sql: str, name: str) -> Iterator[str]:
+        cursor = self.conn.cursor(name=f"export_{name}")
+        cursor.itersize = EXPORT_FETCH_ROWS
+        try:
+            cursor.execute(sql, self.params)
+            for (value,) in cursor:
+                yield value
+        finally:
+            cursor.close()
+
+    def sections(self) -> Iterator[Tuple[str, Iterator[str]]]:
+        """(tabla, filas como texto JSON) de cada tabla presente en la base."""
+        for table, where in SECTIONS:
+            existing = self.existing.get(table.name)
+            if not existing:
+                continue
+            hidden = HIDDEN_COLUMNS.get(table.name, set())
+            columns = [c for c in bulk.columns_of(table, existing) if c not in hidden]
+            query = bulk.select_sql(table.name, columns, where)
+            yield table.name, self._count(table.name, self._stream(f"SELECT row_to_json(q)::text FROM ({query}) q", table.name))
+
+    def _count(self, name: str, rows: Iterator[str]) -> Iterator[str]:
+        self.counts[name] = 0
+        for row in rows:
+            self.counts[name] += 1
+            yield row
+
+    def media(self) -> Iterator[str]:
+        return self._stream(_MEDIA_SQL, "media")
+
+    def manifest(self, **extra) -> dict:
+        return {
+            "user_id": self.user_id,
+            "exported_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "tables": self.counts,
+            **extra,
+        }
+
+    def finished(self, fmt: str, sent: int):
+        logger.info(
+            "Exportacion de la cuenta {} ({}): {} filas, {:.1f} MB en {:.1f}s",
+            self.user_id, fmt, sum(self.counts.values()), sent / 1e6, time.perf_counter() - self.started,
+        )
+
+
+def _blocks(lines: Iterator[bytes]) -> Iterator[bytes]:
+    """Agrupa lineas en bloques de al menos EXPORT_CHUNK_BYTES (el ultimo puede ser menor)."""
+    buf = bytearray()
+    for line in lines:
+        buf += line
+        if len(buf) >= EXPORT_CHUNK_BYTES:
+            yield bytes(buf)
+            buf.clear()
+    if buf:
+        yield bytes(buf)
+
+
+def _logged(export: AccountExport, fmt: str, body: Iterator[bytes]) -> Iterator[bytes]:
+    """Registra el final de la descarga, o el corte o error a mitad de camino."""
+    sent = 0
+    try:
+        for chunk in body:
+            sent += len(chunk)
+            yield chunk
+        export.finished(fmt, sent)
+    except GeneratorExit:
+        logger.info("Exportacion de la cuenta {} cortada por el cliente tras {:.1f} MB", export.user_id, sent / 1e6)
+        raise
+    except Exception:
+        # los encabezados ya salieron: el cliente ve la descarga cortada (sin manifest)
+        logger.exception("Exportacion de la cuenta {} fallo tras {:.1f} MB", export.user_id, sent / 1e6)
+        raise
+
+
+def _ndjson_body(export: AccountExport) -> Iterator[bytes]:
+    def lines() -> Iterator[bytes]:
+        for name, rows in export.sections():
+            prefix = b'{"table": ' + json.dumps(name).encode() + b', "row": '
+            for row in rows:
+                yield prefix + row.encode() + b"}\n"
+        media = 0
+        for url in export.media():
+            media += 1
+            yield b'{"table": "media", "row": ' + json.dumps({"url": url}).encode() + b"}\n"
+        yield b'{"table": "manifest", "row": ' + json.dumps(export.manifest(media=media)).encode() + b"}\n"
+
+    return _blocks(lines())
+
+
+class _ZipSink:
+    """Destino del ZipFile sin seek: zipfile escribe descriptores de datos y el generador vacia el buffer."""
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.offset = 0
+
+    def write(self, data) -> int:
+        self.buf += data
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = bytes(self.buf)
+        self.buf.clear()
+        return data
+
+
+def _zip_body(export: AccountExport) -> Iterator[bytes]:
+    def body() -> Iterator[bytes]:
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, rows in export.sections():
+                with archive.open(f"{name}.ndjson", "w", force_zip64=True) as entry:
+                    for block in _blocks(row.encode() + b"\n" for row in rows):
+                        entry.write(block)
+                        if len(sink.buf) >= EXPORT_CHUNK_BYTES:
+                            yield sink.take()
+            media = included = 0
+            with archive.open("media.ndjson", "w") as entry:
+                for url in export.media():
+                    media += 1
+                    file = f"media/{url[len(MEDIA_URL):]}" if local_path(url) else None
+                    entry.write(json.dumps({"url": url, "file": file}).encode() + b"\n")
+            # segunda pasada (misma foto) para copiar los archivos locales
+            for url in export.media():
+                path = local_path(url)
+                if path is None:
+                    continue
+                # imagenes y videos ya vienen comprimidos: van sin deflate
+                info = zipfile.ZipInfo(f"media/{url[len(MEDIA_URL):]}", time.localtime(path.stat().st_mtime)[:6])
+                with path.open("rb") as source, archive.open(info, "w", force_zip64=True) as entry:
+                    for data in iter(lambda: source.read(EXPORT_CHUNK_BYTES), b""):
+                        entry.write(data)
+                        if len(sink.buf) >= EXPORT_CHUNK_BYTES:
+                            yield sink.take()
+                included += 1
+            archive.writestr("manifest.json", json.dumps(export.manifest(media=media, media_files=included), indent=2))
+        yield sink.take()
+
+    return body()
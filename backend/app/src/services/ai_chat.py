@@ -0,0 +1,141 @@
+"""
+Asistente de chat con respuestas en streaming.
+
+- El modelo es enchufable: AI_BACKEND=stub (por defecto, respuesta local
+  determinista) o "paquete.modulo:fabrica", que debe devolver un objeto con
+  `async def stream(prompt, context)` que produzca fragmentos de texto.
+- El contexto de la mascota (ultimas vacunas, medicaciones vigentes y pesos)
+  sale de una sola consulta y se cachea por mascota; las escrituras de esos
+  registros llaman a invalidate_context.
+- El historial se escribe en segundo plano: cada respuesta terminada entra a
+  una cola acotada y un hilo la vuelca a ai_chat_history en lotes.
+"""
+import asyncio
+import importlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from cachetools import TTLCache
+from loguru import logger
+
+from src.db.ai import insert_chat_history, pet_context
+from src.services.batching import BatchWorker
+from src.services import metrics
+
+AI_BACKEND = os.getenv("AI_BACKEND", "stub")
+AI_STUB_TOKEN_DELAY_MS = float(os.getenv("AI_STUB_TOKEN_DELAY_MS", "0"))
+AI_CONTEXT_TTL = int(os.getenv("AI_CONTEXT_TTL", "600"))
+AI_HISTORY_BATCH = int(os.getenv("AI_HISTORY_BATCH", "200"))
+AI_HISTORY_FLUSH_SECONDS = float(os.getenv("AI_HISTORY_FLUSH_SECONDS", "1.0"))
+AI_HISTORY_QUEUE = int(os.getenv("AI_HISTORY_QUEUE", "10000"))
+
+_contexts: TTLCache = TTLCache(maxsize=int(os.getenv("AI_CONTEXT_CACHE_SIZE", "4096")), ttl=AI_CONTEXT_TTL)
+metrics.register_cache("ai_context", _contexts)
+_contexts_lock = threading.Lock()
+
+
+# ----- Contexto de la mascota -----
+def get_context(pet_id: int) -> Optional[Dict[str, Any]]:
+    with _contexts_lock:
+        cached = _contexts.get(pet_id)
+    metrics.cache_lookup("ai_context", cached is not None)
+    if cached is None:
+        cached = pet_context(pet_id)
+        if cached is not None:
+            with _contexts_lock:
+                _contexts[pet_id] = cached
+    return cached
+
+
+def invalidate_context(pet_id: int):
+    with _contexts_lock:
+        _contexts.pop(pet_id, None)
+
+
+# ----- Backends -----
+class StubBackend:
+    """Respuesta local armada con el contexto; sirve para desarrollo y pruebas."""
+
+    name = "stub"
+
+    def __init__(self, token_delay_ms: float = AI_STUB_TOKEN_DELAY_MS):
+        self.token_delay = token_delay_ms / 1000
+
+    def _reply(self, prompt: str, context: Optional[Dict[str, Any]]) -> str:
+        if not context:
+            return f"Recibí tu consulta: «{prompt}». Indica una mascota para darte una respuesta con su historial."
+        parts = [f"Sobre {context['name'] or 'tu mascota'} ({context['species'] or 'mascota'}"
+                 f"{', ' + context['breed'] if context.get('breed') else ''})."]
+        if context["vaccines"]:
+            last = context["vaccines"][0]
+            parts.append(f"Última vacuna: {last['vaccine_name']} el {last['date']}.")
+            due = [v for v in context["vaccines"] if v.get("next_due")]
+            if due:
+                parts.append(f"Próximo refuerzo: {due[0]['vaccine_name']} el {due[0]['next_due']}.")
+        else:
+            parts.append("No hay vacunas registradas.")
+        if context["medications"]:
+            meds = ", ".join(f"{m['medication']} ({m['dose'] or 's/d'})" for m in context["medications"])
+            parts.append(f"Medicación vigente: {meds}.")
+        if context["weights"]:
+            w = context["weights"][0]
+            parts.append(f"Último peso: {w['weight']} kg el {w['date']}.")
+        parts.append(f"Sobre tu pregunta «{prompt}»: consulta con tu veterinario ante cualquier síntoma.")
+        return " ".join(parts)
+
+    async def stream(self, prompt: str, context: Optional[Dict[str, Any]]) -> AsyncIterator[str]:
+        for word in self._reply(prompt, context).split(" "):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield word + " "
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if AI_BACKEND == "stub":
+            _backend = StubBackend()
+        else:
+            module, _, factory = AI_BACKEND.partition(":")
+            _backend = getattr(importlib.import_module(module), factory or "create_backend")()
+        logger.info("AI backend: {}", getattr(_backend, "name", AI_BACKEND))
+    return _backend
+
+
+# ----- Historial por lotes -----
+history = BatchWorker(
+    "ai-history", insert_chat_history, batch=AI_HISTORY_BATCH, interval=AI_HISTORY_FLUSH_SECONDS, maxsize=AI_HISTORY_QUEUE
+)
+
+
+# ----- Streaming -----
+def _sse(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def stream_chat(user_id: int, prompt: str, pet_id: Optional[int], context: Optional[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Eventos SSE: start, un `data` por fragmento y done; guarda el historial al terminar o si el cliente corta."""
+    chunks: List[str] = []
+    started = time.perf_counter()
+    yield _sse({"pet_id": pet_id, "backend": getattr(get_backend(), "name", AI_BACKEND)}, "start")
+    try:
+        async for token in get_backend().stream(prompt, context):
+            chunks.append(token)
+            yield _sse({"token": token})
+        yield _sse({"chars": sum(len(c) for c in chunks), "ms": round((time.perf_counter() - started) * 1000, 1)}, "done")
+    finally:
+        history.enqueue({
+            "user_id": user_id,
+            "pet_id": pet_id,
+            "prompt": prompt,
+            "response": "".join(chunks).strip(),
+            "created_at": datetime.utcnow(),
+        })
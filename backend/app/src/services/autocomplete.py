@@ -0,0 +1,187 @@
+"""
+Indices de prefijos en memoria para autocompletar razas, lugares y usuarios.
+
+Cada indice guarda dos listas paralelas ordenadas (clave plegada por palabra y
+referencia) y responde con bisect en O(log n). Las claves se pliegan a
+minusculas sin tildes, asi "pere" encuentra "Juan Pérez".
+Se construyen al arrancar y se actualizan de forma incremental en las escrituras.
+"""
+import heapq
+import re
+import sys
+import time
+import unicodedata
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, literal, select
+
+from src.db import SessionLocal
+from src.models import tables as t
+
+_WORD = re.compile(r"\w+")
+# cuantas entradas del rango de prefijo se revisan como maximo por consulta en los
+# indices alfabeticos; los ordenados por frecuencia recorren todo el rango
+SCAN_FACTOR = 20
+
+
+def fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+
+
+def _tokens(text: str) -> List[str]:
+    return _WORD.findall(fold(text))
+
+
+class PrefixIndex:
+    def __init__(self, ranked: bool = False):
+        # ranked: las sugerencias se ordenan por frecuencia (razas) y no alfabeticamente
+        self.ranked = ranked
+        self._keys: List[str] = []
+        self._refs: List[Any] = []
+        self._labels: Dict[Any, str] = {}
+        self._counts: Dict[Any, int] = {}
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def load(self, items: Iterable[Tuple[Any, str, int]]):
+        """Reconstruye el indice completo a partir de (ref, etiqueta, peso)."""
+        pairs = set()
+        labels, counts = {}, {}
+        for ref, label, count in items:
+            if not label:
+                continue
+            labels[ref] = label
+            counts[ref] = counts.get(ref, 0) + count
+            pairs.update((key, ref) for key in _tokens(label))
+        pairs = sorted(pairs, key=lambda pair: pair[0])
+        with self._lock:
+            self._keys = [key for key, _ in pairs]
+            self._refs = [ref for _, ref in pairs]
+            self._labels, self._counts = labels, counts
+
+    def add(self, ref: Any, label: Optional[str], count: int = 1):
+        if not label:
+            return
+        with self._lock:
+            if ref in self._labels:
+                if self._labels[ref] == label or self.ranked:
+                    self._counts[ref] += count
+                    return
+                self._remove_locked(ref)
+            self._labels[ref] = label
+            self._counts[ref] = count
+            for key in set(_tokens(label)):
+                pos = bisect_left(self._keys, key)
+                self._keys.insert(pos, key)
+                self._refs.insert(pos, ref)
+
+    def remove(self, ref: Any):
+        with self._lock:
+            self._remove_locked(ref)
+
+    def discount(self, ref: Any, count: int = 1):
+        """Resta `count` al peso de ref; al llegar a 0 sale del indice."""
+        with self._lock:
+            if ref not in self._counts:
+                return
+            self._counts[ref] -= count
+            if self._counts[ref] <= 0:
+                self._remove_locked(ref)
+
+    def _remove_locked(self, ref: Any):
+        label = self._labels.pop(ref, None)
+        self._counts.pop(ref, None)
+        if label is None:
+            return
+        for key in set(_tokens(label)):
+            pos = bisect_left(self._keys, key)
+            while pos < len(self._keys) and self._keys[pos] == key:
+                if self._refs[pos] == ref:
+                    del self._keys[pos]
+                    del self._refs[pos]
+                    break
+                pos += 1
+
+    def lookup(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+        prefix, others = tokens[-1], tokens[:-1]
+        with self._lock:
+            lo = bisect_left(self._keys, prefix)
+            hi = bisect_left(self._keys, prefix + "\U0010ffff", lo)
+            # el mas usado puede estar al final del rango alfabetico: con ranking se revisa entero
+            candidates = self._refs[lo:hi if self.ranked else min(hi, lo + limit * SCAN_FACTOR)]
+            labels, counts = self._labels, self._counts
+            seen, matches = set(), []
+            for ref in candidates:
+                if ref in seen:
+                    continue
+                seen.add(ref)
+                if others:
+                    words = _tokens(labels[ref])
+                    if not all(any(w.startswith(o) for w in words) for o in others):
+                        continue
+                matches.append(ref)
+                if not self.ranked and len(matches) >= limit:
+                    break
+            if self.ranked:
+                matches = heapq.nlargest(limit, matches, key=counts.__getitem__)
+            return [{"id": ref, "label": labels[ref], "count": counts[ref]} for ref in matches[:limit]]
+
+    def memory_bytes(self) -> int:
+        size = sys.getsizeof(self._keys) + sys.getsizeof(self._refs)
+        size += sum(sys.getsizeof(k) for k in self._keys)
+        size += sys.getsizeof(self._labels) + sys.getsizeof(self._counts)
+        size += sum(sys.getsizeof(v) for v in self._labels.values())
+        return size
+
+
+# las razas usan la propia raza (plegada) como referencia y cuentan mascotas
+breeds = PrefixIndex(ranked=True)
+places = PrefixIndex()
+users = PrefixIndex()
+
+INDEXES = {"breed": breeds, "place": places, "user": users}
+
+
+def add_breed(breed: Optional[str]):
+    if breed and breed.strip():
+        breeds.add(fold(breed.strip()), breed.strip())
+
+
+def discount_breed(breed: Optional[str]):
+    """Una mascota menos con esa raza (cambio de raza o mascota borrada)."""
+    if breed and breed.strip():
+        breeds.discount(fold(breed.strip()))
+
+
+def build_all() -> Dict[str, Dict[str, Any]]:
+    """Carga los tres indices desde la DB y devuelve tamaño y tiempo de cada uno."""
+    session = SessionLocal()
+    try:
+        sources = {
+            "breed": select(t.pets.c.breed, func.count()).where(t.pets.c.breed.isnot(None)).group_by(t.pets.c.breed),
+            "place": select(t.places.c.id, t.places.c.name, literal(1)),
+            "user": select(t.users.c.id, t.users.c.full_name, literal(1)),
+        }
+        stats = {}
+        for kind, stmt in sources.items():
+            start = time.perf_counter()
+            rows = session.execute(stmt).all()
+            if kind == "breed":
+                rows = [(fold(b.strip()), b.strip(), c) for b, c in rows if b and b.strip()]
+            INDEXES[kind].load(rows)
+            stats[kind] = {
+                "entries": len(INDEXES[kind]),
+                "bytes": INDEXES[kind].memory_bytes(),
+                "build_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+        return stats
+    finally:
+        session.close()
@@ -0,0 +1,118 @@
+"""
+Trabajo en segundo plano por lotes.
+
+BatchWorker junta elementos en una cola acotada y un hilo los entrega a
+`flush(items)` cuando hay `batch` elementos o pasaron `interval` segundos.
+Si la cola se llena se descarta el elemento (y se cuenta) en lugar de frenar
+al request que lo encola. Con add_filter otro modulo puede corregir o
+descartar elementos ya encolados justo antes de entregarlos (p. ej. los de
+una mascota que se esta borrando).
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+class BatchWorker:
+    def __init__(self, name: str, flush: Callable[[List[Any]], None], batch: int, interval: float, maxsize: int):
+        self.name = name
+        self.batch = batch
+        self.interval = interval
+        self._flush_fn = flush
+        self._filters: List[Callable[[Any], Any]] = []
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.filtered = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self.last_batch_ms = 0.0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def enqueue(self, item: Any):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(item)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("{}: cola llena, se descarta un elemento ({} en total)", self.name, self.dropped)
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize()
+
+    def add_filter(self, fn: Callable[[Any], Any]):
+        """`fn(item)` devuelve el elemento a entregar (el mismo o una copia cambiada) o None para descartarlo."""
+        self._filters.append(fn)
+
+    def _flush(self, items: List[Any]):
+        for fn in self._filters:
+            kept = [item for item in map(fn, items) if item is not None]
+            self.filtered += len(items) - len(kept)
+            items = kept
+        if not items:
+            return
+        started = time.perf_counter()
+        try:
+            self._flush_fn(items)
+            self.written += len(items)
+        except Exception as exc:
+            self.failed += len(items)
+            logger.error("{}: fallo un lote de {}: {}", self.name, len(items), exc)
+        elapsed = time.perf_counter() - started
+        self.batches += 1
+        self.busy_seconds += elapsed
+        self.last_batch_ms = round(elapsed * 1000, 2)
+
+    def _run(self):
+        pending: List[Any] = []
+        deadline = time.monotonic() + self.interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+            except queue.Empty:
+                item = ...
+            if item is None:
+                self._flush(pending)
+                return
+            if item is not ...:
+                pending.append(item)
+            if len(pending) >= self.batch or time.monotonic() >= deadline:
+                self._flush(pending)
+                pending = []
+                deadline = time.monotonic() + self.interval
+
+    def stop(self, timeout: float = 5.0):
+        """Vuelca lo pendiente y detiene el hilo (al apagar la app)."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backlog": self.backlog,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "filtered": self.filtered,
+            "batches": self.batches,
+            "last_batch_ms": self.last_batch_ms,
+            "items_per_second": round(self.written / self.busy_seconds, 1) if self.busy_seconds else None,
+        }
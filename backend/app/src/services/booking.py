@@ -0,0 +1,153 @@
+"""
+Disponibilidad de turnos con bitmaps por dia.
+
+Un dia se divide en una grilla de GRID_MINUTES; cada horario de inicio de turno
+es un bit. Los horarios de atencion de una clinica se compilan una vez (por dia
+de semana y veterinario) y se cachean; los turnos reservados de la semana se
+traen en una consulta y se descuentan del bitmap: cada turno tomado tapa
+todos los inicios cuyo turno se superpondria con el suyo, no solo el propio.
+"""
+from datetime import date, time, timedelta
+from threading import Lock
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from cachetools import TTLCache
+
+from src.db.appointments import booked_in_range, get_rules
+from src.services import metrics
+
+GRID_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // GRID_MINUTES
+DEFAULT_SLOT_MINUTES = 30
+
+_schedules: TTLCache = TTLCache(maxsize=2048, ttl=600)
+metrics.register_cache("booking_schedules", _schedules)
+_lock = Lock()
+
+
+class DaySchedule(NamedTuple):
+    """Inicios ofrecidos de un dia y veterinario, y el largo (en celdas) de cada turno."""
+
+    bits: int
+    lengths: Dict[int, int]
+
+
+def normalize_time(value: str) -> str:
+    """'9:5' / '09:05' / '09:05:00' -> '09:05'; error si no cae en la grilla."""
+    parts = value.strip().split(":")
+    hours, minutes = int(parts[0]), int(parts[1]) if len(parts) > 1 else 0
+    if not (0 <= hours < 24 and 0 <= minutes < 60) or minutes % GRID_MINUTES:
+        raise ValueError(f"Hora inválida: {value}")
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def _index(value) -> int:
+    if isinstance(value, time):
+        return (value.hour * 60 + value.minute) // GRID_MINUTES
+    hours, minutes = normalize_time(value).split(":")
+    return (int(hours) * 60 + int(minutes)) // GRID_MINUTES
+
+
+def _label(index: int) -> str:
+    minutes = index * GRID_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _vet_key(vet_id: Optional[int]) -> int:
+    return vet_id or 0
+
+
+def _steps(slot_minutes: Optional[int]) -> int:
+    return max((slot_minutes or DEFAULT_SLOT_MINUTES) // GRID_MINUTES, 1)
+
+
+def compile_rules(rules: Iterable[Dict[str, Any]]) -> Dict[int, Dict[int, DaySchedule]]:
+    """weekday -> vet -> horarios de inicio y largo de cada turno."""
+    compiled: Dict[int, Dict[int, DaySchedule]] = {}
+    for rule in rules:
+        step = _steps(rule.get("slot_minutes"))
+        start, end = _index(rule["start_time"]), _index(rule["end_time"])
+        per_vet = compiled.setdefault(rule["weekday"], {})
+        day = per_vet.setdefault(_vet_key(rule.get("vet_id")), DaySchedule(0, {}))
+        bits = day.bits
+        for i in range(start, end - step + 1, step):
+            bits |= 1 << i
+            day.lengths.setdefault(i, step)
+        per_vet[_vet_key(rule.get("vet_id"))] = day._replace(bits=bits)
+    return compiled
+
+
+def find_overlap(rules: Iterable[Dict[str, Any]]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Primer par de reglas del mismo dia y veterinario cuyos horarios se pisan."""
+    ordered = sorted(rules, key=lambda r: (r["weekday"], _vet_key(r.get("vet_id")), _index(r["start_time"])))
+    for prev, rule in zip(ordered, ordered[1:]):
+        same = (prev["weekday"], _vet_key(prev.get("vet_id"))) == (rule["weekday"], _vet_key(rule.get("vet_id")))
+        if same and _index(rule["start_time"]) < _index(prev["end_time"]):
+            return prev, rule
+    return None
+
+
+def free_starts(day: DaySchedule, booked: Iterable[int]) -> int:
+    """Bitmap de inicios libres: se tapa todo inicio cuyo turno se cruza con uno reservado."""
+    free = day.bits
+    for taken in booked:
+        taken_end = taken + day.lengths.get(taken, _steps(None))
+        for start, length in day.lengths.items():
+            if start < taken_end and taken < start + length:
+                free &= ~(1 << start)
+    return free
+
+
+def schedule(clinic_id: int) -> Dict[int, Dict[int, int]]:
+    with _lock:
+        compiled = _schedules.get(clinic_id)
+    metrics.cache_lookup("booking_schedules", compiled is not None)
+    if compiled is None:
+        compiled = compile_rules(get_rules(clinic_id))
+        with _lock:
+            _schedules[clinic_id] = compiled
+    return compiled
+
+
+def invalidate(clinic_id: int):
+    with _lock:
+        _schedules.pop(clinic_id, None)
+
+
+def _booked(clinic_id: int, start: date, days: int) -> Dict[tuple, List[int]]:
+    """(dia, veterinario) -> indices de los turnos activos."""
+    booked: Dict[tuple, List[int]] = {}
+    for row in booked_in_range(clinic_id, start, start + timedelta(days=days)):
+        try:
+            index = _index(row["time"])
+        except (ValueError, IndexError):
+            continue
+        booked.setdefault((row["date"], _vet_key(row["vet_id"])), []).append(index)
+    return booked
+
+
+def is_offered(clinic_id: int, day: date, vet_id: Optional[int], slot: str) -> bool:
+    """El horario existe en la grilla y no se superpone con un turno ya reservado."""
+    offered = schedule(clinic_id).get(day.weekday(), {}).get(_vet_key(vet_id))
+    if offered is None or not offered.bits >> _index(slot) & 1:
+        return False
+    booked = _booked(clinic_id, day, 1).get((day, _vet_key(vet_id)), [])
+    return bool(free_starts(offered, booked) >> _index(slot) & 1)
+
+
+def availability(clinic_id: int, start: date, days: int = 7, vet_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    compiled = schedule(clinic_id)
+    booked = _booked(clinic_id, start, days)
+
+    result = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        vets = []
+        for vet, offered in sorted(compiled.get(day.weekday(), {}).items()):
+            if vet_id is not None and vet != vet_id:
+                continue
+            free = free_starts(offered, booked.get((day, vet), []))
+            slots = [_label(i) for i in range(SLOTS_PER_DAY) if free >> i & 1]
+            vets.append({"vet_id": vet or None, "slots": slots})
+        result.append({"date": day, "vets": vets})
+    return result
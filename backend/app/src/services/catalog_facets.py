@@ -0,0 +1,90 @@
+"""
+Cache de facetas del catalogo por tienda (tramos de precio y productos en stock).
+
+Se construye con un unico GROUP BY la primera vez que se pide y despues se
+ajusta de forma incremental con cada alta, edicion, baja o venta de producto,
+sin volver a contar. El TTL acota la deriva entre workers de uvicorn.
+"""
+from bisect import bisect_right
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional
+
+from cachetools import TTLCache
+
+from src.db.shop import product_facet_rows
+from src.services import metrics
+
+PRICE_EDGES = [0, 10, 25, 50, 100, 250, 500]
+FACETS_TTL = 300
+
+_cache: TTLCache = TTLCache(maxsize=4096, ttl=FACETS_TTL)
+metrics.register_cache("catalog_facets", _cache)
+_lock = Lock()
+
+
+def _bucket(price: float) -> int:
+    return max(bisect_right(PRICE_EDGES, price) - 1, 0)
+
+
+def _label(i: int) -> str:
+    if i == len(PRICE_EDGES) - 1:
+        return f"{PRICE_EDGES[i]}+"
+    return f"{PRICE_EDGES[i]}-{PRICE_EDGES[i + 1]}"
+
+
+def _build(shop_id: int) -> Dict[str, Any]:
+    facets = {"buckets": [[0, 0] for _ in PRICE_EDGES]}
+    for row in product_facet_rows(shop_id, PRICE_EDGES):
+        facets["buckets"][row["bucket"]] = [row["total"], row["in_stock"]]
+    return facets
+
+
+def get(shop_id: int) -> Dict[str, Any]:
+    with _lock:
+        facets = _cache.get(shop_id)
+    metrics.cache_lookup("catalog_facets", facets is not None)
+    if facets is None:
+        facets = _build(shop_id)
+        with _lock:
+            facets = _cache.setdefault(shop_id, facets)
+    with _lock:
+        buckets = [list(b) for b in facets["buckets"]]
+    return {
+        "shop_id": shop_id,
+        "total": sum(b[0] for b in buckets),
+        "in_stock": sum(b[1] for b in buckets),
+        "price_buckets": [
+            {"range": _label(i), "min": PRICE_EDGES[i], "count": total, "in_stock": in_stock}
+            for i, (total, in_stock) in enumerate(buckets)
+        ],
+    }
+
+
+def _apply(buckets, product: Optional[Dict[str, Any]], sign: int):
+    if not product or product.get("price") is None:
+        return
+    bucket = buckets[_bucket(product["price"])]
+    bucket[0] += sign
+    if (product.get("stock") or 0) > 0:
+        bucket[1] += sign
+
+
+def product_changed(shop_id: int, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]):
+    """Alta: (None, nuevo); edicion: (antes, despues); baja: (antes, None)."""
+    with _lock:
+        facets = _cache.get(shop_id)
+        if facets is None:
+            return
+        _apply(facets["buckets"], before, -1)
+        _apply(facets["buckets"], after, +1)
+
+
+def sold_out(shop_id: int, products: Iterable[Dict[str, Any]]):
+    """Productos cuyo stock llego a 0 en un checkout: salen del contador en stock."""
+    with _lock:
+        facets = _cache.get(shop_id)
+        if facets is None:
+            return
+        for product in products:
+            if product.get("price") is not None:
+                facets["buckets"][_bucket(product["price"])][1] -= 1
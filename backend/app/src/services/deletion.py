@@ -0,0 +1,349 @@
+"""
+Borrado de mascotas y cuentas en segundo plano.
+
+DELETE /pets/{id} y DELETE /users/me solo encolan un job en deletion_jobs y
+responden 202; un hilo (DeletionWorker) lo ejecuta siguiendo el plan de
+src/db/deletion.py: lotes de DELETION_BATCH filas, cada uno en una
+transaccion corta con lock_timeout, asi el borrado de una cuenta grande no
+deja tablas bloqueadas ni una transaccion abierta por minutos. Entre lotes
+respeta DELETION_PAUSE_SECONDS y, como el job de recomendaciones, espera si
+la base tiene mas de DELETION_MAX_ACTIVE consultas activas.
+
+Si un lote no consigue el lock se reintenta con espera creciente; si falla
+otra cosa el job queda 'failed' con el error y se puede volver a pedir (los
+pasos ya hechos no encuentran filas). Un job 'running' sin avance en
+DELETION_STALE_SECONDS (el proceso murio) lo retoma otro worker.
+
+Los archivos de media se borran del disco despues de confirmar cada lote.
+Desde que se pide el borrado la mascota (o cuenta) queda oculta (is_hidden):
+los endpoints no la muestran ni la editan, los tokens y el login de la
+cuenta se rechazan con 401 (solo puede consultar el avance del borrado), y
+lo que quede para ella en las colas de embeddings y de historial del
+asistente se descarta al volcarlas, asi no vuelve a escribir filas que el
+job ya borro. Cada proceso ve sus pedidos al instante y los de los demas en
+el siguiente chequeo del worker.
+Con DB_BACKEND=memory las mascotas se borran en el momento a traves de los
+repositorios y el borrado de cuentas no esta disponible.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from cachetools import TTLCache
+from loguru import logger
+from sqlalchemy.exc import OperationalError
+
+from src import repositories as repo
+from src.db import DB_BACKEND
+from src.db import deletion as db
+from src.db.embeddings import delete_embeddings
+from src.db.jobs import active_queries
+from src.services import ai_chat, autocomplete, booking, embeddings, group_membership, media, social_graph
+
+DELETION_BATCH = int(os.getenv("DELETION_BATCH", "1000"))
+DELETION_PAUSE_SECONDS = float(os.getenv("DELETION_PAUSE_SECONDS", "0.05"))
+DELETION_LOCK_TIMEOUT_MS = int(os.getenv("DELETION_LOCK_TIMEOUT_MS", "2000"))
+DELETION_LOCK_RETRIES = int(os.getenv("DELETION_LOCK_RETRIES", "5"))
+DELETION_MAX_ACTIVE = int(os.getenv("DELETION_MAX_ACTIVE", "0"))
+DELETION_POLL_SECONDS = float(os.getenv("DELETION_POLL_SECONDS", "5"))
+DELETION_STALE_SECONDS = float(os.getenv("DELETION_STALE_SECONDS", "300"))
+# cuanto sigue oculto lo ya borrado: mas que lo que tarda en vaciarse cualquier cola
+DELETION_HIDE_SECONDS = float(os.getenv("DELETION_HIDE_SECONDS", "3600"))
+
+LOCK_NOT_AVAILABLE = "55P03"
+
+# tablas de una mascota con pet_id, para el borrado en memoria
+_PET_CHILDREN = (
+    repo.health_records, repo.pet_vaccines, repo.pet_medications, repo.pet_weight_history,
+    repo.pet_media, repo.pet_medical_visits, repo.pet_vaccine_card_scans,
+)
+
+
+class _Stopped(Exception):
+    pass
+
+
+# ----- Ocultas mientras se borran -----
+# los posts se borran en el momento (forget_post); solo se ocultan para la cola de embeddings
+_hidden = {kind: TTLCache(maxsize=100_000, ttl=DELETION_HIDE_SECONDS) for kind in (*db.PLANS, "post")}
+_hidden_lock = threading.Lock()
+
+
+def _hide(kind: str, target_ids: List[int]):
+    with _hidden_lock:
+        for target_id in target_ids:
+            _hidden[kind][target_id] = True
+
+
+def _unhide(kind: str, target_id: int):
+    with _hidden_lock:
+        _hidden[kind].pop(target_id, None)
+
+
+def is_hidden(kind: str, target_id: Optional[int]) -> bool:
+    """Si la mascota o cuenta tiene un borrado pendiente (o recien terminado)."""
+    if target_id is None:
+        return False
+    with _hidden_lock:
+        return target_id in _hidden[kind]
+
+
+def _sync_hidden():
+    """Suma los borrados pedidos en otros procesos (y los que quedaron en cola al reiniciar)."""
+    for kind in db.PLANS:
+        _hide(kind, db.active_targets(kind))
+
+
+def _history_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # como el paso de ai_chat_history: de una mascota borrada queda sin pet_id, de una cuenta no queda
+    if is_hidden("user", item.get("user_id")):
+        return None
+    if is_hidden("pet", item.get("pet_id")):
+        return {**item, "pet_id": None}
+    return item
+
+
+def _embedding_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if item["entity_type"] in ("pet", "post") and is_hidden(item["entity_type"], item["entity_id"]):
+        return None
+    return item
+
+
+def forget_post(post_id: int):
+    """Post ya borrado: descarta su embedding en cola y borra el guardado."""
+    _hide("post", [post_id])
+    if DB_BACKEND != "memory":
+        delete_embeddings("post", [post_id])
+
+
+ai_chat.history.add_filter(_history_item)
+embeddings.worker.add_filter(_embedding_item)
+
+
+def _media_urls(table: str, rows: List[tuple]) -> List[Optional[str]]:
+    if table not in db.MEDIA_COLUMNS:
+        return []
+    if table == "posts":
+        return [url for row in rows for url in media.split_urls(row[1])]
+    return [row[1] for row in rows]
+
+
+class DeletionWorker:
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.current: Optional[int] = None
+        self.done = 0
+        self.failed = 0
+        self.batches = 0
+        self.lock_retries = 0
+        self.rows = 0
+        self.files = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="deletion-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Corta entre lotes; el job en curso vuelve a la cola y se retoma al arrancar."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                _sync_hidden()
+                job = db.claim_job(DELETION_STALE_SECONDS)
+            except Exception as exc:
+                logger.error("deletion-worker: no se pudo tomar un job: {}", exc)
+                job = None
+            if job is None:
+                self._wake.wait(DELETION_POLL_SECONDS)
+                self._wake.clear()
+                continue
+            self.current = job["id"]
+            try:
+                self._process(job)
+            finally:
+                self.current = None
+
+    def _process(self, job: Dict[str, Any]):
+        started = time.perf_counter()
+        logger.info("Borrado {} {} (job {}): inicio, intento {}", job["kind"], job["target_id"], job["id"], job["attempts"])
+        try:
+            plan = db.plan_for(job["kind"])
+            if job["total"] is None:
+                job["total"] = db.count_rows(plan, job["target_id"])
+                db.update_job(job["id"], total=job["total"])
+            files = job["files_deleted"]
+            for step in plan:
+                files = self._run_step(job, step, files)
+        except _Stopped:
+            db.update_job(job["id"], status="queued")
+            logger.info("Borrado {} {} (job {}): interrumpido, vuelve a la cola", job["kind"], job["target_id"], job["id"])
+            return
+        except Exception as exc:
+            self.failed += 1
+            logger.exception("Borrado {} {} (job {}) fallo", job["kind"], job["target_id"], job["id"])
+            db.finish_job(job["id"], "failed", str(exc)[:2000])
+            # lo que quedo se vuelve a ver: el usuario puede pedir el borrado otra vez
+            _unhide(job["kind"], job["target_id"])
+            return
+        db.finish_job(job["id"], "done")
+        self.done += 1
+        logger.info(
+            "Borrado {} {} (job {}): listo, {} filas y {} archivos en {:.1f}s",
+            job["kind"], job["target_id"], job["id"], sum(job["progress"].values()), files, time.perf_counter() - started,
+        )
+
+    def _run_step(self, job: Dict[str, Any], step: db.Step, files: int) -> int:
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            self._throttle()
+            count, rows = self._batch(job, step)
+            self.batches += 1
+            self.rows += count
+            if not step.set_null:
+                removed = media.remove(_media_urls(step.table, rows))
+                if removed:
+                    files += removed
+                    self.files += removed
+                    db.update_job(job["id"], files_deleted=files)
+                self._after_delete(step.table, rows)
+            if count < DELETION_BATCH:
+                return files
+
+    def _batch(self, job: Dict[str, Any], step: db.Step):
+        for attempt in range(DELETION_LOCK_RETRIES + 1):
+            try:
+                return db.run_batch(job["id"], step, job["target_id"], DELETION_BATCH, DELETION_LOCK_TIMEOUT_MS, job["progress"])
+            except OperationalError as exc:
+                if getattr(exc.orig, "pgcode", None) != LOCK_NOT_AVAILABLE or attempt == DELETION_LOCK_RETRIES:
+                    raise
+                self.lock_retries += 1
+                wait = min(0.5 * 2 ** attempt, 10.0)
+                logger.warning("Borrado job {}: {} sin lock, reintento en {:.1f}s", job["id"], step.name, wait)
+                if self._stop.wait(wait):
+                    raise _Stopped()
+
+    def _throttle(self):
+        if DELETION_PAUSE_SECONDS:
+            self._stop.wait(DELETION_PAUSE_SECONDS)
+        while DELETION_MAX_ACTIVE and not self._stop.is_set() and active_queries() > DELETION_MAX_ACTIVE:
+            self._stop.wait(1.0)
+
+    @staticmethod
+    def _after_delete(table: str, rows: List[tuple]):
+        """Caches en memoria que guardan lo borrado."""
+        if table == "pets":
+            for row in rows:
+                ai_chat.invalidate_context(row[0])
+                autocomplete.discount_breed(row[2])
+        elif table == "group_members":
+            for row in rows:
+                group_membership.removed(row[1], row[2])
+        elif table == "vet_availability":
+            for clinic_id in {row[1] for row in rows if row[1] is not None}:
+                booking.invalidate(clinic_id)
+        elif table == "friendships":
+            # el grafo cacheado de los dos lados seguiria mostrando la amistad
+            social_graph.invalidate(*{user_id for row in rows for user_id in row[1:] if user_id is not None})
+        elif table == "users":
+            for row in rows:
+                autocomplete.users.remove(row[0])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None,
+            "current_job": self.current,
+            "done": self.done,
+            "failed": self.failed,
+            "batches": self.batches,
+            "rows": self.rows,
+            "files": self.files,
+            "lock_retries": self.lock_retries,
+        }
+
+
+worker = DeletionWorker()
+
+
+def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+    total, deleted = job.get("total"), job.get("deleted") or 0
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "target_id": job["target_id"],
+        "status": job["status"],
+        "step": job.get("step"),
+        "total": total,
+        "deleted": deleted,
+        "percent": round(min(deleted / total, 1.0) * 100, 1) if total else (100.0 if job["status"] == "done" else 0.0),
+        "files_deleted": job.get("files_deleted") or 0,
+        "progress": job.get("progress") or {},
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "finished_at": job.get("finished_at"),
+    }
+
+
+def _delete_pet_in_memory(pet: Dict[str, Any]) -> Dict[str, Any]:
+    pet_id = pet["id"]
+    progress: Dict[str, int] = {}
+    urls: List[Optional[str]] = [pet.get("avatar_url")]
+    urls += [row.get("url") for row in repo.pet_media.find(pet_id=pet_id)]
+    urls += [row.get("file_url") for row in repo.pet_vaccine_card_scans.find(pet_id=pet_id)]
+    for child in _PET_CHILDREN:
+        count = child.delete_where(pet_id=pet_id)
+        if count:
+            progress[child.name] = count
+    for post in repo.posts.find(pet_id=pet_id):
+        repo.posts.update(post["id"], {"pet_id": None})
+        progress["posts.pet_id"] = progress.get("posts.pet_id", 0) + 1
+    repo.pets.delete(pet_id)
+    progress["pets"] = 1
+    ai_chat.invalidate_context(pet_id)
+    autocomplete.discount_breed(pet.get("breed"))
+    deleted = sum(progress.values())
+    return {
+        "id": None, "kind": "pet", "target_id": pet_id, "status": "done", "step": None,
+        "total": deleted, "deleted": deleted, "files_deleted": media.remove(urls), "progress": progress,
+    }
+
+
+def request_pet(pet: Dict[str, Any], requested_by: int) -> Dict[str, Any]:
+    """Encola el borrado de la mascota (ya validada como del usuario)."""
+    if DB_BACKEND == "memory":
+        _hide("pet", [pet["id"]])
+        return _public(_delete_pet_in_memory(pet))
+    job = db.create_job("pet", pet["id"], requested_by)
+    _hide("pet", [pet["id"]])
+    worker.wake()
+    return _public(job)
+
+
+def request_user(user_id: int) -> Dict[str, Any]:
+    job = db.create_job("user", user_id, user_id)
+    _hide("user", [user_id])
+    worker.wake()
+    return _public(job)
+
+
+def get(job_id: int, requested_by: int) -> Optional[Dict[str, Any]]:
+    job = db.get_job(job_id)
+    if job is None or job["requested_by"] != requested_by:
+        return None
+    return _public(job)
@@ -0,0 +1,165 @@
+"""
+Embeddings de posts y mascotas.
+
+Las escrituras (crear/editar post, crear/editar mascota) encolan la entidad y
+un hilo las procesa en lotes: se quedan con la ultima version de cada
+(entity_type, entity_id), comparan el hash del texto con el guardado para
+saltear lo que no cambio, calculan los vectores que faltan en una sola llamada
+al modelo y hacen upsert en bloque.
+
+El modelo es enchufable: EMBEDDING_MODEL=hashing (por defecto, local y sin
+dependencias extra) o "paquete.modulo:fabrica", que debe devolver un objeto
+con `name`, `dim` y `embed(textos) -> ndarray (n, dim)`.
+"""
+import hashlib
+import importlib
+import json
+import os
+import re
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+from loguru import logger
+
+from src.db import DB_BACKEND
+from src.db.embeddings import existing_hashes, upsert_embeddings
+from src.services.batching import BatchWorker
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "hashing")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+EMBEDDING_BATCH = int(os.getenv("EMBEDDING_BATCH", "64"))
+EMBEDDING_FLUSH_SECONDS = float(os.getenv("EMBEDDING_FLUSH_SECONDS", "0.5"))
+EMBEDDING_QUEUE = int(os.getenv("EMBEDDING_QUEUE", "10000"))
+EMBEDDING_DECIMALS = 5
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+# ----- Modelos -----
+class HashingEmbedder:
+    """
+    Feature hashing de palabras y bigramas con signo, normalizado a norma 1.
+    Determinista entre procesos (crc32), asi sirve como linea base offline.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _TOKEN.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        rows, cols, signs = [], [], []
+        for i, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(i)
+                cols.append(h % self.dim)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(out, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), np.array(signs, dtype=np.float32))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+_model = None
+
+
+def get_model():
+    global _model
+    if _model is None:
+        if EMBEDDING_MODEL == "hashing":
+            _model = HashingEmbedder()
+        else:
+            module, _, factory = EMBEDDING_MODEL.partition(":")
+            _model = getattr(importlib.import_module(module), factory or "create_model")()
+        logger.info("Embedding model: {} ({} dims)", _model.name, _model.dim)
+    return _model
+
+
+# ----- Texto de cada entidad -----
+def post_text(post: Dict[str, Any]) -> str:
+    return (post.get("content") or "").strip()
+
+
+def pet_text(pet: Dict[str, Any]) -> str:
+    return " ".join(str(pet[k]).strip() for k in ("name", "species", "breed", "sex") if pet.get(k))
+
+
+def content_hash(model_name: str, text: str) -> str:
+    # el modelo entra en el hash: cambiarlo fuerza a recalcular todo
+    return hashlib.sha256(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+
+# ----- Procesamiento por lotes -----
+counters = {"embedded": 0, "skipped": 0}
+
+
+def process(items: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Calcula y guarda los embeddings de un lote de {entity_type, entity_id, text}."""
+    latest: Dict[tuple, str] = {}
+    for item in items:
+        latest[(item["entity_type"], item["entity_id"])] = item["text"]
+
+    model = get_model()
+    by_type: Dict[str, List[int]] = {}
+    for entity_type, entity_id in latest:
+        by_type.setdefault(entity_type, []).append(entity_id)
+    stored = {(kind, eid): h for kind, ids in by_type.items() for eid, h in existing_hashes(kind, ids).items()}
+
+    keys, texts, hashes = [], [], []
+    for key, text in latest.items():
+        digest = content_hash(model.name, text)
+        if stored.get(key) != digest:
+            keys.append(key)
+            texts.append(text)
+            hashes.append(digest)
+    skipped = len(items) - len(keys)
+
+    if keys:
+        vectors = np.round(np.asarray(model.embed(texts), dtype=np.float64), EMBEDDING_DECIMALS).tolist()
+        now = datetime.utcnow()
+        meta = json.dumps({"model": model.name, "dim": model.dim})
+        upsert_embeddings([
+            {
+                "entity_type": kind,
+                "entity_id": eid,
+                "vector": json.dumps(vector, separators=(",", ":")),
+                "metadata": meta,
+                "content_hash": digest,
+                "updated_at": now,
+            }
+            for (kind, eid), vector, digest in zip(keys, vectors, hashes)
+        ])
+    counters["embedded"] += len(keys)
+    counters["skipped"] += skipped
+    return {"embedded": len(keys), "skipped": skipped}
+
+
+worker = BatchWorker(
+    "embeddings", process, batch=EMBEDDING_BATCH, interval=EMBEDDING_FLUSH_SECONDS, maxsize=EMBEDDING_QUEUE
+)
+
+
+def _enqueue(item: Dict[str, Any]):
+    # con DB_BACKEND=memory no hay tabla embeddings donde escribir
+    if DB_BACKEND != "memory":
+        worker.enqueue(item)
+
+
+def enqueue_post(post: Dict[str, Any]):
+    _enqueue({"entity_type": "post", "entity_id": post["id"], "text": post_text(post)})
+
+
+def enqueue_pet(pet: Dict[str, Any]):
+    _enqueue({"entity_type": "pet", "entity_id": pet["id"], "text": pet_text(pet)})
+
+
+def stats() -> Dict[str, Any]:
+    model = get_model()
+    return {**worker.stats(), **counters, "model": model.name, "dim": model.dim}
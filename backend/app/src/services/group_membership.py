@@ -0,0 +1,103 @@
+"""
+Membresias de grupos en memoria.
+
+Cada grupo cacheado guarda su fila y los ids de sus miembros como un array
+ordenado de int32 (400 KB para 100k miembros): comprobar si alguien es
+miembro es un searchsorted, sin consulta por request. Altas y bajas ajustan
+el array en el momento; el TTL acota la deriva entre workers de uvicorn.
+"""
+import os
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+from cachetools import TTLCache
+
+from src.db.groups import ADMIN, get_group, member_rows
+from src.services import metrics
+
+MEMBERSHIP_TTL = int(os.getenv("GROUP_MEMBERSHIP_TTL", "300"))
+
+_groups: TTLCache = TTLCache(maxsize=int(os.getenv("GROUP_CACHE_SIZE", "1024")), ttl=MEMBERSHIP_TTL)
+metrics.register_cache("group_membership", _groups)
+_lock = Lock()
+
+
+def _contains(arr: np.ndarray, value: int) -> bool:
+    # con un int de Python searchsorted convierte todo el array; con np.int32 no copia
+    i = np.searchsorted(arr, np.int32(value))
+    return bool(i < len(arr) and arr[i] == value)
+
+
+def _load(group_id: int) -> Optional[Dict[str, Any]]:
+    group = get_group(group_id)
+    if not group:
+        return None
+    rows = member_rows(group_id)
+    members = np.unique(np.fromiter((uid for uid, _ in rows), dtype=np.int32, count=len(rows)))
+    admins = np.unique(np.fromiter((uid for uid, role in rows if role == ADMIN), dtype=np.int32))
+    return {"group": group, "members": members, "admins": admins}
+
+
+def entry(group_id: int) -> Optional[Dict[str, Any]]:
+    with _lock:
+        cached = _groups.get(group_id)
+    metrics.cache_lookup("group_membership", cached is not None)
+    if cached is None:
+        cached = _load(group_id)
+        if cached is not None:
+            with _lock:
+                _groups[group_id] = cached
+    return cached
+
+
+def is_member(group_id: int, user_id: int) -> bool:
+    cached = entry(group_id)
+    return bool(cached) and _contains(cached["members"], user_id)
+
+
+def is_admin(group_id: int, user_id: int) -> bool:
+    cached = entry(group_id)
+    return bool(cached) and _contains(cached["admins"], user_id)
+
+
+def member_count(group_id: int) -> int:
+    cached = entry(group_id)
+    return len(cached["members"]) if cached else 0
+
+
+def added(group_id: int, user_ids: Iterable[int], admin: bool = False):
+    new = np.fromiter(user_ids, dtype=np.int32)
+    with _lock:
+        cached = _groups.get(group_id)
+        if cached is None:
+            return
+        # se reemplaza el dict: los lectores que ya tienen la entrada siguen viendo una version consistente
+        _groups[group_id] = {
+            **cached,
+            "members": np.union1d(cached["members"], new),
+            "admins": np.union1d(cached["admins"], new) if admin else cached["admins"],
+        }
+
+
+def removed(group_id: int, user_id: int):
+    with _lock:
+        cached = _groups.get(group_id)
+        if cached is None:
+            return
+        _groups[group_id] = {
+            **cached,
+            "members": cached["members"][cached["members"] != user_id],
+            "admins": cached["admins"][cached["admins"] != user_id],
+        }
+
+
+def group_changed(group_id: int, group: Optional[Dict[str, Any]]):
+    with _lock:
+        cached = _groups.get(group_id)
+        if cached is None:
+            return
+        if group is None:
+            _groups.pop(group_id, None)
+        else:
+            _groups[group_id] = {**cached, "group": group}
@@ -0,0 +1,196 @@
+"""
+Logs estructurados sin escrituras en el camino del request.
+
+El sink de loguru solo encola el registro (y el request id del ContextVar) en
+un BatchWorker; su hilo lo serializa (JSON por linea, o texto con
+LOG_FORMAT=text) y escribe en stdout o LOG_FILE en lotes. La cola es acotada
+(LOG_QUEUE): pasado LOG_PRESSURE de ocupacion se descartan los DEBUG/TRACE, y
+con la cola llena cualquier registro; nunca se bloquea al que loguea. Lo
+descartado se cuenta por nivel (/metrics) y se avisa en la salida.
+
+El access log (src/middleware/access_log.py) se muestrea por ruta con
+LOG_SAMPLE ("/health=0.01,/metrics=0"); los errores se loguean siempre.
+"""
+import atexit
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as Tally
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from loguru import logger
+
+from src.services import metrics
+from src.services.batching import BatchWorker
+
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE")
+LOG_QUEUE = int(os.getenv("LOG_QUEUE", "10000"))
+LOG_PRESSURE = float(os.getenv("LOG_PRESSURE", "0.8"))
+LOG_BATCH = int(os.getenv("LOG_BATCH", "256"))
+LOG_FLUSH_SECONDS = float(os.getenv("LOG_FLUSH_SECONDS", "0.2"))
+LOG_SAMPLE = os.getenv("LOG_SAMPLE", "/health=0.01,/metrics=0")
+
+INFO = 20
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+dropped_records = metrics.registry.register(metrics.Counter(
+    "petverse_log_records_dropped_total", "Logs descartados por cola llena", ("level",)))
+
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for pair in filter(None, (p.strip() for p in spec.split(","))):
+        route, _, rate = pair.partition("=")
+        rates[route.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+sample_rates = parse_rates(LOG_SAMPLE)
+
+
+def sampled(route: str) -> bool:
+    rate = sample_rates.get(route, 1.0)
+    return rate >= 1.0 or random.random() < rate
+
+
+# ----- Formatos (en el hilo del writer) -----
+def as_json(record: Dict[str, Any], rid: Optional[str]) -> str:
+    entry = {
+        "ts": record["time"].isoformat(timespec="milliseconds"),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "msg": record["message"],
+    }
+    if rid:
+        entry["request_id"] = rid
+    entry.update(record["extra"])
+    if record["exception"] is not None:
+        entry["exception"] = "".join(traceback.format_exception(*record["exception"])).rstrip()
+    return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def as_text(record: Dict[str, Any], rid: Optional[str]) -> str:
+    line = (
+        f"{record['time']:%Y-%m-%d %H:%M:%S.%f}"[:-3]
+        + f" | {record['level'].name:<8} | {record['name']}:{record['function']}:{record['line']} - {record['message']}"
+    )
+    if rid:
+        line += f" [{rid}]"
+    if record["exception"] is not None:
+        line += "\n" + "".join(traceback.format_exception(*record["exception"])).rstrip()
+    return line
+
+
+FORMATTERS = {"json": as_json, "text": as_text}
+
+
+class LogWriter(BatchWorker):
+    """BatchWorker de registros; descarta sin loguear (loguear aca volveria a encolar)."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        super().__init__("logs", self._write, batch=LOG_BATCH, interval=LOG_FLUSH_SECONDS, maxsize=LOG_QUEUE)
+        self.stream = stream
+        self.format = FORMATTERS.get(LOG_FORMAT, as_json)
+        self.pressure = int(LOG_QUEUE * LOG_PRESSURE)
+        self.dropped_levels: Tally = Tally()
+        self._reported = 0
+        # _drop corre en el hilo de cualquiera que loguea; _write lo lee en el del writer
+        self._drop_lock = threading.Lock()
+
+    def enqueue(self, item: Tuple[Dict[str, Any], Optional[str]]):
+        self._ensure_started()
+        level = item[0]["level"]
+        if level.no < INFO and self._queue.qsize() >= self.pressure:
+            self._drop(level.name)
+            return
+        try:
+            self._queue.put_nowait(item)
+            self.enqueued += 1
+        except queue.Full:
+            self._drop(level.name)
+
+    def _drop(self, level: str):
+        with self._drop_lock:
+            self.dropped += 1
+            self.dropped_levels[level] += 1
+        dropped_records.inc(level)
+
+    def _flush(self, items: List[Tuple[Dict[str, Any], Optional[str]]]):
+        # como BatchWorker._flush, pero un lote que no se pudo escribir solo se cuenta
+        if not items:
+            return
+        started = time.perf_counter()
+        try:
+            self._write(items)
+            self.written += len(items)
+        except Exception:
+            self.failed += len(items)
+        elapsed = time.perf_counter() - started
+        self.batches += 1
+        self.busy_seconds += elapsed
+        self.last_batch_ms = round(elapsed * 1000, 2)
+
+    def _write(self, items: List[Tuple[Dict[str, Any], Optional[str]]]):
+        lines = [self.format(record, rid) for record, rid in items]
+        with self._drop_lock:
+            if self.dropped > self._reported:
+                lines.append(self._drop_notice())
+                self._reported = self.dropped
+        stream = self.stream or sys.stdout
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
+
+    def _drop_notice(self) -> str:
+        message = f"logs: cola llena, {self.dropped - self._reported} registros descartados"
+        if LOG_FORMAT == "text":
+            return message
+        ts = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        return json.dumps({"ts": ts, "level": "WARNING", "logger": __name__, "msg": message,
+                           "dropped_by_level": dict(self.dropped_levels)})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._drop_lock:
+            dropped_by_level = dict(self.dropped_levels)
+        return {**super().stats(), "dropped_by_level": dropped_by_level}
+
+
+writer = LogWriter(open(LOG_FILE, "a", encoding="utf-8") if LOG_FILE else None)
+metrics.registry.register(metrics.Gauge(
+    "petverse_log_queue", "Logs pendientes de escribir", (), lambda: {(): writer.backlog}))
+
+
+def _sink(message):
+    writer.enqueue((message.record, request_id.get()))
+
+
+_handler_id: Optional[int] = None
+
+
+def setup():
+    """Reemplaza los handlers de loguru por el sink encolado; idempotente."""
+    global _handler_id
+    if _handler_id is not None:
+        return
+    logger.remove()  # incluido el handler por defecto, que escribe sincronico en stderr
+    _handler_id = logger.add(_sink, level=LOG_LEVEL, format="{message}", catch=True)
+
+
+def teardown():
+    global _handler_id
+    if _handler_id is not None:
+        logger.remove(_handler_id)
+        _handler_id = None
+    writer.stop()
+
+
+atexit.register(writer.stop)
@@ -0,0 +1,46 @@
+"""
+Archivos subidos por los usuarios (avatares, fotos, escaneos del carnet).
+
+Se guardan bajo MEDIA_DIR y en la base se referencian como URLs /media/...;
+cualquier otra URL es externa y no se toca. local_path valida que la ruta
+quede dentro de MEDIA_DIR (una URL con ../ no sale de la carpeta).
+"""
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+from loguru import logger
+
+MEDIA_DIR = Path(os.getenv("MEDIA_DIR", "media"))
+MEDIA_URL = "/media/"
+
+
+def local_path(url: Optional[str]) -> Optional[Path]:
+    """Archivo bajo MEDIA_DIR para una URL /media/...; None si es externa o no existe."""
+    if not url or not url.startswith(MEDIA_URL):
+        return None
+    root = MEDIA_DIR.resolve()
+    path = (root / url[len(MEDIA_URL):]).resolve()
+    if root not in path.parents or not path.is_file():
+        return None
+    return path
+
+
+def split_urls(value: Optional[str]) -> Iterable[str]:
+    """posts.media_urls guarda varias URLs separadas por coma."""
+    return (url.strip() for url in (value or "").split(",") if url.strip())
+
+
+def remove(urls: Iterable[Optional[str]]) -> int:
+    """Borra los archivos locales de `urls`; devuelve cuantos borro. Las URLs externas se ignoran."""
+    removed = 0
+    for url in urls:
+        path = local_path(url)
+        if path is None:
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError as exc:
+            logger.warning("No se pudo borrar {}: {}", path, exc)
+    return removed
@@ -0,0 +1,346 @@
+"""
+Metricas en formato de texto de Prometheus, sin dependencias externas.
+
+- HTTP (src/middleware/metrics.py): requests por ruta y estado, histograma de
+  latencia por ruta (plantilla de la ruta, no la URL, para acotar las series)
+  y requests en curso.
+- Base: eventos de cursor de SQLAlchemy en cada engine instrumentado; cuentan
+  consultas y tiempo en total y por request (el request en curso viaja en un
+  ContextVar, que run_in_threadpool copia a los hilos).
+- Pool de conexiones y caches: se leen al momento de exponer /metrics.
+
+Costo por request: el middleware solo agrega una tupla a `requests` (en el
+event loop, sin locks); las muestras se vuelcan en bloque con numpy en los
+histogramas al exponer /metrics o cada METRICS_FLUSH_EVERY requests. Las
+metricas de base se escriben desde los hilos y usan un lock por metrica.
+"""
+import bisect
+import contextvars
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter as Tally
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+METRICS_FLUSH_EVERY = int(os.getenv("METRICS_FLUSH_EVERY", "2048"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Lineas de muestra, sin HELP ni TYPE."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def snapshot(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self) -> List[str]:
+        items = self.snapshot().items()
+        return [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Metric):
+    """Valor que sube y baja; con `collect` se calcula al exponer ({labels: valor})."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def samples(self) -> List[str]:
+        if self._collect is not None:
+            items = list(self._collect().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in items]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # por serie: [cuenta por bucket (no acumulada)..., +Inf, suma]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[slot] += 1
+            series[-1] += value
+
+    def observe_many(self, values: np.ndarray, *labels: str):
+        counts = np.bincount(np.searchsorted(self.buckets, values, side="left"), minlength=len(self.buckets) + 1)
+        total = float(values.sum())
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            for slot, count in enumerate(counts.tolist()):
+                series[slot] += count
+            series[-1] += total
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        lines = []
+        for labels, series in items:
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                le = _labels((*self.label_names, "le"), (*labels, _number(bound)))
+                lines.append(f"{self.name}_bucket{le} {_number(cumulative)}")
+            base = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{base} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{base} {_number(cumulative)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics) + "\n"
+
+
+registry = Registry()
+
+# ----- HTTP -----
+http_requests = registry.register(Counter(
+    "petverse_http_requests_total", "Requests atendidos", ("method", "route", "status")))
+http_latency = registry.register(Histogram(
+    "petverse_http_request_duration_seconds", "Latencia por ruta", ("method", "route")))
+request_queries = registry.register(Histogram(
+    "petverse_http_request_db_queries", "Consultas SQL por request", ("route",), QUERY_COUNT_BUCKETS))
+request_db_time = registry.register(Histogram(
+    "petverse_http_request_db_seconds", "Tiempo en la base por request", ("route",)))
+
+# ----- Base -----
+db_queries = registry.register(Counter(
+    "petverse_db_queries_total", "Consultas SQL ejecutadas", ("db",)))
+db_query_time = registry.register(Counter(
+    "petverse_db_query_seconds_total", "Tiempo total en consultas SQL", ("db",)))
+
+
+class RequestStats:
+    """Acumulado del request en curso."""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "metrics_request", default=None
+)
+
+
+class RequestLog:
+    """
+    Muestras HTTP pendientes de agregar: (method, route, status, segundos,
+    consultas, segundos en base). Solo se usa desde el event loop.
+    """
+
+    def __init__(self, flush_every: int = METRICS_FLUSH_EVERY):
+        self.flush_every = flush_every
+        self.in_flight = 0
+        self._pending: List[tuple] = []
+
+    def add(self, sample: tuple):
+        self._pending.append(sample)
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        batch, self._pending = self._pending, []
+        by_route: Dict[Tuple[str, str], List[tuple]] = {}
+        for sample in batch:
+            by_route.setdefault(sample[:2], []).append(sample)
+        for (method, route), samples in by_route.items():
+            _, _, statuses, elapsed, queries, db_seconds = zip(*samples)
+            for status, count in Tally(statuses).items():
+                http_requests.inc(method, route, str(status), amount=count)
+            http_latency.observe_many(np.array(elapsed), method, route)
+            request_queries.observe_many(np.array(queries, dtype=float), route)
+            request_db_time.observe_many(np.array(db_seconds), route)
+
+
+requests = RequestLog()
+registry.register(Gauge(
+    "petverse_http_requests_in_flight", "Requests en curso", (), lambda: {(): requests.in_flight}))
+
+
+# ----- Engines -----
+_engines: Dict[str, Engine] = {}
+_listeners: Dict[str, Tuple[Callable, Callable]] = {}
+
+
+def instrument_engine(engine: Engine, name: str):
+    """Cuenta consultas y tiempo del engine; idempotente por nombre."""
+    if name in _listeners:
+        return
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        context.metrics_start = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.metrics_start
+        db_queries.inc(name)
+        db_query_time.inc(name, amount=elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    _engines[name] = engine
+    _listeners[name] = (before, after)
+
+
+def uninstrument_engine(name: str):
+    listeners = _listeners.pop(name, None)
+    if listeners is None:
+        return
+    engine = _engines[name]
+    event.remove(engine, "before_cursor_execute", listeners[0])
+    event.remove(engine, "after_cursor_execute", listeners[1])
+
+
+def _pool_stats() -> Dict[LabelValues, float]:
+    values: Dict[LabelValues, float] = {}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        for stat in ("size", "checkedin", "checkedout", "overflow"):
+            fn = getattr(pool, stat, None)
+            if fn is not None:
+                values[(name, stat)] = fn()
+    return values
+
+
+registry.register(Gauge("petverse_db_pool_connections", "Estado del pool de conexiones", ("db", "state"), _pool_stats))
+
+# ----- Caches -----
+cache_lookups = registry.register(Counter(
+    "petverse_cache_lookups_total", "Busquedas en caches en memoria", ("cache", "result")))
+_caches: Dict[str, object] = {}
+
+
+def register_cache(name: str, cache) -> None:
+    """Expone tamano y capacidad de una cache de cachetools."""
+    _caches[name] = cache
+
+
+def cache_lookup(name: str, hit: bool, count: int = 1):
+    if count:
+        cache_lookups.inc(name, "hit" if hit else "miss", amount=count)
+
+
+def _cache_sizes() -> Dict[LabelValues, float]:
+    values: Dict[LabelValues, float] = {}
+    for name, cache in _caches.items():
+        values[(name, "entries")] = len(cache)
+        values[(name, "maxsize")] = getattr(cache, "maxsize", 0)
+    return values
+
+
+def _cache_ratios() -> Dict[LabelValues, float]:
+    lookups = cache_lookups.snapshot()
+    ratios: Dict[LabelValues, float] = {}
+    for name in {labels[0] for labels in lookups}:
+        hits, misses = lookups.get((name, "hit"), 0.0), lookups.get((name, "miss"), 0.0)
+        ratios[(name,)] = hits / (hits + misses)
+    return ratios
+
+
+registry.register(Gauge("petverse_cache_size", "Entradas y capacidad de cada cache", ("cache", "kind"), _cache_sizes))
+registry.register(Gauge("petverse_cache_hit_ratio", "Aciertos / busquedas desde el arranque", ("cache",), _cache_ratios))
+
+
+def render() -> str:
+    requests.flush()
+    return registry.render()
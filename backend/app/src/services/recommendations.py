@@ -0,0 +1,211 @@
+"""
+Recomendaciones precalculadas por mascota.
+
+El job (scripts/generate_recommendations.py) recorre las mascotas por ventanas
+con un cursor del lado del servidor, calcula las reglas en un pool de procesos,
+hace upsert en bloque y guarda su avance en job_checkpoints para poder
+reanudarse. Entre lotes respeta un ritmo maximo y espera si la base tiene
+muchas consultas activas, para no quitarle recursos al trafico de la app.
+La API sirve las filas desde un cache TTL por mascota.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from cachetools import TTLCache
+from loguru import logger
+
+from src.db.jobs import active_queries, get_checkpoint, reset_checkpoint, save_checkpoint
+from src.db.recommendations import list_for_pet, stream_pet_features, upsert_recommendations
+from src.services import metrics
+
+JOB_NAME = "ai_recommendations"
+RECOMMENDATIONS_TTL = int(os.getenv("AI_RECOMMENDATIONS_TTL", "900"))
+
+# (especie, edad en meses) a partir de la cual se considera senior
+SENIOR_MONTHS = {"perro": 96, "gato": 120}
+VACCINE_SOON_DAYS = 30
+WEIGHT_CHANGE_ALERT = 0.10
+MEDICATION_ENDING_DAYS = 7
+
+_cache: TTLCache = TTLCache(maxsize=int(os.getenv("AI_RECOMMENDATIONS_CACHE_SIZE", "4096")), ttl=RECOMMENDATIONS_TTL)
+metrics.register_cache("recommendations", _cache)
+_cache_lock = Lock()
+
+
+# ----- Reglas (funciones puras, se ejecutan en el pool de procesos) -----
+def _parse(value) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _age_months(birthdate: Optional[date], today: date) -> Optional[int]:
+    if not birthdate:
+        return None
+    return (today.year - birthdate.year) * 12 + today.month - birthdate.month - (today.day < birthdate.day)
+
+
+def _latest_vaccines(vaccines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """La ultima dosis de cada vacuna (por fecha y luego next_due): un refuerzo reemplaza a las anteriores."""
+    latest: Dict[str, tuple] = {}
+    for v in vaccines:
+        key = (v.get("vaccine_name") or "").strip().lower()
+        rank = (_parse(v.get("date")) or date.min, _parse(v.get("next_due")) or date.min)
+        if key not in latest or rank > latest[key][0]:
+            latest[key] = (rank, v)
+    return [v for _, v in latest.values()]
+
+
+def compute(pet: Dict[str, Any], today: date) -> List[Dict[str, Any]]:
+    recs = []
+    species = (pet.get("species") or "").strip().lower()
+
+    due = sorted(
+        ((_parse(v["next_due"]), v["vaccine_name"]) for v in _latest_vaccines(pet.get("vaccines") or []) if v.get("next_due")),
+        key=lambda item: item[0],
+    )
+    overdue = [name for when, name in due if when < today]
+    soon = [(when, name) for when, name in due if today <= when <= today + timedelta(days=VACCINE_SOON_DAYS)]
+    if overdue:
+        recs.append({
+            "recommendation_type": "vaccines",
+            "content": f"Vacunas vencidas: {', '.join(sorted(set(overdue)))}. Agenda un turno con tu veterinario.",
+            "metadata": {"overdue": sorted(set(overdue)), "priority": "high"},
+        })
+    elif soon:
+        when, name = soon[0]
+        recs.append({
+            "recommendation_type": "vaccines",
+            "content": f"Se acerca el refuerzo de {name} ({when.isoformat()}).",
+            "metadata": {"next_due": when.isoformat(), "vaccine": name, "priority": "medium"},
+        })
+    elif not pet.get("vaccines"):
+        recs.append({
+            "recommendation_type": "vaccines",
+            "content": "No hay vacunas registradas. Sube el carnet para llevar el control.",
+            "metadata": {"priority": "low"},
+        })
+
+    weights = [(_parse(w["date"]), w["weight"]) for w in pet.get("weights") or [] if w.get("weight")]
+    if len(weights) >= 2:
+        (first_day, first), (_, last) = weights[0], weights[-1]
+        change = (last - first) / first if first else 0
+        if abs(change) >= WEIGHT_CHANGE_ALERT:
+            trend = "subió" if change > 0 else "bajó"
+            recs.append({
+                "recommendation_type": "weight",
+                "content": f"El peso {trend} {abs(change) * 100:.0f}% desde {first_day.isoformat()}. Consulta si la dieta es adecuada.",
+                "metadata": {"change": round(change, 4), "from": first, "to": last},
+            })
+
+    ending = sorted(
+        m["medication"] for m in pet.get("medications") or []
+        if m.get("end_date") and _parse(m["end_date"]) <= today + timedelta(days=MEDICATION_ENDING_DAYS)
+    )
+    if ending:
+        recs.append({
+            "recommendation_type": "medication",
+            "content": f"Termina pronto: {', '.join(ending)}. Revisa si hace falta renovar el tratamiento.",
+            "metadata": {"ending": ending},
+        })
+
+    months = _age_months(_parse(pet.get("birthdate")), today)
+    if months is not None:
+        if months < 12:
+            recs.append({
+                "recommendation_type": "life_stage",
+                "content": "Etapa de crecimiento: controles mensuales, desparasitación y socialización.",
+                "metadata": {"stage": "junior", "age_months": months},
+            })
+        elif months >= SENIOR_MONTHS.get(species, 96):
+            recs.append({
+                "recommendation_type": "life_stage",
+                "content": "Etapa senior: chequeo general y análisis de sangre cada 6 meses.",
+                "metadata": {"stage": "senior", "age_months": months},
+            })
+
+    for rec in recs:
+        rec["pet_id"] = pet["id"]
+    return recs
+
+
+def compute_many(pets: List[Dict[str, Any]], today: date) -> List[Dict[str, Any]]:
+    return [rec for pet in pets for rec in compute(pet, today)]
+
+
+# ----- Lectura para la API -----
+def get_for_pet(pet_id: int) -> List[Dict[str, Any]]:
+    with _cache_lock:
+        cached = _cache.get(pet_id)
+    metrics.cache_lookup("recommendations", cached is not None)
+    if cached is None:
+        cached = list_for_pet(pet_id)
+        with _cache_lock:
+            _cache[pet_id] = cached
+    return cached
+
+
+# ----- Job por lotes -----
+def run(
+    chunk: int = 500,
+    window: int = 20_000,
+    workers: int = 2,
+    max_rate: float = 0,
+    max_active: int = 0,
+    restart: bool = False,
+    limit: int = 0,
+) -> Dict[str, Any]:
+    """
+    Procesa mascotas desde el ultimo checkpoint. max_rate: mascotas por segundo
+    (0 = sin limite); max_active: si hay mas consultas activas que esto en la
+    base, espera antes del siguiente lote. limit corta despues de N mascotas.
+    Al llegar al final de la tabla el checkpoint vuelve a 0 para la proxima pasada.
+    """
+    if restart:
+        reset_checkpoint(JOB_NAME)
+    checkpoint = get_checkpoint(JOB_NAME)
+    last_id, processed = checkpoint["last_id"], checkpoint["processed"]
+    done_this_run = written = 0
+    started = time.perf_counter()
+    today = date.today()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            empty_window = True
+            for pets in stream_pet_features(last_id, window, chunk):
+                empty_window = False
+                batch_started = time.perf_counter()
+                slices = [pets[i::workers] for i in range(workers)]
+                recs = [rec for part in pool.map(compute_many, slices, [today] * workers) for rec in part]
+                written += upsert_recommendations([p["id"] for p in pets], recs)
+                last_id = pets[-1]["id"]
+                processed += len(pets)
+                done_this_run += len(pets)
+                save_checkpoint(JOB_NAME, last_id, processed)
+                logger.info("recomendaciones: {} mascotas (hasta id {}), {} recomendaciones", done_this_run, last_id, written)
+
+                if limit and done_this_run >= limit:
+                    break
+                if max_rate:
+                    time.sleep(max(len(pets) / max_rate - (time.perf_counter() - batch_started), 0))
+                while max_active and active_queries() > max_active:
+                    time.sleep(1)
+            if empty_window or (limit and done_this_run >= limit):
+                break
+
+    completed = empty_window
+    if completed:
+        save_checkpoint(JOB_NAME, 0, 0)
+    elapsed = time.perf_counter() - started
+    return {
+        "pets": done_this_run,
+        "recommendations": written,
+        "last_id": last_id,
+        "completed": completed,
+        "seconds": round(elapsed, 2),
+        "pets_per_second": round(done_this_run / elapsed, 1) if elapsed else None,
+    }
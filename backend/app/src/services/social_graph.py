@@ -0,0 +1,94 @@
+"""
+Cache de adyacencia del grafo de amistades.
+
+Cada usuario se guarda como un array ordenado de int32 con los ids de sus
+amigos aceptados. Con los arrays ordenados los amigos en comun son una
+interseccion lineal (np.intersect1d con assume_unique) y las sugerencias
+"amigos de amigos" se cuentan concatenando las listas de los amigos y
+agrupando con np.unique, sin tocar la base mas alla de una consulta por lote
+de usuarios no cacheados. Aceptar o eliminar una amistad invalida a ambos
+usuarios; ademas cada entrada vence a los SOCIAL_GRAPH_TTL segundos, asi una
+escritura que no invalide no deja el grafo desactualizado para siempre.
+"""
+import os
+from threading import Lock
+from typing import Dict, Iterable, List
+
+import numpy as np
+from cachetools import TTLCache
+
+from src.db.friendships import friend_ids_for
+from src.services import metrics
+
+GRAPH_CACHE_SIZE = int(os.getenv("SOCIAL_GRAPH_CACHE_SIZE", "50000"))
+GRAPH_CACHE_TTL = int(os.getenv("SOCIAL_GRAPH_TTL", "300"))
+
+_adjacency: TTLCache = TTLCache(maxsize=GRAPH_CACHE_SIZE, ttl=GRAPH_CACHE_TTL)
+metrics.register_cache("social_graph", _adjacency)
+_lock = Lock()
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def _to_array(ids: Iterable[int]) -> np.ndarray:
+    arr = np.unique(np.fromiter(ids, dtype=np.int32))
+    arr.setflags(write=False)
+    return arr
+
+
+def friends_many(user_ids: Iterable[int]) -> Dict[int, np.ndarray]:
+    """Adyacencias de varios usuarios; los que faltan se cargan en una sola consulta."""
+    ids = list(dict.fromkeys(user_ids))
+    found: Dict[int, np.ndarray] = {}
+    with _lock:
+        for uid in ids:
+            arr = _adjacency.get(uid)
+            if arr is not None:
+                found[uid] = arr
+    missing = [uid for uid in ids if uid not in found]
+    metrics.cache_lookup("social_graph", True, len(found))
+    metrics.cache_lookup("social_graph", False, len(missing))
+    if missing:
+        loaded = {uid: _to_array(friends) for uid, friends in friend_ids_for(missing).items()}
+        with _lock:
+            _adjacency.update(loaded)
+        found.update(loaded)
+    return found
+
+
+def friends(user_id: int) -> np.ndarray:
+    return friends_many([user_id]).get(user_id, _EMPTY)
+
+
+def invalidate(*user_ids: int):
+    with _lock:
+        for uid in user_ids:
+            _adjacency.pop(uid, None)
+
+
+def are_friends(a: int, b: int) -> bool:
+    arr = friends(a)
+    i = np.searchsorted(arr, np.int32(b))
+    return bool(i < len(arr) and arr[i] == b)
+
+
+def mutual(a: int, b: int) -> List[int]:
+    pair = friends_many([a, b])
+    return np.intersect1d(pair[a], pair[b], assume_unique=True).tolist()
+
+
+def suggestions(user_id: int, limit: int = 20) -> List[Dict[str, int]]:
+    """Amigos de amigos ordenados por cantidad de amigos en comun (y luego por id)."""
+    own = friends(user_id)
+    if not len(own):
+        return []
+    neighbours = friends_many(own.tolist())
+    merged = np.concatenate([neighbours.get(int(f), _EMPTY) for f in own])
+    if not len(merged):
+        return []
+    candidates, counts = np.unique(merged, return_counts=True)
+    keep = ~np.isin(candidates, own, assume_unique=True) & (candidates != user_id)
+    candidates, counts = candidates[keep], counts[keep]
+    # lexsort: ultima clave manda -> mas comunes primero, empate por id ascendente
+    order = np.lexsort((candidates, -counts))[:limit]
+    return [{"user_id": int(candidates[i]), "mutual_count": int(counts[i])} for i in order]
+
@@ -0,0 +1,121 @@
+"""
+Perfilador de SQL por request y detector de N+1 (opt-in).
+
+SQL_PROFILE:
+- "0" (por defecto): apagado, sin listeners ni middleware;
+- "1": cada request registra sus consultas (eventos de cursor de SQLAlchemy) y
+  las sesiones abiertas (checkouts del pool); la respuesta lleva Server-Timing
+  y X-SQL-Queries, y se loguea un resumen. Se marcan las sentencias que se
+  repiten SQL_REPEAT_THRESHOLD veces o mas (N+1) y las duplicadas exactas
+  (misma sentencia y mismos parametros: una relectura evitable);
+- "strict": ademas, si un endpoint supera su presupuesto de consultas la
+  respuesta se reemplaza por un 500 con el detalle. Pensado para pruebas y
+  para scripts/check_query_budgets.py.
+
+El presupuesto es SQL_QUERY_BUDGET, o el que declare el endpoint con
+@query_budget(n).
+"""
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQL_PROFILE = os.getenv("SQL_PROFILE", "0").lower()
+ENABLED = SQL_PROFILE in ("1", "true", "strict")
+STRICT = SQL_PROFILE == "strict"
+SQL_QUERY_BUDGET = int(os.getenv("SQL_QUERY_BUDGET", "10"))
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "3"))
+
+
+class Profile:
+    """Consultas de un request: (sentencia, hash de parametros, segundos)."""
+
+    __slots__ = ("statements", "sessions")
+
+    def __init__(self):
+        self.statements: List[Tuple[str, int, float]] = []
+        self.sessions = 0
+
+    @property
+    def queries(self) -> int:
+        return len(self.statements)
+
+    @property
+    def seconds(self) -> float:
+        return sum(s for _, _, s in self.statements)
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Sentencias ejecutadas SQL_REPEAT_THRESHOLD veces o mas, de la mas repetida a la menos."""
+        counts = Counter(sql for sql, _, _ in self.statements)
+        return [(sql, n) for sql, n in counts.most_common() if n >= SQL_REPEAT_THRESHOLD]
+
+    def duplicates(self) -> int:
+        """Ejecuciones que repiten sentencia y parametros de una anterior."""
+        return self.queries - len({(sql, params) for sql, params, _ in self.statements})
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "queries": self.queries,
+            "sessions": self.sessions,
+            "db_ms": round(self.seconds * 1000, 2),
+            "duplicates": self.duplicates(),
+            "repeated": [{"sql": shorten(sql), "count": n} for sql, n in self.repeated()],
+        }
+
+
+current: ContextVar[Optional[Profile]] = ContextVar("sql_profile", default=None)
+
+
+def shorten(sql: str, limit: int = 160) -> str:
+    sql = " ".join(sql.split())
+    return sql if len(sql) <= limit else sql[:limit] + "..."
+
+
+_instrumented: Set[str] = set()
+
+
+def instrument_engine(engine: Engine, name: str):
+    """Registra consultas y checkouts del engine en el perfil en curso; idempotente por nombre."""
+    if name in _instrumented:
+        return
+    _instrumented.add(name)
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        context.profile_start = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        profile = current.get()
+        if profile is not None:
+            try:
+                params = hash(repr(parameters))
+            except Exception:
+                params = id(parameters)
+            profile.statements.append((statement, params, time.perf_counter() - context.profile_start))
+
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        profile = current.get()
+        if profile is not None:
+            profile.sessions += 1
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    event.listen(engine, "checkout", checkout)
+
+
+# ----- Presupuestos -----
+def query_budget(limit: int) -> Callable:
+    """Declara cuantas consultas puede hacer el endpoint (incluida la autenticacion)."""
+
+    def decorate(endpoint: Callable) -> Callable:
+        endpoint.query_budget = limit
+        return endpoint
+
+    return decorate
+
+
+def budget_for(route) -> int:
+    return getattr(getattr(route, "endpoint", None), "query_budget", SQL_QUERY_BUDGET)
@@ -0,0 +1,176 @@
+"""
+Pipeline de OCR local para carnets de vacunación.
+
+El OCR se ejecuta en un pool de procesos (tesseract es CPU-bound y no libera
+el GIL de forma útil) y el resultado se cachea por hash de la imagen, de modo
+que subir dos veces el mismo carnet no vuelve a pasar por el OCR.
+Si pytesseract/Pillow no están instalados, OCR_AVAILABLE queda en False.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from io import BytesIO
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from cachetools import LRUCache
+
+from src.services import metrics
+
+try:
+    import pytesseract
+    from PIL import Image
+    OCR_AVAILABLE = True
+except Exception:
+    OCR_AVAILABLE = False
+
+OCR_LANG = os.getenv("OCR_LANG", "spa+eng")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", os.cpu_count() or 1))
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", 256))
+
+# nombre canonico -> variantes (ya normalizadas: minusculas y sin tildes)
+VACCINE_ALIASES = {
+    "Rabia": ["rabia", "antirrabica", "rabies", "rabisin", "nobivac rabies"],
+    "Parvovirus": ["parvovirus", "parvo"],
+    "Moquillo": ["moquillo", "distemper"],
+    "Hepatitis": ["hepatitis", "adenovirus"],
+    "Leptospirosis": ["leptospirosis", "lepto"],
+    "Parainfluenza": ["parainfluenza"],
+    "Polivalente": ["polivalente", "sextuple", "quintuple", "dhppi", "dhpp", "dhlpp"],
+    "Bordetella": ["bordetella", "tos de las perreras", "kennel cough"],
+    "Coronavirus": ["coronavirus"],
+    "Triple felina": ["triple felina", "tricat", "fvrcp", "rinotraqueitis", "panleucopenia"],
+    "Leucemia felina": ["leucemia felina", "felv", "leucofeligen"],
+    "Giardia": ["giardia"],
+}
+
+_ALIAS_PATTERNS = [
+    (canonical, re.compile(r"\b" + re.escape(alias) + r"\b"))
+    for canonical, aliases in VACCINE_ALIASES.items()
+    # variantes largas primero para que "triple felina" gane a "felina"
+    for alias in sorted(aliases, key=len, reverse=True)
+]
+
+_DATE_DMY = re.compile(r"\b(\d{1,2})[/\-.](\d{1,2})[/\-.](\d{4}|\d{2})\b")
+_DATE_YMD = re.compile(r"\b(\d{4})[/\-.](\d{1,2})[/\-.](\d{1,2})\b")
+
+_cache: LRUCache = LRUCache(maxsize=OCR_CACHE_SIZE)
+metrics.register_cache("ocr", _cache)
+_cache_lock = Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+
+def image_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.lower()
+
+
+def _to_date(year: int, month: int, day: int) -> Optional[date]:
+    if year < 100:
+        year += 2000
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _find_dates(line: str) -> List[date]:
+    found = []
+    for match in _DATE_YMD.finditer(line):
+        d = _to_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        if d:
+            found.append((match.start(), d))
+    # los carnets locales usan dia/mes/año
+    for match in _DATE_DMY.finditer(line):
+        d = _to_date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+        if d:
+            found.append((match.start(), d))
+    return [d for _, d in sorted(found, key=lambda item: item[0])]
+
+
+def _find_vaccine(line: str) -> Optional[str]:
+    for canonical, pattern in _ALIAS_PATTERNS:
+        if pattern.search(line):
+            return canonical
+    return None
+
+
+def parse_vaccine_text(text: str) -> List[Dict[str, Any]]:
+    """
+    Extrae filas {vaccine_name, date, next_due} del texto de un carnet.
+    Si una linea nombra la vacuna sin fecha, se usan las fechas de la siguiente.
+    """
+    entries: List[Dict[str, Any]] = []
+    pending: Optional[str] = None
+    for raw_line in (text or "").splitlines():
+        line = _normalize(raw_line).strip()
+        if not line:
+            continue
+        vaccine = _find_vaccine(line) or pending
+        dates = _find_dates(line)
+        if vaccine and dates:
+            entries.append({
+                "vaccine_name": vaccine,
+                "date": dates[0],
+                "next_due": dates[1] if len(dates) > 1 else None,
+            })
+            pending = None
+        else:
+            pending = _find_vaccine(line)
+    return entries
+
+
+def run_ocr(data: bytes) -> str:
+    if not OCR_AVAILABLE:
+        raise RuntimeError("OCR local no disponible (instala pytesseract y Pillow)")
+    with Image.open(BytesIO(data)) as image:
+        return pytesseract.image_to_string(image.convert("L"), lang=OCR_LANG)
+
+
+def process_card(data: bytes) -> Dict[str, Any]:
+    """Trabajo que se ejecuta en el pool: OCR + parseo, sin tocar la DB."""
+    text = run_ocr(data)
+    return {"text": text, "entries": parse_vaccine_text(text)}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS)
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+async def scan_card(data: bytes) -> Dict[str, Any]:
+    """
+    Devuelve {"hash", "text", "entries", "cached"} para la imagen dada.
+    """
+    digest = image_hash(data)
+    with _cache_lock:
+        cached = _cache.get(digest)
+    metrics.cache_lookup("ocr", cached is not None)
+    if cached is not None:
+        return {"hash": digest, "cached": True, **cached}
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(_get_pool(), process_card, data)
+    with _cache_lock:
+        _cache[digest] = result
+    return {"hash": digest, "cached": False, **result}
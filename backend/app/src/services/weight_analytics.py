@@ -0,0 +1,151 @@
+"""
+Analitica del historial de peso calculada con NumPy.
+
+La serie completa se trae en una sola consulta y todo (media movil, outliers,
+tasa de crecimiento y reduccion LTTB para graficas) se calcula vectorizado.
+El resultado se cachea por mascota y se invalida en cada escritura de peso.
+Cada invalidacion sube la version de la mascota; un resultado calculado con
+una version vieja (hubo una escritura mientras se calculaba) no se guarda.
+"""
+from datetime import date
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+
+from src.services import metrics
+
+# umbral de outlier: |x - mediana movil| > OUTLIER_Z * MAD escalada y, ademas,
+# mayor que MIN_RELATIVE_DEVIATION del peso (evita marcar ruido de balanza)
+OUTLIER_Z = 3.5
+MIN_RELATIVE_DEVIATION = 0.05
+
+_cache: LRUCache = LRUCache(maxsize=1024)
+metrics.register_cache("weight_analytics", _cache)
+_cache_lock = Lock()
+# pet_id -> cantidad de invalidaciones; un int por mascota con pesos editados en este proceso
+_versions: Dict[int, int] = {}
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: devuelve los indices de los puntos elegidos."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    every = (n - 2) / (threshold - 2)
+    bounds = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    bounds[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        if i + 2 < len(bounds):
+            next_x, next_y = x[end:bounds[i + 2]], y[end:bounds[i + 2]]
+        else:
+            next_x, next_y = x[-1:], y[-1:]
+        avg_x, avg_y = next_x.mean(), next_y.mean()
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def moving_average(y: np.ndarray, window: int) -> np.ndarray:
+    """Media movil de las ultimas `window` muestras (ventana parcial al inicio)."""
+    csum = np.cumsum(np.insert(y, 0, 0.0))
+    idx = np.arange(1, len(y) + 1)
+    lo = np.maximum(idx - window, 0)
+    return (csum[idx] - csum[lo]) / (idx - lo)
+
+
+def outlier_mask(y: np.ndarray, window: int) -> np.ndarray:
+    if len(y) < 5:
+        return np.zeros(len(y), dtype=bool)
+    half = max(window // 2, 2)
+    padded = np.pad(y, half, mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1)
+    median = np.median(windows, axis=1)
+    residual = np.abs(y - median)
+    mad = np.median(residual) * 1.4826
+    return (residual > OUTLIER_Z * mad) & (residual > MIN_RELATIVE_DEVIATION * np.abs(median))
+
+
+def growth(x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> Dict[str, Optional[float]]:
+    keep = ~mask
+    xs, ys = x[keep], y[keep]
+    if len(xs) < 2 or xs[-1] == xs[0]:
+        return {"kg_per_month": None, "total_change": None, "pct_change": None}
+    slope = np.polyfit(xs, ys, 1)[0]
+    total = float(ys[-1] - ys[0])
+    return {
+        "kg_per_month": round(float(slope) * 30.0, 3),
+        "total_change": round(total, 3),
+        "pct_change": round(total / ys[0] * 100.0, 2) if ys[0] else None,
+    }
+
+
+def compute(rows: List[Tuple[date, float]], points: int, window: int) -> Dict[str, Any]:
+    rows = [(d, w) for d, w in rows if d is not None and w is not None]
+    if not rows:
+        return {"count": 0, "points": [], "outliers": [], "growth": None, "stats": None}
+    dates = np.array([d.toordinal() for d, _ in rows], dtype=np.float64)
+    weights = np.array([w for _, w in rows], dtype=np.float64)
+    order = np.argsort(dates, kind="stable")
+    dates, weights = dates[order], weights[order]
+
+    ma = moving_average(weights, window)
+    mask = outlier_mask(weights, window)
+    idx = lttb(dates, weights, points)
+    # los outliers siempre se envian aunque LTTB los descarte
+    idx = np.union1d(idx, np.flatnonzero(mask))
+
+    def _point(i):
+        return {
+            "date": date.fromordinal(int(dates[i])),
+            "weight": float(weights[i]),
+            "moving_avg": round(float(ma[i]), 3),
+            "outlier": bool(mask[i]),
+        }
+
+    return {
+        "count": len(weights),
+        "first_date": date.fromordinal(int(dates[0])),
+        "last_date": date.fromordinal(int(dates[-1])),
+        "points": [_point(i) for i in idx],
+        "outliers": [_point(i) for i in np.flatnonzero(mask)],
+        "growth": growth(dates, weights, mask),
+        "stats": {
+            "min": float(weights.min()),
+            "max": float(weights.max()),
+            "mean": round(float(weights.mean()), 3),
+            "latest": float(weights[-1]),
+        },
+    }
+
+
+def version(pet_id: int) -> int:
+    """Leer antes de traer la serie y pasarla a set_cached."""
+    with _cache_lock:
+        return _versions.get(pet_id, 0)
+
+
+def get_cached(pet_id: int, key: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+    with _cache_lock:
+        cached = _cache.get(pet_id, {}).get(key)
+    metrics.cache_lookup("weight_analytics", cached is not None)
+    return cached
+
+
+def set_cached(pet_id: int, key: Tuple[int, int], value: Dict[str, Any], seen_version: int):
+    with _cache_lock:
+        if _versions.get(pet_id, 0) == seen_version:
+            _cache.setdefault(pet_id, {})[key] = value
+
+
+def invalidate(pet_id: int):
+    with _cache_lock:
+        _versions[pet_id] = _versions.get(pet_id, 0) + 1
+        _cache.pop(pet_id, None)
@@ -0,0 +1,43 @@
+-- Busqueda de texto completo (tsvector español + ingles) y trigramas para tolerar errores.
+-- Idempotente: se puede ejecutar sobre una base ya creada con
+--   psql "$DATABASE_URL" -f databases/01-search.sql
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE "posts" ADD COLUMN IF NOT EXISTS "search_vector" tsvector GENERATED ALWAYS AS (
+  to_tsvector('spanish', coalesce("content", '')) ||
+  to_tsvector('english', coalesce("content", ''))
+) STORED;
+
+ALTER TABLE "places" ADD COLUMN IF NOT EXISTS "search_vector" tsvector GENERATED ALWAYS AS (
+  setweight(to_tsvector('spanish', coalesce("name", '')), 'A') ||
+  setweight(to_tsvector('english', coalesce("name", '')), 'A') ||
+  setweight(to_tsvector('spanish', coalesce("description", '')), 'B') ||
+  setweight(to_tsvector('english', coalesce("description", '')), 'B') ||
+  setweight(to_tsvector('spanish', coalesce("services", '')), 'C') ||
+  setweight(to_tsvector('english', coalesce("services", '')), 'C')
+) STORED;
+
+ALTER TABLE "vet_clinics" ADD COLUMN IF NOT EXISTS "search_vector" tsvector GENERATED ALWAYS AS (
+  setweight(to_tsvector('spanish', coalesce("name", '')), 'A') ||
+  setweight(to_tsvector('english', coalesce("name", '')), 'A') ||
+  setweight(to_tsvector('spanish', coalesce("description", '')), 'B') ||
+  setweight(to_tsvector('english', coalesce("description", '')), 'B') ||
+  setweight(to_tsvector('spanish', coalesce("address", '')), 'C')
+) STORED;
+
+ALTER TABLE "shop_products" ADD COLUMN IF NOT EXISTS "search_vector" tsvector GENERATED ALWAYS AS (
+  setweight(to_tsvector('spanish', coalesce("name", '')), 'A') ||
+  setweight(to_tsvector('english', coalesce("name", '')), 'A') ||
+  setweight(to_tsvector('spanish', coalesce("description", '')), 'B') ||
+  setweight(to_tsvector('english', coalesce("description", '')), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS "ix_posts_search_vector" ON "posts" USING GIN ("search_vector");
+CREATE INDEX IF NOT EXISTS "ix_places_search_vector" ON "places" USING GIN ("search_vector");
+CREATE INDEX IF NOT EXISTS "ix_vet_clinics_search_vector" ON "vet_clinics" USING GIN ("search_vector");
+CREATE INDEX IF NOT EXISTS "ix_shop_products_search_vector" ON "shop_products" USING GIN ("search_vector");
+
+CREATE INDEX IF NOT EXISTS "ix_posts_content_trgm" ON "posts" USING GIN ("content" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "ix_places_name_trgm" ON "places" USING GIN ("name" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "ix_vet_clinics_name_trgm" ON "vet_clinics" USING GIN ("name" gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS "ix_shop_products_name_trgm" ON "shop_products" USING GIN ("name" gin_trgm_ops);
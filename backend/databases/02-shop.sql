@@ -0,0 +1,17 @@
+-- Checkout de la tienda: claves de idempotencia y stock nunca negativo.
+-- Idempotente: psql "$DATABASE_URL" -f databases/02-shop.sql
+ALTER TABLE "orders" ADD COLUMN IF NOT EXISTS "idempotency_key" varchar;
+
+CREATE UNIQUE INDEX IF NOT EXISTS "ux_orders_user_idempotency"
+  ON "orders" ("user_id", "idempotency_key") WHERE "idempotency_key" IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS "ix_order_items_order_id" ON "order_items" ("order_id");
+
+DO $$
+BEGIN
+  ALTER TABLE "shop_products" ADD CONSTRAINT "ck_shop_products_stock_non_negative" CHECK ("stock" >= 0);
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Catalogo: listado por tienda ordenado por precio con paginacion por cursor (price, id)
+CREATE INDEX IF NOT EXISTS "ix_shop_products_shop_price" ON "shop_products" ("shop_id", "price", "id");
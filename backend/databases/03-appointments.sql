@@ -0,0 +1,19 @@
+-- Reservas de turnos: horarios de atencion y un turno por hora/veterinario.
+-- Idempotente: psql "$DATABASE_URL" -f databases/03-appointments.sql
+CREATE TABLE IF NOT EXISTS "vet_availability" (
+  "id" INT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  "clinic_id" int REFERENCES "vet_clinics" ("id"),
+  "vet_id" int REFERENCES "users" ("id"),
+  "weekday" int,
+  "start_time" time,
+  "end_time" time,
+  "slot_minutes" int
+);
+
+CREATE INDEX IF NOT EXISTS "ix_vet_availability_clinic" ON "vet_availability" ("clinic_id");
+CREATE INDEX IF NOT EXISTS "ix_appointments_clinic_date" ON "appointments" ("clinic_id", "date");
+
+-- vet_id nulo = turno de la clinica en general; los cancelados liberan el horario
+CREATE UNIQUE INDEX IF NOT EXISTS "ux_appointments_slot"
+  ON "appointments" ("clinic_id", coalesce("vet_id", 0), "date", "time")
+  WHERE "status" IS DISTINCT FROM 'cancelled';
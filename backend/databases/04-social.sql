@@ -0,0 +1,33 @@
+-- Amistades: par canonico (user_1 < user_2) unico e indexado en ambos sentidos.
+-- Idempotente: psql "$DATABASE_URL" -f databases/04-social.sql
+ALTER TABLE "friendships" ADD COLUMN IF NOT EXISTS "requested_by" int REFERENCES "users" ("id");
+
+-- Filas previas: se ordenan, se descartan auto-amistades y duplicados (se conserva la mas antigua).
+UPDATE "friendships" SET "user_1" = "user_2", "user_2" = "user_1", "requested_by" = coalesce("requested_by", "user_1")
+WHERE "user_1" > "user_2";
+-- Las que ya estaban en orden tambien las pidio user_1 (el esquema anterior guardaba al que
+-- solicitaba primero): sin requested_by una solicitud pendiente no se puede aceptar.
+UPDATE "friendships" SET "requested_by" = "user_1" WHERE "requested_by" IS NULL;
+DELETE FROM "friendships" WHERE "user_1" = "user_2" OR "user_1" IS NULL OR "user_2" IS NULL;
+DELETE FROM "friendships" f USING "friendships" g
+WHERE f."user_1" = g."user_1" AND f."user_2" = g."user_2" AND f."id" > g."id";
+
+DO $$
+BEGIN
+  ALTER TABLE "friendships" ADD CONSTRAINT "ck_friendships_canonical" CHECK ("user_1" < "user_2");
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS "ux_friendships_pair" ON "friendships" ("user_1", "user_2");
+CREATE INDEX IF NOT EXISTS "ix_friendships_user_2" ON "friendships" ("user_2", "user_1");
+
+-- Grupos: una membresia por usuario y grupo, y feed por grupo via posts.group_id.
+DELETE FROM "group_members" m USING "group_members" n
+WHERE m."group_id" = n."group_id" AND m."user_id" = n."user_id" AND m."id" > n."id";
+CREATE UNIQUE INDEX IF NOT EXISTS "ux_group_members_group_user" ON "group_members" ("group_id", "user_id");
+CREATE INDEX IF NOT EXISTS "ix_group_members_user" ON "group_members" ("user_id");
+
+ALTER TABLE "posts" ADD COLUMN IF NOT EXISTS "group_id" int REFERENCES "groups" ("id") ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS "ix_posts_group_created"
+  ON "posts" ("group_id", "created_at" DESC, "id" DESC)
+  WHERE "group_id" IS NOT NULL;
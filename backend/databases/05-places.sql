@@ -0,0 +1,38 @@
+-- Agregados de calificacion mantenidos en places (sin GROUP BY al leer).
+-- Idempotente: psql "$DATABASE_URL" -f databases/05-places.sql
+ALTER TABLE "places" ADD COLUMN IF NOT EXISTS "rating_count" int NOT NULL DEFAULT 0;
+ALTER TABLE "places" ADD COLUMN IF NOT EXISTS "rating_sum" int NOT NULL DEFAULT 0;
+-- rating_hist[k] = cantidad de reseñas con k estrellas (1..5)
+ALTER TABLE "places" ADD COLUMN IF NOT EXISTS "rating_hist" int[] NOT NULL DEFAULT '{0,0,0,0,0}';
+ALTER TABLE "places" ADD COLUMN IF NOT EXISTS "rating_avg" double precision
+  GENERATED ALWAYS AS (CASE WHEN "rating_count" > 0 THEN "rating_sum"::double precision / "rating_count" ELSE 0 END) STORED;
+
+CREATE INDEX IF NOT EXISTS "ix_places_rating" ON "places" ("rating_avg" DESC, "id" DESC);
+CREATE INDEX IF NOT EXISTS "ix_places_lat_lng" ON "places" ("lat", "lng");
+
+-- Una reseña por usuario y lugar; las filas previas fuera de rango no se validan.
+DELETE FROM "place_reviews" r USING "place_reviews" s
+WHERE r."place_id" = s."place_id" AND r."user_id" = s."user_id" AND r."id" < s."id";
+CREATE UNIQUE INDEX IF NOT EXISTS "ux_place_reviews_place_user" ON "place_reviews" ("place_id", "user_id");
+CREATE INDEX IF NOT EXISTS "ix_place_reviews_place_created" ON "place_reviews" ("place_id", "created_at" DESC);
+CREATE INDEX IF NOT EXISTS "ix_place_reports_place" ON "place_reports" ("place_id");
+
+DO $$
+BEGIN
+  ALTER TABLE "place_reviews" ADD CONSTRAINT "ck_place_reviews_rating" CHECK ("rating" BETWEEN 1 AND 5) NOT VALID;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Carga inicial de los agregados (equivale a scripts/recompute_place_ratings.py).
+UPDATE "places" p SET
+  "rating_count" = coalesce(a."n", 0),
+  "rating_sum" = coalesce(a."s", 0),
+  "rating_hist" = coalesce(a."h", '{0,0,0,0,0}')
+FROM "places" q
+LEFT JOIN (
+  SELECT "place_id", count(*) AS "n", sum("rating") AS "s",
+    ARRAY[count(*) FILTER (WHERE "rating" = 1), count(*) FILTER (WHERE "rating" = 2), count(*) FILTER (WHERE "rating" = 3),
+          count(*) FILTER (WHERE "rating" = 4), count(*) FILTER (WHERE "rating" = 5)]::int[] AS "h"
+  FROM "place_reviews" WHERE "rating" BETWEEN 1 AND 5 GROUP BY "place_id"
+) a ON a."place_id" = q."id"
+WHERE p."id" = q."id";
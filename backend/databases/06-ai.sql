@@ -0,0 +1,23 @@
+-- Asistente IA: historial por usuario (y mascota) ordenado por fecha.
+-- Idempotente: psql "$DATABASE_URL" -f databases/06-ai.sql
+CREATE INDEX IF NOT EXISTS "ix_ai_chat_history_user_created" ON "ai_chat_history" ("user_id", "created_at" DESC);
+
+-- Recomendaciones precalculadas: una fila por mascota y tipo (upsert del job por lotes).
+DELETE FROM "ai_recommendations" r USING "ai_recommendations" s
+WHERE r."pet_id" = s."pet_id" AND r."recommendation_type" = s."recommendation_type" AND r."id" < s."id";
+CREATE UNIQUE INDEX IF NOT EXISTS "ux_ai_recommendations_pet_type" ON "ai_recommendations" ("pet_id", "recommendation_type");
+
+-- Punto de avance de los jobs por lotes, para poder reanudarlos.
+CREATE TABLE IF NOT EXISTS "job_checkpoints" (
+  "job" varchar PRIMARY KEY,
+  "last_id" int NOT NULL DEFAULT 0,
+  "processed" bigint NOT NULL DEFAULT 0,
+  "updated_at" timestamp NOT NULL DEFAULT now()
+);
+
+-- Embeddings: una fila por entidad (upsert en bloque) y hash del texto para no recalcular lo que no cambio.
+ALTER TABLE "embeddings" ADD COLUMN IF NOT EXISTS "content_hash" varchar(64);
+ALTER TABLE "embeddings" ADD COLUMN IF NOT EXISTS "updated_at" timestamp;
+DELETE FROM "embeddings" e USING "embeddings" f
+WHERE e."entity_type" = f."entity_type" AND e."entity_id" = f."entity_id" AND e."id" < f."id";
+CREATE UNIQUE INDEX IF NOT EXISTS "ux_embeddings_entity" ON "embeddings" ("entity_type", "entity_id");
@@ -0,0 +1,72 @@
+-- Borrado en cascada por lotes de mascotas y cuentas (src/services/deletion.py).
+-- Idempotente: psql "$DATABASE_URL" -f databases/07-deletion.sql
+
+-- Un job por mascota o cuenta a borrar; progress guarda las filas por tabla (JSON).
+CREATE TABLE IF NOT EXISTS "deletion_jobs" (
+  "id" int GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  "kind" varchar(20) NOT NULL,
+  "target_id" int NOT NULL,
+  "requested_by" int,
+  "status" varchar(20) NOT NULL DEFAULT 'queued',
+  "step" varchar(100),
+  "total" bigint,
+  "deleted" bigint NOT NULL DEFAULT 0,
+  "files_deleted" int NOT NULL DEFAULT 0,
+  "progress" text,
+  "attempts" int NOT NULL DEFAULT 0,
+  "error" text,
+  "created_at" timestamp NOT NULL DEFAULT now(),
+  "started_at" timestamp,
+  "updated_at" timestamp NOT NULL DEFAULT now(),
+  "finished_at" timestamp
+);
+-- a lo sumo un job pendiente por mascota o cuenta
+CREATE UNIQUE INDEX IF NOT EXISTS "ux_deletion_jobs_active" ON "deletion_jobs" ("kind", "target_id")
+  WHERE "status" IN ('queued', 'running');
+
+-- FKs hacia users, pets y posts sin indice: cada lote filtra por ellas y, al
+-- borrar la fila padre, Postgres las revisa; sin indice las dos cosas recorren
+-- la tabla entera.
+CREATE INDEX IF NOT EXISTS "ix_pets_owner_id" ON "pets" ("owner_id");
+CREATE INDEX IF NOT EXISTS "ix_user_settings_user_id" ON "user_settings" ("user_id");
+CREATE INDEX IF NOT EXISTS "ix_user_address_user_id" ON "user_address" ("user_id");
+CREATE INDEX IF NOT EXISTS "ix_pet_vaccines_pet_id" ON "pet_vaccines" ("pet_id");
+CREATE INDEX IF NOT EXISTS "ix_pet_medications_pet_id" ON "pet_medications" ("pet_id");
+CREATE INDEX IF NOT EXISTS "ix_pet_weight_history_pet_id" ON "pet_weight_history" ("pet_id");
+CREATE INDEX IF NOT EXISTS "ix_pet_media_pet_id" ON "pet_media" ("pet_id");
+CREATE INDEX IF NOT EXISTS "ix_pet_medical_visits_pet_id" ON "pet_medical_visits" ("pet_id");
+CREATE INDEX IF NOT EXISTS "ix_pet_medical_visits_vet_id" ON "pet_medical_visits" ("vet_id");
+CREATE INDEX IF NOT EXISTS "ix_pet_vaccine_card_scans_pet_id" ON "pet_vaccine_card_scans" ("pet_id");
+CREATE INDEX IF NOT EXISTS "ix_posts_user_id" ON "posts" ("user_id");
+CREATE INDEX IF NOT EXISTS "ix_posts_pet_id" ON "posts" ("pet_id");
+CREATE INDEX IF NOT EXISTS "ix_post_likes_post_id" ON "post_likes" ("post_id");
+CREATE INDEX IF NOT EXISTS "ix_post_likes_user_id" ON "post_likes" ("user_id");
+CREATE INDEX IF NOT EXISTS "ix_post_comments_post_id" ON "post_comments" ("post_id");
+CREATE INDEX IF NOT EXISTS "ix_post_comments_user_id" ON "post_comments" ("user_id");
+CREATE INDEX IF NOT EXISTS "ix_friendships_requested_by" ON "friendships" ("requested_by");
+CREATE INDEX IF NOT EXISTS "ix_chat_members_user_id" ON "chat_members" ("user_id");
+CREATE INDEX IF NOT EXISTS "ix_messages_sender_id" ON "messages" ("sender_id");
+CREATE INDEX IF NOT EXISTS "ix_places_created_by_user" ON "places" ("created_by_user");
+CREATE INDEX IF NOT EXISTS "ix_place_reviews_user_id" ON "place_reviews" ("user_id");
+CREATE INDEX IF NOT EXISTS "ix_place_reports_user_id" ON "place_reports" ("user_id");
+CREATE INDEX IF NOT EXISTS "ix_vet_clinics_owner_id" ON "vet_clinics" ("owner_id");
+CREATE INDEX IF NOT EXISTS "ix_orders_user_id" ON "orders" ("user_id");
+CREATE INDEX IF NOT EXISTS "ix_orders_shop_id" ON "orders" ("shop_id");
+CREATE INDEX IF NOT EXISTS "ix_ai_chat_history_pet_id" ON "ai_chat_history" ("pet_id");
+
+-- tablas de databases/03-appointments.sql y de models/tables.py que pueden no existir todavia
+DO $$
+BEGIN
+  IF to_regclass('appointments') IS NOT NULL THEN
+    CREATE INDEX IF NOT EXISTS "ix_appointments_pet_id" ON "appointments" ("pet_id");
+    CREATE INDEX IF NOT EXISTS "ix_appointments_user_id" ON "appointments" ("user_id");
+    CREATE INDEX IF NOT EXISTS "ix_appointments_vet_id" ON "appointments" ("vet_id");
+  END IF;
+  IF to_regclass('vet_availability') IS NOT NULL THEN
+    CREATE INDEX IF NOT EXISTS "ix_vet_availability_vet_id" ON "vet_availability" ("vet_id");
+  END IF;
+  IF to_regclass('health_records') IS NOT NULL THEN
+    CREATE INDEX IF NOT EXISTS "ix_health_records_pet_id" ON "health_records" ("pet_id");
+    CREATE INDEX IF NOT EXISTS "ix_health_records_vet_id" ON "health_records" ("vet_id");
+  END IF;
+END $$;
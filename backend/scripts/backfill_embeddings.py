@@ -0,0 +1,46 @@
+"""
+Calcula los embeddings de posts y mascotas que faltan o cambiaron.
+
+Uso (desde la carpeta backend, con DATABASE_URL apuntando a Postgres):
+    python scripts/backfill_embeddings.py [--types post,pet] [--chunk 500]
+
+Usa el mismo procesamiento que el hilo de la app: las filas cuyo hash de texto
+coincide con el guardado se saltean, asi que volver a correrlo es barato.
+Imprime items por segundo y cuantos se calcularon o saltearon por tipo.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from src.db.embeddings import iter_sources  # noqa: E402
+from src.services import embeddings  # noqa: E402
+
+TEXT = {"post": embeddings.post_text, "pet": embeddings.pet_text}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--types", default="post,pet", help="tipos de entidad separados por coma")
+    parser.add_argument("--chunk", type=int, default=500, help="filas por lote (una llamada al modelo y un upsert)")
+    args = parser.parse_args()
+
+    for entity_type in [k.strip() for k in args.types.split(",") if k.strip()]:
+        totals = {"embedded": 0, "skipped": 0}
+        started = time.perf_counter()
+        for rows in iter_sources(entity_type, args.chunk):
+            items = [{"entity_type": entity_type, "entity_id": r["id"], "text": TEXT[entity_type](r)} for r in rows]
+            for key, value in embeddings.process(items).items():
+                totals[key] += value
+        elapsed = time.perf_counter() - started
+        count = totals["embedded"] + totals["skipped"]
+        rate = count / elapsed if elapsed else 0
+        print(f"{entity_type:>5}: {count} items en {elapsed:.2f}s ({rate:.0f} items/s), "
+              f"{totals['embedded']} calculados, {totals['skipped']} sin cambios")
+
+
+if __name__ == "__main__":
+    main()
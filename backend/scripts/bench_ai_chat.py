@@ -0,0 +1,161 @@
+"""
+Benchmark del chat IA en streaming: tiempo al primer byte y memoria por stream.
+
+Uso (desde la carpeta backend, con DATABASE_URL apuntando a Postgres):
+    python scripts/bench_ai_chat.py [--streams 200] [--token-delay-ms 20]
+    python scripts/bench_ai_chat.py --url http://localhost:8000 --token "$TOKEN" --pet-id 1
+
+Sin --url corre en proceso: crea una mascota con vacunas, medicacion y pesos,
+mide la consulta de contexto (fria y cacheada), lanza `--streams` respuestas
+concurrentes con el backend stub y reporta p50/p95 del primer evento y del
+primer token, mas la memoria pico por stream (tracemalloc). Con --url mide el
+primer byte y el primer token contra un servidor levantado.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from src.db import SessionLocal  # noqa: E402
+from src.models import tables as t  # noqa: E402
+from src.services import ai_chat  # noqa: E402
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)] * 1000
+
+
+def report(name, values):
+    print(f"{name}: p50 {statistics.median(values) * 1000:.2f} ms, p95 {pct(values, 0.95):.2f} ms, max {max(values) * 1000:.2f} ms")
+
+
+def seed():
+    session = SessionLocal()
+    try:
+        user_id = session.execute(
+            insert(t.users).values(full_name="Bench IA", email=f"ai-{uuid.uuid4()}@bench").returning(t.users.c.id)
+        ).scalar_one()
+        pet_id = session.execute(
+            insert(t.pets).values(owner_id=user_id, name="Luna", species="perro", breed="Labrador").returning(t.pets.c.id)
+        ).scalar_one()
+        today = date.today()
+        session.execute(insert(t.pet_vaccines), [
+            {"pet_id": pet_id, "vaccine_name": f"Vacuna {i}", "date": today - timedelta(days=60 * i),
+             "next_due": today + timedelta(days=300 - 60 * i)} for i in range(10)
+        ])
+        session.execute(insert(t.pet_medications), [
+            {"pet_id": pet_id, "medication": "Antiparasitario", "dose": "1 comp", "start_date": today}
+        ])
+        session.execute(insert(t.pet_weight_history), [
+            {"pet_id": pet_id, "date": today - timedelta(days=7 * i), "weight": 28 - i * 0.1} for i in range(50)
+        ])
+        session.commit()
+        return user_id, pet_id
+    finally:
+        session.close()
+
+
+async def in_process(args):
+    user_id, pet_id = seed()
+    start = time.perf_counter()
+    context = ai_chat.get_context(pet_id)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(1000):
+        ai_chat.get_context(pet_id)
+    cached = (time.perf_counter() - start) / 1000
+    print(f"contexto: {cold * 1000:.2f} ms en frio (1 consulta), {cached * 1e6:.1f} us cacheado")
+
+    ai_chat._backend = ai_chat.StubBackend(args.token_delay_ms)
+    first_event, first_token = [], []
+
+    async def one(i):
+        started = time.perf_counter()
+        seen = 0
+        # se consume el stream completo para que la memoria medida sea la de toda la respuesta
+        async for chunk in ai_chat.stream_chat(user_id, f"¿Cómo está Luna? #{i}", pet_id, context):
+            if seen == 0:
+                first_event.append(time.perf_counter() - started)
+            elif seen == 1:
+                first_token.append(time.perf_counter() - started)
+            seen += 1
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.streams)))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report("primer evento (TTFB)", first_event)
+    report("primer token", first_token)
+    print(f"{args.streams} streams concurrentes en {elapsed:.2f}s; memoria pico {(peak - baseline) / args.streams / 1024:.1f} KiB por stream")
+
+    ai_chat.history.stop()
+    session = SessionLocal()
+    try:
+        saved = session.execute(
+            select(func.count()).select_from(t.ai_chat_history).where(t.ai_chat_history.c.user_id == user_id)
+        ).scalar_one()
+    finally:
+        session.close()
+    print(f"historial: {saved} filas guardadas en lotes de hasta {ai_chat.AI_HISTORY_BATCH}, {ai_chat.history.dropped} descartadas")
+
+
+def against_server(args):
+    import requests
+
+    def one(i):
+        started = time.perf_counter()
+        ttfb = token = None
+        with requests.post(
+            f"{args.url.rstrip('/')}/ai/chat",
+            json={"message": f"¿Cómo está mi mascota? #{i}", "pet_id": args.pet_id},
+            headers={"Authorization": f"Bearer {args.token}"},
+            stream=True,
+            timeout=60,
+        ) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if ttfb is None:
+                    ttfb = time.perf_counter() - started
+                if line.startswith(b"data:") and b'"token"' in line and token is None:
+                    token = time.perf_counter() - started
+        return ttfb, token
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(one, range(args.streams)))
+    report("primer byte", [r[0] for r in results])
+    report("primer token", [r[1] for r in results if r[1] is not None])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=200)
+    parser.add_argument("--token-delay-ms", type=float, default=20)
+    parser.add_argument("--url")
+    parser.add_argument("--token")
+    parser.add_argument("--pet-id", type=int)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    if args.url:
+        against_server(args)
+    else:
+        asyncio.run(in_process(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Prueba de concurrencia y benchmark del checkout de la tienda.
+
+Uso (desde la carpeta backend, con DATABASE_URL apuntando a Postgres):
+    python scripts/bench_checkout.py [--buyers 300] [--stock 100] [--threads 32]
+
+Crea un producto con `--stock` unidades y lanza `--buyers` compras en paralelo
+de 1 unidad (mas un producto comun a todos los carritos para provocar
+bloqueos cruzados). Verifica que no se vende mas de lo que habia, que el
+stock no queda negativo y que reintentar con la misma clave no duplica el
+pedido. Reporta checkouts por segundo.
+"""
+import argparse
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+
+from src.db import DATABASE_URL, SessionLocal  # noqa: E402
+from src.db.shop import OutOfStockError, checkout  # noqa: E402
+from src.models import tables as t  # noqa: E402
+
+
+def setup(buyers: int, stock: int):
+    session = SessionLocal()
+    try:
+        shop_id = session.execute(
+            insert(t.users).values(full_name="Tienda bench", email=f"shop-{uuid.uuid4()}@bench", user_type="shop")
+            .returning(t.users.c.id)
+        ).scalar_one()
+        user_ids = session.execute(
+            insert(t.users).returning(t.users.c.id),
+            [{"full_name": f"Comprador {i}", "email": f"buyer-{uuid.uuid4()}@bench"} for i in range(buyers)],
+        ).scalars().all()
+        scarce, common = session.execute(
+            insert(t.shop_products).returning(t.shop_products.c.id),
+            [
+                {"shop_id": shop_id, "name": "Escaso", "price": 10.0, "stock": stock},
+                {"shop_id": shop_id, "name": "Comun", "price": 1.0, "stock": buyers * 10},
+            ],
+        ).scalars().all()
+        session.commit()
+        return list(user_ids), scarce, common
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buyers", type=int, default=300)
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+    # un pool con una conexion por hilo para medir la DB y no la espera del pool
+    SessionLocal.configure(bind=create_engine(DATABASE_URL, pool_size=args.threads, future=True))
+
+    user_ids, scarce, common = setup(args.buyers, args.stock)
+
+    def buy(i):
+        user_id = user_ids[i]
+        # la mitad de los carritos lista los productos en orden inverso
+        items = [{"product_id": scarce, "quantity": 1}, {"product_id": common, "quantity": 1}]
+        if i % 2:
+            items.reverse()
+        key = f"bench-{i}"
+        try:
+            first = checkout(user_id, items, key)
+        except OutOfStockError:
+            return "agotado"
+        retry = checkout(user_id, items, key)
+        assert retry["replayed"] and retry["id"] == first["id"], "la clave de idempotencia duplico el pedido"
+        return "vendido"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(buy, range(args.buyers)))
+    elapsed = time.perf_counter() - start
+
+    session = SessionLocal()
+    try:
+        remaining = session.execute(select(t.shop_products.c.stock).where(t.shop_products.c.id == scarce)).scalar_one()
+        sold = session.execute(
+            select(func.coalesce(func.sum(t.order_items.c.quantity), 0)).where(t.order_items.c.product_id == scarce)
+        ).scalar_one()
+    finally:
+        session.close()
+
+    expected = min(args.stock, args.buyers)
+    print(f"compradores={args.buyers} stock={args.stock} hilos={args.threads}")
+    print(f"vendidos={results.count('vendido')} agotados={results.count('agotado')} "
+          f"lineas={sold} stock_restante={remaining}")
+    print(f"{args.buyers / elapsed:.1f} checkouts/s ({elapsed:.2f}s)")
+    if sold != expected or remaining != args.stock - expected or remaining < 0:
+        sys.exit("ERROR: sobreventa o stock inconsistente")
+    print("OK: sin sobreventa")
+
+
+if __name__ == "__main__":
+    main()
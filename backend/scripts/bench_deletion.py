@@ -0,0 +1,131 @@
+"""
+Benchmark del borrado de mascotas: en lotes (src/services/deletion.py) contra
+un DELETE en una sola transaccion.
+
+Uso (desde la carpeta backend, con DATABASE_URL apuntando a Postgres y
+databases/07-deletion.sql aplicado):
+    python scripts/bench_deletion.py [--rows 200000] [--batch 1000]
+
+Para cada modo crea una mascota con `--rows` pesos y la borra mientras otro
+hilo edita el ultimo de esos pesos cada 20 ms, como un usuario que sigue
+usando la app. En una sola transaccion esa escritura puede esperar hasta el
+COMMIT; en lotes espera a lo sumo un lote. Reporta la duracion del borrado y la espera de la
+escritura concurrente (p50, p99 y maxima).
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from sqlalchemy import insert, text  # noqa: E402
+
+from src.db import SessionLocal  # noqa: E402
+from src.db import deletion as db  # noqa: E402
+from src.models import tables as t  # noqa: E402
+from src.services import deletion  # noqa: E402
+
+_EDIT = text("UPDATE pet_weight_history SET weight = weight + 0 WHERE id = :row")
+
+
+def setup(rows: int) -> tuple:
+    """Usuario, mascota con `rows` pesos y el ultimo peso (el que edita la escritura concurrente)."""
+    session = SessionLocal()
+    try:
+        user_id = session.execute(
+            insert(t.users).values(full_name="Bench borrado", email=f"delete-{uuid.uuid4()}@bench").returning(t.users.c.id)
+        ).scalar_one()
+        pet_id = session.execute(
+            insert(t.pets).values(owner_id=user_id, name="Bench", species="perro").returning(t.pets.c.id)
+        ).scalar_one()
+        session.execute(
+            text("INSERT INTO pet_weight_history (pet_id, weight) SELECT :pet, 10 + g % 5 FROM generate_series(1, :rows) g"),
+            {"pet": pet_id, "rows": rows},
+        )
+        row_id = session.execute(text("SELECT max(id) FROM pet_weight_history WHERE pet_id = :pet"), {"pet": pet_id}).scalar_one()
+        session.commit()
+        return user_id, pet_id, row_id
+    finally:
+        session.close()
+
+
+def single_transaction(pet_id: int):
+    session = SessionLocal()
+    try:
+        for step in db.plan_for("pet"):
+            if step.set_null:
+                session.execute(text(f"UPDATE {step.table} SET {step.assignments} WHERE {step.where}"), {"target": pet_id})
+            else:
+                session.execute(text(f"DELETE FROM {step.table} WHERE {step.where}"), {"target": pet_id})
+        session.commit()
+    finally:
+        session.close()
+
+
+def batched(user_id: int, pet_id: int):
+    db.create_job("pet", pet_id, user_id)
+    job = db.claim_job(deletion.DELETION_STALE_SECONDS)
+    assert job["target_id"] == pet_id, "hay otros borrados en la cola: correr el benchmark con la app detenida"
+    deletion.DeletionWorker()._process(job)
+    assert db.get_job(job["id"])["status"] == "done"
+
+
+def measure(name: str, rows: int, run) -> None:
+    user_id, pet_id, row_id = setup(rows)
+    waits = []
+    stop = threading.Event()
+
+    def writer():
+        session = SessionLocal()
+        try:
+            while not stop.is_set():
+                started = time.perf_counter()
+                session.execute(_EDIT, {"row": row_id})
+                session.commit()
+                waits.append((time.perf_counter() - started) * 1000)
+                stop.wait(0.02)
+        finally:
+            session.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    time.sleep(0.2)
+    started = time.perf_counter()
+    run(user_id, pet_id)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    thread.join()
+
+    waits.sort()
+    p99 = waits[min(len(waits) - 1, int(len(waits) * 0.99))]
+    print(
+        f"{name:<20} {elapsed:6.2f}s  {rows / elapsed:9.0f} filas/s  escritura concurrente: "
+        f"p50={statistics.median(waits):.1f} ms p99={p99:.1f} ms max={waits[-1]:.1f} ms ({len(waits)} escrituras)"
+    )
+    session = SessionLocal()
+    try:
+        session.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        session.commit()
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=deletion.DELETION_BATCH)
+    args = parser.parse_args()
+    deletion.DELETION_BATCH = args.batch
+
+    print(f"filas={args.rows} lote={args.batch} pausa={deletion.DELETION_PAUSE_SECONDS}s")
+    measure("una transaccion", args.rows, lambda user_id, pet_id: single_transaction(pet_id))
+    measure("en lotes", args.rows, batched)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark de membresias y feed de grupos.
+
+Uso (desde la carpeta backend, con DATABASE_URL apuntando a Postgres con
+databases/04-social.sql aplicado):
+    python scripts/bench_groups.py [--members 100000] [--posts 5000] [--checks 100000]
+
+Crea `--members` usuarios con COPY, un grupo y los agrega con la importacion
+masiva (un COPY); luego mide la carga en frio del cache de membresia, la
+comprobacion de membresia en memoria frente a un EXISTS por consulta, y la
+latencia del feed del grupo (primera pagina y paginas profundas por cursor).
+"""
+import argparse
+import io
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from sqlalchemy import exists, select  # noqa: E402
+
+from src.db import SessionLocal  # noqa: E402
+from src.db.groups import create_group, group_posts, import_members  # noqa: E402
+from src.models import tables as t  # noqa: E402
+from src.services import group_membership  # noqa: E402
+
+
+def copy_rows(sql: str, lines):
+    session = SessionLocal()
+    try:
+        cursor = session.connection().connection.cursor()
+        cursor.copy_expert(sql, io.StringIO("".join(lines)))
+        cursor.close()
+        session.commit()
+    finally:
+        session.close()
+
+
+def seed(members: int, posts: int):
+    tag = uuid.uuid4().hex[:8]
+    copy_rows(
+        "COPY users (full_name, email, user_type) FROM STDIN",
+        (f"Miembro {i}\tbench-{tag}-{i}@bench\ttutor\n" for i in range(members)),
+    )
+    session = SessionLocal()
+    try:
+        user_ids = session.execute(
+            select(t.users.c.id).where(t.users.c.email.like(f"bench-{tag}-%"))
+        ).scalars().all()
+    finally:
+        session.close()
+    group = create_group(user_ids[0], {"name": f"Bench {tag}", "type": "private"})
+
+    start = time.perf_counter()
+    added = import_members(group["id"], user_ids)
+    print(f"importacion: {len(added)} miembros en {time.perf_counter() - start:.2f}s (un COPY)")
+
+    base = datetime(2025, 1, 1)
+    copy_rows(
+        "COPY posts (user_id, content, visibility, created_at, group_id) FROM STDIN",
+        (
+            f"{random.choice(user_ids)}\tpost {i}\tpublic\t{(base + timedelta(seconds=i)).isoformat()}\t{group['id']}\n"
+            for i in range(posts)
+        ),
+    )
+    return group["id"], user_ids
+
+
+def ms(values):
+    values = sorted(values)
+    return f"p50 {statistics.median(values) * 1000:.3f} ms, p99 {values[int(len(values) * 0.99) - 1] * 1000:.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=100_000)
+    parser.add_argument("--posts", type=int, default=5_000)
+    parser.add_argument("--checks", type=int, default=100_000)
+    parser.add_argument("--sql-checks", type=int, default=1_000)
+    args = parser.parse_args()
+
+    group_id, user_ids = seed(args.members, args.posts)
+    lo, hi = min(user_ids), max(user_ids)
+    probes = [random.randint(lo, hi + args.members) for _ in range(args.checks)]
+
+    start = time.perf_counter()
+    entry = group_membership.entry(group_id)
+    print(f"carga en frio del cache: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{len(entry['members'])} miembros, {entry['members'].nbytes / 1024:.0f} KB")
+
+    start = time.perf_counter()
+    hits = sum(group_membership.is_member(group_id, uid) for uid in probes)
+    elapsed = time.perf_counter() - start
+    print(f"membresia en memoria: {elapsed / args.checks * 1e6:.2f} us/check ({hits} aciertos de {args.checks})")
+
+    session = SessionLocal()
+    try:
+        gm = t.group_members.c
+        timings = []
+        for uid in probes[: args.sql_checks]:
+            start = time.perf_counter()
+            session.execute(select(exists().where(gm.group_id == group_id, gm.user_id == uid))).scalar()
+            timings.append(time.perf_counter() - start)
+        print(f"membresia por EXISTS: {ms(timings)}")
+    finally:
+        session.close()
+
+    for depth in (0, 10, 50):
+        timings = []
+        for _ in range(20):
+            cursor = None
+            start = time.perf_counter()
+            for _ in range(depth + 1):
+                rows = group_posts(group_id, cursor, 20)
+                last = rows[19] if len(rows) > 20 else None
+                cursor = (last["created_at"], last["id"]) if last else None
+                if cursor is None:
+                    break
+            timings.append((time.perf_counter() - start) / (depth + 1))
+        print(f"feed pagina {depth + 1}: {ms(timings)} por pagina")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Latencia de los requests con los logs apagados, con el sink anterior y con el
+pipeline encolado (src/services/logs.py).
+
+Uso (desde la carpeta backend):
+    python scripts/bench_logging.py [--requests 2000] [--rounds 10] [--concurrency 4] [--slow-ms 0]
+
+Llama a la app como ASGI directamente (sin red) con cada request logueado
+(sin muestreo) y mide la latencia de cada uno. Los modos se alternan por
+bloques en el mismo proceso:
+- off: sin handlers de loguru;
+- print: el sink de antes, `print` sincronico desde el request;
+- async: el sink encolado, con el writer en su hilo.
+Los dos ultimos escriben en un archivo temporal. --slow-ms simula una salida
+lenta (un pipe o un colector que no da abasto) durmiendo en cada escritura:
+el sink sincronico frena los requests; el encolado no, y si la cola se llena
+descarta y lo cuenta. Con DATABASE_URL mide tambien /posts?fields=id,content.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from loguru import logger  # noqa: E402
+
+from src import main as api, repositories as repo  # noqa: E402
+from src.db import DB_BACKEND, test_connection  # noqa: E402
+from src.services import logs  # noqa: E402
+
+
+class SlowFile:
+    """Archivo cuyas escrituras tardan `delay` segundos."""
+
+    def __init__(self, raw, delay: float):
+        self.raw = raw
+        self.delay = delay
+
+    def write(self, text: str):
+        if self.delay:
+            time.sleep(self.delay)
+        return self.raw.write(text)
+
+    def flush(self):
+        self.raw.flush()
+
+
+async def drive(app, path: str, query: str, total: int, concurrency: int):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path}: status {message['status']}")
+
+    latencies = []
+
+    async def worker(n: int):
+        for _ in range(n):
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+                "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+            }
+            start = time.perf_counter()
+            await app(scope, receive, send)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+    return latencies
+
+
+def set_mode(mode: str, out):
+    logs.teardown()
+    logger.remove()
+    if mode == "print":
+        logger.add(lambda msg: print(msg, end="", file=out))
+    elif mode == "async":
+        logs.writer.stream = out
+        logs.setup()
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+def measure(app, path: str, query: str, out, args):
+    modes = ("off", "print", "async")
+    samples = {mode: [] for mode in modes}
+    for mode in modes:  # calentamiento
+        set_mode(mode, out)
+        asyncio.run(drive(app, path, query, args.requests, args.concurrency))
+    for i in range(args.rounds):
+        for mode in (modes if i % 2 == 0 else modes[::-1]):
+            set_mode(mode, out)
+            samples[mode].extend(asyncio.run(drive(app, path, query, args.requests, args.concurrency)))
+    set_mode("off", out)
+    print(f"{path}")
+    for mode in modes:
+        values = samples[mode]
+        print(f"  {mode:6} p50 {statistics.median(values) * 1e6:8.1f} us | p99 {percentile(values, 0.99) * 1e6:8.1f} us"
+              f" | max {max(values) * 1e3:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2_000, help="requests por bloque")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="demora de cada escritura de la salida")
+    args = parser.parse_args()
+
+    app = api.create_app()
+    logs.sample_rates.clear()  # se loguea cada request
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as raw:
+        out = SlowFile(raw, args.slow_ms / 1000)
+        measure(app, "/health", "", out, args)
+        if DB_BACKEND != "memory" and test_connection():
+            if not repo.posts.find(columns=("id",), group_id=None):
+                for i in range(50):
+                    repo.posts.create({"content": f"bench {i} " * 20, "visibility": "public"})
+            measure(app, "/posts", "fields=id,content", out, args)
+        logs.writer.stop()
+        stats = logs.writer.stats()
+    print(f"writer async: {stats['written']} escritos en {stats['batches']} lotes, {stats['dropped']} descartados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark del almacenamiento en memoria frente al camino SQL (usuarios y mascotas).
+
+Uso (desde la carpeta backend; para la parte SQL, DATABASE_URL apuntando a Postgres):
+    python scripts/bench_memory_store.py [--users 2000] [--pets 5] [--threads 8] [--skip-sql]
+
+Llama a las mismas funciones de src/db/users.py y src/db/pets.py con cada
+backend: alta de usuarios y mascotas, mascotas por dueño, usuario por email y
+mascota por id. Despues carga la tabla en memoria desde varios hilos a la vez
+y comprueba que los ids y los indices quedaron consistentes, y mide el
+snapshot/restore a disco.
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from src.db import memory, pets, test_connection, users  # noqa: E402
+from src.models import tables as t  # noqa: E402
+from src.repositories import MemoryRepository, SqlRepository  # noqa: E402
+
+MEMORY = {"users": MemoryRepository.for_table(t.users), "pets": MemoryRepository.for_table(t.pets)}
+SQL = {"users": SqlRepository(t.users), "pets": SqlRepository(t.pets)}
+
+
+def use_backend(name: str):
+    repos = SQL if name == "sql" else MEMORY
+    users._users, pets._pets = repos["users"], repos["pets"]
+
+
+def us(values):
+    values = sorted(values)
+    return f"p50 {statistics.median(values) * 1e6:.1f} us, p99 {values[int(len(values) * 0.99) - 1] * 1e6:.1f} us"
+
+
+def timed(fn, args_list):
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run(backend: str, n_users: int, pets_per_user: int, reads: int):
+    use_backend(backend)
+    tag = uuid.uuid4().hex[:8]
+    emails = [f"bench-{tag}-{i}@bench" for i in range(n_users)]
+    created = []
+    start = time.perf_counter()
+    for email in emails:
+        created.append(users.create_user_with_password("Bench", email, "secreta"))
+    owner_ids = [u["id"] for u in created]
+    pet_ids = [
+        pets.create_pet(owner_id, {"name": f"Mascota {j}", "species": "perro"})["id"]
+        for owner_id in owner_ids
+        for j in range(pets_per_user)
+    ]
+    seed = time.perf_counter() - start
+    writes = n_users * (1 + pets_per_user)
+    print(f"[{backend}] alta: {writes} filas en {seed:.2f}s ({writes / seed:.0f} filas/s)")
+    print(f"[{backend}] mascotas por dueño: {us(timed(pets.get_pets_by_owner, [(random.choice(owner_ids),) for _ in range(reads)]))}")
+    print(f"[{backend}] usuario por email:  {us(timed(users.get_user_by_email, [(random.choice(emails),) for _ in range(reads)]))}")
+    print(f"[{backend}] mascota por id:     {us(timed(pets.get_pet_by_id, [(random.choice(pet_ids),) for _ in range(reads)]))}")
+
+
+def stress(threads: int, n_users: int, pets_per_user: int):
+    use_backend("memory")
+    store_users, store_pets = MEMORY["users"].store, MEMORY["pets"].store
+    store_users.clear()
+    store_pets.clear()
+
+    def worker(i):
+        owner = users.get_or_create_user(f"stress-{i}@bench", "Stress")
+        for j in range(pets_per_user):
+            pet = pets.create_pet(owner["id"], {"name": f"m{j}", "species": "gato"})
+            pets.update_pet(owner["id"], pet["id"], {"owner_id": -1, "breed": "mestizo"})
+        return owner["id"]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        # cada email se pide dos veces en paralelo: tiene que crearse una sola vez
+        owner_ids = list(pool.map(worker, [i % n_users for i in range(n_users * 2)]))
+    elapsed = time.perf_counter() - start
+    assert len(store_users) == n_users, len(store_users)
+    assert len(store_pets) == n_users * 2 * pets_per_user
+    assert len({p["id"] for p in store_pets.all()}) == len(store_pets)
+    assert sum(len(pets.get_pets_by_owner(o)) for o in set(owner_ids)) == len(store_pets)
+    print(f"[memory] {threads} hilos: {len(store_pets) * 2 + n_users} escrituras en {elapsed:.2f}s, indices consistentes")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        memory.snapshot_all(tmp)
+        saved = time.perf_counter() - start
+        store_pets.clear()
+        store_users.clear()
+        start = time.perf_counter()
+        restored = memory.restore_all(tmp)
+        print(f"[memory] snapshot {saved * 1000:.1f} ms, restore {(time.perf_counter() - start) * 1000:.1f} ms: {restored}")
+    assert sum(len(pets.get_pets_by_owner(o)) for o in set(owner_ids)) == len(store_pets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--pets", type=int, default=5, help="mascotas por usuario")
+    parser.add_argument("--reads", type=int, default=2_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--skip-sql", action="store_true")
+    args = parser.parse_args()
+
+    run("memory", args.users, args.pets, args.reads)
+    if args.skip_sql:
+        pass
+    elif test_connection():
+        run("sql", args.users, args.pets, args.reads)
+    else:
+        print("[sql] sin conexion a la base, se omite")
+    stress(args.threads, args.users, args.pets)
+
+
+if __name__ == "__main__":
+    main()
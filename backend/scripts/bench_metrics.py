@@ -0,0 +1,117 @@
+"""
+Costo de las metricas (/metrics) sobre el throughput de la API.
+
+Uso (desde la carpeta backend; DATABASE_URL apuntando a Postgres):
+    python scripts/bench_metrics.py [--requests 1000] [--rounds 20] [--concurrency 4] [--max-overhead 2]
+
+Arma dos apps en el mismo proceso, con y sin metricas (middleware + eventos de
+SQLAlchemy), y las llama como ASGI directamente, sin red ni cliente HTTP, que
+solo diluirian la diferencia. Alterna bloques de --requests requests de cada
+modo --rounds veces, para que el ruido de la maquina y de la base caiga parejo
+en los dos, y compara la mediana de requests/s:
+- /posts?fields=id,content: repositorio + consulta instrumentada; es la ruta
+  que se compara contra --max-overhead (sale con codigo 1 si lo supera);
+- /health: sin base ni serializacion, solo como referencia del peor caso
+  (el costo fijo por request sobre una respuesta casi vacia).
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from src import main as api, repositories as repo  # noqa: E402
+from src.db import DB_BACKEND, engine, test_connection  # noqa: E402
+from src.services import metrics  # noqa: E402
+
+
+async def drive(app, path: str, query: str, total: int, concurrency: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path}: status {message['status']}")
+
+    async def one():
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+            "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        }
+        await app(scope, receive, send)
+
+    async def worker(n: int):
+        for _ in range(n):
+            await one()
+
+    per_worker = total // concurrency
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+    return per_worker * concurrency / (time.perf_counter() - start)
+
+
+def build_apps():
+    enabled = metrics.METRICS_ENABLED
+    try:
+        metrics.METRICS_ENABLED = True
+        with_metrics = api.create_app()
+        metrics.METRICS_ENABLED = False
+        without = api.create_app()
+    finally:
+        metrics.METRICS_ENABLED = enabled
+    return {True: with_metrics, False: without}
+
+
+def set_mode(enabled: bool):
+    if enabled:
+        metrics.instrument_engine(engine, "primary")
+    else:
+        metrics.uninstrument_engine("primary")
+
+
+def measure(apps, path: str, query: str, args):
+    samples = {False: [], True: []}
+    for enabled in (False, True):  # calentamiento
+        set_mode(enabled)
+        asyncio.run(drive(apps[enabled], path, query, args.requests, args.concurrency))
+    for i in range(args.rounds):
+        # se alterna el orden para no favorecer siempre al mismo modo
+        for enabled in ((False, True) if i % 2 == 0 else (True, False)):
+            set_mode(enabled)
+            samples[enabled].append(asyncio.run(drive(apps[enabled], path, query, args.requests, args.concurrency)))
+    set_mode(True)
+    off, on = statistics.median(samples[False]), statistics.median(samples[True])
+    overhead = (off - on) / off * 100
+    print(f"{path:8} sin metricas {off:8.0f} req/s | con metricas {on:8.0f} req/s | "
+          f"costo {overhead:+.2f}% ({(1 / on - 1 / off) * 1e6:+.1f} us/request)")
+    return overhead
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1_000, help="requests por bloque")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4, help="no mas que el pool de conexiones (5)")
+    parser.add_argument("--max-overhead", type=float, default=2.0, help="porcentaje maximo aceptado")
+    args = parser.parse_args()
+
+    apps = build_apps()
+    measure(apps, "/health", "", args)
+    if DB_BACKEND == "memory" or not test_connection():
+        print("/posts   sin Postgres, no se puede verificar el limite")
+        return
+    if not repo.posts.find(columns=("id",), group_id=None):
+        for i in range(50):
+            repo.posts.create({"content": f"bench {i} " * 20, "visibility": "public"})
+    overhead = measure(apps, "/posts", "fields=id,content", args)
+    print(f"limite: {args.max_overhead}% en /posts -> {'OK' if overhead <= args.max_overhead else 'SUPERADO'}")
+    sys.exit(0 if overhead <= args.max_overhead else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark de latencia de GET /search (capa de DB) por tipo y unificada.
+
+Uso (desde la carpeta backend, con DATABASE_URL apuntando a Postgres y
+databases/01-search.sql aplicado):
+    python scripts/bench_search.py [--seed 50000] [--runs 200]
+
+--seed inserta N filas sinteticas por tabla antes de medir.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from sqlalchemy import insert  # noqa: E402
+
+from src.db import SessionLocal  # noqa: E402
+from src.db.search import SEARCH_SOURCES, search  # noqa: E402
+from src.models import tables as t  # noqa: E402
+
+WORDS = (
+    "perro gato cachorro veterinaria parque paseo vacuna collar juguete comida "
+    "arena correa clinica urgencias peluqueria adopcion dog cat puppy vet park "
+    "walk toy food grooming rescue rabia moquillo baño entrenamiento playa"
+).split()
+QUERIES = ["perro", "gato parque", "vacuna rabia", "peluqeria", "collar", "dog park", "urgencias 24h", "adopcion"]
+
+
+def _sentence(n):
+    return " ".join(random.choice(WORDS) for _ in range(n))
+
+
+def seed(rows: int, batch: int = 5000):
+    session = SessionLocal()
+    try:
+        for start in range(0, rows, batch):
+            size = min(batch, rows - start)
+            session.execute(insert(t.posts), [{"content": _sentence(30)} for _ in range(size)])
+            session.execute(insert(t.places), [
+                {"name": _sentence(3), "description": _sentence(15), "services": _sentence(5)} for _ in range(size)
+            ])
+            session.execute(insert(t.vet_clinics), [
+                {"name": _sentence(3), "description": _sentence(15), "address": _sentence(4)} for _ in range(size)
+            ])
+            session.execute(insert(t.shop_products), [
+                {"name": _sentence(3), "description": _sentence(15), "price": random.uniform(1, 100), "stock": random.randint(0, 50)}
+                for _ in range(size)
+            ])
+            session.commit()
+    finally:
+        session.close()
+
+
+def measure(kinds, runs: int):
+    timings = []
+    for i in range(runs):
+        q = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        search(q, kinds, page=1, page_size=20)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    pct = lambda p: timings[min(len(timings) - 1, int(len(timings) * p))]  # noqa: E731
+    return statistics.mean(timings), pct(0.50), pct(0.95), pct(0.99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    if args.seed:
+        start = time.perf_counter()
+        seed(args.seed)
+        print(f"seed: {args.seed} filas por tabla en {time.perf_counter() - start:.1f}s")
+
+    print(f"{'tipo':>10} {'media ms':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, kinds in [(k, [k]) for k in SEARCH_SOURCES] + [("todos", None)]:
+        mean, p50, p95, p99 = measure(kinds, args.runs)
+        print(f"{label:>10} {mean:>9.2f} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Microbenchmark de serializacion de listados: costo por cada 1000 filas.
+
+Uso (desde la carpeta backend):
+    python scripts/bench_serialization.py [--rows 1000] [--repeat 30]
+
+Para posts, mascotas y los registros de mascota (vacunas, pesos, escaneos de
+carnet con texto OCR largo) compara, sobre las mismas filas sinteticas:
+- dict: lo que hacia un endpoint que devuelve las filas tal cual
+  (jsonable_encoder + json.dumps de JSONResponse);
+- response_model: FastAPI con response_model (valida, arma dicts y json.dumps);
+- rapido: rows_response de src/models/responses.py (pydantic-core valida y
+  escribe el JSON de la lista entera).
+Verifica que el JSON de los tres caminos sea equivalente.
+"""
+import argparse
+import datetime as dt
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from src.models import responses as r  # noqa: E402
+
+WORDS = "perro gato paseo vacuna control veterinario parque comida juego siesta pelota".split()
+
+
+def text(n_words: int) -> str:
+    return " ".join(random.choices(WORDS, k=n_words))
+
+
+def day(i: int) -> dt.date:
+    return dt.date(2020, 1, 1) + dt.timedelta(days=i % 1500)
+
+
+def moment(i: int) -> dt.datetime:
+    return dt.datetime(2024, 1, 1, 8) + dt.timedelta(minutes=17 * i, microseconds=i)
+
+
+def posts(n):
+    return [{
+        "id": i, "user_id": i % 97, "pet_id": i % 31 or None, "content": text(60),
+        "media_urls": f"/media/posts/{i}.jpg" if i % 3 else None, "visibility": "public",
+        "created_at": moment(i), "group_id": None,
+    } for i in range(1, n + 1)]
+
+
+def pets(n):
+    return [{
+        "id": i, "owner_id": i % 97 + 1, "name": f"Mascota {i}", "species": random.choice(["perro", "gato"]),
+        "breed": "mestizo", "sex": "M", "birthdate": day(i), "weight": round(random.uniform(2, 40), 1),
+        "avatar_url": None, "created_at": moment(i),
+    } for i in range(1, n + 1)]
+
+
+def vaccines(n):
+    return [{
+        "id": i, "pet_id": i % 31 + 1, "vaccine_name": "Rabia", "date": day(i), "next_due": day(i + 365),
+        "vet_clinic": "Clinica Central", "notes": text(8),
+    } for i in range(1, n + 1)]
+
+
+def weights(n):
+    return [{"id": i, "pet_id": i % 31 + 1, "date": day(i), "weight": round(random.uniform(2, 40), 2)} for i in range(1, n + 1)]
+
+
+def vaccine_scans(n):
+    return [{
+        "id": i, "pet_id": i % 31 + 1, "file_url": f"/media/vaccine_scans/{i}.jpg",
+        "extracted_text": text(250), "ocr_metadata": json.dumps({"engine": "tesseract", "entries": 3}),
+    } for i in range(1, n + 1)]
+
+
+CASES = [
+    ("posts", posts, r.PostResponse),
+    ("pets", pets, r.PetResponse),
+    ("vacunas", vaccines, r.VaccineResponse),
+    ("pesos", weights, r.WeightResponse),
+    ("escaneos", vaccine_scans, r.VaccineCardScanResponse),
+]
+
+
+def render(content) -> bytes:
+    # igual que starlette.responses.JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def as_dicts(rows, model):
+    return render(jsonable_encoder(rows))
+
+
+def as_response_model(rows, model):
+    adapter = r.list_adapter(model)
+    return render(adapter.dump_python(adapter.validate_python(rows), mode="json"))
+
+
+def fast(rows, model):
+    return r.dump_rows(model, rows)
+
+
+PATHS = [("dict", as_dicts), ("response_model", as_response_model), ("rapido", fast)]
+
+
+def best_ms(fn, rows, model, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows, model)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    random.seed(7)
+
+    per_k = 1000 / args.rows
+    print(f"{'':10}" + "".join(f"{name:>18}" for name, _ in PATHS) + f"{'KB':>8}")
+    for label, make, model in CASES:
+        rows = make(args.rows)
+        fields = set(model.model_fields)
+        expected = [{k: v for k, v in row.items() if k in fields} for row in json.loads(as_dicts(rows, model))]
+        for _, fn in PATHS[1:]:
+            assert json.loads(fn(rows, model)) == expected, f"{label}: el JSON no coincide"
+        times = [best_ms(fn, rows, model, args.repeat) * per_k for _, fn in PATHS]
+        size = len(fast(rows, model)) / 1024 * per_k
+        print(f"{label:10}" + "".join(f"{t:>15.2f} ms" for t in times) + f"{size:>8.0f}"
+              + f"   x{times[0] / times[-1]:.1f}")
+    print("ms por cada 1000 filas (mejor de --repeat); x = dict / rapido")
+
+
+if __name__ == "__main__":
+    main()
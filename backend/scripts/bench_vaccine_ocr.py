@@ -0,0 +1,60 @@
+"""
+Benchmark del OCR local de carnets de vacunación.
+
+Uso (desde la carpeta backend):
+    python scripts/bench_vaccine_ocr.py ruta/a/carnets [--workers 1 2 4]
+
+Procesa todas las imagenes de la carpeta con 1..N procesos y reporta
+paginas por segundo y paginas por segundo por nucleo.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from src.services.vaccine_ocr import process_card  # noqa: E402
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp"}
+
+
+def load_pages(folder: Path):
+    return [p.read_bytes() for p in sorted(folder.iterdir()) if p.suffix.lower() in IMAGE_SUFFIXES]
+
+
+def run(pages, workers: int):
+    start = time.perf_counter()
+    entries = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(process_card, pages):
+            entries += len(result["entries"])
+    elapsed = time.perf_counter() - start
+    return elapsed, entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", type=Path)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    parser.add_argument("--repeat", type=int, default=1, help="repite el corpus N veces")
+    args = parser.parse_args()
+
+    pages = load_pages(args.folder) * args.repeat
+    if not pages:
+        sys.exit(f"No hay imagenes en {args.folder}")
+    workers_list = args.workers or sorted({1, max(1, (os.cpu_count() or 1) // 2), os.cpu_count() or 1})
+
+    print(f"{len(pages)} paginas")
+    print(f"{'workers':>8} {'seg':>8} {'pag/s':>8} {'pag/s/core':>11} {'vacunas':>8}")
+    for workers in workers_list:
+        elapsed, entries = run(pages, workers)
+        pps = len(pages) / elapsed
+        print(f"{workers:>8} {elapsed:>8.2f} {pps:>8.2f} {pps / workers:>11.2f} {entries:>8}")
+
+
+if __name__ == "__main__":
+    main()
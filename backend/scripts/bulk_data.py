@@ -0,0 +1,521 @@
+"""
+Exportacion e importacion masiva de las tablas de models/tables.py.
+
+Uso (desde la carpeta backend, con DATABASE_URL):
+    python scripts/bulk_data.py export DIR [--format csv|ndjson|parquet] [--gzip] [--tables a,b] [--jobs 4] [--force]
+    python scripts/bulk_data.py import DIR [--tables a,b] [--jobs 4] [--chunk-rows 100000] [--truncate] [--job NOMBRE]
+
+export: un archivo por tabla (DIR/<tabla>.csv, .ndjson, .parquet; .gz con
+--gzip) y DIR/manifest.json con formato, columnas y filas. Todo sale por COPY
+en streaming, con memoria constante. Las tablas se exportan en paralelo
+(--jobs conexiones) desde un mismo snapshot (pg_export_snapshot, como
+pg_dump -j), asi las FKs quedan consistentes entre archivos. Cada archivo se
+escribe como .part y se renombra al terminar: si se corta, volver a correr
+el comando saltea lo ya exportado (--force rehace todo). Las tablas
+retomadas salen de un snapshot nuevo.
+
+import: lee los archivos de DIR (con o sin manifest) en lotes de --chunk-rows
+filas. Cada lote va en su propia transaccion, junto con el avance en la tabla
+bulk_import_progress: si algo falla, volver a correr el comando retoma desde
+el ultimo lote confirmado, sin duplicar filas. Las tablas se cargan en
+paralelo respetando el orden de las FKs: una tabla arranca cuando terminaron
+las tablas que referencia. Si una tabla falla, las que dependen de ella no
+se cargan. Al final de cada tabla se ajusta la secuencia de `id`.
+--truncate vacia antes las tablas elegidas y reinicia el avance del job; no
+arranca si otras tablas, fuera de la carga, las referencian.
+
+Parquet necesita pyarrow. Se convierte por lotes desde y hacia el CSV de
+COPY, con los tipos del modelo; Time y ARRAY quedan como texto de Postgres.
+"""
+import argparse
+import concurrent.futures as cf
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, Float, Integer  # noqa: E402
+
+from src.db import DB_BACKEND, engine, test_connection  # noqa: E402
+from src.db import bulk  # noqa: E402
+from src.models import tables as t  # noqa: E402
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# primera sentencia de la transaccion (sin tocar la sesion, que vuelve al pool)
+READ_SNAPSHOT = "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"
+EXTENSIONS = {"csv": ".csv", "ndjson": ".ndjson", "parquet": ".parquet"}
+PROGRESS_DDL = """
+CREATE TABLE IF NOT EXISTS bulk_import_progress (
+  job text NOT NULL,
+  table_name text NOT NULL,
+  rows bigint NOT NULL DEFAULT 0,
+  done boolean NOT NULL DEFAULT false,
+  updated_at timestamptz NOT NULL DEFAULT now(),
+  PRIMARY KEY (job, table_name)
+)
+"""
+
+
+def selected_tables(names: Optional[str]):
+    """Tablas del modelo en orden de dependencias (padres primero)."""
+    tables = list(t.metadata.sorted_tables)
+    if not names:
+        return tables
+    wanted = {n.strip() for n in names.split(",") if n.strip()}
+    unknown = wanted - {table.name for table in tables}
+    if unknown:
+        raise SystemExit(f"Tablas desconocidas: {', '.join(sorted(unknown))}")
+    return [table for table in tables if table.name in wanted]
+
+
+def dependencies(tables) -> Dict[str, Set[str]]:
+    names = {table.name for table in tables}
+    return {
+        table.name: {fk.column.table.name for fk in table.foreign_keys} & names - {table.name}
+        for table in tables
+    }
+
+
+def report(table: str, rows: int, size: int, seconds: float, note: str = ""):
+    rate = rows / seconds if seconds else 0.0
+    print(f"{table:28} {rows:>12,} filas {size / 1e6:>10.1f} MB {seconds:>8.1f}s "
+          f"{rate:>12,.0f} filas/s {size / 1e6 / seconds if seconds else 0:>7.1f} MB/s {note}", flush=True)
+
+
+# ----- Parquet -----
+def arrow_type(column):
+    kind = column.type
+    if isinstance(kind, BigInteger):
+        return pa.int64()
+    if isinstance(kind, Integer):
+        return pa.int32()
+    if isinstance(kind, Float):
+        return pa.float64()
+    if isinstance(kind, Boolean):
+        return pa.bool_()
+    if isinstance(kind, DateTime):
+        return pa.timestamp("us")
+    if isinstance(kind, Date):
+        return pa.date32()
+    return pa.string()  # String, Text, Time, ARRAY: el texto de Postgres
+
+
+def csv_to_parquet(source, path: Path, table, columns: List[str]):
+    types = {c: arrow_type(table.c[c]) for c in columns}
+    reader = pa_csv.open_csv(
+        source,
+        read_options=pa_csv.ReadOptions(block_size=4 << 20),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=types, null_values=[""], strings_can_be_null=True, quoted_strings_can_be_null=False,
+            true_values=["t"], false_values=["f"],
+        ),
+    )
+    schema = pa.schema([pa.field(c, types[c]) for c in columns])
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+
+
+# ----- Export -----
+def export_table(table, directory: Path, fmt: str, compress: bool, snapshot: Optional[str]) -> dict:
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(READ_SNAPSHOT)
+        if snapshot:
+            cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+        columns = bulk.columns_of(table, bulk.existing_columns(cursor, table.name))
+        if not columns:
+            return {"skipped": "no existe en la base"}
+        query = bulk.select_sql(table.name, columns)
+        name = table.name + EXTENSIONS[fmt] + (".gz" if compress and fmt != "parquet" else "")
+        part = directory / (name + ".part")
+        started = time.perf_counter()
+        if fmt == "parquet":
+            rows = export_parquet(cursor, query, part, table, columns)
+        else:
+            opener = (lambda p: gzip.open(p, "wb", compresslevel=3)) if compress else (lambda p: open(p, "wb"))
+            with opener(part) as out:
+                rows = bulk.copy_out(cursor, query, fmt, out)
+        conn.commit()
+        part.rename(directory / name)
+        seconds = time.perf_counter() - started
+        size = (directory / name).stat().st_size
+        report(table.name, rows, size, seconds)
+        return {"file": name, "columns": columns, "rows": rows, "bytes": size, "seconds": round(seconds, 2)}
+    finally:
+        conn.close()
+
+
+def export_parquet(cursor, query: str, part: Path, table, columns: List[str]) -> int:
+    # COPY escribe el CSV en un pipe desde otro hilo; pyarrow lo lee por bloques
+    read_fd, write_fd = os.pipe()
+    result: Dict[str, object] = {}
+
+    def produce():
+        try:
+            with os.fdopen(write_fd, "wb") as sink:
+                result["rows"] = bulk.copy_out(cursor, query, "csv", sink)
+        except Exception as exc:  # se relanza en el hilo principal
+            result["error"] = exc
+
+    producer = threading.Thread(target=produce, name=f"copy-{table.name}", daemon=True)
+    producer.start()
+    with os.fdopen(read_fd, "rb") as source:
+        try:
+            csv_to_parquet(source, part, table, columns)
+        finally:
+            source.close()  # si pyarrow fallo, desbloquea al productor
+            producer.join()
+    if "error" in result:
+        raise result["error"]
+    return result["rows"]
+
+
+def run_export(args):
+    if args.format == "parquet" and not PARQUET_AVAILABLE:
+        raise SystemExit("--format parquet necesita pyarrow (pip install pyarrow)")
+    directory = Path(args.dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest_path = directory / "manifest.json"
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() and not args.force else {}
+    if manifest and manifest.get("format") != args.format:
+        raise SystemExit(f"{directory} ya tiene una exportacion en {manifest.get('format')}; usar --force")
+    manifest.update({"format": args.format, "gzip": args.gzip})
+    manifest.setdefault("tables", {})
+    manifest.setdefault("exported_at", datetime.utcnow().isoformat(timespec="seconds"))
+    done = {
+        name for name, info in manifest["tables"].items()
+        if "file" in info and (directory / info["file"]).exists()
+    }
+    pending = [table for table in selected_tables(args.tables) if table.name not in done]
+    if done:
+        print(f"ya exportadas: {len(done)} tablas (--force para rehacerlas)")
+    lock = threading.Lock()
+
+    def save():
+        with lock:
+            manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    # el snapshot vive mientras esta conexion mantiene abierta su transaccion
+    coordinator = engine.raw_connection()
+    failures = 0
+    started = time.perf_counter()
+    try:
+        cursor = coordinator.cursor()
+        cursor.execute(READ_SNAPSHOT)
+        cursor.execute("SELECT pg_export_snapshot()")
+        snapshot = cursor.fetchone()[0]
+        with cf.ThreadPoolExecutor(args.jobs) as pool:
+            futures = {
+                pool.submit(export_table, table, directory, args.format, args.gzip, snapshot): table.name
+                for table in pending
+            }
+            for future in cf.as_completed(futures):
+                name = futures[future]
+                try:
+                    info = future.result()
+                except Exception as exc:
+                    failures += 1
+                    print(f"{name:28} ERROR: {exc}", flush=True)
+                    continue
+                if "skipped" in info:
+                    print(f"{name:28} salteada: {info['skipped']}", flush=True)
+                    continue
+                with lock:
+                    manifest["tables"][name] = info
+                save()
+    finally:
+        coordinator.close()
+    summarize(manifest["tables"], time.perf_counter() - started)
+    if failures:
+        print(f"{failures} tablas fallaron; volver a correr el comando retoma las pendientes")
+        sys.exit(1)
+
+
+def summarize(tables: Dict[str, dict], seconds: float):
+    rows = sum(info.get("rows", 0) for info in tables.values())
+    size = sum(info.get("bytes", 0) for info in tables.values())
+    print(f"total: {rows:,} filas, {size / 1e6:,.1f} MB en {seconds:.1f}s "
+          f"({rows / seconds if seconds else 0:,.0f} filas/s)")
+
+
+# ----- Import -----
+def find_file(directory: Path, table_name: str, manifest: dict) -> Optional[Tuple[Path, str]]:
+    info = manifest.get("tables", {}).get(table_name)
+    candidates = [info["file"]] if info and "file" in info else [
+        table_name + ext + gz for ext in EXTENSIONS.values() for gz in ("", ".gz")
+    ]
+    for name in candidates:
+        path = directory / name
+        if path.exists():
+            fmt = next(f for f, ext in EXTENSIONS.items() if name.removesuffix(".gz").endswith(ext))
+            return path, fmt
+    return None
+
+
+def open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def csv_chunks(path: Path, size: int, skip: int) -> Tuple[List[str], Iterator[Tuple[int, io.BytesIO]]]:
+    """Lotes de `size` registros CSV completos (un campo entre comillas puede tener saltos de linea)."""
+    f = open_text(path)
+    header = next(csv.reader([f.readline()]))
+
+    def chunks():
+        raw: List[str] = []
+
+        def lines():
+            for line in f:
+                raw.append(line)
+                yield line
+
+        pending, buf, remaining = 0, [], skip
+        try:
+            for _ in csv.reader(lines()):
+                record = "".join(raw)
+                raw.clear()
+                if remaining:
+                    remaining -= 1
+                    continue
+                buf.append(record)
+                pending += 1
+                if pending == size:
+                    yield pending, io.BytesIO("".join(buf).encode("utf-8"))
+                    pending, buf = 0, []
+            if pending:
+                yield pending, io.BytesIO("".join(buf).encode("utf-8"))
+        finally:
+            f.close()
+
+    return header, chunks()
+
+
+def ndjson_chunks(path: Path, size: int, skip: int) -> Iterator[Tuple[int, io.BytesIO]]:
+    with open_text(path) as f:
+        pending, buf = 0, []
+        for number, line in enumerate(f):
+            if number < skip or not line.strip():
+                continue
+            buf.append(line)
+            pending += 1
+            if pending == size:
+                yield pending, io.BytesIO("".join(buf).encode("utf-8"))
+                pending, buf = 0, []
+        if pending:
+            yield pending, io.BytesIO("".join(buf).encode("utf-8"))
+
+
+def parquet_chunks(path: Path, size: int, skip: int) -> Tuple[List[str], Iterator[Tuple[int, io.BytesIO]]]:
+    source = pq.ParquetFile(path)
+
+    def chunks():
+        remaining = skip
+        for batch in source.iter_batches(batch_size=size):
+            if remaining >= batch.num_rows:
+                remaining -= batch.num_rows
+                continue
+            batch, remaining = batch.slice(remaining), 0
+            buf = io.BytesIO()
+            pa_csv.write_csv(batch, buf, write_options=pa_csv.WriteOptions(include_header=False))
+            buf.seek(0)
+            yield batch.num_rows, buf
+
+    return source.schema_arrow.names, chunks()
+
+
+def import_table(table, path: Path, fmt: str, job: str, chunk_rows: int, manifest: dict) -> dict:
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT rows, done FROM bulk_import_progress WHERE job = %s AND table_name = %s",
+                       (job, table.name))
+        row = cursor.fetchone()
+        conn.commit()
+        loaded, done = (row[0], row[1]) if row else (0, False)
+        if done:
+            return {"rows": loaded, "skipped": "ya importada"}
+        existing = bulk.existing_columns(cursor, table.name)
+        if not existing:
+            return {"rows": 0, "skipped": "no existe en la base"}
+        model = set(bulk.columns_of(table, existing))
+        if fmt == "csv":
+            columns, chunks = csv_chunks(path, chunk_rows, loaded)
+            copy_fmt = "csv"
+        elif fmt == "parquet":
+            if not PARQUET_AVAILABLE:
+                raise RuntimeError("importar parquet necesita pyarrow")
+            columns, chunks = parquet_chunks(path, chunk_rows, loaded)
+            copy_fmt = "csv"
+        else:
+            info = manifest.get("tables", {}).get(table.name, {})
+            columns = [c for c in info.get("columns", bulk.columns_of(table, existing)) if c in model]
+            chunks = ndjson_chunks(path, chunk_rows, loaded)
+            copy_fmt = "ndjson"
+        unknown = set(columns) - model
+        if unknown:
+            raise RuntimeError(f"columnas que no estan en el modelo: {', '.join(sorted(unknown))}")
+
+        started, size, resumed_from = time.perf_counter(), path.stat().st_size, loaded
+        for count, data in chunks:
+            try:
+                bulk.copy_in(cursor, table.name, columns, copy_fmt, data)
+                loaded += count
+                cursor.execute(
+                    "INSERT INTO bulk_import_progress (job, table_name, rows) VALUES (%s, %s, %s) "
+                    "ON CONFLICT (job, table_name) DO UPDATE SET rows = EXCLUDED.rows, updated_at = now()",
+                    (job, table.name, loaded),
+                )
+                conn.commit()  # el lote y su avance, juntos
+            except Exception:
+                conn.rollback()
+                raise
+        if "id" in columns:
+            bulk.reset_identity(cursor, table.name)
+        cursor.execute(
+            "INSERT INTO bulk_import_progress (job, table_name, rows, done) VALUES (%s, %s, %s, true) "
+            "ON CONFLICT (job, table_name) DO UPDATE SET rows = EXCLUDED.rows, done = true, updated_at = now()",
+            (job, table.name, loaded),
+        )
+        conn.commit()
+        seconds = time.perf_counter() - started
+        report(table.name, loaded - resumed_from, size, seconds,
+               f"(retomada desde la fila {resumed_from:,})" if resumed_from else "")
+        return {"rows": loaded - resumed_from, "bytes": size, "seconds": seconds}
+    finally:
+        conn.close()
+
+
+def prepare_import(args, tables) -> str:
+    job = args.job or str(Path(args.dir).resolve())
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(PROGRESS_DDL)
+        if args.truncate:
+            names = [table.name for table in tables if bulk.existing_columns(cursor, table.name)]
+            # TRUNCATE sin CASCADE: las tablas que apuntan a estas y no se cargan se dejan como estan
+            cursor.execute(
+                "SELECT DISTINCT c.conrelid::regclass::text FROM pg_constraint c WHERE c.contype = 'f' "
+                "AND c.confrelid::regclass::text = ANY(%s) AND NOT c.conrelid::regclass::text = ANY(%s)",
+                (names, names),
+            )
+            outside = sorted(row[0] for row in cursor.fetchall())
+            if outside:
+                print(f"--truncate: {', '.join(outside)} apuntan a tablas de la carga y no estan en ella "
+                      "(agregarlas a --tables o vaciarlas antes)")
+                sys.exit(2)
+            if names:
+                cursor.execute(f"TRUNCATE {', '.join(map(bulk.quote, names))} RESTART IDENTITY")
+            cursor.execute("DELETE FROM bulk_import_progress WHERE job = %s", (job,))
+            print(f"vaciadas: {', '.join(names)}")
+        conn.commit()
+    finally:
+        conn.close()
+    return job
+
+
+def run_import(args):
+    directory = Path(args.dir)
+    manifest_path = directory / "manifest.json"
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    files = {}
+    for table in selected_tables(args.tables):
+        found = find_file(directory, table.name, manifest)
+        if found:
+            files[table.name] = (table, *found)
+    if not files:
+        raise SystemExit(f"No hay archivos de tablas del modelo en {directory}")
+    tables = [entry[0] for entry in files.values()]
+    job = prepare_import(args, tables)
+    waiting = dependencies(tables)
+    results: Dict[str, dict] = {}
+    failed: Set[str] = set()
+    started = time.perf_counter()
+
+    with cf.ThreadPoolExecutor(args.jobs) as pool:
+        running: Dict[cf.Future, str] = {}
+        while waiting or running:
+            # arrancan las tablas cuyos padres ya se cargaron
+            ready = [n for n, deps in waiting.items() if not deps & (set(waiting) | set(running.values()))]
+            if not ready and not running:
+                # ciclo de FKs entre las tablas elegidas: se carga una y las FKs deciden
+                ready = [next(iter(waiting))]
+                print(f"{ready[0]:28} ciclo de FKs con {', '.join(sorted(waiting[ready[0]]))}", flush=True)
+            for name in ready:
+                deps = waiting.pop(name)
+                if deps & failed:
+                    failed.add(name)
+                    print(f"{name:28} no se carga: fallo {', '.join(sorted(deps & failed))}", flush=True)
+                    continue
+                table, path, fmt = files[name]
+                running[pool.submit(import_table, table, path, fmt, job, args.chunk_rows, manifest)] = name
+            if not running:
+                continue
+            finished, _ = cf.wait(running, return_when=cf.FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as exc:
+                    failed.add(name)
+                    print(f"{name:28} ERROR: {exc}", flush=True)
+                    continue
+                if "skipped" in results[name]:
+                    print(f"{name:28} salteada: {results[name]['skipped']}", flush=True)
+    summarize({n: r for n, r in results.items() if "skipped" not in r}, time.perf_counter() - started)
+    if failed:
+        print(f"{len(failed)} tablas sin cargar; volver a correr el comando retoma desde el ultimo lote")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="tablas -> archivos")
+    export.add_argument("dir")
+    export.add_argument("--format", choices=tuple(EXTENSIONS), default="csv")
+    export.add_argument("--gzip", action="store_true", help="comprimir CSV/NDJSON")
+    export.add_argument("--force", action="store_true", help="rehacer tablas ya exportadas")
+    imp = commands.add_parser("import", help="archivos -> tablas")
+    imp.add_argument("dir")
+    imp.add_argument("--chunk-rows", type=int, default=100_000, help="filas por transaccion")
+    imp.add_argument("--truncate", action="store_true", help="vaciar antes las tablas a cargar")
+    imp.add_argument("--job", help="nombre del avance guardado (por defecto, la carpeta)")
+    for command in (export, imp):
+        command.add_argument("--tables", help="lista separada por comas (por defecto, todas)")
+        command.add_argument("--jobs", type=int, default=4, help="tablas en paralelo")
+    args = parser.parse_args()
+
+    if DB_BACKEND == "memory" or not test_connection():
+        print("Se necesita Postgres (DATABASE_URL)")
+        sys.exit(2)
+    if args.command == "export":
+        run_export(args)
+    else:
+        run_import(args)
+
+
+if __name__ == "__main__":
+    main()
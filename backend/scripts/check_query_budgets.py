@@ -0,0 +1,111 @@
+"""
+Verifica el presupuesto de consultas SQL de los endpoints principales.
+
+Uso (desde la carpeta backend; DATABASE_URL apuntando a una base de pruebas):
+    python scripts/check_query_budgets.py [--rows 20]
+
+Levanta la API con SQL_PROFILE=strict (ver src/services/sql_profiler.py),
+registra un usuario de prueba, crea una mascota con --rows registros de cada
+tipo, posts y comentarios, y recorre los endpoints. Imprime por ruta las
+consultas contra el presupuesto, las sesiones y las sentencias repetidas.
+Sale con codigo 1 si algun endpoint se pasa del presupuesto o repite
+sentencias: con --rows > SQL_REPEAT_THRESHOLD un N+1 aparece como repeticion
+aunque el presupuesto alcance.
+
+Escribe datos: no usar contra produccion.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+from pathlib import Path
+
+os.environ["SQL_PROFILE"] = "strict"
+os.environ.setdefault("METRICS_ENABLED", "0")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.db import DB_BACKEND, test_connection  # noqa: E402
+from src.main import app  # noqa: E402
+from src.services import sql_profiler  # noqa: E402
+
+RECORDS = {
+    "health-records": {"description": "control"},
+    "vaccines": {"vaccine_name": "rabia"},
+    "medications": {"medication": "antiparasitario"},
+    "weights": {"weight": 10.5},
+    "media": {"url": "https://example.com/rex.jpg", "media_type": "image"},
+    "medical-visits": {"diagnosis": "sano"},
+}
+
+
+def seed(client: TestClient, headers: dict, rows: int) -> dict:
+    pet = client.post("/pets", json={"name": "Presupuesto", "species": "perro"}, headers=headers).json()
+    for kind, body in RECORDS.items():
+        for _ in range(rows):
+            client.post(f"/pets/{pet['id']}/{kind}", json=body, headers=headers)
+    post = None
+    for i in range(rows):
+        post = client.post("/posts", json={"content": f"presupuesto {i}", "pet_id": pet["id"]}, headers=headers).json()
+    for i in range(rows):
+        client.post(f"/posts/{post['id']}/comments", json={"comment": f"comentario {i}"}, headers=headers)
+        client.post(f"/posts/{post['id']}/likes", headers=headers)
+    return {"pet_id": pet["id"], "post_id": post["id"]}
+
+
+def requests_to_check(ids: dict):
+    pet, post = ids["pet_id"], ids["post_id"]
+    yield "GET", "/users/me", None
+    yield "GET", "/pets", None
+    yield "PUT", f"/pets/{pet}", {"weight": 11.0}
+    for kind in RECORDS:
+        yield "GET", f"/pets/{pet}/{kind}", None
+    yield "GET", f"/pets/{pet}/vaccine-scans", None
+    yield "GET", "/posts", None
+    yield "GET", f"/posts?pet_id={pet}", None
+    yield "GET", f"/posts/{post}", None
+    yield "PUT", f"/posts/{post}", {"content": "editado"}
+    yield "GET", f"/posts/{post}/likes", None
+    yield "GET", f"/posts/{post}/comments", None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20, help="registros de cada tipo a crear")
+    args = parser.parse_args()
+
+    if DB_BACKEND == "memory" or not test_connection():
+        print("Se necesita Postgres (DATABASE_URL) para contar consultas")
+        sys.exit(2)
+    warnings.filterwarnings("ignore")
+    client = TestClient(app)
+    email = f"presupuesto-{int(time.time())}@example.com"
+    auth = client.post("/auth/register", json={"name": "Presupuesto", "email": email, "password": "secreta"})
+    headers = {"Authorization": "Bearer " + auth.json()["access_token"]}
+    ids = seed(client, headers, args.rows)
+
+    failures = 0
+    print(f"{'ruta':42} {'estado':>6} {'consultas':>10} {'sesiones':>8}  repetidas")
+    for method, path, body in requests_to_check(ids):
+        response = client.request(method, path, json=body, headers=headers)
+        queries = response.headers.get("x-sql-queries", "?")
+        sessions = response.headers.get("x-sql-sessions", "")
+        repeated = response.headers.get("x-sql-repeated", "")
+        if response.status_code == 500 and "budget" in response.text:
+            summary = response.json()
+            sessions = str(summary["sessions"])
+            repeated = str(summary["repeated"][0]["count"]) if summary["repeated"] else ""
+        failed = response.status_code >= 400 or bool(repeated)
+        failures += failed
+        print(f"{method + ' ' + path:42} {response.status_code:>6} {queries:>10} {sessions:>8}  "
+              f"{repeated + 'x' if repeated else ''}{'  <- FALLA' if failed else ''}")
+    print(f"presupuesto por defecto: {sql_profiler.SQL_QUERY_BUDGET}; umbral de repeticion: {sql_profiler.SQL_REPEAT_THRESHOLD}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
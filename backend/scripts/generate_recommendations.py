@@ -0,0 +1,47 @@
+"""
+Genera las recomendaciones precalculadas de todas las mascotas.
+
+Uso (desde la carpeta backend, con DATABASE_URL apuntando a Postgres):
+    python scripts/generate_recommendations.py [--chunk 500] [--workers 2]
+        [--max-rate 2000] [--max-active 20] [--limit 0] [--restart]
+
+Reanuda desde el ultimo checkpoint (job_checkpoints) si una ejecucion anterior
+se corto; --restart empieza de cero. --max-rate limita mascotas por segundo y
+--max-active hace esperar al job mientras la base tenga mas consultas activas
+que ese valor. Pensado para correr de noche desde cron.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from src.services import recommendations  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk", type=int, default=500, help="mascotas por lote (upsert y checkpoint)")
+    parser.add_argument("--window", type=int, default=20_000, help="mascotas por transaccion de lectura")
+    parser.add_argument("--workers", type=int, default=2, help="procesos para calcular las reglas")
+    parser.add_argument("--max-rate", type=float, default=0, help="mascotas por segundo (0 = sin limite)")
+    parser.add_argument("--max-active", type=int, default=0, help="esperar si hay mas consultas activas (0 = no mirar)")
+    parser.add_argument("--limit", type=int, default=0, help="cortar despues de N mascotas")
+    parser.add_argument("--restart", action="store_true", help="ignorar el checkpoint y empezar de cero")
+    args = parser.parse_args()
+
+    summary = recommendations.run(
+        chunk=args.chunk,
+        window=args.window,
+        workers=args.workers,
+        max_rate=args.max_rate,
+        max_active=args.max_active,
+        restart=args.restart,
+        limit=args.limit,
+    )
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
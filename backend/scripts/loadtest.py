@@ -0,0 +1,285 @@
+"""
+Prueba de carga de la API con sesiones que imitan la app movil.
+
+Necesita httpx (requirements-dev.txt: pip install -r requirements-dev.txt).
+
+Uso (desde la carpeta backend, con datos de scripts/seed_load_data.py):
+    python scripts/loadtest.py [--base-url http://localhost:8000 | --in-process]
+        [--vus 50] [--duration 60] [--warmup 5] [--seed 1] [--manifest loadtest_data.json]
+        [--baseline loadtest_baseline.json] [--save-baseline loadtest_baseline.json]
+        [--max-regression 20] [--min-delta-ms 5] [--min-samples 100]
+
+Cada usuario virtual toma un usuario del manifest, hace login y repite
+sesiones:
+- abrir la app: GET /users/me;
+- dashboard: GET /pets y, de la primera mascota, vacunas, medicaciones y
+  analitica de peso en paralelo, como las pide la app;
+- feed: primera pagina del feed de un grupo (a veces la segunda) y los posts
+  de la mascota;
+- interacciones sobre un post del feed: like, leer comentarios, comentar.
+Algunas sesiones vuelven a hacer login (--relogin). Entre sesiones espera
+--think-ms.
+
+Reporta por endpoint requests, requests/s, p50/p95/p99 y errores, solo de lo
+medido despues de --warmup. --save-baseline guarda el resultado;
+--baseline lo compara con uno guardado y sale con codigo 1 si algun endpoint
+empeora su p95 o su throughput mas de --max-regression %, o tiene errores
+nuevos (ver compare). Comparar solo corridas de la misma maquina, datos y
+parametros.
+
+--in-process llama a la app como ASGI (sin red ni servidor): util en CI,
+pero no corre el arranque (indices de autocompletar, replicas).
+
+GET /posts sin filtros no esta en la mezcla: devuelve todos los posts
+publicos, sin paginar.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.recording = False
+
+    def add(self, label: str, seconds: float, ok: bool):
+        if not self.recording:
+            return
+        if ok:
+            self.latencies[label].append(seconds)
+        else:
+            self.errors[label] += 1
+
+    def report(self, duration: float) -> dict:
+        endpoints = {}
+        for label in sorted(set(self.latencies) | set(self.errors)):
+            values = np.array(self.latencies[label]) * 1000
+            p50, p95, p99 = np.percentile(values, (50, 95, 99)) if len(values) else (0.0, 0.0, 0.0)
+            endpoints[label] = {
+                "count": int(len(values)),
+                "rps": round(len(values) / duration, 2),
+                "p50_ms": round(float(p50), 2),
+                "p95_ms": round(float(p95), 2),
+                "p99_ms": round(float(p99), 2),
+                "errors": self.errors[label],
+            }
+        total = sum(e["count"] for e in endpoints.values())
+        return {"duration_s": round(duration, 1), "total_rps": round(total / duration, 2), "endpoints": endpoints}
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, manifest: dict, rng: random.Random, args):
+        self.client = client
+        self.stats = stats
+        self.manifest = manifest
+        self.rng = rng
+        self.args = args
+        self.headers = {}
+
+    async def call(self, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.stats.add(label, time.perf_counter() - started, ok)
+        return response if ok else None
+
+    def pick(self, key: str) -> int:
+        lo, hi = self.manifest[key]
+        return self.rng.randrange(lo, hi)
+
+    async def login(self):
+        lo, hi = self.manifest["users"]
+        i = self.rng.randrange(hi - lo)
+        self.headers = {}
+        body = {"email": self.manifest["email"].format(i=i), "password": self.manifest["password"]}
+        response = await self.call("POST /auth/login", "POST", "/auth/login", json=body)
+        if response is not None:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def dashboard(self):
+        response = await self.call("GET /pets", "GET", "/pets", params={"fields": "id,name,species,avatar_url"})
+        pets = response.json() if response is not None else []
+        if not pets:
+            return None
+        pet_id = pets[0]["id"]
+        await asyncio.gather(
+            self.call("GET /pets/{id}/vaccines", "GET", f"/pets/{pet_id}/vaccines"),
+            self.call("GET /pets/{id}/medications", "GET", f"/pets/{pet_id}/medications"),
+            self.call("GET /pets/{id}/weights/analytics", "GET", f"/pets/{pet_id}/weights/analytics"),
+        )
+        return pet_id
+
+    async def feed(self, pet_id):
+        group_id = self.pick("groups")
+        response = await self.call("GET /groups/{id}/posts", "GET", f"/groups/{group_id}/posts", params={"limit": 20})
+        items = []
+        if response is not None:
+            page = response.json()
+            items = page["items"]
+            if page["next_cursor"] and self.rng.random() < 0.3:
+                await self.call("GET /groups/{id}/posts", "GET", f"/groups/{group_id}/posts",
+                                params={"limit": 20, "cursor": page["next_cursor"]})
+        if pet_id is not None:
+            await self.call("GET /posts?pet_id", "GET", "/posts", params={"pet_id": pet_id})
+        return items
+
+    async def interact(self, items):
+        post_id = self.rng.choice(items)["id"] if items else self.pick("posts")
+        roll = self.rng.random()
+        if roll < 0.5:
+            await self.call("POST /posts/{id}/likes", "POST", f"/posts/{post_id}/likes")
+        if roll < 0.3:
+            await self.call("GET /posts/{id}/comments", "GET", f"/posts/{post_id}/comments")
+        if roll < 0.1:
+            await self.call("POST /posts/{id}/comments", "POST", f"/posts/{post_id}/comments",
+                            json={"comment": "que lindo!"})
+
+    async def run(self, until: float):
+        await self.login()
+        while time.monotonic() < until:
+            if not self.headers or self.rng.random() < self.args.relogin:
+                await self.login()
+                if not self.headers:
+                    await asyncio.sleep(0.1)  # sin token el resto de la sesion falla
+                    continue
+            await self.call("GET /users/me", "GET", "/users/me")
+            pet_id = await self.dashboard()
+            items = await self.feed(pet_id)
+            await self.interact(items)
+            if self.args.think_ms:
+                await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.args.think_ms / 1000)
+
+
+def make_client(args) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=args.vus * 3, max_keepalive_connections=args.vus * 3)
+    if args.in_process:
+        from src.main import app
+
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=30)
+    return httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30)
+
+
+async def run(args, manifest: dict) -> dict:
+    stats = Stats()
+    rng = random.Random(args.seed)
+    async with make_client(args) as client:
+        users = [VirtualUser(client, stats, manifest, random.Random(rng.random()), args) for _ in range(args.vus)]
+        start = time.monotonic()
+        until = start + args.warmup + args.duration
+        tasks = [asyncio.create_task(u.run(until)) for u in users]
+        await asyncio.sleep(args.warmup)
+        stats.recording = True
+        measured_from = time.monotonic()
+        await asyncio.gather(*tasks)
+        stats.recording = False
+        return stats.report(time.monotonic() - measured_from)
+
+
+def print_report(result: dict):
+    print(f"{'endpoint':36} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errores':>8}")
+    for label, e in result["endpoints"].items():
+        print(f"{label:36} {e['count']:>9} {e['rps']:>8.1f} {e['p50_ms']:>8.1f} {e['p95_ms']:>8.1f} "
+              f"{e['p99_ms']:>8.1f} {e['errors']:>8}")
+    print(f"total: {result['total_rps']:.1f} req/s en {result['duration_s']}s")
+
+
+def compare(result: dict, baseline: dict, args) -> list:
+    """
+    Endpoints que empeoran mas de --max-regression % (p95, si ademas sube al
+    menos --min-delta-ms, o throughput) o con errores nuevos. Los que tienen
+    menos de --min-samples requests se muestran pero no cuentan: su p95 es ruido.
+    """
+    regressions = []
+    limit = args.max_regression / 100
+    print(f"\ncontra la linea base del {baseline['meta'].get('created_at', '?')} ({baseline['meta'].get('commit', '?')}):")
+    for label, e in result["endpoints"].items():
+        base = baseline["endpoints"].get(label)
+        if base is None:
+            print(f"  {label:36} nuevo")
+            continue
+        p95 = (e["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+        rps = (e["rps"] - base["rps"]) / base["rps"] if base["rps"] else 0.0
+        slower = p95 > limit and e["p95_ms"] - base["p95_ms"] >= args.min_delta_ms
+        failed = slower or rps < -limit or bool(e["errors"] and not base["errors"])
+        gated = min(e["count"], base["count"]) >= args.min_samples
+        note = ("  <- REGRESION" if gated else "  (pocas muestras)") if failed else ""
+        print(f"  {label:36} p95 {p95:+7.1%}  req/s {rps:+7.1%}  errores {base['errors']} -> {e['errors']}{note}")
+        failed = failed and gated
+        if failed:
+            regressions.append(label)
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "?"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="llamar a la app como ASGI, sin servidor")
+    parser.add_argument("--vus", type=int, default=50, help="usuarios virtuales concurrentes")
+    parser.add_argument("--duration", type=float, default=60, help="segundos medidos")
+    parser.add_argument("--warmup", type=float, default=5, help="segundos iniciales sin medir")
+    parser.add_argument("--think-ms", type=float, default=0, help="pausa media entre sesiones")
+    parser.add_argument("--relogin", type=float, default=0.1, help="fraccion de sesiones que vuelven a hacer login")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--manifest", default="loadtest_data.json")
+    parser.add_argument("--baseline", help="JSON guardado con --save-baseline para comparar")
+    parser.add_argument("--save-baseline", help="guardar el resultado como linea base")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="porcentaje tolerado")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="suba minima del p95 para contar")
+    parser.add_argument("--min-samples", type=int, default=100, help="requests minimos para comparar un endpoint")
+    args = parser.parse_args()
+
+    manifest = json.loads(Path(args.manifest).read_text())
+    target = "en proceso" if args.in_process else args.base_url
+    print(f"{args.vus} usuarios virtuales contra {target}, {args.warmup}s de calentamiento + {args.duration}s")
+    result = asyncio.run(run(args, manifest))
+    print_report(result)
+
+    result["meta"] = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "target": target,
+        "vus": args.vus,
+        "think_ms": args.think_ms,
+        "relogin": args.relogin,
+        "seed": args.seed,
+        "data": {k: manifest[k] for k in ("users", "pets", "groups", "posts")},
+    }
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(result, indent=2))
+        print(f"linea base guardada en {args.save_baseline}")
+    if args.baseline:
+        regressions = compare(result, json.loads(Path(args.baseline).read_text()), args)
+        if regressions:
+            print(f"{len(regressions)} endpoints con regresion (limite {args.max_regression}%)")
+            sys.exit(1)
+        print("sin regresiones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Recalcula los agregados de calificacion de places desde place_reviews.
+
+Uso (desde la carpeta backend, con DATABASE_URL apuntando a Postgres):
+    python scripts/recompute_place_ratings.py [--batch 5000] [--pause 0.05]
+
+Los agregados se mantienen de forma incremental en cada escritura; este job
+es la red de seguridad (importaciones directas en SQL, borrados manuales).
+Recorre los lugares por rangos de id, una transaccion corta por rango, y solo
+reescribe las filas cuyo agregado cambio.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from src.db.places import place_id_range, recompute_ratings  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=5000, help="lugares por transaccion")
+    parser.add_argument("--pause", type=float, default=0.0, help="segundos de espera entre lotes")
+    args = parser.parse_args()
+
+    lo, hi = place_id_range()
+    start = time.perf_counter()
+    fixed = 0
+    for first in range(lo, hi + 1, args.batch):
+        fixed += recompute_ratings(first, first + args.batch - 1)
+        if args.pause:
+            time.sleep(args.pause)
+    print(f"lugares {lo}..{hi}: {fixed} agregados corregidos en {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Datos sinteticos para las pruebas de carga (scripts/loadtest.py).
+
+Uso (desde la carpeta backend; DATABASE_URL apuntando a una base de pruebas
+con databases/*.sql aplicados):
+    python scripts/seed_load_data.py [--users 1000000] [--seed 1] [--manifest loadtest_data.json]
+
+Genera usuarios, mascotas, grupos publicos, posts (la mitad en grupos), likes,
+comentarios, vacunas, medicaciones y pesos, todo con COPY en lotes de
+--chunk filas. Los ids se asignan a mano a continuacion del maximo de cada
+tabla (con la tabla bloqueada mientras se carga) y despues se ajusta su
+secuencia, asi las relaciones se calculan sin volver a leer nada. Todos los
+usuarios tienen la clave --password.
+
+Las cantidades salen de --users y de las proporciones por usuario, mascota y
+post. El manifest guarda los rangos de ids, el tag de los emails y la clave;
+loadtest.py lo lee para elegir usuarios, posts y grupos. Con la misma --seed
+los datos son los mismos.
+"""
+import argparse
+import hashlib
+import io
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "app"), str(ROOT)]
+
+from src.db import DB_BACKEND, engine, test_connection  # noqa: E402
+
+SPECIES = [("perro", ["labrador", "golden", "criollo", "bulldog", "beagle"]),
+           ("gato", ["siames", "persa", "criollo", "bengala"]),
+           ("conejo", ["belier", "enano"])]
+VACCINES = ["rabia", "moquillo", "parvovirus", "triple felina", "leptospirosis"]
+MEDICATIONS = ["antiparasitario", "antibiotico", "antiinflamatorio", "vitaminas"]
+WORDS = "hoy paseo parque comida juego siesta veterinario amigos playa lluvia feliz nuevo truco".split()
+EPOCH = datetime(2024, 1, 1)
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+class Loader:
+    """COPY por lotes con ids explicitos, una transaccion por tabla."""
+
+    def __init__(self, chunk: int):
+        self.chunk = chunk
+        self.conn = engine.raw_connection()
+
+    def load(self, table: str, columns, rows) -> range:
+        started = time.perf_counter()
+        cursor = self.conn.cursor()
+        try:
+            # nadie mas inserta en la tabla mientras se reservan y cargan los ids
+            cursor.execute(f'LOCK TABLE "{table}" IN SHARE ROW EXCLUSIVE MODE')
+            cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM "{table}"')
+            first = cursor.fetchone()[0] + 1
+            sql = f'COPY "{table}" (id, {", ".join(columns)}) FROM STDIN'
+            next_id, buf, pending = first, io.StringIO(), 0
+            for row in rows:
+                buf.write(f"{next_id}\t" + "\t".join("\\N" if v is None else str(v) for v in row) + "\n")
+                next_id += 1
+                pending += 1
+                if pending >= self.chunk:
+                    buf.seek(0)
+                    cursor.copy_expert(sql, buf)
+                    buf, pending = io.StringIO(), 0
+            if pending:
+                buf.seek(0)
+                cursor.copy_expert(sql, buf)
+            if next_id > first:
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), %s)", (next_id - 1,)
+                )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        elapsed = time.perf_counter() - started
+        count = next_id - first
+        print(f"{table:20} {count:>10} filas en {elapsed:6.1f}s ({count / max(elapsed, 1e-9):,.0f} filas/s)")
+        return range(first, next_id)
+
+    def analyze(self, tables):
+        self.conn.autocommit = True
+        cursor = self.conn.cursor()
+        for table in tables:
+            cursor.execute(f'ANALYZE "{table}"')
+        cursor.close()
+        self.conn.autocommit = False
+
+    def close(self):
+        self.conn.close()
+
+
+def seed(args) -> dict:
+    rng = random.Random(args.seed)
+    tag = uuid.uuid4().hex[:8]
+    password_hash = hashlib.sha256(args.password.encode("utf-8")).hexdigest()
+    loader = Loader(args.chunk)
+    n_users = args.users
+    n_pets = int(n_users * args.pets_per_user)
+    n_posts = int(n_users * args.posts_per_user)
+    try:
+        users = loader.load(
+            "users", ("full_name", "email", "password_hash", "user_type", "created_at"),
+            ((f"Usuario {i}", f"load-{tag}-{i}@example.com", password_hash, "tutor",
+              EPOCH + timedelta(minutes=i)) for i in range(n_users)),
+        )
+
+        def owner(k: int) -> int:
+            return users.start + k * n_users // max(n_pets, 1)
+
+        def pet_row(k: int):
+            species, breeds = rng.choice(SPECIES)
+            birth = date(2012, 1, 1) + timedelta(days=rng.randrange(4000))
+            return (owner(k), f"Mascota {k}", species, rng.choice(breeds), rng.choice("MF"), birth,
+                    round(rng.uniform(2, 40), 1), EPOCH + timedelta(minutes=k))
+
+        pets = loader.load(
+            "pets", ("owner_id", "name", "species", "breed", "sex", "birthdate", "weight", "created_at"),
+            (pet_row(k) for k in range(n_pets)),
+        )
+        groups = loader.load(
+            "groups", ("name", "description", "type"),
+            ((f"Grupo {g} {tag}", sentence(rng, 6), "public") for g in range(args.groups)),
+        )
+
+        def post_row(k: int):
+            pet = pets.start + rng.randrange(len(pets)) if len(pets) else None
+            author = owner(pet - pets.start) if pet else users.start + rng.randrange(n_users)
+            group = groups.start + rng.randrange(len(groups)) if len(groups) and k % 2 else None
+            return (author, pet, sentence(rng, rng.randint(5, 30)), "public",
+                    EPOCH + timedelta(seconds=k * 30), group)
+
+        posts = loader.load(
+            "posts", ("user_id", "pet_id", "content", "visibility", "created_at", "group_id"),
+            (post_row(k) for k in range(n_posts)),
+        )
+        # likes sin repetir usuario en el mismo post: muestra sin reemplazo (sample sobre range no arma la lista)
+        loader.load(
+            "post_likes", ("post_id", "user_id"),
+            ((p, users.start + u)
+             for p in posts for u in rng.sample(range(n_users), min(args.likes_per_post, n_users))),
+        )
+        loader.load(
+            "post_comments", ("post_id", "user_id", "comment", "created_at"),
+            ((p, users.start + rng.randrange(n_users), sentence(rng, 8), EPOCH + timedelta(seconds=(p - posts.start) * 30 + j))
+             for p in posts for j in range(args.comments_per_post)),
+        )
+        loader.load(
+            "pet_vaccines", ("pet_id", "vaccine_name", "date", "next_due"),
+            ((p, rng.choice(VACCINES), d, d + timedelta(days=365))
+             for p in pets for j in range(args.vaccines_per_pet)
+             for d in (date(2023, 1, 1) + timedelta(days=rng.randrange(600)),)),
+        )
+        loader.load(
+            "pet_medications", ("pet_id", "medication", "dose", "frequency", "start_date", "end_date"),
+            ((p, rng.choice(MEDICATIONS), "1 tableta", "cada 12 horas", d, d + timedelta(days=10))
+             for p in pets for j in range(args.medications_per_pet)
+             for d in (date(2024, 1, 1) + timedelta(days=rng.randrange(300)),)),
+        )
+        loader.load(
+            "pet_weight_history", ("pet_id", "date", "weight"),
+            ((p, date(2024, 1, 1) + timedelta(days=30 * j), round(base + rng.uniform(-0.5, 0.5) + j * 0.1, 2))
+             for p in pets for base in (rng.uniform(2, 40),) for j in range(args.weights_per_pet)),
+        )
+        loader.analyze(["users", "pets", "groups", "posts", "post_likes", "post_comments",
+                        "pet_vaccines", "pet_medications", "pet_weight_history"])
+    finally:
+        loader.close()
+    return {
+        "tag": tag,
+        "seed": args.seed,
+        "password": args.password,
+        "email": f"load-{tag}-{{i}}@example.com",
+        "users": [users.start, users.stop],
+        "pets": [pets.start, pets.stop],
+        "groups": [groups.start, groups.stop],
+        "posts": [posts.start, posts.stop],
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--pets-per-user", type=float, default=1.5)
+    parser.add_argument("--posts-per-user", type=float, default=2.0)
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--likes-per-post", type=int, default=3)
+    parser.add_argument("--comments-per-post", type=int, default=1)
+    parser.add_argument("--vaccines-per-pet", type=int, default=2)
+    parser.add_argument("--medications-per-pet", type=int, default=1)
+    parser.add_argument("--weights-per-pet", type=int, default=6)
+    parser.add_argument("--password", default="secreta")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--chunk", type=int, default=100_000, help="filas por COPY")
+    parser.add_argument("--manifest", default="loadtest_data.json")
+    args = parser.parse_args()
+
+    if DB_BACKEND == "memory" or not test_connection():
+        print("Se necesita Postgres (DATABASE_URL)")
+        sys.exit(2)
+    started = time.perf_counter()
+    manifest = seed(args)
+    Path(args.manifest).write_text(json.dumps(manifest, indent=2))
+    print(f"listo en {time.perf_counter() - started:.1f}s; manifest: {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# los modulos se importan como en la app: from src....
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
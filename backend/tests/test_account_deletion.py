@@ -0,0 +1,37 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.deps import auth
+from src.routers import users
+from src.services import deletion
+
+USER = {"id": 4242, "email": "borrar@petverse.test", "full_name": "Borrar", "role": "tutor"}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # sin Postgres: el usuario y el job se simulan, el ocultamiento es el real
+    monkeypatch.setattr(auth, "get_user_by_email", lambda email: dict(USER) if email == USER["email"] else None)
+    monkeypatch.setattr(users, "DB_BACKEND", "sql")
+    monkeypatch.setattr(deletion.db, "create_job", lambda kind, target_id, requested_by: {
+        "id": 1, "kind": kind, "target_id": target_id, "requested_by": requested_by, "status": "queued",
+    })
+    monkeypatch.setattr(deletion.db, "get_job", lambda job_id: {
+        "id": job_id, "kind": "user", "target_id": USER["id"], "requested_by": USER["id"], "status": "running",
+    })
+    monkeypatch.setattr(deletion.worker, "wake", lambda: None)
+    app = FastAPI()
+    app.include_router(users.router)
+    yield TestClient(app)
+    deletion._unhide("user", USER["id"])
+
+
+def test_requests_after_account_deletion_are_refused(client):
+    headers = {"Authorization": "Bearer " + auth.create_access_token({"sub": USER["email"]})}
+    response = client.delete("/users/me", headers=headers)
+    assert response.status_code == 202
+    assert client.delete("/users/me", headers=headers).status_code == 401
+    assert client.get("/users/me/export", headers=headers).status_code == 401
+    # el avance del borrado se puede seguir consultando
+    assert client.get(f"/users/me/deletions/{response.json()['id']}", headers=headers).json()["status"] == "running"
@@ -0,0 +1,32 @@
+from src.services.autocomplete import PrefixIndex, fold
+
+
+def _breeds(items):
+    index = PrefixIndex(ranked=True)
+    index.load((fold(label), label, count) for label, count in items)
+    return index
+
+
+def test_ranked_lookup_sees_the_whole_prefix_range():
+    # 500 razas raras antes, en orden alfabetico, que la mas usada
+    items = [(f"Pa{i:03d}", 1) for i in range(500)] + [("Pastor aleman", 900)]
+    top = _breeds(items).lookup("pa", limit=3)
+    assert top[0] == {"id": "pastor aleman", "label": "Pastor aleman", "count": 900}
+    assert len(top) == 3
+
+
+def test_discount_and_remove():
+    index = _breeds([("Labrador", 2), ("Beagle", 1)])
+    index.discount("labrador")
+    assert index.lookup("lab") == [{"id": "labrador", "label": "Labrador", "count": 1}]
+    index.discount("labrador")
+    assert index.lookup("lab") == []
+    index.discount("desconocida")
+    assert index.lookup("bea")[0]["count"] == 1
+
+
+def test_unranked_lookup_is_alphabetical_and_filters_words():
+    index = PrefixIndex()
+    index.load([(1, "Juan Pérez", 1), (2, "Ana Pereira", 1), (3, "Pedro Gomez", 1)])
+    assert [m["id"] for m in index.lookup("pere")] == [2, 1]
+    assert [m["id"] for m in index.lookup("juan pe")] == [1]
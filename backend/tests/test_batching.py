@@ -0,0 +1,11 @@
+from src.services.batching import BatchWorker
+
+
+def test_filters_fix_or_drop_items_before_flush():
+    flushed = []
+    worker = BatchWorker("test", flushed.extend, batch=10, interval=1.0, maxsize=10)
+    worker.add_filter(lambda item: None if item["pet_id"] == 1 else item)
+    worker.add_filter(lambda item: {**item, "pet_id": None} if item["pet_id"] == 2 else item)
+    worker._flush([{"pet_id": 1}, {"pet_id": 2}, {"pet_id": 3}])
+    assert flushed == [{"pet_id": None}, {"pet_id": 3}]
+    assert worker.stats()["filtered"] == 1 and worker.written == 2
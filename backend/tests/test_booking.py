@@ -0,0 +1,30 @@
+from datetime import time
+
+from src.services.booking import _index, compile_rules, find_overlap, free_starts
+
+
+def _rule(start, end, minutes, vet_id=7, weekday=0):
+    return {"weekday": weekday, "vet_id": vet_id, "start_time": start, "end_time": end, "slot_minutes": minutes}
+
+
+def _labels(bits):
+    return [i for i in range(_index("23:55") + 1) if bits >> i & 1]
+
+
+def test_overlapping_rules_of_the_same_vet_and_day():
+    rules = [_rule(time(9), time(10), 60), _rule(time(9, 30), time(10), 30)]
+    assert find_overlap(rules) == (rules[0], rules[1])
+    assert find_overlap([_rule(time(9), time(10), 60), _rule(time(10), time(11), 30)]) is None
+    assert find_overlap([_rule(time(9), time(10), 60), _rule(time(9, 30), time(10), 30, vet_id=8)]) is None
+    assert find_overlap([_rule(time(9), time(10), 60), _rule(time(9, 30), time(10), 30, weekday=1)]) is None
+
+
+def test_booked_slot_masks_every_start_inside_its_length():
+    day = compile_rules([_rule(time(9), time(10), 60), _rule(time(10), time(11), 30)])[0][7]
+    assert _labels(day.bits) == [_index("09:00"), _index("10:00"), _index("10:30")]
+    # el turno de 60 minutos de las 9 no deja reservar nada que empiece antes de las 10
+    assert _labels(free_starts(day, [_index("09:00")])) == [_index("10:00"), _index("10:30")]
+    # un turno tomado con otra grilla (reglas cambiadas despues) tapa el inicio anterior que lo cubre
+    day = compile_rules([_rule(time(8), time(10), 90)])[0][7]
+    assert _labels(day.bits) == [_index("08:00")]
+    assert _labels(free_starts(day, [_index("09:00")])) == []
@@ -0,0 +1,50 @@
+import threading
+
+from loguru import logger
+
+from src.services.logs import LogWriter
+
+
+class BrokenStream:
+    def write(self, text):
+        raise OSError("disco lleno")
+
+    def flush(self):
+        pass
+
+
+def _record(message="hola"):
+    records = []
+    handler = logger.add(lambda m: records.append(m.record), format="{message}")
+    logger.info(message)
+    logger.remove(handler)
+    return records[0]
+
+
+def test_failed_batch_is_counted_without_logging():
+    writer = LogWriter(BrokenStream())
+    batch = [(_record(), None), (_record(), "req-1")]
+    logged = []
+    handler = logger.add(lambda m: logged.append(m), format="{message}")
+    try:
+        writer._flush(batch)
+    finally:
+        logger.remove(handler)
+    assert logged == []
+    assert writer.failed == 2 and writer.written == 0
+
+
+def test_drops_from_many_threads_are_all_counted():
+    writer = LogWriter()
+
+    def drop():
+        for _ in range(2000):
+            writer._drop("DEBUG")
+
+    threads = [threading.Thread(target=drop) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert writer.dropped == 16000
+    assert writer.stats()["dropped_by_level"] == {"DEBUG": 16000}
@@ -0,0 +1,18 @@
+from datetime import date
+
+from src.routers.pet_records import MedicationBase, VaccineBase, WeightBase
+
+
+def test_vaccine_dates():
+    body = VaccineBase(vaccine_name="Rabia", date="2024-03-12", next_due="2025-03-12")
+    assert body.date == date(2024, 3, 12)
+    assert body.next_due == date(2025, 3, 12)
+
+
+def test_weight_date():
+    assert WeightBase(date="2024-03-12", weight=12.5).date == date(2024, 3, 12)
+
+
+def test_medication_dates():
+    body = MedicationBase(start_date="2024-03-01", end_date="2024-03-10")
+    assert (body.start_date, body.end_date) == (date(2024, 3, 1), date(2024, 3, 10))
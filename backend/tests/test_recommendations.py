@@ -0,0 +1,35 @@
+from datetime import date
+
+from src.services.recommendations import compute
+
+TODAY = date(2026, 6, 1)
+
+
+def _vaccine_recs(vaccines):
+    return [r for r in compute({"id": 1, "species": "perro", "vaccines": vaccines}, TODAY) if r["recommendation_type"] == "vaccines"]
+
+
+def test_booster_replaces_overdue_dose():
+    recs = _vaccine_recs([
+        {"vaccine_name": "Rabia", "date": "2024-05-01", "next_due": "2025-05-01"},
+        {"vaccine_name": "rabia ", "date": "2025-05-03", "next_due": "2026-05-03"},
+        {"vaccine_name": "Rabia", "date": "2026-05-20", "next_due": "2027-05-20"},
+    ])
+    assert recs == []
+
+
+def test_latest_dose_overdue_is_reported():
+    recs = _vaccine_recs([
+        {"vaccine_name": "Rabia", "date": "2025-05-20", "next_due": "2026-05-20"},
+        {"vaccine_name": "Moquillo", "date": "2026-01-10", "next_due": "2026-06-15"},
+        {"vaccine_name": "Moquillo", "date": "2025-01-10", "next_due": "2026-01-10"},
+    ])
+    assert recs[0]["metadata"] == {"overdue": ["Rabia"], "priority": "high"}
+
+
+def test_booster_due_soon():
+    recs = _vaccine_recs([
+        {"vaccine_name": "Moquillo", "date": "2025-01-10", "next_due": "2026-01-10"},
+        {"vaccine_name": "Moquillo", "date": "2026-01-10", "next_due": "2026-06-15"},
+    ])
+    assert recs[0]["metadata"] == {"next_due": "2026-06-15", "vaccine": "Moquillo", "priority": "medium"}
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from src.db import replicas
+from src.repositories import sql
+
+# SQLite hace de primario y de replica: las filas de cada base dicen de donde salio la lectura
+metadata = MetaData()
+notes = Table("notes", metadata, Column("id", Integer, primary_key=True), Column("body", String))
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    urls = {}
+    for name in ("primary", "replica"):
+        urls[name] = f"sqlite:///{tmp_path / name}.db"
+        engine = create_engine(urls[name])
+        metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(notes).values(id=1, body=name))
+    router = replicas.ReplicaRouter([urls["replica"]])
+    router.check_all()
+    primary = sessionmaker(bind=create_engine(urls["primary"]))
+    replicas.watch_writes(primary, router)
+    monkeypatch.setattr(replicas, "router", router)
+    monkeypatch.setattr(sql, "SessionLocal", primary)
+    token = replicas.current_user.set(7)
+    yield router, primary
+    replicas.current_user.reset(token)
+
+
+def test_reads_go_to_the_replica_until_the_user_writes(setup):
+    router, _ = setup
+    repo = sql.SqlRepository(notes)
+    assert repo.get(1)["body"] == "replica"
+    repo.update(1, {"body": "editado"})
+    assert repo.get(1)["body"] == "editado"
+    assert router.stats()["sticky_reads"] == 1
+
+
+def test_domain_module_commits_stick_the_user(setup):
+    router, primary = setup
+    session = primary()
+    session.execute(text("UPDATE notes SET body = 'x' WHERE id = 1"))
+    session.commit()
+    session.close()
+    assert router.pick() is None
+
+
+def test_read_only_commits_and_rollbacks_do_not(setup):
+    router, primary = setup
+    session = primary()
+    session.execute(select(notes))
+    session.execute(text("SELECT 1"))
+    session.commit()
+    session.execute(insert(notes).values(id=2, body="y"))
+    session.rollback()
+    session.close()
+    assert router.pick() is router.replicas[0]
+
+
+def test_writes_without_user_do_not_stick(setup):
+    router, primary = setup
+    replicas.current_user.set(None)
+    session = primary()
+    session.execute(insert(notes).values(id=2, body="y"))
+    session.commit()
+    session.close()
+    replicas.current_user.set(7)
+    assert router.pick() is router.replicas[0]
@@ -0,0 +1,12 @@
+import json
+
+from src.models.responses import PetResponse, dump_rows
+
+
+def test_pet_without_name_or_species_is_serialized():
+    # name y species admiten NULL en la tabla pets
+    rows = [{"id": 1, "owner_id": 2, "name": None, "species": None, "breed": "Beagle"}]
+    assert json.loads(dump_rows(PetResponse, rows))[0] == {
+        "id": 1, "owner_id": 2, "name": None, "species": None, "breed": "Beagle",
+        "sex": None, "birthdate": None, "weight": None, "avatar_url": None,
+    }
@@ -0,0 +1,86 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from src.services.vaccine_ocr import parse_vaccine_text
+
+CARDS = Path(__file__).parent / "fixtures" / "vaccine_cards"
+
+
+def _card(name: str):
+    return parse_vaccine_text((CARDS / name).read_text(encoding="utf-8"))
+
+
+def _entry(name, applied, next_due=None):
+    return {"vaccine_name": name, "date": applied, "next_due": next_due}
+
+
+@pytest.mark.parametrize(
+    "card, expected",
+    [
+        (
+            "perro_dmy.txt",
+            [
+                _entry("Rabia", date(2024, 3, 12), date(2025, 3, 12)),
+                _entry("Polivalente", date(2024, 1, 5), date(2024, 2, 5)),
+                _entry("Leptospirosis", date(2024, 6, 30)),
+            ],
+        ),
+        (
+            "gato_ymd.txt",
+            [
+                _entry("Triple felina", date(2024, 2, 10), date(2025, 2, 10)),
+                _entry("Leucemia felina", date(2024, 3, 15)),
+                _entry("Rabia", date(2024, 4, 1), date(2025, 4, 1)),
+            ],
+        ),
+        (
+            "lineas_partidas.txt",
+            [
+                _entry("Bordetella", date(2024, 7, 15), date(2025, 7, 15)),
+                _entry("Parvovirus", date(2024, 9, 1)),
+            ],
+        ),
+        (
+            "ruido_ocr.txt",
+            [_entry("Giardia", date(2024, 8, 1), date(2025, 8, 1))],
+        ),
+    ],
+)
+def test_cards(card, expected):
+    assert _card(card) == expected
+
+
+@pytest.mark.parametrize(
+    "line, applied",
+    [
+        ("Rabia 12/03/2024", date(2024, 3, 12)),
+        ("Rabia 12-03-2024", date(2024, 3, 12)),
+        ("Rabia 12.03.2024", date(2024, 3, 12)),
+        ("Rabia 12/03/24", date(2024, 3, 12)),
+        ("Rabia 2/3/2024", date(2024, 3, 2)),
+        ("Rabia 2024-03-12", date(2024, 3, 12)),
+        ("Rabia 2024/3/12", date(2024, 3, 12)),
+    ],
+)
+def test_date_formats(line, applied):
+    assert parse_vaccine_text(line) == [_entry("Rabia", applied)]
+
+
+@pytest.mark.parametrize("dose", ["1ra dosis", "2° dosis", "3a dosis", "refuerzo", "dosis unica"])
+def test_dose_marks_are_not_dates(dose):
+    assert parse_vaccine_text(f"Moquillo {dose} 01/02/2024") == [_entry("Moquillo", date(2024, 2, 1))]
+
+
+def test_accents_and_case():
+    assert parse_vaccine_text("ANTIRRÁBICA 01/02/2024") == [_entry("Rabia", date(2024, 2, 1))]
+
+
+def test_invalid_date_is_skipped():
+    assert parse_vaccine_text("Rabia 31/02/2024") == []
+
+
+def test_empty_text():
+    assert parse_vaccine_text("") == []
+    assert parse_vaccine_text(None) == []
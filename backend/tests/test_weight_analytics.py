@@ -0,0 +1,15 @@
+from src.services import weight_analytics
+
+
+def test_result_computed_before_a_write_is_not_cached():
+    pet_id, key = 9001, (200, 7)
+    seen = weight_analytics.version(pet_id)
+    weight_analytics.invalidate(pet_id)  # un peso nuevo mientras se calculaba
+    weight_analytics.set_cached(pet_id, key, {"count": 1}, seen)
+    assert weight_analytics.get_cached(pet_id, key) is None
+
+    seen = weight_analytics.version(pet_id)
+    weight_analytics.set_cached(pet_id, key, {"count": 2}, seen)
+    assert weight_analytics.get_cached(pet_id, key) == {"count": 2}
+    weight_analytics.invalidate(pet_id)
+    assert weight_analytics.get_cached(pet_id, key) is None